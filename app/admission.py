@@ -0,0 +1,106 @@
+# Admission control for the expensive endpoints. Each class of endpoint (search,
+# ingest) gets its own gate: a bounded number of requests run at once, each on a
+# worker thread reserved for that class, and a bounded number may wait for a slot.
+# Beyond that, requests are shed at once with 503 + Retry-After instead of queueing
+# in the shared threadpool, so a burst of slow ingests can't delay searches.
+
+import functools
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Sequence
+import anyio
+import anyio.to_thread
+from services.deadlines import remaining
+
+
+class Overloaded(Exception):
+    """The request was shed: too many requests of its class are running or waiting."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """
+    At most `max_concurrent` admitted requests and `max_queue` waiting ones. A wait
+    is bounded by the request deadline. A gate that `defers_to` others sheds its
+    requests while any of those has requests waiting: that is how search takes
+    priority over ingest.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        retry_after: float = 1.0,
+        defers_to: Sequence["AdmissionGate"] = (),
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.defers_to = tuple(defers_to)
+        self.running = 0
+        self.waiting = 0
+        # anyio primitives are created on first use, inside the event loop.
+        self._slots = None
+        self._threads = None
+
+    @classmethod
+    def from_env(cls, name: str, max_concurrent: int, max_queue: int, **kwargs) -> "AdmissionGate":
+        prefix = name.upper()
+        return cls(
+            name,
+            int(os.getenv(f"{prefix}_MAX_CONCURRENT", str(max_concurrent))),
+            int(os.getenv(f"{prefix}_MAX_QUEUE", str(max_queue))),
+            **kwargs,
+        )
+
+    def _shed(self, reason: str) -> Overloaded:
+        return Overloaded(f"Too many {self.name} requests ({reason}), try again later.", self.retry_after)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._slots is None:
+            self._slots = anyio.Semaphore(self.max_concurrent)
+            self._threads = anyio.CapacityLimiter(self.max_concurrent)
+        if any(gate.waiting for gate in self.defers_to):
+            raise self._shed("yielding to higher-priority requests")
+
+        try:
+            self._slots.acquire_nowait()
+        except anyio.WouldBlock:
+            # Only a request that actually blocks counts as waiting: lower-priority
+            # gates yield to it, and it takes a place in the queue.
+            if self.waiting >= self.max_queue:
+                raise self._shed("queue full")
+            self.waiting += 1
+            try:
+                left = remaining()
+                with anyio.move_on_after(left if left is not None else float("inf")) as scope:
+                    await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+            if scope.cancelled_caught:
+                raise self._shed("no slot before the deadline")
+
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Runs a blocking call on one of this gate's worker threads once admitted."""
+        async with self.admit():
+            return await self.to_thread(func, *args, **kwargs)
+
+    async def to_thread(self, func: Callable, *args, **kwargs):
+        """
+        Runs a blocking call on one of this gate's worker threads, for requests
+        already inside `admit` that make several calls (a pushed stream's batches).
+        """
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=self._threads)
@@ -1,20 +1,135 @@
 import os
 import re
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from typing import List, Optional
 from ingestion.models import Article
+from ingestion.providers.provider_i import ProviderError
 from uses_cases.article_ingestion import ArticleIngestionService, ArticleIngestionError
+from storage.search_filters import SearchFilters
 from uses_cases.search_service import SearchService, SearchError
+from uses_cases.related_articles import RelatedArticlesService, ArticleNotFoundError
+from uses_cases.trending import TrendingService
+from uses_cases.suggest import SuggestService
+from uses_cases.push_ingestion import PushIngestionService
+from app.admission import AdmissionGate, Overloaded
+from services.deadlines import DeadlineExceeded, deadline
 
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Services (and the SDK clients behind them) are built on first use instead of at
+# import time, so the process can accept traffic before Vertex AI / Postgres are ready.
+@lru_cache(maxsize=1)
+def get_article_service() -> ArticleIngestionService:
+    service = ArticleIngestionService()
+    # Titles indexed by this worker show up in suggestions right away.
+    service.indexed_listeners.append(lambda articles: get_suggest_service().add_articles(articles))
+    return service
+
+
+@lru_cache(maxsize=1)
+def get_search_service() -> SearchService:
+    return SearchService()
+
+
+@lru_cache(maxsize=1)
+def get_related_service() -> RelatedArticlesService:
+    return RelatedArticlesService()
+
+
+@lru_cache(maxsize=1)
+def get_trending_service() -> TrendingService:
+    return TrendingService()
+
+
+@lru_cache(maxsize=1)
+def get_suggest_service() -> SuggestService:
+    return SuggestService()
+
+
+@lru_cache(maxsize=1)
+def get_push_service() -> PushIngestionService:
+    return PushIngestionService(get_article_service())
+
+
+# Search and ingest are admitted separately; ingest is shed while searches queue.
+@lru_cache(maxsize=1)
+def get_search_gate() -> AdmissionGate:
+    return AdmissionGate.from_env("search", max_concurrent=16, max_queue=64)
+
+
+@lru_cache(maxsize=1)
+def get_ingest_gate() -> AdmissionGate:
+    return AdmissionGate.from_env(
+        "ingest", max_concurrent=2, max_queue=8, retry_after=5, defers_to=[get_search_gate()]
+    )
+
+
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "10"))
+INGEST_DEADLINE_SECONDS = float(os.getenv("INGEST_DEADLINE_SECONDS", "120"))
+
+
+def _overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) or 1)})
+
+
+def _reset_services_after_fork():
+    # The cached services hold the parent's SDK clients; the singletons behind them
+    # reset themselves after a fork, so the services must be rebuilt as well.
+    get_article_service.cache_clear()
+    get_search_service.cache_clear()
+    get_related_service.cache_clear()
+    get_trending_service.cache_clear()
+    get_suggest_service.cache_clear()
+    get_push_service.cache_clear()
+    get_search_gate.cache_clear()
+    get_ingest_gate.cache_clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_services_after_fork)
+
+
+def warm_up():
+    """
+    Builds the services and touches every backend once (SDK imports, aiplatform.init,
+    Matching Engine resources, Postgres connection), and loads the suggestion index.
+    """
+    get_article_service()
+    get_search_service().vector_store.warm_up()
+    get_suggest_service().load()
+
+
+def _warm_up_quietly():
+    try:
+        warm_up()
+    except Exception as e:
+        logger.error(f"Background warm-up failed: {e}", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # WARMUP_ON_STARTUP=true warms up in the background so startup isn't blocked;
+    # the readiness probe reports 503 until it completes.
+    if os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true":
+        threading.Thread(target=_warm_up_quietly, daemon=True).start()
+    yield
+
 
 app = FastAPI(
     title="News Ingestion Service",
     description="An API to fetch articles from different sources.",
+    lifespan=lifespan,
 )
 
 # Orígenes permitidos (dev y prod)
@@ -40,36 +155,154 @@ app.add_middleware(
     allow_headers=["*"],  # Authorization, Content-Type, etc.
 )
 
-article_service = ArticleIngestionService()
-search_service = SearchService()
+
+@app.get("/api/v1/health/live")
+def liveness():
+    """
+    Liveness probe. Never touches external services.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/api/v1/health/ready")
+def readiness():
+    """
+    Readiness probe. Initializes the services on first call and checks the backends.
+    """
+    try:
+        warm_up()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Service not ready: {e}")
+    return {"status": "ready"}
+
+
+@app.post("/api/v1/articles:batch")
+async def push_articles(request: Request, source: str = Query("push", description="Source for records without one.")):
+    """
+    Ingests pre-fetched articles sent as NDJSON `Article` records, optionally
+    gzip-compressed. The body is parsed as it streams in and indexed in batches;
+    the response has one result per record, by line number. A malformed stream
+    stops at the bad point (`error`); the records before it are still ingested.
+    """
+    gate = get_ingest_gate()
+
+    async def run_batch(func, *args):
+        # A stream may take longer than one ingest deadline: each batch gets its own.
+        with deadline(INGEST_DEADLINE_SECONDS):
+            return await gate.to_thread(func, *args)
+
+    try:
+        async with gate.admit():
+            report = await get_push_service().ingest_stream(request.stream(), source, run_batch)
+    except Overloaded as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error ingesting pushed articles: {e}")
+    if report.error and not report.received:
+        raise HTTPException(status_code=400, detail=report.error)
+    return report
+
+
+@app.get("/api/v1/articles/{article_id}/related")
+def get_related_articles(article_id: int, k: int = Query(10, gt=0, le=50)):
+    """
+    Articles most similar to the given one, precomputed when articles are indexed.
+    """
+    try:
+        return get_related_service().get_related(article_id, k=k)
+    except ArticleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error fetching related articles: {e}")
 
 
 @app.get("/api/v1/articles/{source}", response_model=str)
-def get_articles_from_source(source: str, q: str):
+async def get_articles_from_source(source: str, q: str):
     """
-    Fetch, clean, store and index articles from a source.
+    Fetch, clean, store and index articles from a source. Shed with 503 when too
+    many ingests are running or searches are queueing.
     """
     try:
-        return article_service.ingest_articles(source, q)
+        with deadline(INGEST_DEADLINE_SECONDS):
+            return await get_ingest_gate().run(lambda: get_article_service().ingest_articles(source, q))
 
+    except Overloaded as e:
+        raise _overloaded(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ArticleIngestionError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ProviderError as e:
+        # Rate limited, circuit open or provider down: tell the caller when to retry.
+        headers = {"Retry-After": str(int(e.retry_after) + 1)} if e.retry_after else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
 
+@app.get("/api/v1/suggest")
+def suggest_titles(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, gt=0, le=20),
+):
+    """
+    Title type-ahead: articles whose title contains a word sequence starting with
+    `q`, newest first. Served from memory, without embeddings or vector search.
+    """
+    try:
+        return get_suggest_service().suggest(q, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error in suggestions: {e}")
+
+
 @app.get("/api/v1/search")
-def search_articles(q: str):
+async def search_articles(
+    q: str,
+    source: Optional[List[str]] = Query(None, description="Only articles from these providers."),
+    language: Optional[List[str]] = Query(None, description="Only articles in these languages (ISO 639-1)."),
+    published_after: Optional[datetime] = Query(None, description="Only articles published at or after this time."),
+    published_before: Optional[datetime] = Query(None, description="Only articles published before this time."),
+    since_hours: Optional[int] = Query(None, gt=0, description="Shortcut for published_after = now - N hours."),
+):
     """
     Endpoint to perform semantic search over stored articles.
+    Filters are applied inside the vector index, not after retrieval.
     """
+    if since_hours and not published_after:
+        published_after = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+    filters = SearchFilters(
+        sources=source or [],
+        languages=language or [],
+        published_after=published_after,
+        published_before=published_before,
+    )
     try:
-        return search_service.search_articles(q, k=10)
+        with deadline(SEARCH_DEADLINE_SECONDS):
+            return await get_search_gate().run(lambda: get_search_service().search_articles(q, k=10, filters=filters))
+    except Overloaded as e:
+        raise _overloaded(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except SearchError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Unexpected error in semantic search: {e}"
         )
+
+
+@app.get("/api/v1/trending")
+def trending_stories(
+    hours: int = Query(48, gt=0, le=24 * 14, description="Only stories with an article in the last N hours."),
+    limit: int = Query(10, gt=0, le=50),
+    min_size: int = Query(2, gt=0, description="Minimum number of articles in a story."),
+):
+    """
+    Stories (clusters of articles about the same event) ranked by recent velocity.
+    """
+    try:
+        return get_trending_service().get_trending(hours=hours, limit=limit, min_size=min_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error fetching trending stories: {e}")
@@ -1,16 +1,102 @@
-from typing import List
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
 from .strategies.strategy_i import ChunkingStrategy
+from .strategies.semantic import SemanticChunkingStrategy
+from .strategies.sentence_window import SentenceWindowChunkingStrategy
+from .strategies.recursive import RecursiveChunkingStrategy
+from .strategies.heading_aware import HeadingAwareChunkingStrategy
 from ingestion.models import Article
 
+
+# Strategy names usable in configuration.
+STRATEGY_BUILDERS: Dict[str, Type[ChunkingStrategy]] = {
+    "semantic": SemanticChunkingStrategy,
+    "sentence": SentenceWindowChunkingStrategy,
+    "recursive": RecursiveChunkingStrategy,
+    "heading": HeadingAwareChunkingStrategy,
+}
+
+
+def build_strategy(name: str) -> ChunkingStrategy:
+    if name not in STRATEGY_BUILDERS:
+        raise ValueError(f"Chunking strategy '{name}' is not supported.")
+    return STRATEGY_BUILDERS[name]()
+
+
 class DocumentChunker:
     """
     Context class that uses a chunking strategy to split a document.
+
+    The default `strategy` can be overridden per provider (`source_strategies`, keyed
+    by Article.source) or by content length (`length_strategies`, a list of
+    (max_chars, strategy): the first rule whose max_chars fits the content wins).
+    Provider overrides take precedence over length rules.
     """
-    def __init__(self, strategy: ChunkingStrategy):
+    def __init__(
+        self,
+        strategy: ChunkingStrategy,
+        source_strategies: Optional[Dict[str, ChunkingStrategy]] = None,
+        length_strategies: Optional[List[Tuple[int, ChunkingStrategy]]] = None,
+    ):
         self._strategy = strategy
+        self._source_strategies = source_strategies or {}
+        self._length_strategies = sorted(length_strategies or [], key=lambda rule: rule[0])
+
+    def strategy_for(self, article: Article) -> ChunkingStrategy:
+        if article.source and article.source in self._source_strategies:
+            return self._source_strategies[article.source]
+        length = len(article.content or "")
+        for max_chars, strategy in self._length_strategies:
+            if length <= max_chars:
+                return strategy
+        return self._strategy
 
     def chunk(self, article: Article) -> List[str]:
         """
         Chunks the content of an article using the configured strategy.
         """
-        return self._strategy.chunk(article.content)
\ No newline at end of file
+        return self.strategy_for(article).chunk(article.content)
+
+
+def build_document_chunker() -> DocumentChunker:
+    """
+    Builds the chunker from the environment:
+
+    - CHUNKING_STRATEGY: default strategy (default "semantic").
+    - CHUNKING_SOURCE_STRATEGIES: per-provider overrides, e.g. "core=heading,newsapi=sentence".
+    - CHUNKING_SHORT_MAX_CHARS / CHUNKING_SHORT_STRATEGY: strategy for content up to
+      that many characters, e.g. 3000 / "sentence".
+    """
+    cache: Dict[str, ChunkingStrategy] = {}
+
+    def get(name: str) -> ChunkingStrategy:
+        name = name.strip()
+        if name not in cache:
+            cache[name] = build_strategy(name)
+        return cache[name]
+
+    default = get(os.getenv("CHUNKING_STRATEGY", "semantic"))
+
+    source_strategies = {}
+    for entry in os.getenv("CHUNKING_SOURCE_STRATEGIES", "").split(","):
+        if "=" in entry:
+            source, name = entry.split("=", 1)
+            source_strategies[source.strip()] = get(name)
+
+    length_strategies = []
+    short_max_chars = os.getenv("CHUNKING_SHORT_MAX_CHARS")
+    short_strategy = os.getenv("CHUNKING_SHORT_STRATEGY")
+    if short_max_chars and short_strategy:
+        length_strategies.append((int(short_max_chars), get(short_strategy)))
+
+    return DocumentChunker(default, source_strategies, length_strategies)
+
+
+@lru_cache(maxsize=None)
+def build_version_chunker(strategy: str) -> DocumentChunker:
+    """
+    Chunker for an index version built with a fixed strategy: every article is
+    chunked with it, without the per-provider or length overrides.
+    """
+    return DocumentChunker(build_strategy(strategy))
@@ -0,0 +1,58 @@
+import re
+from typing import List, Optional
+from chunking.strategies.strategy_i import ChunkingStrategy
+from chunking.strategies.recursive import RecursiveChunkingStrategy
+
+# A heading on its own line: numbered ("2.1 Methods", "3. Results") or a well-known
+# section name ("Abstract", "Conclusions").
+_SECTION_NAMES = (
+    r"abstract|introduction|background|related work|methods?|methodology|materials and methods|"
+    r"experiments?|results|discussion|conclusions?|future work|limitations"
+)
+_LINE_HEADING = re.compile(
+    rf"^\s*(?:(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^\n]{{0,80}}|(?:{_SECTION_NAMES}))\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# The cleaner collapses newlines, so headings may also appear inline after a sentence:
+# "... as shown before. 2. Related Work Prior studies ...".
+_INLINE_HEADING = re.compile(
+    r"(?<=[.!?])\s+(?=\d+(?:\.\d+)*\.?\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,4}\s+[A-Z])"
+)
+
+
+class HeadingAwareChunkingStrategy(ChunkingStrategy):
+    """
+    For academic papers: splits at section headings so no chunk spans two sections,
+    then sizes each section with a recursive splitter. The heading is prefixed to
+    every chunk of its section to keep the chunk self-describing.
+    """
+
+    def __init__(self, max_tokens: int = 250, overlap_tokens: int = 20):
+        self.section_splitter = RecursiveChunkingStrategy(max_tokens, overlap_tokens)
+
+    def _sections(self, text: str) -> List[tuple]:
+        matches = list(_LINE_HEADING.finditer(text))
+        if matches:
+            sections = []
+            preamble = text[: matches[0].start()].strip()
+            if preamble:
+                sections.append((None, preamble))
+            for i, match in enumerate(matches):
+                end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+                sections.append((match.group(0).strip(), text[match.end():end].strip()))
+            return sections
+        return [(None, part.strip()) for part in _INLINE_HEADING.split(text) if part.strip()]
+
+    def chunk(self, text: str) -> List[str]:
+        """
+        Splits text into section-aligned chunks.
+        """
+        if not text or not text.strip():
+            return []
+        chunks = []
+        for heading, body in self._sections(text):
+            if not body:
+                continue
+            for piece in self.section_splitter.chunk(body):
+                chunks.append(f"{heading}\n{piece}" if heading else piece)
+        return chunks
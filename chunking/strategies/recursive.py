@@ -0,0 +1,62 @@
+from typing import List
+from chunking.strategies.strategy_i import ChunkingStrategy
+from chunking.strategies.text_utils import count_tokens, split_paragraphs, split_sentences
+
+
+class RecursiveChunkingStrategy(ChunkingStrategy):
+    """
+    Splits by paragraphs, then sentences, then words, until every piece fits in
+    `max_tokens`; adjacent pieces are then packed greedily up to `max_tokens`.
+    Consecutive chunks repeat the last `overlap_tokens` words of the previous one.
+    """
+
+    def __init__(self, max_tokens: int = 200, overlap_tokens: int = 20):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1.")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be between 0 and max_tokens - 1.")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def _split(self, text: str, level: int = 0) -> List[str]:
+        if count_tokens(text) <= self.max_tokens:
+            return [text]
+        if level == 0:
+            parts = split_paragraphs(text)
+        elif level == 1:
+            parts = split_sentences(text)
+        else:
+            words = text.split()
+            return [
+                " ".join(words[i:i + self.max_tokens])
+                for i in range(0, len(words), self.max_tokens)
+            ]
+        if len(parts) <= 1:
+            return self._split(text, level + 1)
+        pieces = []
+        for part in parts:
+            pieces.extend(self._split(part, level + 1))
+        return pieces
+
+    def chunk(self, text: str) -> List[str]:
+        """
+        Splits text into chunks of at most `max_tokens` words (plus the overlap).
+        """
+        if not text or not text.strip():
+            return []
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for piece in self._split(text.strip()):
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > self.max_tokens:
+                chunks.append(" ".join(current))
+                tail = " ".join(chunks[-1].split()[-self.overlap_tokens:]) if self.overlap_tokens else ""
+                current = [tail] if tail else []
+                current_tokens = count_tokens(tail)
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
@@ -0,0 +1,34 @@
+from typing import List
+from chunking.strategies.strategy_i import ChunkingStrategy
+from chunking.strategies.text_utils import split_sentences
+
+
+class SentenceWindowChunkingStrategy(ChunkingStrategy):
+    """
+    Groups consecutive sentences into fixed windows, with `overlap` sentences shared
+    between neighbouring windows. No model calls: suited to short news pieces.
+    """
+
+    def __init__(self, sentences_per_chunk: int = 4, overlap: int = 1):
+        if sentences_per_chunk < 1:
+            raise ValueError("sentences_per_chunk must be at least 1.")
+        if not 0 <= overlap < sentences_per_chunk:
+            raise ValueError("overlap must be between 0 and sentences_per_chunk - 1.")
+        self.sentences_per_chunk = sentences_per_chunk
+        self.overlap = overlap
+
+    def chunk(self, text: str) -> List[str]:
+        """
+        Splits text into windows of sentences.
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return []
+
+        step = self.sentences_per_chunk - self.overlap
+        chunks = []
+        for start in range(0, len(sentences), step):
+            chunks.append(" ".join(sentences[start:start + self.sentences_per_chunk]))
+            if start + self.sentences_per_chunk >= len(sentences):
+                break
+        return chunks
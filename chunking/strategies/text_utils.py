@@ -0,0 +1,29 @@
+import re
+from typing import List
+
+# Sentence boundary: terminal punctuation (optionally followed by a closing quote or
+# bracket), whitespace, then something that can start a sentence. Avoids splitting
+# on common abbreviations and on decimals like "3.5".
+_ABBREVIATIONS = "".join(
+    rf"(?<!\b{a}\.)"
+    for a in ("Mr", "Mrs", "Ms", "Dr", "Prof", "Sr", "Sra", "St", "vs", r"e\.g", r"i\.e", "et al", "Fig", "No")
+)
+_SENTENCE_BOUNDARY = re.compile(
+    _ABBREVIATIONS + r"(?<=[.!?…])[\"'”’)\]]?\s+(?=[\"'“‘(¿¡]?[A-ZÁÉÍÓÚÑÜ0-9])"
+)
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+_WORD = re.compile(r"\S+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits text into sentences with a single compiled regex pass."""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def split_paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in _PARAGRAPH_BOUNDARY.split(text) if p.strip()]
+
+
+def count_tokens(text: str) -> int:
+    """Approximates model tokens by whitespace-separated words (close enough for sizing)."""
+    return len(_WORD.findall(text))
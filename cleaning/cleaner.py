@@ -1,11 +1,44 @@
+import hashlib
 import re
+from typing import Dict, Optional
+from .profiles import PROFILES, CleaningProfile, CompiledTable, build_translate_table, normalize, profile_for_source
+
+_NON_ASCII = re.compile(r'[^\x00-\x7F]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of (cleaned) text, used to detect articles and chunks that changed."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 class Cleaner:
     """
     An advanced class for cleaning raw text, especially from academic papers
     or PDF extractions.
+
+    Text is Unicode-normalized rather than reduced to ASCII, following a
+    CleaningProfile: a fixed `profile`, or one picked per provider (`source`) in
+    `clean`. See cleaning/profiles.py.
     """
-    
+
+    def __init__(self, profile: Optional[CleaningProfile] = None):
+        self.profile = profile
+        self._tables: Dict[str, CompiledTable] = {}
+
+    def _table(self, profile: CleaningProfile) -> CompiledTable:
+        if profile.name not in self._tables:
+            self._tables[profile.name] = CompiledTable(build_translate_table(profile))
+        return self._tables[profile.name]
+
+    def profile_for(self, source: Optional[str] = None) -> CleaningProfile:
+        if self.profile is not None:
+            return self.profile
+        name = profile_for_source(source)
+        if name not in PROFILES:
+            raise ValueError(f"Cleaning profile '{name}' is not supported.")
+        return PROFILES[name]
+
     def _rejoin_hyphenated_words(self, text: str) -> str:
         """Joins words that have been split with a hyphen at the end of a line."""
         # Finds a word, a hyphen, a newline, and another word, then joins them.
@@ -36,41 +69,50 @@ class Cleaner:
         # This regex looks for patterns like [1], [2, 3], [4-7], [8, 10-12]
         return re.sub(r'\[\d+(,[\s\d-]+)*\]', '', text)
 
-    def _remove_artifacts(self, text: str) -> str:
+    def _remove_artifacts(self, text: str, profile: CleaningProfile) -> str:
         """Removes other non-prose artifacts like figure captions, URLs, etc."""
         # Remove figure captions (e.g., "Figure 1. Some description.")
-        text = re.sub(r'Figure \d+\..*?\n', '', text)
+        if profile.paper_sections:
+            text = re.sub(r'Figure \d+\..*?\n', '', text)
         
         # Remove URLs
         text = re.sub(r'http\S+|www\S+', '', text)
         
-        # Remove any remaining garbled text (non-ASCII characters)
-        text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+        # Legacy mode: remove any non-ASCII text. Otherwise it was normalized in step 0.
+        if profile.ascii_only:
+            text = _NON_ASCII.sub(' ', text)
         return text
 
-    def clean(self, text: str) -> str:
+    def clean(self, text: str, source: Optional[str] = None) -> str:
         """
-        Applies a full, multi-stage cleaning pipeline to the text.
+        Applies a full, multi-stage cleaning pipeline to the text, using the profile
+        for the provider `source` unless the cleaner has a fixed one.
         """
         if not text:
             return ""
+        profile = self.profile_for(source)
 
         # --- Cleaning Pipeline ---
         # The order of these steps is important.
+
+        # 0. Unicode normalization, quote/dash folding and control characters, as a
+        # single translate pass.
+        cleaned_text = text if profile.ascii_only else normalize(text, profile, self._table(profile))
         
         # 1. First, fix words that were broken by line breaks.
-        cleaned_text = self._rejoin_hyphenated_words(text)
+        cleaned_text = self._rejoin_hyphenated_words(cleaned_text)
 
-        # 2. Remove the large blocks of metadata at the start and end.
-        cleaned_text = self._remove_preamble_and_references(cleaned_text)
+        if profile.paper_sections:
+            # 2. Remove the large blocks of metadata at the start and end.
+            cleaned_text = self._remove_preamble_and_references(cleaned_text)
 
-        # 3. Remove in-text citations.
-        cleaned_text = self._remove_citations(cleaned_text)
+            # 3. Remove in-text citations.
+            cleaned_text = self._remove_citations(cleaned_text)
         
         # 4. Remove other artifacts like figure captions and URLs.
-        cleaned_text = self._remove_artifacts(cleaned_text)
+        cleaned_text = self._remove_artifacts(cleaned_text, profile)
 
         # 5. Finally, normalize all remaining whitespace.
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+        cleaned_text = _WHITESPACE.sub(' ', cleaned_text).strip()
 
         return cleaned_text
\ No newline at end of file
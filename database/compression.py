@@ -0,0 +1,49 @@
+# Compression for stored article content. zstd is used when the `zstandard` package
+# is installed; zlib (standard library) otherwise. The codec is stored next to each
+# blob, so content written with either can always be read back where it is available.
+
+import os
+import zlib
+from typing import Tuple
+
+ZSTD, ZLIB = "zstd", "zlib"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def default_codec() -> str:
+    codec = os.getenv("CONTENT_CODEC")
+    if codec:
+        return codec
+    return ZSTD if _zstd() is not None else ZLIB
+
+
+def compress_text(text: str, codec: str = None, level: int = None) -> Tuple[str, bytes]:
+    """Returns (codec, compressed UTF-8 bytes)."""
+    codec = codec or default_codec()
+    data = text.encode("utf-8")
+    if codec == ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package.")
+        return codec, zstandard.ZstdCompressor(level=level or int(os.getenv("CONTENT_ZSTD_LEVEL", "9"))).compress(data)
+    if codec == ZLIB:
+        return codec, zlib.compress(data, level or int(os.getenv("CONTENT_ZLIB_LEVEL", "6")))
+    raise ValueError(f"Content codec '{codec}' is not supported.")
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise ImportError("Reading zstd content requires the 'zstandard' package.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Content codec '{codec}' is not supported.")
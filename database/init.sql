@@ -3,5 +3,110 @@ CREATE TABLE IF NOT EXISTS articles (
     title TEXT NOT NULL UNIQUE,
     url TEXT,
     published_at TIMESTAMP,
-    content_preview TEXT
+    content_preview TEXT,
+    source VARCHAR(50),
+    language VARCHAR(10),
+    content_hash VARCHAR(64),
+    status VARCHAR(20) NOT NULL DEFAULT 'cleaned',
+    last_error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status_updated_at TIMESTAMP DEFAULT NOW(),
+    fetched_at TIMESTAMP DEFAULT NOW(),
+    cleaned_at TIMESTAMP,
+    chunked_at TIMESTAMP,
+    embedded_at TIMESTAMP,
+    indexed_at TIMESTAMP
 );
+
+-- Stories: articles about the same event, clustered as they are indexed.
+CREATE TABLE IF NOT EXISTS story_clusters (
+    id SERIAL PRIMARY KEY,
+    label TEXT,
+    centroid BYTEA NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    trend_key DOUBLE PRECISION NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_article_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_story_clusters_trend_key ON story_clusters (trend_key);
+CREATE INDEX IF NOT EXISTS ix_story_clusters_last_article_at ON story_clusters (last_article_at);
+
+-- Existing databases: add the columns introduced after the first release.
+-- Rows that predate state tracking were indexed inline, so they start as 'indexed'.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'indexed';
+ALTER TABLE articles ALTER COLUMN status SET DEFAULT 'cleaned';
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS last_error TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS status_updated_at TIMESTAMP DEFAULT NOW();
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMP DEFAULT NOW();
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS cleaned_at TIMESTAMP;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS chunked_at TIMESTAMP;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS embedded_at TIMESTAMP;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS indexed_at TIMESTAMP;
+-- Incomplete articles are re-driven from article_contents, which holds the same text.
+ALTER TABLE articles DROP COLUMN IF EXISTS pending_content;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS source VARCHAR(50);
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS language VARCHAR(10);
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS cluster_id INTEGER REFERENCES story_clusters(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS ix_articles_status ON articles (status);
+CREATE INDEX IF NOT EXISTS ix_articles_source ON articles (source);
+CREATE INDEX IF NOT EXISTS ix_articles_language ON articles (language);
+CREATE INDEX IF NOT EXISTS ix_articles_content_hash ON articles (content_hash);
+CREATE INDEX IF NOT EXISTS ix_articles_cluster_id ON articles (cluster_id);
+CREATE INDEX IF NOT EXISTS ix_articles_indexed_at ON articles (indexed_at);
+
+-- Chunk text per vector datapoint (used by corpus export/import).
+CREATE TABLE IF NOT EXISTS article_chunks (
+    id SERIAL PRIMARY KEY,
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    datapoint_id TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    content_hash VARCHAR(64),
+    index_version VARCHAR(64),
+    vector BYTEA
+);
+ALTER TABLE article_chunks ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE article_chunks ADD COLUMN IF NOT EXISTS index_version VARCHAR(64);
+ALTER TABLE article_chunks ADD COLUMN IF NOT EXISTS vector BYTEA;
+CREATE INDEX IF NOT EXISTS ix_article_chunks_index_version ON article_chunks (index_version);
+CREATE INDEX IF NOT EXISTS ix_article_chunks_article_id ON article_chunks (article_id);
+
+-- Article-level embeddings (mean of chunk vectors, float16) and related articles.
+CREATE TABLE IF NOT EXISTS article_embeddings (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    embedding BYTEA NOT NULL,
+    neighbor_floor DOUBLE PRECISION,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS article_neighbors (
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    related_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    score DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (article_id, related_id)
+);
+CREATE INDEX IF NOT EXISTS ix_article_neighbors_article_score ON article_neighbors (article_id, score);
+CREATE INDEX IF NOT EXISTS ix_article_neighbors_related_id ON article_neighbors (related_id);
+
+-- Cleaned article text, compressed (zstd or zlib), for offline re-chunking.
+CREATE TABLE IF NOT EXISTS article_contents (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    codec VARCHAR(10) NOT NULL,
+    data BYTEA NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Vector index versions; exactly one is active.
+CREATE TABLE IF NOT EXISTS index_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    backend VARCHAR(20) NOT NULL,
+    settings TEXT NOT NULL DEFAULT '{}',
+    chunking_strategy VARCHAR(50),
+    embedding_model VARCHAR(100),
+    status VARCHAR(20) NOT NULL DEFAULT 'building',
+    created_at TIMESTAMP DEFAULT NOW(),
+    activated_at TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_index_versions_active ON index_versions (status) WHERE status = 'active';
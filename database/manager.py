@@ -1,54 +1,145 @@
 # database/manager.py
 import os
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, func, insert, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker
-from .models import Base, ArticleModel
+from .models import (
+    Base,
+    ArticleModel,
+    ArticleChunkModel,
+    ArticleContentModel,
+    ArticleEmbeddingModel,
+    IndexVersionModel,
+    ArticleNeighborModel,
+    StoryClusterModel,
+    PIPELINE_STAGES,
+)
+from cleaning.cleaner import content_hash
+from .compression import compress_text, decompress_text
 from ingestion.models import Article as ArticleSchema
 from dotenv import load_dotenv
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from services.deadlines import check, remaining
 
 load_dotenv()
 
 
+def apply_deadline(conn):
+    """
+    Caps the statements of the current transaction (Session or Connection) to the
+    time left before the request deadline. Only Postgres; a no-op without a deadline.
+    """
+    left = remaining()
+    if left is None:
+        return
+    check("database query")
+    bind = conn.get_bind() if hasattr(conn, "get_bind") else conn
+    if bind.dialect.name == "postgresql":
+        conn.execute(text(f"SET LOCAL statement_timeout = {max(int(left * 1000), 1)}"))
+
+
 class DatabaseManager:
+    """
+    Process-wide access to Postgres. The engine is created (and the schema ensured)
+    on first use rather than on construction, so building services is cheap.
+
+    Creation is guarded by a lock, so concurrent first uses share one engine. After a
+    fork the child drops the connections it inherited from the parent's pool (see
+    `_after_fork_in_child`), so preloading the app before forking workers is safe.
+    Each process opens at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+    """
+
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            print("Creating new DatabaseManager instance...")
-            cls._instance = super(DatabaseManager, cls).__new__(cls)
-
-            db_user = os.getenv("POSTGRES_USER", "news_user")
-            db_pass = os.getenv("POSTGRES_PASSWORD", "news_pass")
-            db_name = os.getenv("POSTGRES_DB", "news_db")
-            db_host = os.getenv("POSTGRES_HOST", "postgres")
-            db_port = os.getenv("POSTGRES_PORT", "5432")
-
-            # LÓGICA DE CONEXIÓN DUAL
-            # Si el host empieza con '/', asumimos que es una ruta de socket de Cloud SQL
-            if db_host and db_host.startswith("/"):
-                print(f"Connecting to Cloud SQL via Unix socket: {db_host}")
-                # El "host" en la query string debe ser el directorio del socket
-                database_url = f"postgresql+psycopg2://{db_user}:{db_pass}@/{db_name}?host={db_host}"
-            # De lo contrario, usamos la conexión de red estándar (para desarrollo local)
-            else:
-                print(f"Connecting to PostgreSQL via network host: {db_host}")
-                database_url = f"postgresql+psycopg2://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-
-            print(f"Database URL: {database_url.replace(db_pass, '****')}")
-            cls._instance.engine = create_engine(database_url)
-            Base.metadata.create_all(cls._instance.engine)
-            cls._instance.SessionLocal = sessionmaker(
-                autocommit=False, autoflush=False, bind=cls._instance.engine
-            )
+            with cls._lock:
+                if cls._instance is None:
+                    print("Creating new DatabaseManager instance...")
+                    instance = super(DatabaseManager, cls).__new__(cls)
+                    instance._engine = None
+                    instance._session_factory = None
+                    instance._init_lock = threading.Lock()
+                    cls._instance = instance
         return cls._instance
 
+    @classmethod
+    def _after_fork_in_child(cls):
+        # Locks may have been held by another thread at fork time: start fresh.
+        cls._lock = threading.Lock()
+        instance = cls._instance
+        if instance is None:
+            return
+        instance._init_lock = threading.Lock()
+        if instance._engine is not None:
+            # Forget the parent's pooled connections without closing them: the
+            # sockets are still in use by the parent.
+            instance._engine.dispose(close=False)
+
+    def _initialize(self):
+        db_user = os.getenv("POSTGRES_USER", "news_user")
+        db_pass = os.getenv("POSTGRES_PASSWORD", "news_pass")
+        db_name = os.getenv("POSTGRES_DB", "news_db")
+        db_host = os.getenv("POSTGRES_HOST", "postgres")
+        db_port = os.getenv("POSTGRES_PORT", "5432")
+
+        # LÓGICA DE CONEXIÓN DUAL
+        # Si el host empieza con '/', asumimos que es una ruta de socket de Cloud SQL
+        if db_host and db_host.startswith("/"):
+            print(f"Connecting to Cloud SQL via Unix socket: {db_host}")
+            # El "host" en la query string debe ser el directorio del socket
+            database_url = f"postgresql+psycopg2://{db_user}:{db_pass}@/{db_name}?host={db_host}"
+        # De lo contrario, usamos la conexión de red estándar (para desarrollo local)
+        else:
+            print(f"Connecting to PostgreSQL via network host: {db_host}")
+            database_url = f"postgresql+psycopg2://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+
+        print(f"Database URL: {database_url.replace(db_pass, '****')}")
+        engine = create_engine(
+            database_url,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
+            pool_pre_ping=True,
+        )
+        Base.metadata.create_all(engine)
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self._engine = engine
+
+    def _ensure_initialized(self):
+        if self._engine is None:
+            with self._init_lock:
+                if self._engine is None:
+                    self._initialize()
+
+    @property
+    def engine(self):
+        self._ensure_initialized()
+        return self._engine
+
+    @property
+    def SessionLocal(self):
+        self._ensure_initialized()
+        return self._session_factory
+
+    def ping(self) -> bool:
+        """
+        Opens a connection and runs a trivial query. Used by readiness checks.
+        """
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+
     def add_article(self, article_data: ArticleSchema) -> int:
         """
         Adds a new article to the database and returns its ID.
         """
         db = self.SessionLocal()
         try:
+            apply_deadline(db)
             existing_article = (
                 db.query(ArticleModel)
                 .filter(ArticleModel.title == article_data.title)
@@ -64,8 +155,15 @@ class DatabaseManager:
                 url=article_data.url,
                 published_at=article_data.published_at,
                 content_preview=article_data.content_preview,
+                source=article_data.source,
+                language=article_data.language,
+                content_hash=content_hash(article_data.content),
+                status="cleaned",
+                cleaned_at=func.now(),
             )
             db.add(new_article)
+            db.flush()
+            self._store_contents(db, {new_article.id: article_data.content})
             db.commit()
             db.refresh(new_article)
             print(f"Article added to PostgreSQL with ID: {new_article.id}")
@@ -73,16 +171,1132 @@ class DatabaseManager:
         finally:
             db.close()
 
+    def add_articles(self, articles: List[ArticleSchema]) -> List[Optional[int]]:
+        """
+        Bulk-inserts cleaned articles and their content in a single transaction, at
+        the 'cleaned' stage.
+        Returns the new ID for each input article, or None when its title already exists
+        or the same content is stored under another title (in the database or earlier
+        in the same batch).
+        """
+        if not articles:
+            return []
+        hashes = [content_hash(a.content) for a in articles]
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            titles = {a.title for a in articles}
+            existing_titles = {
+                row[0]
+                for row in db.query(ArticleModel.title)
+                .filter(ArticleModel.title.in_(titles))
+                .all()
+            }
+            existing_hashes = self._existing_hashes(db, [h for h in hashes if h])
+
+            new_models = []
+            for a, digest in zip(articles, hashes):
+                if a.title in existing_titles or digest in existing_hashes:
+                    new_models.append(None)
+                    continue
+                existing_titles.add(a.title)
+                existing_hashes.add(digest)
+                new_models.append(
+                    ArticleModel(
+                        title=a.title,
+                        url=a.url,
+                        published_at=a.published_at,
+                        content_preview=a.content_preview,
+                        source=a.source,
+                        language=a.language,
+                        content_hash=digest,
+                        status="cleaned",
+                        cleaned_at=func.now(),
+                    )
+                )
+
+            db.add_all([m for m in new_models if m is not None])
+            db.flush()
+            # Read the IDs before commit so they don't trigger one refresh per row.
+            ids = [m.id if m is not None else None for m in new_models]
+            self._store_contents(db, {aid: a.content for aid, a in zip(ids, articles) if aid is not None})
+            db.commit()
+            return ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _store_contents(db, contents: Dict[int, str]):
+        # Cleaned content is kept compressed for good: it is what the sweeper re-drives
+        # incomplete articles from and what offline reindexing re-chunks.
+        if not contents:
+            return
+        rows = []
+        for aid, content in contents.items():
+            codec, data = compress_text(content)
+            rows.append({"article_id": aid, "codec": codec, "data": data, "raw_size": len(content)})
+        stmt = pg_insert(ArticleContentModel.__table__).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["article_id"],
+            set_={
+                "codec": stmt.excluded.codec,
+                "data": stmt.excluded.data,
+                "raw_size": stmt.excluded.raw_size,
+                "stored_at": func.now(),
+            },
+        ))
+
+    def save_contents(self, contents: Dict[int, str]):
+        """
+        Stores (compressed) cleaned content for articles, replacing any previous copy.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            self._store_contents(db, contents)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_contents(self, article_ids: List[int]) -> Dict[int, str]:
+        """
+        Returns the stored cleaned content of the given articles, decompressed.
+        Articles without stored content are omitted.
+        """
+        if not article_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleContentModel.article_id, ArticleContentModel.codec, ArticleContentModel.data)
+                .filter(ArticleContentModel.article_id.in_(list(article_ids)))
+                .all()
+            )
+            return {aid: decompress_text(codec, bytes(data)) for aid, codec, data in rows}
+        finally:
+            db.close()
+
+    @staticmethod
+    def _existing_hashes(db, hashes: List[str]) -> set:
+        if not hashes:
+            return set()
+        return {
+            row[0]
+            for row in db.query(ArticleModel.content_hash)
+            .filter(ArticleModel.content_hash.in_(set(hashes)))
+            .all()
+        }
+
+    def get_statuses_by_title(self, titles: List[str]) -> Dict[str, Tuple[int, str, Optional[str]]]:
+        """
+        Returns {title: (id, status, content_hash)} for the titles already stored, in
+        one query.
+        """
+        if not titles:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleModel.title, ArticleModel.id, ArticleModel.status, ArticleModel.content_hash)
+                .filter(ArticleModel.title.in_(set(titles)))
+                .all()
+            )
+            return {title: (aid, status, digest) for title, aid, status, digest in rows}
+        finally:
+            db.close()
+
+    def get_existing_hashes(self, hashes: List[str]) -> set:
+        """
+        Returns the subset of content hashes already stored, in one query.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return self._existing_hashes(db, hashes)
+        finally:
+            db.close()
+
+    def update_articles(self, articles: Dict[int, ArticleSchema]):
+        """
+        Stores a new version of already known articles (ID -> cleaned article): the
+        metadata, the content hash and the content to index, back at the 'cleaned'
+        stage.
+        """
+        if not articles:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            db.bulk_update_mappings(
+                ArticleModel,
+                [
+                    {
+                        "id": aid,
+                        "url": a.url,
+                        "published_at": a.published_at,
+                        "content_preview": a.content_preview,
+                        "content_hash": content_hash(a.content),
+                        "status": "cleaned",
+                        "last_error": None,
+                    }
+                    for aid, a in articles.items()
+                ],
+            )
+            self._store_contents(db, {aid: a.content for aid, a in articles.items()})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def set_content_hashes(self, hashes: Dict[int, str]):
+        """
+        Records content hashes (ID -> hash) for articles stored before hashing existed.
+        """
+        if not hashes:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            db.bulk_update_mappings(
+                ArticleModel, [{"id": aid, "content_hash": digest} for aid, digest in hashes.items()]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def mark_stage(self, article_ids: List[int], stage: str):
+        """
+        Records that the articles completed pipeline `stage` (see PIPELINE_STAGES).
+        Articles already past `stage` are left untouched.
+        """
+        if stage not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown pipeline stage '{stage}'.")
+        if not article_ids:
+            return
+        values = {
+            "status": stage,
+            "last_error": None,
+            "status_updated_at": func.now(),
+            f"{stage}_at": func.now(),
+        }
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            # Only moves articles forward: a batch that already reached 'indexed'
+            # through the upsert writer is never pulled back to 'embedded'.
+            earlier_stages = PIPELINE_STAGES[: PIPELINE_STAGES.index(stage)]
+            db.query(ArticleModel).filter(
+                ArticleModel.id.in_(article_ids),
+                ArticleModel.status.in_(earlier_stages),
+            ).update(values, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def mark_failed(self, errors: Dict[int, str]):
+        """
+        Records a failure for each article (ID -> error message). The status stays at
+        the last completed stage, so the sweeper resumes from there.
+        """
+        if not errors:
+            return
+        # One UPDATE per distinct error message (usually one for the whole batch).
+        ids_by_error: Dict[str, List[int]] = {}
+        for aid, error in errors.items():
+            ids_by_error.setdefault(error, []).append(aid)
+
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            for error, ids in ids_by_error.items():
+                db.query(ArticleModel).filter(ArticleModel.id.in_(ids)).update(
+                    {
+                        "last_error": error[:2000],
+                        "attempts": ArticleModel.attempts + 1,
+                        "status_updated_at": func.now(),
+                    },
+                    synchronize_session=False,
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def mark_articles_indexed(self, article_ids: List[int]):
+        """
+        Marks articles whose chunk vectors all landed in the vector index.
+        """
+        self.mark_stage(article_ids, "indexed")
+
+    def mark_articles_index_failed(self, errors: Dict[int, str]):
+        """
+        Marks articles whose vectors could not be upserted so they can be retried.
+        `errors` maps article ID to the error message.
+        """
+        self.mark_failed(errors)
+
+    def get_incomplete_articles(
+        self,
+        limit: int,
+        after_id: int = 0,
+        max_attempts: int = 5,
+        idle_seconds: int = 300,
+    ) -> List[ArticleModel]:
+        """
+        Returns up to `limit` articles (ordered by ID, starting after `after_id`) that
+        haven't reached 'indexed', still have their content, are under `max_attempts`
+        failures and haven't changed in the last `idle_seconds` (so articles that an
+        ingest run is still processing are left alone).
+        """
+        db = self.SessionLocal()
+        try:
+            return (
+                db.query(ArticleModel)
+                .filter(
+                    ArticleModel.id > after_id,
+                    ArticleModel.status != "indexed",
+                    db.query(ArticleContentModel.article_id)
+                    .filter(ArticleContentModel.article_id == ArticleModel.id)
+                    .exists(),
+                    ArticleModel.attempts < max_attempts,
+                    ArticleModel.status_updated_at
+                    < func.now() - timedelta(seconds=idle_seconds),
+                )
+                .order_by(ArticleModel.id)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def claim_idle_articles(self, article_ids: List[int], idle_seconds: int = 300) -> set:
+        """
+        Claims incomplete articles for a re-drive. Those that haven't changed in the
+        last `idle_seconds` get their status timestamp bumped, in one statement, so a
+        concurrent ingest run or sweep sees them as busy. Returns the IDs claimed;
+        the others are still being processed elsewhere.
+        """
+        if not article_ids:
+            return set()
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            stmt = (
+                update(ArticleModel)
+                .where(
+                    ArticleModel.id.in_(article_ids),
+                    ArticleModel.status != "indexed",
+                    ArticleModel.status_updated_at < func.now() - timedelta(seconds=idle_seconds),
+                )
+                .values(status_updated_at=func.now())
+                .returning(ArticleModel.id)
+            )
+            claimed = {row[0] for row in db.execute(stmt)}
+            db.commit()
+            return claimed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
     def get_article_by_id(self, article_id: int) -> Optional[ArticleModel]:
         """
         Retrieves an article by its primary key ID.
         """
         db = self.SessionLocal()
         try:
+            apply_deadline(db)
             return db.query(ArticleModel).filter(ArticleModel.id == article_id).first()
         finally:
             db.close()
 
+    def get_articles_by_ids(self, article_ids: List[int]) -> Dict[int, ArticleModel]:
+        """
+        Retrieves several articles in one query, keyed by ID. Missing IDs are omitted.
+        """
+        if not article_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = db.query(ArticleModel).filter(ArticleModel.id.in_(list(article_ids))).all()
+            return {row.id: row for row in rows}
+        finally:
+            db.close()
+
+    def add_chunks(self, chunks: List[dict]):
+        """
+        Records the text behind each datapoint written to the vector index. Each row
+        has article_id, position, datapoint_id and text, plus index_version when the
+        chunk belongs to a versioned index.
+        """
+        if not chunks:
+            return
+        chunks = [
+            chunk if chunk.get("content_hash") else dict(chunk, content_hash=content_hash(chunk["text"]))
+            for chunk in chunks
+        ]
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            db.bulk_insert_mappings(ArticleChunkModel, chunks)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _version_filter(index_version: Optional[str]):
+        if index_version is None:
+            return ArticleChunkModel.index_version.is_(None)
+        return ArticleChunkModel.index_version == index_version
+
+    def get_chunks_for_articles(
+        self, article_ids: List[int], index_version: Optional[str] = None
+    ) -> List[ArticleChunkModel]:
+        """
+        Returns the chunks of the given articles in `index_version` (None is the
+        original index), ordered by article and position.
+        """
+        if not article_ids:
+            return []
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return (
+                db.query(ArticleChunkModel)
+                .filter(
+                    ArticleChunkModel.article_id.in_(list(article_ids)),
+                    self._version_filter(index_version),
+                )
+                .order_by(ArticleChunkModel.article_id, ArticleChunkModel.position)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def get_chunk_vectors(self, datapoint_ids: List[str]) -> Dict[str, bytes]:
+        """
+        Full vectors (float32 bytes) of the given datapoints, keyed by datapoint ID.
+        Datapoints without one are omitted.
+        """
+        if not datapoint_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleChunkModel.datapoint_id, ArticleChunkModel.vector)
+                .filter(
+                    ArticleChunkModel.datapoint_id.in_(list(datapoint_ids)),
+                    ArticleChunkModel.vector.isnot(None),
+                )
+                .all()
+            )
+            return {datapoint_id: vector for datapoint_id, vector in rows}
+        finally:
+            db.close()
+
+    def sample_chunk_vectors(self, index_version: str, limit: int) -> Dict[str, bytes]:
+        """
+        Up to `limit` full vectors of `index_version`, in chunk order. Used to
+        benchmark two-stage settings offline.
+        """
+        db = self.SessionLocal()
+        try:
+            rows = (
+                db.query(ArticleChunkModel.datapoint_id, ArticleChunkModel.vector)
+                .filter(
+                    self._version_filter(index_version),
+                    ArticleChunkModel.vector.isnot(None),
+                )
+                .order_by(ArticleChunkModel.id)
+                .limit(limit)
+                .all()
+            )
+            return {datapoint_id: vector for datapoint_id, vector in rows}
+        finally:
+            db.close()
+
+    def delete_chunks(self, datapoint_ids: List[str]):
+        """
+        Deletes the chunk rows of datapoints removed from the vector index.
+        """
+        if not datapoint_ids:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            db.query(ArticleChunkModel).filter(
+                ArticleChunkModel.datapoint_id.in_(datapoint_ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def update_chunk_positions(self, positions: Dict[int, int]):
+        """
+        Moves kept chunks (chunk row ID -> position) within a new version of an article.
+        """
+        if not positions:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            db.bulk_update_mappings(
+                ArticleChunkModel, [{"id": cid, "position": pos} for cid, pos in positions.items()]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_indexed_articles(self, limit: int = 500, after_id: int = 0) -> List[ArticleModel]:
+        """
+        Returns up to `limit` indexed articles with ID greater than `after_id`, in ID
+        order. Used to page through the whole corpus with a keyset cursor.
+        """
+        db = self.SessionLocal()
+        try:
+            return (
+                db.query(ArticleModel)
+                .filter(ArticleModel.status == "indexed", ArticleModel.id > after_id)
+                .order_by(ArticleModel.id)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def restore_articles(self, rows: List[dict], status: str = "embedded") -> List[int]:
+        """
+        Inserts articles from a snapshot keeping their original IDs (datapoint IDs
+        embed them), with their cleaned content when the row has a `content`. Rows
+        whose ID or title already exists are skipped. Returns the IDs that were inserted.
+        """
+        if not rows:
+            return []
+        db = self.SessionLocal()
+        try:
+            titles = [r["title"] for r in rows]
+            existing_titles = {
+                row[0] for row in db.query(ArticleModel.title).filter(ArticleModel.title.in_(titles)).all()
+            }
+            contents = {r["id"]: r["content"] for r in rows if r.get("content")}
+            values = [
+                dict(
+                    {key: value for key, value in r.items() if key != "content"},
+                    status=status, embedded_at=func.now(), status_updated_at=func.now(),
+                )
+                for r in rows
+                if r["title"] not in existing_titles
+            ]
+            if not values:
+                return []
+            stmt = (
+                pg_insert(ArticleModel.__table__)
+                .values(values)
+                .on_conflict_do_nothing(index_elements=["id"])
+                .returning(ArticleModel.id)
+            )
+            inserted = [row[0] for row in db.execute(stmt)]
+            self._store_contents(db, {aid: contents[aid] for aid in inserted if aid in contents})
+            db.commit()
+            return inserted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def iter_story_clusters(self, batch_size: int = 1000) -> Iterator[List[StoryClusterModel]]:
+        """Pages through every story in ID order."""
+        after_id = 0
+        while True:
+            db = self.SessionLocal()
+            try:
+                rows = (
+                    db.query(StoryClusterModel)
+                    .filter(StoryClusterModel.id > after_id)
+                    .order_by(StoryClusterModel.id)
+                    .limit(batch_size)
+                    .all()
+                )
+            finally:
+                db.close()
+            if not rows:
+                return
+            after_id = rows[-1].id
+            yield rows
+
+    def restore_story_clusters(self, rows: List[dict]) -> List[int]:
+        """
+        Inserts stories from a snapshot keeping their original IDs. Rows whose ID
+        already exists are skipped. Returns the IDs that were inserted.
+        """
+        if not rows:
+            return []
+        db = self.SessionLocal()
+        try:
+            stmt = (
+                pg_insert(StoryClusterModel.__table__)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["id"])
+                .returning(StoryClusterModel.id)
+            )
+            inserted = [row[0] for row in db.execute(stmt)]
+            db.commit()
+            return inserted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def reset_id_sequences(self):
+        """
+        Moves the articles and stories ID sequences past their highest IDs, after
+        inserting explicit IDs.
+        """
+        with self.engine.begin() as conn:
+            for table in ("articles", "story_clusters"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+                ))
+
+    def save_article_embeddings(self, embeddings: Dict[int, bytes]):
+        """
+        Stores (or replaces) article-level embeddings, keyed by article ID.
+        """
+        if not embeddings:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            stmt = pg_insert(ArticleEmbeddingModel.__table__).values([
+                {"article_id": aid, "embedding": embedding} for aid, embedding in embeddings.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["article_id"],
+                set_={"embedding": stmt.excluded.embedding, "updated_at": func.now()},
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_article_embeddings(self, article_ids: List[int]) -> Dict[int, bytes]:
+        if not article_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleEmbeddingModel.article_id, ArticleEmbeddingModel.embedding)
+                .filter(ArticleEmbeddingModel.article_id.in_(list(article_ids)))
+                .all()
+            )
+            return {aid: bytes(embedding) for aid, embedding in rows}
+        finally:
+            db.close()
+
+    def get_article_embedding_rows(self, article_ids: List[int]) -> List[Tuple[int, bytes, Optional[float]]]:
+        """
+        (article_id, embedding, neighbor_floor) of the given articles, in ID order, like
+        the pages of iter_article_embeddings.
+        """
+        if not article_ids:
+            return []
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(
+                    ArticleEmbeddingModel.article_id,
+                    ArticleEmbeddingModel.embedding,
+                    ArticleEmbeddingModel.neighbor_floor,
+                )
+                .filter(ArticleEmbeddingModel.article_id.in_(list(article_ids)))
+                .order_by(ArticleEmbeddingModel.article_id)
+                .all()
+            )
+            return [(aid, bytes(embedding), floor) for aid, embedding, floor in rows]
+        finally:
+            db.close()
+
+    def iter_article_embeddings(
+        self, batch_size: int = 2000
+    ) -> Iterator[List[Tuple[int, bytes, Optional[float]]]]:
+        """
+        Pages through every article embedding in ID order, yielding lists of
+        (article_id, embedding, neighbor_floor).
+        """
+        after_id = 0
+        while True:
+            db = self.SessionLocal()
+            try:
+                apply_deadline(db)
+                rows = (
+                    db.query(
+                        ArticleEmbeddingModel.article_id,
+                        ArticleEmbeddingModel.embedding,
+                        ArticleEmbeddingModel.neighbor_floor,
+                    )
+                    .filter(ArticleEmbeddingModel.article_id > after_id)
+                    .order_by(ArticleEmbeddingModel.article_id)
+                    .limit(batch_size)
+                    .all()
+                )
+            finally:
+                db.close()
+            if not rows:
+                return
+            after_id = rows[-1][0]
+            yield [(aid, bytes(embedding), floor) for aid, embedding, floor in rows]
+
+    def get_indexed_without_embedding(self, limit: int = 500, after_id: int = 0) -> List[int]:
+        """
+        IDs of indexed articles that have no article embedding yet, in ID order.
+        """
+        db = self.SessionLocal()
+        try:
+            rows = (
+                db.query(ArticleModel.id)
+                .outerjoin(ArticleEmbeddingModel, ArticleEmbeddingModel.article_id == ArticleModel.id)
+                .filter(
+                    ArticleModel.status == "indexed",
+                    ArticleModel.id > after_id,
+                    ArticleEmbeddingModel.article_id.is_(None),
+                )
+                .order_by(ArticleModel.id)
+                .limit(limit)
+                .all()
+            )
+            return [row[0] for row in rows]
+        finally:
+            db.close()
+
+    def delete_article_neighbors(self, article_ids: List[int]):
+        """
+        Forgets the related lists of the given articles and removes them from every
+        other list. The lists they left have room again, so their floors are cleared.
+        """
+        if not article_ids:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            ids = list(article_ids)
+            affected = {
+                row[0] for row in db.query(ArticleNeighborModel.article_id)
+                .filter(ArticleNeighborModel.related_id.in_(ids)).distinct().all()
+            }
+            db.query(ArticleNeighborModel).filter(
+                (ArticleNeighborModel.article_id.in_(ids)) | (ArticleNeighborModel.related_id.in_(ids))
+            ).delete(synchronize_session=False)
+            db.query(ArticleEmbeddingModel).filter(
+                ArticleEmbeddingModel.article_id.in_(list(affected | set(ids)))
+            ).update({"neighbor_floor": None}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def add_article_neighbors(self, rows: List[Tuple[int, int, float]], limit: int):
+        """
+        Inserts (article_id, related_id, score) rows, keeps the best `limit` per
+        article and refreshes the floors of the lists that changed.
+        """
+        if not rows:
+            return
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            stmt = pg_insert(ArticleNeighborModel.__table__).values([
+                {"article_id": aid, "related_id": rid, "score": score} for aid, rid, score in rows
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["article_id", "related_id"], set_={"score": stmt.excluded.score}
+            ))
+            params = {"ids": sorted({aid for aid, _, _ in rows}), "limit": limit}
+            db.execute(text(
+                "DELETE FROM article_neighbors n USING ("
+                " SELECT article_id, related_id,"
+                " ROW_NUMBER() OVER (PARTITION BY article_id ORDER BY score DESC) AS rn"
+                " FROM article_neighbors WHERE article_id = ANY(:ids)"
+                ") ranked "
+                "WHERE n.article_id = ranked.article_id AND n.related_id = ranked.related_id"
+                " AND ranked.rn > :limit"
+            ), params)
+            db.execute(text(
+                "UPDATE article_embeddings e"
+                " SET neighbor_floor = CASE WHEN s.size >= :limit THEN s.floor END "
+                "FROM ("
+                " SELECT article_id, COUNT(*) AS size, MIN(score) AS floor"
+                " FROM article_neighbors WHERE article_id = ANY(:ids) GROUP BY article_id"
+                ") s "
+                "WHERE e.article_id = s.article_id"
+            ), params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_related_articles(self, article_id: int, limit: int = 10) -> List[Tuple[ArticleModel, float]]:
+        """
+        The precomputed related articles of `article_id`, best first, in one query
+        over the (article_id, score) index. Only indexed articles are returned.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return [
+                (article, score)
+                for article, score in db.query(ArticleModel, ArticleNeighborModel.score)
+                .join(ArticleNeighborModel, ArticleNeighborModel.related_id == ArticleModel.id)
+                .filter(ArticleNeighborModel.article_id == article_id, ArticleModel.status == "indexed")
+                .order_by(ArticleNeighborModel.score.desc())
+                .limit(limit)
+                .all()
+            ]
+        finally:
+            db.close()
+
+    def iter_indexed_titles(
+        self, batch_size: int = 5000
+    ) -> Iterator[List[Tuple[int, str, Optional[datetime], Optional[datetime]]]]:
+        """
+        Pages through (id, title, published_at, indexed_at) of every indexed article.
+        """
+        after_id = 0
+        while True:
+            db = self.SessionLocal()
+            try:
+                rows = (
+                    db.query(ArticleModel.id, ArticleModel.title, ArticleModel.published_at, ArticleModel.indexed_at)
+                    .filter(ArticleModel.status == "indexed", ArticleModel.id > after_id)
+                    .order_by(ArticleModel.id)
+                    .limit(batch_size)
+                    .all()
+                )
+            finally:
+                db.close()
+            if not rows:
+                return
+            after_id = rows[-1][0]
+            yield [tuple(row) for row in rows]
+
+    def get_titles_indexed_since(
+        self, since: datetime
+    ) -> List[Tuple[int, str, Optional[datetime], Optional[datetime]]]:
+        """
+        (id, title, published_at, indexed_at) of articles indexed at or after `since`.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleModel.id, ArticleModel.title, ArticleModel.published_at, ArticleModel.indexed_at)
+                .filter(ArticleModel.status == "indexed", ArticleModel.indexed_at >= since)
+                .all()
+            )
+            return [tuple(row) for row in rows]
+        finally:
+            db.close()
+
+    def get_indexed_missing_version(
+        self, index_version: Optional[str], limit: int = 500, after_id: int = 0
+    ) -> List[ArticleModel]:
+        """
+        Indexed articles with ID greater than `after_id` that have no chunks in
+        `index_version` yet, in ID order. Used to build (and catch up) a new version.
+        """
+        db = self.SessionLocal()
+        try:
+            has_chunks = (
+                db.query(ArticleChunkModel.id)
+                .filter(ArticleChunkModel.article_id == ArticleModel.id, self._version_filter(index_version))
+                .exists()
+            )
+            return (
+                db.query(ArticleModel)
+                .filter(ArticleModel.status == "indexed", ArticleModel.id > after_id, ~has_chunks)
+                .order_by(ArticleModel.id)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def create_index_version(
+        self,
+        name: str,
+        backend: str,
+        settings: str = "{}",
+        chunking_strategy: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+    ):
+        """
+        Registers a new index version in 'building' status. `settings` is JSON.
+        """
+        db = self.SessionLocal()
+        try:
+            db.add(IndexVersionModel(
+                name=name,
+                backend=backend,
+                settings=settings,
+                chunking_strategy=chunking_strategy,
+                embedding_model=embedding_model,
+                status="building",
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_index_version(self, name: str) -> Optional[IndexVersionModel]:
+        db = self.SessionLocal()
+        try:
+            return db.query(IndexVersionModel).filter(IndexVersionModel.name == name).first()
+        finally:
+            db.close()
+
+    def get_active_index_version(self) -> Optional[IndexVersionModel]:
+        """
+        The version searches and ingestion use, or None for the original index.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return db.query(IndexVersionModel).filter(IndexVersionModel.status == "active").first()
+        finally:
+            db.close()
+
+    def list_index_versions(self) -> List[IndexVersionModel]:
+        db = self.SessionLocal()
+        try:
+            return db.query(IndexVersionModel).order_by(IndexVersionModel.created_at).all()
+        finally:
+            db.close()
+
+    def activate_index_version(self, name: str):
+        """
+        Makes `name` the active version and retires the previous one, in one
+        transaction: readers see either the old or the new version, never none.
+        """
+        db = self.SessionLocal()
+        try:
+            target = (
+                db.query(IndexVersionModel)
+                .filter(IndexVersionModel.name == name)
+                .with_for_update()
+                .first()
+            )
+            if target is None:
+                raise ValueError(f"Index version '{name}' does not exist.")
+            db.query(IndexVersionModel).filter(
+                IndexVersionModel.status == "active", IndexVersionModel.name != name
+            ).update({"status": "retired"}, synchronize_session=False)
+            db.flush()
+            target.status = "active"
+            target.activated_at = func.now()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # Key for pg_advisory_lock: story assignment reads and rewrites centroids.
+    STORY_CLUSTER_LOCK_KEY = 4301
+
+    @contextmanager
+    def story_cluster_lock(self):
+        """
+        Serialises story clustering across threads and worker processes.
+        """
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": self.STORY_CLUSTER_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.STORY_CLUSTER_LOCK_KEY})
+
+    def get_active_story_clusters(self, since: datetime) -> List[StoryClusterModel]:
+        """
+        Stories that received an article at or after `since`, the only ones a new
+        article can join.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return (
+                db.query(StoryClusterModel)
+                .filter(StoryClusterModel.last_article_at >= since)
+                .order_by(StoryClusterModel.id)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def get_unclustered_titles(self, article_ids: List[int]) -> Dict[int, str]:
+        """
+        Titles of the given articles that don't belong to a story yet, keyed by ID.
+        """
+        if not article_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleModel.id, ArticleModel.title)
+                .filter(ArticleModel.id.in_(list(article_ids)), ArticleModel.cluster_id.is_(None))
+                .all()
+            )
+            return {aid: title for aid, title in rows}
+        finally:
+            db.close()
+
+    def get_story_article_ids(self, cluster_ids: List[int]) -> Dict[int, List[int]]:
+        """
+        IDs of the articles of each given story, keyed by story ID.
+        """
+        if not cluster_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rows = (
+                db.query(ArticleModel.cluster_id, ArticleModel.id)
+                .filter(ArticleModel.cluster_id.in_(list(cluster_ids)))
+                .order_by(ArticleModel.id)
+                .all()
+            )
+            article_ids: Dict[int, List[int]] = {}
+            for cluster_id, aid in rows:
+                article_ids.setdefault(cluster_id, []).append(aid)
+            return article_ids
+        finally:
+            db.close()
+
+    def save_story_clusters(
+        self, created: List[dict], updated: List[dict], assignments: Dict[int, int]
+    ) -> List[int]:
+        """
+        Inserts new stories, updates existing ones and assigns articles, in one
+        transaction. In `assignments` (article ID -> story ID) a negative story ID
+        -(i + 1) refers to created[i]. Returns the IDs of the created stories.
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            new_ids = []
+            if created:
+                new_ids = list(db.scalars(
+                    insert(StoryClusterModel).returning(StoryClusterModel.id, sort_by_parameter_order=True),
+                    created,
+                ))
+            if updated:
+                db.bulk_update_mappings(StoryClusterModel, updated)
+            if assignments:
+                db.bulk_update_mappings(ArticleModel, [
+                    {"id": aid, "cluster_id": new_ids[-cid - 1] if cid < 0 else cid}
+                    for aid, cid in assignments.items()
+                ])
+            db.commit()
+            return new_ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_trending_stories(
+        self, since: datetime, limit: int = 10, min_size: int = 2
+    ) -> List[StoryClusterModel]:
+        """
+        Stories active since `since` ordered by decayed article count (`trend_key`).
+        """
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            return (
+                db.query(StoryClusterModel)
+                .filter(StoryClusterModel.last_article_at >= since, StoryClusterModel.size >= min_size)
+                .order_by(StoryClusterModel.trend_key.desc())
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def get_story_articles(self, cluster_ids: List[int], per_story: int = 3) -> Dict[int, List[ArticleModel]]:
+        """
+        The most recently published indexed articles of each story, in one query.
+        """
+        if not cluster_ids:
+            return {}
+        db = self.SessionLocal()
+        try:
+            apply_deadline(db)
+            rank = func.row_number().over(
+                partition_by=ArticleModel.cluster_id,
+                order_by=ArticleModel.published_at.desc().nullslast(),
+            ).label("rank")
+            ranked = (
+                db.query(ArticleModel.id, rank)
+                .filter(ArticleModel.cluster_id.in_(list(cluster_ids)), ArticleModel.status == "indexed")
+                .subquery()
+            )
+            rows = (
+                db.query(ArticleModel)
+                .join(ranked, ranked.c.id == ArticleModel.id)
+                .filter(ranked.c.rank <= per_story)
+                .order_by(ArticleModel.cluster_id, ranked.c.rank)
+                .all()
+            )
+            articles: Dict[int, List[ArticleModel]] = {}
+            for row in rows:
+                articles.setdefault(row.cluster_id, []).append(row)
+            return articles
+        finally:
+            db.close()
+
     def article_exists_by_title(self, title: str) -> bool:
         """
         Checks if an article with the given title already exists in the database.
@@ -90,9 +1304,14 @@ class DatabaseManager:
         """
         db = self.SessionLocal()
         try:
+            apply_deadline(db)
             existing_article = (
                 db.query(ArticleModel).filter(ArticleModel.title == title).first()
             )
             return existing_article is not None
         finally:
             db.close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DatabaseManager._after_fork_in_child)
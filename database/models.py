@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, TIMESTAMP, func, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred
 
 Base = declarative_base()
 
+# Pipeline stages in order. An article's `status` is the last stage it completed;
+# articles are stored once cleaned, so 'cleaned' is the first.
+PIPELINE_STAGES = ("cleaned", "chunked", "embedded", "indexed")
+
 class ArticleModel(Base):
     __tablename__ = 'articles'
 
@@ -11,6 +16,155 @@ class ArticleModel(Base):
     url = Column(Text)
     published_at = Column(TIMESTAMP)
     content_preview = Column(Text)
+    source = Column(String(50), index=True)
+    language = Column(String(10), index=True)
+    # SHA-256 of the cleaned content: detects corrected stories and retitled copies.
+    content_hash = Column(String(64), index=True)
+    # Story the article was assigned to when it was indexed (see StoryClusterer).
+    cluster_id = Column(Integer, ForeignKey("story_clusters.id", ondelete="SET NULL"), index=True)
+
+    # --- Pipeline state ---
+    # `status` is the last stage completed (see PIPELINE_STAGES). Anything short of
+    # 'indexed' is re-driven by the sweeper from the stored content (ArticleContentModel).
+    status = Column(String(20), nullable=False, default="cleaned", server_default="cleaned", index=True)
+    last_error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    status_updated_at = Column(TIMESTAMP, server_default=func.now())
+    fetched_at = Column(TIMESTAMP, server_default=func.now())
+    cleaned_at = Column(TIMESTAMP)
+    chunked_at = Column(TIMESTAMP)
+    embedded_at = Column(TIMESTAMP)
+    indexed_at = Column(TIMESTAMP, index=True)
+
+    def __repr__(self):
+        return f"<Article(id={self.id}, title='{self.title[:30]}...')>" 
+
+
+class ArticleChunkModel(Base):
+    """
+    The text of every chunk written to the vector index, keyed by its datapoint ID.
+    The vectors themselves live in the index; this is what lets the corpus be
+    exported without re-chunking or re-embedding. Versions with a two-stage index
+    (see storage.two_stage) also keep the full vector here, for re-scoring.
+    """
+    __tablename__ = 'article_chunks'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    datapoint_id = Column(Text, nullable=False, unique=True)
+    text = Column(Text, nullable=False)
+    # SHA-256 of the chunk text: unchanged chunks of an updated article keep their vectors.
+    content_hash = Column(String(64))
+    # Index version the chunk's vector was written to (see IndexVersionModel);
+    # NULL is the original, unversioned index.
+    index_version = Column(String(64), index=True)
+    # Full-dimension float32 vector, only for two-stage index versions.
+    vector = deferred(Column(LargeBinary))
+
+    def __repr__(self):
+        return f"<ArticleChunk(article_id={self.article_id}, position={self.position})>"
+
+
+
+class ArticleEmbeddingModel(Base):
+    """
+    One vector per article: the normalised mean of its chunk vectors, stored as
+    float16 bytes. `neighbor_floor` is the lowest score in the article's full
+    related list (NULL while the list has room), so a new article only touches the
+    lists it would actually enter.
+    """
+    __tablename__ = 'article_embeddings'
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    embedding = Column(LargeBinary, nullable=False)
+    neighbor_floor = Column(Float)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ArticleEmbedding(article_id={self.article_id})>"
+
+
+class ArticleNeighborModel(Base):
+    """
+    Precomputed related articles: the nearest articles to `article_id` by cosine
+    similarity of their article embeddings.
+    """
+    __tablename__ = 'article_neighbors'
+    __table_args__ = (
+        Index("ix_article_neighbors_article_score", "article_id", "score"),
+    )
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    related_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<ArticleNeighbor(article_id={self.article_id}, related_id={self.related_id})>"
+
+
+class StoryClusterModel(Base):
+    """
+    A story: articles covering the same event, grouped online as they are indexed.
+    `centroid` is the normalised mean of the members' article embeddings (float16).
+
+    `trend_key` ranks stories by an exponentially decayed article count without
+    rewriting every row as time passes: it is log2(count) + t / half_life at the
+    last update, and the count now is 2 ** (trend_key - now / half_life).
+    """
+    __tablename__ = 'story_clusters'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    label = Column(Text)
+    centroid = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False, default=0, server_default="0")
+    trend_key = Column(Float, nullable=False, default=0.0, server_default="0", index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    last_article_at = Column(TIMESTAMP, server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<StoryCluster(id={self.id}, size={self.size})>"
+
+
+class ArticleContentModel(Base):
+    """
+    The cleaned full text of an article, compressed (see database.compression), so
+    it can be re-chunked and re-embedded without fetching it again. Kept in its
+    own table so article queries never load it.
+    """
+    __tablename__ = 'article_contents'
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String(10), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer, nullable=False)
+    stored_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ArticleContent(article_id={self.article_id}, codec={self.codec})>"
+
+
+class IndexVersionModel(Base):
+    """
+    A vector index built with a given chunking strategy and embedding model.
+    `settings` (JSON) holds the backend resources: Matching Engine index_id,
+    endpoint_id and deployed_index_id, or the pgvector table. Exactly one version
+    is 'active' at a time; switching it is a single transaction.
+    """
+    __tablename__ = 'index_versions'
+    __table_args__ = (
+        Index("ux_index_versions_active", "status", unique=True, postgresql_where=text("status = 'active'")),
+    )
+
+    name = Column(String(64), primary_key=True)
+    backend = Column(String(20), nullable=False)
+    settings = Column(Text, nullable=False, default="{}", server_default="{}")
+    chunking_strategy = Column(String(50))
+    embedding_model = Column(String(100))
+    # 'building', 'active' or 'retired'
+    status = Column(String(20), nullable=False, default="building", server_default="building")
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    activated_at = Column(TIMESTAMP)
 
     def __repr__(self):
-        return f"<Article(id={self.id}, title='{self.title[:30]}...')>" 
\ No newline at end of file
+        return f"<IndexVersion(name={self.name}, status={self.status})>"
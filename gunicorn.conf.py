@@ -0,0 +1,51 @@
+# Multi-process serving: gunicorn manages a pool of uvicorn workers so one container
+# uses all its cores. Every setting can be overridden through the environment.
+#
+#   gunicorn app.main:app -c gunicorn.conf.py
+#
+# The app is preloaded in the master (imports only: services and SDK clients are
+# built lazily) and forked into the workers. DatabaseManager, AIClientsSingleton and
+# VectorStoreSingleton re-initialize themselves in each child (os.register_at_fork),
+# so no DB connection or gRPC channel is shared between processes.
+
+import multiprocessing
+import os
+import resource
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Embedding and index calls can be slow; don't kill workers that are waiting on them.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers periodically so slow leaks in the SDKs can't accumulate.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+accesslog = "-"
+errorlog = "-"
+
+# Per-worker limits. Postgres connections per worker come from DB_POOL_SIZE and
+# DB_MAX_OVERFLOW; chunking threads per worker from INGEST_CHUNK_WORKERS; each
+# worker's share of the provider quotas from PROVIDER_RATE_LIMIT_SHARES.
+WORKER_MAX_MEMORY_MB = int(os.getenv("WORKER_MAX_MEMORY_MB", "0"))
+raw_env = [
+    f"DB_POOL_SIZE={os.getenv('DB_POOL_SIZE', '2')}",
+    f"DB_MAX_OVERFLOW={os.getenv('DB_MAX_OVERFLOW', '3')}",
+    f"INGEST_CHUNK_WORKERS={os.getenv('INGEST_CHUNK_WORKERS', '4')}",
+    # Provider token buckets are per worker: split each provider quota between them.
+    f"PROVIDER_RATE_LIMIT_SHARES={os.getenv('PROVIDER_RATE_LIMIT_SHARES', workers)}",
+]
+
+
+def post_fork(server, worker):
+    # A worker going over its memory limit fails its allocations (MemoryError) and is
+    # replaced by the master instead of taking the whole container down.
+    if WORKER_MAX_MEMORY_MB > 0:
+        limit = WORKER_MAX_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    server.log.info(f"Worker {worker.pid} started")
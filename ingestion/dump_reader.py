@@ -0,0 +1,106 @@
+# Streams Article records from local dump files (JSONL or Parquet) for offline backfills.
+
+import gzip
+import json
+import os
+from typing import Callable, Iterator, List, Optional
+from ingestion.models import Article
+
+
+SUPPORTED_EXTENSIONS = (".jsonl", ".jsonl.gz", ".ndjson", ".parquet")
+
+
+class InvalidRecordError(ValueError):
+    """A record that is not a valid Article. The message names the file and line or record."""
+
+
+def iter_articles(
+    path: str,
+    skip: int = 0,
+    parquet_batch_size: int = 1000,
+    on_invalid: Optional[Callable[[InvalidRecordError], None]] = None,
+) -> Iterator[Article]:
+    """
+    Yields one Article per record in `path`, skipping the first `skip` records.
+
+    JSONL files (optionally gzip-compressed) are read line by line and Parquet
+    files batch by batch, so dumps larger than memory can be streamed. A malformed
+    record raises InvalidRecordError, or is passed to `on_invalid` and skipped;
+    either way it counts towards `skip`.
+    """
+    if path.endswith(".parquet"):
+        yield from _iter_parquet(path, skip, parquet_batch_size, on_invalid)
+    elif path.endswith((".jsonl", ".jsonl.gz", ".ndjson")):
+        yield from _iter_jsonl(path, skip, on_invalid)
+    else:
+        raise ValueError(
+            f"Unsupported dump format for '{path}'. Expected one of {SUPPORTED_EXTENSIONS}."
+        )
+
+
+def _invalid(error: InvalidRecordError, on_invalid: Optional[Callable[[InvalidRecordError], None]]):
+    if on_invalid is None:
+        raise error
+    on_invalid(error)
+
+
+def _iter_jsonl(path: str, skip: int, on_invalid) -> Iterator[Article]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        position = 0
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            position += 1
+            if position <= skip:
+                continue
+            try:
+                article = Article.model_validate(json.loads(line))
+            except ValueError as e:
+                # pydantic's ValidationError is a ValueError too.
+                error = InvalidRecordError(f"{path}:{number}: invalid record: {str(e).splitlines()[0]}")
+                error.__cause__ = e
+                _invalid(error, on_invalid)
+                continue
+            yield article
+
+
+def _iter_parquet(path: str, skip: int, batch_size: int, on_invalid) -> Iterator[Article]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet dumps requires 'pyarrow' to be installed.") from e
+
+    parquet_file = pq.ParquetFile(path)
+    position = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        if position + batch.num_rows <= skip:
+            position += batch.num_rows
+            continue
+        for record in batch.to_pylist():
+            position += 1
+            if position <= skip:
+                continue
+            try:
+                article = Article.model_validate(record)
+            except ValueError as e:
+                error = InvalidRecordError(f"{path}: record {position}: invalid record: {str(e).splitlines()[0]}")
+                error.__cause__ = e
+                _invalid(error, on_invalid)
+                continue
+            yield article
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Expands directories into the supported dump files they contain, sorted by name."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(SUPPORTED_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
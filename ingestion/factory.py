@@ -1,23 +1,27 @@
 # Implements simple Factory Pattern for News Providers creation based on a string key.
+# Providers are registered by import path and loaded on first use, so importing the
+# factory does not pull in every provider SDK (eventregistry, perigon, ...).
 
+import importlib
 from typing import Type, Dict
 from ingestion.providers.provider_i import NewsProvider
-from ingestion.providers.news_api_adapter import NewsApiAdapter
-from ingestion.providers.core_api_adapter import CoreApiAdapter
-from ingestion.providers.perigon_adapter import PerigonAdapter
-from ingestion.providers.news_ai_api_adapter import NewsAiApiAdapter
 
 
 class NewsProviderFactory:
-    _providers: Dict[str, Type[NewsProvider]] = {
-        "newsapi": NewsApiAdapter,
-        "core": CoreApiAdapter,
-        "news-ai": NewsAiApiAdapter,
-        "perigon": PerigonAdapter,
+    _providers: Dict[str, str] = {
+        "newsapi": "ingestion.providers.news_api_adapter:NewsApiAdapter",
+        "core": "ingestion.providers.core_api_adapter:CoreApiAdapter",
+        "news-ai": "ingestion.providers.news_ai_api_adapter:NewsAiApiAdapter",
+        "perigon": "ingestion.providers.perigon_adapter:PerigonAdapter",
     }
 
+    @classmethod
+    def _load_provider_class(cls, source: str) -> Type[NewsProvider]:
+        module_path, class_name = cls._providers[source].split(":")
+        return getattr(importlib.import_module(module_path), class_name)
+
     @classmethod
     def get_provider(cls, source: str) -> NewsProvider:
         if source not in cls._providers:
             raise ValueError(f"News source '{source}' is not supported.")
-        return cls._providers[source]()
+        return cls._load_provider_class(source)()
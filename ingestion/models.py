@@ -10,4 +10,6 @@ class Article(BaseModel):
     url: Optional[str] = Field(None, description="The URL of the article.")
     content: str
     published_at: Optional[datetime] = Field(None, description="The publication date of the article.")
-    content_preview: Optional[str] = Field(None, description="A brief summary or description of the article.")
\ No newline at end of file
+    content_preview: Optional[str] = Field(None, description="A brief summary or description of the article.")
+    source: Optional[str] = Field(None, description="Key of the provider the article came from (e.g. 'newsapi').")
+    language: Optional[str] = Field(None, description="ISO 639-1 code of the article language.")
\ No newline at end of file
@@ -0,0 +1,92 @@
+# Incremental parsing of pushed NDJSON article streams (optionally gzip-compressed),
+# fed chunk by chunk as the request body arrives.
+
+import json
+import zlib
+from typing import List, Optional, Tuple, Union
+from pydantic import ValidationError
+from ingestion.models import Article
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class RecordError(ValueError):
+    """A line that is not a valid Article record. The stream goes on."""
+
+
+class StreamError(ValueError):
+    """The stream itself is malformed (bad gzip data, oversized line): parsing stops."""
+
+
+class NDJSONArticleDecoder:
+    """
+    Turns body chunks into (line number, Article or RecordError) pairs. gzip input is
+    detected by its magic bytes and inflated incrementally, member after member, so
+    only the current partial line is held in memory. Blank lines are skipped but
+    still counted.
+    """
+
+    def __init__(self, max_line_bytes: int = 8 * 1024 * 1024):
+        self.max_line_bytes = max_line_bytes
+        self._inflater: Optional[zlib.Decompress] = None
+        self._sniffed = False
+        self._head = b""
+        self._partial = b""
+        self._line = 0
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, Union[Article, RecordError]]]:
+        if not self._sniffed:
+            self._head += chunk
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            chunk, self._head, self._sniffed = self._head, b"", True
+            if chunk.startswith(GZIP_MAGIC):
+                # wbits=47: gzip (or zlib) header, detected automatically.
+                self._inflater = zlib.decompressobj(wbits=47)
+        if self._inflater is not None:
+            chunk = self._inflate(chunk)
+        return self._split(chunk, final=False)
+
+    def _inflate(self, data: bytes) -> bytes:
+        inflated = []
+        while data:
+            if self._inflater.eof:
+                # Concatenated gzip members (`cat a.gz b.gz`) make up one stream.
+                self._inflater = zlib.decompressobj(wbits=47)
+            try:
+                inflated.append(self._inflater.decompress(data))
+            except zlib.error as e:
+                raise StreamError(f"Invalid gzip stream: {e}") from e
+            data = self._inflater.unused_data
+        return b"".join(inflated)
+
+    def close(self) -> List[Tuple[int, Union[Article, RecordError]]]:
+        """Parses whatever is left once the body has ended."""
+        data = self._head
+        self._head, self._sniffed = b"", True
+        if self._inflater is not None:
+            data += self._inflater.flush()
+            if not self._inflater.eof:
+                raise StreamError("Truncated gzip stream.")
+        return self._split(data, final=True)
+
+    def _split(self, data: bytes, final: bool) -> List[Tuple[int, Union[Article, RecordError]]]:
+        data = self._partial + data
+        lines = data.split(b"\n")
+        self._partial = b"" if final else lines.pop()
+        if len(self._partial) > self.max_line_bytes:
+            raise StreamError(f"Line {self._line + 1} is longer than {self.max_line_bytes} bytes.")
+        records = []
+        for line in lines:
+            self._line += 1
+            if not line.strip():
+                continue
+            records.append((self._line, self._parse(line)))
+        return records
+
+    @staticmethod
+    def _parse(line: bytes) -> Union[Article, RecordError]:
+        try:
+            return Article.model_validate(json.loads(line))
+        except (ValueError, ValidationError) as e:
+            return RecordError(str(e).splitlines()[0])
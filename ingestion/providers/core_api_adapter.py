@@ -1,10 +1,10 @@
 import os
-import requests
-from typing import List
+from typing import List, Optional
 from datetime import date
 from ingestion.models import Article
 from dotenv import load_dotenv
 from ingestion.providers.provider_i import NewsProvider
+from ingestion.providers.response_cache import fetch_json, peek_json, provider_cache
 
 
 class CoreApiAdapter(NewsProvider):
@@ -16,30 +16,36 @@ class CoreApiAdapter(NewsProvider):
         if not self.api_key:
             raise ValueError("CORE_API_KEY environment variable not set.")
         self.base_url = "https://api.core.ac.uk/v3/search/works"
+        self.cache = provider_cache()
+
+    @staticmethod
+    def _params(query: str) -> dict:
+        search_query = f'(title:"{query}") AND _exists_:fullText'
+        return {"q": search_query, "limit": 1}
+
+    def peek_articles(self, query: str) -> Optional[List[Article]]:
+        data = peek_json(self.cache, "CORE API", self._params(query))
+        return self._to_articles(data) if data is not None else None
 
     def fetch_articles(self, query: str) -> List[Article]:
         print(f"Searching for '{query}' using CORE API...")
 
-        search_query = f'(title:"{query}") AND _exists_:fullText'
-
         headers = {"Authorization": f"Bearer {self.api_key}"}
 
-        params = {"q": search_query, "limit": 1}
-
-        try:
-            response = requests.get(self.base_url, headers=headers, params=params)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error calling CORE API: {e}")
-            return []
+        data = fetch_json(self.cache, "CORE API", self.base_url, self._params(query), headers=headers, timeout=60)
+        return self._to_articles(data)
 
+    @staticmethod
+    def _to_articles(data: dict) -> List[Article]:
         articles = []
         for raw_article in data.get("results", []):
             if not raw_article.get("title") or not raw_article.get("downloadUrl"):
                 continue
 
             raw_content = raw_article.get("fullText", "")
+            language = raw_article.get("language")
+            if isinstance(language, dict):
+                language = language.get("code")
             print(raw_content)
             articles.append(
                 Article(
@@ -48,6 +54,8 @@ class CoreApiAdapter(NewsProvider):
                     content=raw_content,
                     published_at=raw_article.get("publishedDate"),
                     content_preview=raw_article.get("abstract"),
+                    source="core",
+                    language=language,
                 )
             )
         return articles
@@ -1,7 +1,8 @@
 import os
-from typing import List
+from typing import List, Optional
 from ingestion.models import Article
-from ingestion.providers.provider_i import NewsProvider
+from ingestion.providers.provider_i import NewsProvider, error_from_exception
+from ingestion.providers.response_cache import cached_articles, peek_articles, provider_cache
 from eventregistry import EventRegistry, QueryArticlesIter
 from dotenv import load_dotenv
 
@@ -24,6 +25,14 @@ class NewsAiApiAdapter(NewsProvider):
         # Initialize the Event Registry client once to be reused.
         # 'allowUseOfArchive=False' focuses on recent articles.
         self.er_client = EventRegistry(apiKey=self.api_key, allowUseOfArchive=False)
+        self.cache = provider_cache()
+
+    @staticmethod
+    def _params(query: str) -> dict:
+        return {"keywords": query, "lang": "eng", "dataType": ["news", "pr"], "sortBy": "date", "maxItems": 10}
+
+    def peek_articles(self, query: str) -> Optional[List[Article]]:
+        return peek_articles(self.cache, "NewsAPI.ai", self._params(query))
 
     def fetch_articles(self, query: str) -> List[Article]:
         """
@@ -36,7 +45,9 @@ class NewsAiApiAdapter(NewsProvider):
             A list of Article objects matching the query.
         """
         print(f"Searching for '{query}' using NewsAPI.ai...")
+        return cached_articles(self.cache, "NewsAPI.ai", self._params(query), lambda: self._search(query))
 
+    def _search(self, query: str) -> List[Article]:
         # Construct the query to search for English news articles
         q = QueryArticlesIter(keywords=query, lang="eng", dataType=["news", "pr"])
 
@@ -63,9 +74,11 @@ class NewsAiApiAdapter(NewsProvider):
                         url=raw_article.get("url"),
                         published_at=raw_article.get("dateTime"),
                         content_preview=raw_article.get("body"),
+                        source="news-ai",
+                        language="en",
                     )
                 )
         except Exception as e:
             print(f"Error calling NewsAPI.ai: {e}")
-            return []  # Return an empty list if an error occurs
+            raise error_from_exception(e, "NewsAPI.ai") from e
         return articles
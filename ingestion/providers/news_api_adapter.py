@@ -1,9 +1,9 @@
 import os
-import requests
-from typing import List
+from typing import List, Optional
 from datetime import date
 from ingestion.models import Article
 from ingestion.providers.provider_i import NewsProvider
+from ingestion.providers.response_cache import fetch_json, peek_json, provider_cache
 from dotenv import load_dotenv
 
 
@@ -15,26 +15,34 @@ class NewsApiAdapter(NewsProvider):
         if not self.api_key:
             raise ValueError("NEWS_API_KEY environment variable not set.")
         self.base_url = "https://newsapi.org/v2/everything"
+        self.cache = provider_cache()
 
-    def fetch_articles(self, query: str) -> List[Article]:
-        print(f"Searching for '{query}' using NewsAPI...")
-
-        params = {
+    @staticmethod
+    def _params(query: str) -> dict:
+        return {
             "q": query,
             "from": date.today().isoformat(),
             "sortBy": "popularity",
-            "apiKey": self.api_key,
             "language": "en",
         }
 
-        try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error calling NewsAPI: {e}")
-            return []
+    def peek_articles(self, query: str) -> Optional[List[Article]]:
+        data = peek_json(self.cache, "NewsAPI", self._params(query))
+        return self._to_articles(data) if data is not None else None
+
+    def fetch_articles(self, query: str) -> List[Article]:
+        print(f"Searching for '{query}' using NewsAPI...")
+
+        params = self._params(query)
+
+        # The key is sent but kept out of the cache key.
+        data = fetch_json(
+            self.cache, "NewsAPI", self.base_url, dict(params, apiKey=self.api_key), timeout=30, cache_params=params
+        )
+        return self._to_articles(data)
 
+    @staticmethod
+    def _to_articles(data: dict) -> List[Article]:
         articles = []
         for raw_article in data.get("articles", []):
 
@@ -48,6 +56,8 @@ class NewsApiAdapter(NewsProvider):
                     url=raw_article.get("url"),
                     published_at=raw_article.get("publishedAt"),
                     content_preview=raw_article.get("description"),
+                    source="newsapi",
+                    language="en",
                 )
             )
         return articles
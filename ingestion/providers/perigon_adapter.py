@@ -1,8 +1,9 @@
 import os
-from typing import List
+from typing import List, Optional
 from datetime import date
 from ingestion.models import Article
-from ingestion.providers.provider_i import NewsProvider
+from ingestion.providers.provider_i import NewsProvider, error_from_exception
+from ingestion.providers.response_cache import cached_articles, peek_articles, provider_cache
 from perigon import ApiClient, V1Api
 from dotenv import load_dotenv
 
@@ -15,20 +16,29 @@ class PerigonAdapter(NewsProvider):
         self.api_key = os.getenv("PERIGON_API_KEY")
         if not self.api_key:
             raise ValueError("PERIGON_API_KEY environment variable not set.")
+        self.cache = provider_cache()
+
+    @staticmethod
+    def _params(query: str) -> dict:
+        return {"q": query, "language": "en", "var_from": date.today().isoformat(), "size": 1}
+
+    def peek_articles(self, query: str) -> Optional[List[Article]]:
+        return peek_articles(self.cache, "PerigonAPI", self._params(query))
 
     def fetch_articles(self, query: str) -> List[Article]:
         print(f"Searching for '{query}' using PerigonAPI...")
+        params = self._params(query)
+        return cached_articles(self.cache, "PerigonAPI", params, lambda: self._search(params))
 
+    def _search(self, params: dict) -> List[Article]:
         client = ApiClient(api_key=self.api_key)
         api = V1Api(client)
 
         try:
-            response = api.search_articles(
-                q=query, language="en", var_from=date.today().isoformat(), size=1
-            )
+            response = api.search_articles(**params)
         except Exception as e:
-            print(f"Error calling NewsAPI: {e}")
-            return []
+            print(f"Error calling PerigonAPI: {e}")
+            raise error_from_exception(e, "PerigonAPI") from e
 
         articles = []
 
@@ -43,6 +53,8 @@ class PerigonAdapter(NewsProvider):
                     url=raw_article.url,
                     published_at=raw_article.pub_date,
                     content_preview=raw_article.description,
+                    source="perigon",
+                    language="en",
                 )
             )
         return articles
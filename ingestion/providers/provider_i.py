@@ -1,7 +1,68 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from ingestion.models import Article
 
+
+class ProviderError(Exception):
+    """
+    Raised by providers when a fetch fails. `retryable` tells the scheduler whether
+    trying again can help (timeouts, 5xx) or not (bad key, bad request).
+    """
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class ProviderRateLimitError(ProviderError):
+    """Raised when the provider answers 429. `retry_after` comes from the Retry-After header."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds. HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def raise_for_response(response, provider_name: str):
+    """
+    Maps an HTTP response from the `requests` library to the provider error hierarchy.
+    """
+    status = response.status_code
+    if status < 400:
+        return
+    if status == 429:
+        raise ProviderRateLimitError(
+            f"{provider_name} rate limit exceeded",
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+        )
+    raise ProviderError(
+        f"{provider_name} returned HTTP {status}",
+        retryable=status >= 500 or status == 408,
+    )
+
+
+def error_from_exception(exc: Exception, provider_name: str) -> ProviderError:
+    """
+    Wraps an SDK exception. SDKs built on generated OpenAPI clients (perigon) expose the
+    HTTP status as `status` and the headers as `headers`; anything else is treated as
+    a transient failure.
+    """
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    message = f"Error calling {provider_name}: {exc}"
+    if status == 429:
+        headers = getattr(exc, "headers", None) or {}
+        return ProviderRateLimitError(message, retry_after=parse_retry_after(headers.get("Retry-After")))
+    if isinstance(status, int) and 400 <= status < 500:
+        return ProviderError(message, retryable=status == 408)
+    return ProviderError(message)
+
+
 # --- Interface (The Adapter Contract) ---
 class NewsProvider(ABC):
     """Interface that all news providers must implement."""
@@ -9,5 +70,10 @@ class NewsProvider(ABC):
     def fetch_articles(self, query: str) -> List[Article]:
         pass
 
-
-
+    def peek_articles(self, query: str) -> Optional[List[Article]]:
+        """
+        The articles `fetch_articles` would answer from the response cache, or None
+        when it would have to call the provider. Never calls it, so the scheduler
+        takes a rate-limit token only on a miss.
+        """
+        return None
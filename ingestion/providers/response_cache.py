@@ -0,0 +1,259 @@
+# On-disk cache of provider responses, shared by the adapters: repeated ingests of
+# the same (source, query) within the TTL are answered without calling the provider,
+# and stale HTTP responses are revalidated with ETag / Last-Modified when the
+# provider sends them. Entries are compressed; the directory is capped in size with
+# least-recently-used eviction.
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import requests
+from database.compression import compress_text, decompress_text
+from ingestion.models import Article
+from ingestion.providers.provider_i import ProviderError, raise_for_response
+from services.deadlines import bounded, check
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """A stored response body with the validators needed to revalidate it."""
+
+    def __init__(
+        self, body: str, stored_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ):
+        self.body = body
+        self.stored_at = stored_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """
+    One compressed file per key in `directory`. Entries are fresh for `ttl`
+    seconds; stale ones are kept until evicted, so they can be revalidated.
+    When the directory grows past `max_bytes`, the least recently used entries
+    (by file mtime, bumped on every hit) are removed down to 90% of the cap.
+    Writes go through a temporary file and a rename, so concurrent workers
+    sharing the directory never read a partial entry.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 600,
+        max_bytes: int = 128 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key(provider: str, params: Dict) -> str:
+        raw = json.dumps([provider, params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".entry")
+
+    def _entries(self):
+        for path in glob.glob(os.path.join(self.directory, "*.entry")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return self._clock() - entry.stored_at < self.ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """The stored entry, fresh or not, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header, blob = f.read().split(b"\n", 1)
+            meta = json.loads(header)
+            body = decompress_text(meta["codec"], blob)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return CachedResponse(body, meta["stored_at"], meta.get("etag"), meta.get("last_modified"))
+
+    def put(self, key: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        codec, blob = compress_text(body)
+        header = json.dumps({
+            "codec": codec,
+            "stored_at": self._clock(),
+            "etag": etag,
+            "last_modified": last_modified,
+        }).encode("utf-8")
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header + b"\n" + blob)
+        try:
+            previous = os.path.getsize(path)
+        except FileNotFoundError:
+            previous = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += len(header) + 1 + len(blob) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Caller holds the lock. Rescans the directory: other processes write to it too.
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        self._size = total
+        logger.info(f"Evicted {evicted} provider cache entries ({total} bytes kept)")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def fetch_json(
+    cache: Optional[ResponseCache],
+    provider_name: str,
+    url: str,
+    params: Dict,
+    headers: Optional[Dict] = None,
+    timeout: float = 30,
+    cache_params: Optional[Dict] = None,
+    get: Callable = requests.get,
+):
+    """
+    GETs a JSON document through the cache. `cache_params` identify the request
+    (default: `params`); pass them without credentials. A stale entry is
+    revalidated with If-None-Match / If-Modified-Since and reused on a 304.
+    """
+    key = cache.key(provider_name, cache_params if cache_params is not None else params) if cache else None
+    entry = cache.get(key) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        return json.loads(entry.body)
+
+    headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    check(f"calling {provider_name}")
+    try:
+        response = get(url, params=params, headers=headers, timeout=bounded(timeout))
+    except requests.exceptions.RequestException as e:
+        raise ProviderError(f"Error calling {provider_name}: {e}") from e
+
+    if response.status_code == 304 and entry is not None:
+        cache.put(key, entry.body, entry.etag, entry.last_modified)
+        return json.loads(entry.body)
+    raise_for_response(response, provider_name)
+    try:
+        data = response.json()
+    except ValueError as e:
+        # Not cached: a truncated or non-JSON body would be served for the whole TTL.
+        raise ProviderError(f"Invalid JSON from {provider_name}: {e}") from e
+    if cache:
+        cache.put(key, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return data
+
+
+def _fresh_body(cache: Optional[ResponseCache], provider_name: str, params: Dict) -> Optional[str]:
+    if not cache:
+        return None
+    entry = cache.get(cache.key(provider_name, params))
+    if entry is None or not cache.is_fresh(entry):
+        return None
+    return entry.body
+
+
+def peek_json(cache: Optional[ResponseCache], provider_name: str, params: Dict):
+    """
+    The JSON document `fetch_json` would answer from the cache for `params` (the
+    `cache_params`), or None when it would have to call the provider.
+    """
+    body = _fresh_body(cache, provider_name, params)
+    return json.loads(body) if body is not None else None
+
+
+def peek_articles(cache: Optional[ResponseCache], provider_name: str, params: Dict) -> Optional[List[Article]]:
+    """The articles `cached_articles` would answer from the cache, or None."""
+    body = _fresh_body(cache, provider_name, params)
+    return [Article.model_validate(a) for a in json.loads(body)] if body is not None else None
+
+
+def cached_articles(
+    cache: Optional[ResponseCache],
+    provider_name: str,
+    params: Dict,
+    load: Callable[[], List[Article]],
+) -> List[Article]:
+    """
+    For SDK-based providers, which expose no HTTP validators: caches the mapped
+    articles of a call for the TTL.
+    """
+    if not cache:
+        return load()
+    articles = peek_articles(cache, provider_name, params)
+    if articles is not None:
+        return articles
+    check(f"calling {provider_name}")
+    articles = load()
+    cache.put(cache.key(provider_name, params), json.dumps([a.model_dump(mode="json") for a in articles]))
+    return articles
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def provider_cache() -> Optional[ResponseCache]:
+    """
+    The process-wide cache, configured by PROVIDER_CACHE_DIR, PROVIDER_CACHE_TTL_SECONDS
+    (0 disables it) and PROVIDER_CACHE_MAX_MB.
+    """
+    global _cache
+    ttl = float(os.getenv("PROVIDER_CACHE_TTL_SECONDS", "600"))
+    if ttl <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                os.getenv("PROVIDER_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "news-provider-cache"),
+                ttl=ttl,
+                max_bytes=int(float(os.getenv("PROVIDER_CACHE_MAX_MB", "128")) * 1024 * 1024),
+            )
+        return _cache
@@ -0,0 +1,358 @@
+# Rate-limit-aware access to news providers: per-provider token buckets, jittered
+# exponential backoff honouring Retry-After, a circuit breaker per provider, and
+# coalescing of identical concurrent (provider, query) fetches.
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+from ingestion.factory import NewsProviderFactory
+from ingestion.models import Article
+from ingestion.providers.provider_i import NewsProvider, ProviderError, ProviderRateLimitError
+from services.deadlines import DeadlineExceeded, bounded, check, remaining
+
+logger = logging.getLogger(__name__)
+
+
+# (requests, per seconds, burst) for each provider plan. Override with
+# PROVIDER_RATE_LIMITS, e.g. "newsapi=100/86400:5,core=10/60:2".
+#
+# These are whole-plan quotas, but token buckets live in each process. Set
+# PROVIDER_RATE_LIMIT_SHARES to the number of processes fetching with the same keys
+# and each gets an equal share (gunicorn.conf.py sets it to the worker count). A
+# separate fetcher such as scripts.run_watchlists must be counted in too.
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[int, float, int]] = {
+    "newsapi": (100, 86400, 5),    # Developer plan: 100 requests/day
+    "core": (10, 60, 2),           # CORE registered key: 10 requests/minute
+    "news-ai": (2000, 86400, 10),  # Event Registry free tier
+    "perigon": (150, 86400, 5),    # Perigon starter plan
+}
+
+
+class ProviderUnavailableError(ProviderError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def parse_rate_limits(spec: Optional[str]) -> Dict[str, Tuple[int, float, int]]:
+    """Parses 'source=requests/seconds[:burst],...' into a rate limit table."""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    if not spec:
+        return limits
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        source, rule = entry.split("=", 1)
+        rate, _, burst = rule.partition(":")
+        requests, seconds = rate.split("/", 1)
+        limits[source.strip()] = (int(requests), float(seconds), int(burst) if burst else 1)
+    return limits
+
+
+def share_rate_limits(
+    limits: Dict[str, Tuple[int, float, int]], shares: int
+) -> Dict[str, Tuple[int, float, int]]:
+    """
+    Splits each quota evenly between `shares` processes: the window is stretched
+    rather than the request count divided, so small quotas never round down to zero.
+    """
+    if shares <= 1:
+        return dict(limits)
+    return {
+        source: (requests, seconds * shares, max(1, burst // shares))
+        for source, (requests, seconds, burst) in limits.items()
+    }
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `capacity`.
+    `acquire` blocks until a token is available; `pause` empties the bucket until a
+    given moment, which is how a Retry-After is applied to every caller at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _wait_time(self, now: float) -> float:
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def wait_time(self) -> float:
+        """Seconds until a token will be available, without taking it."""
+        with self._lock:
+            return self._wait_time(self._clock())
+
+    def try_acquire(self) -> float:
+        """Takes a token if possible. Returns 0 on success, else the seconds to wait."""
+        with self._lock:
+            wait = self._wait_time(self._clock())
+            if wait == 0:
+                self._tokens -= 1
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets a single trial call through (half-open).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                # Only one trial call while half-open.
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class ProviderScheduler:
+    """
+    Runs provider fetches within each provider's quota.
+
+    Identical concurrent (source, query) fetches share a single upstream call. Failures
+    are retried with full-jitter exponential backoff (or the provider's Retry-After),
+    and repeated failures open the provider's circuit so quota isn't spent on an
+    outage.
+    """
+
+    def __init__(
+        self,
+        factory: Optional[NewsProviderFactory] = None,
+        rate_limits: Optional[Dict[str, Tuple[int, float, int]]] = None,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        acquire_timeout: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.factory = factory or NewsProviderFactory()
+        self.rate_limits = rate_limits or share_rate_limits(
+            parse_rate_limits(os.getenv("PROVIDER_RATE_LIMITS")),
+            int(os.getenv("PROVIDER_RATE_LIMIT_SHARES", "1")),
+        )
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.acquire_timeout = acquire_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sleep = sleep
+        self._clock = clock
+
+        self._providers: Dict[str, NewsProvider] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_provider(self, source: str) -> NewsProvider:
+        with self._lock:
+            if source not in self._providers:
+                self._providers[source] = self.factory.get_provider(source)
+            return self._providers[source]
+
+    def bucket(self, source: str) -> TokenBucket:
+        with self._lock:
+            if source not in self._buckets:
+                requests, seconds, burst = self.rate_limits.get(source, (60, 60, 1))
+                self._buckets[source] = TokenBucket(
+                    requests / seconds, burst, clock=self._clock, sleep=self._sleep
+                )
+            return self._buckets[source]
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        with self._lock:
+            if source not in self._breakers:
+                self._breakers[source] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout, clock=self._clock
+                )
+            return self._breakers[source]
+
+    def fetch(self, source: str, query: str) -> List[Article]:
+        """
+        Fetches articles for (source, query), joining an identical in-flight fetch
+        if there is one. Raises ValueError for unknown sources and ProviderError
+        when the provider keeps failing.
+        """
+        key = (source, query)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            logger.info(f"Joining in-flight fetch for {key}")
+            try:
+                return future.result(timeout=bounded(None))
+            except FutureTimeout:
+                raise DeadlineExceeded(f"Request deadline exceeded waiting for a fetch from '{source}'") from None
+
+        try:
+            future.set_result(self._fetch_with_retry(source, query))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)].
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _unavailable(self, source: str, breaker: CircuitBreaker) -> ProviderUnavailableError:
+        return ProviderUnavailableError(
+            f"Provider '{source}' is temporarily disabled after repeated failures.",
+            retry_after=breaker.retry_after(),
+        )
+
+    def _fetch_with_retry(self, source: str, query: str) -> List[Article]:
+        provider = self._get_provider(source)
+        # A fresh cached response needs no call, so it uses no quota either.
+        cached = provider.peek_articles(query)
+        if cached is not None:
+            logger.info(f"Answered '{source}' fetch for '{query}' from the response cache")
+            return cached
+        bucket = self.bucket(source)
+        breaker = self.breaker(source)
+
+        last_error: Optional[ProviderError] = None
+        for attempt in range(self.max_attempts):
+            if breaker.state == CircuitBreaker.OPEN:
+                raise self._unavailable(source, breaker) from last_error
+            check(f"fetching from '{source}'")
+
+            if not bucket.acquire(timeout=bounded(self.acquire_timeout)):
+                raise ProviderRateLimitError(
+                    f"Local quota for provider '{source}' exhausted.",
+                    retry_after=bucket.wait_time(),
+                )
+
+            # Checked again after waiting for a token: the circuit may have opened meanwhile.
+            if not breaker.allow():
+                raise self._unavailable(source, breaker) from last_error
+
+            try:
+                articles = provider.fetch_articles(query=query)
+                breaker.record_success()
+                return articles
+            except ProviderRateLimitError as e:
+                # The provider is healthy, we are just too fast: pause the whole bucket.
+                last_error = e
+                delay = e.retry_after if e.retry_after is not None else self._backoff(attempt)
+                bucket.pause(delay)
+                logger.warning(f"Rate limited by '{source}', retrying in {delay:.1f}s")
+                breaker.record_success()
+            except ProviderError as e:
+                last_error = e
+                breaker.record_failure()
+                if not e.retryable:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Fetch from '{source}' failed (attempt {attempt + 1}/{self.max_attempts}): {e}. "
+                    f"Retrying in {delay:.1f}s"
+                )
+                if attempt + 1 < self.max_attempts:
+                    left = remaining()
+                    if left is not None and delay >= left:
+                        # The retry would start after the caller has given up.
+                        raise
+                    self._sleep(delay)
+            except Exception:
+                # Anything else (bad payload, deadline) still ends the call: without a
+                # recorded result a half-open circuit would never close or reopen.
+                breaker.record_failure()
+                raise
+
+        raise last_error
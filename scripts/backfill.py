@@ -0,0 +1,51 @@
+"""
+Backfills the index from local article dumps (JSONL or Parquet records of
+ingestion.models.Article) without calling any news provider.
+
+Usage:
+    python -m scripts.backfill dumps/ --checkpoint backfill.ckpt.json --batch-size 200
+"""
+
+import argparse
+import logging
+import sys
+from dotenv import load_dotenv
+from uses_cases.backfill import BackfillService, BackfillError
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill articles from local dumps.")
+    parser.add_argument("paths", nargs="+", help="Dump files or directories (.jsonl, .jsonl.gz, .parquet).")
+    parser.add_argument("--batch-size", type=int, default=200, help="Articles per pipeline batch.")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes for cleaning (default: CPU count).")
+    parser.add_argument("--chunk-threads", type=int, default=8, help="Concurrent chunking calls.")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file used to resume interrupted runs.")
+    parser.add_argument(
+        "--fail-on-invalid",
+        action="store_true",
+        help="Stop at the first invalid record instead of skipping and counting it.",
+    )
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    service = BackfillService(
+        batch_size=args.batch_size,
+        processes=args.processes,
+        chunk_threads=args.chunk_threads,
+        checkpoint_path=args.checkpoint,
+        fail_on_invalid=args.fail_on_invalid,
+    )
+    try:
+        report = service.run(args.paths)
+    except BackfillError as e:
+        print(f"Backfill failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Backfill completed: {report.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
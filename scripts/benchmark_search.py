@@ -0,0 +1,110 @@
+"""
+Benchmarks the vector backends (Matching Engine and pgvector) on the same queries:
+end-to-end search latency (p50/p95, hydration included) and the overlap of their
+top-k article IDs.
+
+--mirror first copies the indexed chunk vectors from Matching Engine into the
+pgvector table (no re-embedding), so both backends answer over the same corpus.
+
+Usage:
+    python -m scripts.benchmark_search --mirror --queries queries.txt
+    python -m scripts.benchmark_search --query "inteligencia artificial" --k 10 --repeats 20
+"""
+
+import argparse
+import logging
+import time
+import numpy as np
+from dotenv import load_dotenv
+from database.manager import DatabaseManager
+from storage.backends import VECTOR_BACKENDS, build_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def mirror_vectors(source, target, batch_size=500):
+    """Copies the vectors of every indexed article from `source` into `target`."""
+    db = DatabaseManager()
+    copied, after_id = 0, 0
+    with target.new_writer(on_indexed=None, on_failed=None, on_rejected=None) as writer:
+        while True:
+            articles = db.get_indexed_articles(limit=batch_size, after_id=after_id)
+            if not articles:
+                break
+            after_id = articles[-1].id
+            chunks = db.get_chunks_for_articles([a.id for a in articles], source.version_name)
+            vectors = source.read_vectors([c.datapoint_id for c in chunks])
+            writer.add([
+                {"datapoint_id": datapoint_id, "feature_vector": vector}
+                for datapoint_id, vector in vectors.items()
+            ])
+            copied += len(vectors)
+            logger.info(f"Mirrored {copied} vectors (articles up to ID {after_id})")
+        report = writer.flush()
+    if report.failed_datapoints:
+        logger.warning(f"{len(report.failed_datapoints)} vectors could not be mirrored")
+    return copied
+
+
+def time_searches(store, queries, k, repeats):
+    latencies, results = [], {}
+    for query in queries:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            response = store.search_similar(query, k=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+        results[query] = [r["id"] for r in response["results"]]
+    return np.array(latencies), results
+
+
+def overlap_at_k(a, b, k):
+    if not a and not b:
+        return 1.0
+    return len(set(a[:k]) & set(b[:k])) / max(1, min(k, max(len(a), len(b))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the vector search backends.")
+    parser.add_argument("--query", action="append", default=[], help="Query to run (repeatable).")
+    parser.add_argument("--queries", help="File with one query per line.")
+    parser.add_argument("--k", type=int, default=10, help="Results per search.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed searches per query and backend.")
+    parser.add_argument("--mirror", action="store_true", help="Copy Matching Engine vectors into pgvector first.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    queries = list(args.query)
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries.extend(line.strip() for line in f if line.strip())
+    if not queries:
+        parser.error("Provide at least one --query or a --queries file.")
+
+    stores = {backend: build_vector_store(backend) for backend in VECTOR_BACKENDS}
+    for store in stores.values():
+        store.warm_up()
+    if args.mirror:
+        copied = mirror_vectors(stores["vertex"], stores["pgvector"])
+        print(f"Mirrored {copied} vectors into pgvector")
+
+    results = {}
+    header = f"{'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for backend, store in stores.items():
+        # One untimed pass so connection set-up isn't measured.
+        store.search_similar(queries[0], k=args.k)
+        latencies, results[backend] = time_searches(store, queries, args.k, args.repeats)
+        print(
+            f"{backend:<10} {np.percentile(latencies, 50):>8.1f} "
+            f"{np.percentile(latencies, 95):>8.1f} {latencies.mean():>8.1f}"
+        )
+
+    overlaps = [overlap_at_k(results["vertex"][q], results["pgvector"][q], args.k) for q in queries]
+    print(f"\nMean overlap@{args.k} between backends: {np.mean(overlaps):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmarks two-stage search (see storage.two_stage) against single-stage search.
+
+Live mode runs the same queries on a two-stage index version and on a single-stage
+one (the active version by default). It reports end-to-end latency (p50/p95) and
+recall@k, which is the share of the single-stage top-k articles that two-stage also
+returns.
+
+--sweep tries other settings without building an index for each one. It takes the
+full chunk vectors stored for the two-stage version and searches them by brute force:
+exactly at full dimension, and truncated to each --dimensions then re-scored from
+each --candidates. It reports recall@k against the exact search and the NumPy time
+per query.
+
+Usage:
+    python -m scripts.benchmark_two_stage coarse256 --queries queries.txt --k 10
+    python -m scripts.benchmark_two_stage coarse256 --queries queries.txt --sweep \
+        --dimensions 64,128,256 --candidates 50,100,200,400
+"""
+
+import argparse
+import logging
+import time
+import numpy as np
+from dotenv import load_dotenv
+from database.manager import DatabaseManager
+from scripts.benchmark_search import overlap_at_k, time_searches
+from storage.backends import build_vector_store
+from storage.two_stage import decode_full_vector, truncate_vectors
+
+logger = logging.getLogger(__name__)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k nearest rows by cosine similarity; all rows are unit vectors."""
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def two_stage_top_k(
+    corpus: np.ndarray, queries: np.ndarray, k: int, dimensions: int, candidates: int
+) -> np.ndarray:
+    """Candidates by truncated similarity, then the best k of them by full similarity."""
+    coarse = truncate_vectors(corpus, dimensions) @ truncate_vectors(queries, dimensions).T
+    shortlist = np.argsort(-coarse.T, axis=1, kind="stable")[:, :max(k, candidates)]
+    full = np.einsum("qcd,qd->qc", corpus[shortlist], queries)
+    return np.take_along_axis(shortlist, np.argsort(-full, axis=1, kind="stable")[:, :k], axis=1)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def sweep(corpus, queries, k, dimensions, candidates, repeats=3):
+    """(dimensions, candidates, recall@k, ms per query) rows, plus the exact search."""
+    def timed(search):
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            found = search()
+            best = min(best, time.perf_counter() - started)
+        return found, best * 1000 / len(queries)
+
+    truth, exact_ms = timed(lambda: exact_top_k(corpus, queries, k))
+    rows = [(corpus.shape[1], None, 1.0, exact_ms)]
+    for d in dimensions:
+        for c in candidates:
+            found, ms = timed(lambda: two_stage_top_k(corpus, queries, k, d, c))
+            rows.append((d, c, recall(found, truth), ms))
+    return rows
+
+
+def run_sweep(args, queries, version):
+    stored = DatabaseManager().sample_chunk_vectors(version.name, args.limit)
+    if not stored:
+        raise SystemExit(f"Index version '{version.name}' has no full vectors stored.")
+    corpus = truncate_vectors([decode_full_vector(v) for v in stored.values()], None)
+    store = build_vector_store(version=version)
+    query_vectors = truncate_vectors(
+        store.embeddings.embed_documents(queries, embeddings_task_type="RETRIEVAL_QUERY"), None
+    )
+    print(f"{len(corpus)} chunks x {corpus.shape[1]} dimensions, {len(queries)} queries, k={args.k}\n")
+    header = f"{'dims':>6} {'cands':>6} {'recall':>8} {'ms/query':>9}"
+    print(header)
+    print("-" * len(header))
+    for dims, cands, r, ms in sweep(corpus, query_vectors, args.k, args.dimensions, args.candidates):
+        print(f"{dims:>6} {cands if cands else 'exact':>6} {r:>8.3f} {ms:>9.2f}")
+
+
+def run_live(args, queries, version, baseline):
+    stores = {
+        "single-stage": build_vector_store(version=baseline) if baseline else build_vector_store().current(),
+        "two-stage": build_vector_store(version=version),
+    }
+    results = {}
+    header = f"{'mode':<13} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for mode, store in stores.items():
+        store.warm_up()
+        # One untimed pass so connection set-up isn't measured.
+        store.search_similar(queries[0], k=args.k)
+        latencies, results[mode] = time_searches(store, queries, args.k, args.repeats)
+        print(
+            f"{mode:<13} {np.percentile(latencies, 50):>8.1f} "
+            f"{np.percentile(latencies, 95):>8.1f} {latencies.mean():>8.1f}"
+        )
+    recalls = [overlap_at_k(results["two-stage"][q], results["single-stage"][q], args.k) for q in queries]
+    print(f"\nMean recall@{args.k} of two-stage against single-stage: {np.mean(recalls):.3f}")
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark two-stage against single-stage search.")
+    parser.add_argument("version", help="Two-stage index version (settings with coarse_dimensions).")
+    parser.add_argument("--baseline", help="Single-stage index version (default: the active one).")
+    parser.add_argument("--query", action="append", default=[], help="Query to run (repeatable).")
+    parser.add_argument("--queries", help="File with one query per line.")
+    parser.add_argument("--k", type=int, default=10, help="Results per search.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed searches per query and mode.")
+    parser.add_argument("--sweep", action="store_true", help="Brute-force sweep over stored full vectors.")
+    parser.add_argument("--dimensions", type=int_list, default=[64, 128, 256], help="Sweep: truncated sizes.")
+    parser.add_argument("--candidates", type=int_list, default=[50, 100, 200, 400], help="Sweep: candidate counts.")
+    parser.add_argument("--limit", type=int, default=100000, help="Sweep: chunk vectors to load.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    queries = list(args.query)
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries.extend(line.strip() for line in f if line.strip())
+    if not queries:
+        parser.error("Provide at least one --query or a --queries file.")
+
+    db = DatabaseManager()
+    version = db.get_index_version(args.version)
+    if version is None:
+        parser.error(f"Index version '{args.version}' does not exist.")
+    baseline = None
+    if args.baseline:
+        baseline = db.get_index_version(args.baseline)
+        if baseline is None:
+            parser.error(f"Index version '{args.baseline}' does not exist.")
+
+    if args.sweep:
+        run_sweep(args, queries, version)
+    else:
+        run_live(args, queries, version, baseline)
+
+
+if __name__ == "__main__":
+    main()
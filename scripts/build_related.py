@@ -0,0 +1,58 @@
+"""
+Computes article embeddings for indexed articles that predate them (reading the
+chunk vectors back from the index, no re-embedding) and builds their related lists.
+New articles get both at indexing time; this is for the existing corpus.
+
+--all also recomputes the lists of articles that already have an embedding, e.g.
+after changing RELATED_ARTICLES_PER_ARTICLE or RELATED_MIN_SCORE.
+
+Usage:
+    python -m scripts.build_related --batch-size 500
+    python -m scripts.build_related --all
+"""
+
+import argparse
+import logging
+from dotenv import load_dotenv
+from database.manager import DatabaseManager
+from storage.backends import build_vector_store
+from storage.related_index import RelatedArticlesIndex
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build related-article lists for the existing corpus.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Articles per batch.")
+    parser.add_argument("--all", action="store_true", help="Recompute every related list.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    db = DatabaseManager()
+    vector_store = build_vector_store()
+    related_index = RelatedArticlesIndex(db)
+
+    processed, after_id = 0, 0
+    while True:
+        article_ids = db.get_indexed_without_embedding(limit=args.batch_size, after_id=after_id)
+        if not article_ids:
+            break
+        after_id = article_ids[-1]
+        vector_store.refresh_article_embeddings(article_ids)
+        related_index.update(article_ids)
+        processed += len(article_ids)
+        logger.info(f"Related lists built for {processed} articles (up to ID {after_id})")
+
+    if args.all:
+        for page in db.iter_article_embeddings(args.batch_size):
+            related_index.update([aid for aid, _, _ in page])
+            processed += len(page)
+            logger.info(f"Related lists recomputed for {processed} articles")
+
+    print(f"Related lists built for {processed} articles")
+
+
+if __name__ == "__main__":
+    main()
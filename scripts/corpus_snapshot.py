@@ -0,0 +1,37 @@
+"""
+Exports the indexed corpus (articles with their content and article embeddings,
+stories, chunk text and vectors) to a snapshot directory, or restores one into
+Postgres and the vector index without re-embedding. Import also rebuilds the related
+lists of the restored articles.
+
+Usage:
+    python -m scripts.corpus_snapshot export snapshots/2026-10-19
+    python -m scripts.corpus_snapshot import snapshots/2026-10-19
+"""
+
+import argparse
+import logging
+from dotenv import load_dotenv
+from uses_cases.corpus_snapshot import CorpusSnapshotService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import a corpus snapshot.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot directory.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Articles per database batch.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    service = CorpusSnapshotService(batch_size=args.batch_size)
+    if args.command == "export":
+        report = service.export_to(args.path)
+    else:
+        report = service.import_from(args.path)
+    print(f"{args.command.capitalize()} completed: {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
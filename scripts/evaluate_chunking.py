@@ -0,0 +1,51 @@
+"""
+Compara estrategias de chunking sobre un corpus usando el LLM como juez, con
+evaluaciones concurrentes y caché de veredictos.
+
+Uso:
+    python -m scripts.evaluate_chunking --corpus tests/data/articles --strategy semantic --strategy sentence
+    python -m scripts.evaluate_chunking --fake-llm        # sin red, determinista
+"""
+
+import argparse
+import os
+from dotenv import load_dotenv
+from chunking.chunker import build_strategy
+from services.evaluation_client import ChunkingEvaluator
+from services.evaluation_runner import BatchEvaluationRunner, FakeLLM, VerdictCache, format_comparison
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "articles")
+
+
+def build_strategies(names):
+    return {name: build_strategy(name) for name in names}
+
+
+def load_corpus(path):
+    documents = {}
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(path, filename), "r", encoding="utf-8") as f:
+                documents[os.path.splitext(filename)[0]] = f.read()
+    return documents
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate chunking strategies with an LLM judge.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of .txt documents.")
+    parser.add_argument("--strategy", action="append", default=None, help="Strategy to compare (repeatable): semantic, sentence, recursive, heading.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent LLM calls.")
+    parser.add_argument("--cache", default=None, help="JSON file used to persist verdicts between runs.")
+    parser.add_argument("--fake-llm", action="store_true", help="Use the deterministic offline judge.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    evaluator = ChunkingEvaluator(llm=FakeLLM(), model_name=FakeLLM.model_name) if args.fake_llm else ChunkingEvaluator()
+    runner = BatchEvaluationRunner(evaluator, max_concurrency=args.concurrency, cache=VerdictCache(args.cache))
+
+    results = runner.compare_strategies(build_strategies(args.strategy or ["semantic"]), load_corpus(args.corpus))
+    print(format_comparison(results))
+
+
+if __name__ == "__main__":
+    main()
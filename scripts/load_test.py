@@ -0,0 +1,128 @@
+"""
+Load-tests the API offline. A recorded request log (JSONL, see load_request_log) or
+a synthetic Zipf query mix is sent to the in-process app at production-like rates.
+Vertex AI embeddings, the vector index and the news providers are replaced by
+stand-ins with the given latency distributions. The report has throughput, p50/p95/p99
+and error rates per endpoint; --slo makes the exit code fail when an objective is missed.
+
+Latencies are in milliseconds: fixed:MS, uniform:LO,HI, exp:MEAN or lognormal:MEDIAN,SIGMA.
+
+Usage:
+    python -m scripts.load_test --requests 5000 --qps 80 --slo "search:p99<=800" --slo "search:error_rate<=0.01"
+    python -m scripts.load_test --replay traffic.jsonl --speed 4 --embed-latency lognormal:60,0.4
+    SEARCH_MAX_CONCURRENT=32 python -m scripts.load_test --qps 150 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+from dotenv import load_dotenv
+from ingestion.scheduler import ProviderScheduler, parse_rate_limits
+from scripts.load_testing.stand_ins import (
+    FakeEmbeddings,
+    FakeIngestionService,
+    FakeProvider,
+    FakeProviderFactory,
+    FakeVectorStore,
+    parse_latency,
+)
+from scripts.load_testing.workload import (
+    endpoints_without_stand_ins,
+    load_request_log,
+    run_load,
+    stand_ins,
+    synthetic_queries,
+    zipf_workload,
+)
+from uses_cases.search_service import SearchService
+
+
+def build_services(args, rng):
+    latency = lambda spec: parse_latency(spec, rng)
+    embeddings = FakeEmbeddings(latency(args.embed_latency))
+    search_service = SearchService(FakeVectorStore(
+        embeddings, latency(args.index_latency), latency(args.hydrate_latency), args.corpus_size
+    ))
+    providers = {
+        source: FakeProvider(source, latency(args.provider_latency), args.provider_error_rate, rng=rng)
+        for source in args.sources
+    }
+    # Without --rate-limits the stand-in providers have no local quota.
+    rate_limits = parse_rate_limits(args.rate_limits) if args.rate_limits else {
+        source: (1000000, 1, 1000000) for source in args.sources
+    }
+    scheduler = ProviderScheduler(FakeProviderFactory(providers), rate_limits=rate_limits)
+    article_service = FakeIngestionService(scheduler, embeddings, latency(args.upsert_latency))
+    return search_service, article_service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API against local stand-ins.")
+    parser.add_argument("--replay", help="JSONL request log to replay instead of the Zipf mix.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor.")
+    parser.add_argument("--requests", type=int, default=1000, help="Zipf mix: number of requests.")
+    parser.add_argument("--qps", type=float, default=None, help="Arrival rate (Zipf default 50; spaces a replay evenly).")
+    parser.add_argument("--queries", help="Zipf mix: file with one query per line, most popular first.")
+    parser.add_argument("--distinct-queries", type=int, default=500, help="Zipf mix without --queries.")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--search-share", type=float, default=0.95, help="Share of searches; the rest ingest.")
+    parser.add_argument("--sources", default="newsapi,core", help="Stand-in providers (comma-separated).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embed-latency", default="lognormal:40,0.3", help="Per embedding call.")
+    parser.add_argument("--index-latency", default="lognormal:15,0.4", help="Per find_neighbors call.")
+    parser.add_argument("--hydrate-latency", default="lognormal:4,0.3", help="Per search, loading the results.")
+    parser.add_argument("--provider-latency", default="lognormal:400,0.5", help="Per provider fetch.")
+    parser.add_argument("--provider-error-rate", type=float, default=0.01)
+    parser.add_argument("--upsert-latency", default="lognormal:120,0.4", help="Per ingest index write.")
+    parser.add_argument("--rate-limits", help="Provider quotas, as in PROVIDER_RATE_LIMITS.")
+    parser.add_argument("--corpus-size", type=int, default=100000, help="Articles in the stand-in index.")
+    parser.add_argument("--slo", action="append", default=[], help='Objective, e.g. "search:p99<=800" (repeatable).')
+    parser.add_argument("--json", help="Also write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+    args.sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.replay:
+        requests = load_request_log(args.replay, args.qps)
+    else:
+        if args.queries:
+            with open(args.queries, "r", encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+        else:
+            queries = synthetic_queries(args.distinct_queries)
+        requests = zipf_workload(
+            args.requests, args.qps or 50, queries, args.zipf_exponent, args.search_share, args.sources, args.seed
+        )
+    if not requests:
+        parser.error("No requests to send.")
+
+    # Imported here: building the app reads the admission and deadline settings.
+    from app import main as api
+
+    uncovered = endpoints_without_stand_ins(api.app, requests)
+    if uncovered:
+        parser.error(f"No stand-ins for: {', '.join(uncovered)}. Only search and ingest can be load-tested.")
+
+    search_service, article_service = build_services(args, random.Random(args.seed))
+    print(f"Sending {len(requests)} requests over {requests[-1].at / args.speed:.1f}s...")
+    with stand_ins(api, search_service, article_service):
+        report = asyncio.run(run_load(api.app, requests, args.speed))
+
+    print(report.format())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.model_dump(), f, indent=2)
+    violations = report.check_slos(args.slo)
+    for violation in violations:
+        print(f"SLO missed: {violation}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
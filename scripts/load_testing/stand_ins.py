@@ -0,0 +1,216 @@
+# Local stand-ins for the remote services behind the API (Vertex AI embeddings, the
+# vector index and the news providers), with injectable latency distributions, so
+# the app can be load-tested offline. The request path around them stays the real
+# one: QueryBatcher, ProviderScheduler, admission gates and deadlines.
+
+import os
+import random
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from ingestion.models import Article
+from ingestion.providers.provider_i import NewsProvider, ProviderError
+from services.deadlines import check
+from storage.query_batcher import QueryBatcher
+from storage.search_filters import SearchFilters
+from uses_cases.article_ingestion import ArticleIngestionError
+
+# Draws one latency, in seconds.
+Latency = Callable[[], float]
+
+
+def parse_latency(spec: Optional[str], rng: Optional[random.Random] = None) -> Optional[Latency]:
+    """
+    Parses a latency distribution given in milliseconds: "fixed:MS", "uniform:LO,HI",
+    "exp:MEAN" or "lognormal:MEDIAN,SIGMA". None, "" and "0" mean no latency.
+    """
+    if not spec or spec == "0":
+        return None
+    rng = rng or random.Random()
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",")] if args else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda: values[0] / 1000
+        if kind == "uniform" and len(values) == 2:
+            return lambda: rng.uniform(values[0], values[1]) / 1000
+        if kind == "exp" and len(values) == 1:
+            return lambda: rng.expovariate(1 / values[0]) / 1000
+        if kind == "lognormal" and len(values) == 2:
+            # MEDIAN is in milliseconds; SIGMA is the spread of the underlying normal.
+            return lambda: values[0] * rng.lognormvariate(0, values[1]) / 1000
+    except (ValueError, ZeroDivisionError):
+        pass
+    raise ValueError(f"Invalid latency '{spec}': use fixed:MS, uniform:LO,HI, exp:MEAN or lognormal:MEDIAN,SIGMA.")
+
+
+def _pause(latency: Optional[Latency]):
+    if latency is not None:
+        time.sleep(latency())
+
+
+class FakeEmbeddings:
+    """
+    Stands in for VertexAIEmbeddings: one latency draw per call (a batch is one
+    request) and a deterministic unit vector per text.
+    """
+
+    def __init__(self, latency: Optional[Latency] = None, dimensions: int = 768):
+        self.latency = latency
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str], embeddings_task_type: Optional[str] = None) -> List[List[float]]:
+        _pause(self.latency)
+        return [self.vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def vector(self, text: str) -> List[float]:
+        vector = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeVectorStore:
+    """
+    The search path of VectorStore over a synthetic corpus of `corpus_size` articles:
+    searches go through a real QueryBatcher, and each batched index call and each
+    hydration costs one latency draw. A query always finds the same articles.
+    """
+
+    version_name = None
+
+    def __init__(
+        self,
+        embeddings: FakeEmbeddings,
+        index_latency: Optional[Latency] = None,
+        hydrate_latency: Optional[Latency] = None,
+        corpus_size: int = 10000,
+    ):
+        self.embeddings = embeddings
+        self.index_latency = index_latency
+        self.hydrate_latency = hydrate_latency
+        self.corpus_size = corpus_size
+        self.query_batcher = QueryBatcher(
+            self._embed_queries,
+            self._find_neighbors,
+            window=float(os.getenv("SEARCH_BATCH_WINDOW_MS", "5")) / 1000,
+            max_batch_size=int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32")),
+        )
+
+    def warm_up(self):
+        pass
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        check("query embedding")
+        return self.embeddings.embed_documents(queries, embeddings_task_type="RETRIEVAL_QUERY")
+
+    def _find_neighbors(self, vectors: List[List[float]], k: int, filters: Optional[SearchFilters]) -> List[list]:
+        check("find_neighbors")
+        _pause(self.index_latency)
+        return [self._neighbors(vector, k) for vector in vectors]
+
+    def _neighbors(self, vector: List[float], k: int) -> List[tuple]:
+        rng = random.Random(zlib.crc32(np.asarray(vector[:8], dtype=np.float32).tobytes()))
+        ids = rng.sample(range(1, self.corpus_size + 1), min(k, self.corpus_size))
+        return [(article_id, 0.1 + 0.01 * rank) for rank, article_id in enumerate(ids)]
+
+    def search_similar(self, query: str, k: int = 100, filters: Optional[SearchFilters] = None) -> Dict:
+        neighbors = self.query_batcher.search(query, k, filters)
+        check("hydration")
+        _pause(self.hydrate_latency)
+        return {
+            "query": query,
+            "results": [
+                {
+                    "id": article_id,
+                    "title": f"Article {article_id}",
+                    "url": f"https://example.com/{article_id}",
+                    "published_at": None,
+                    "content_preview": "",
+                    "source": "stand-in",
+                    "language": "es",
+                    "distance": distance,
+                }
+                for article_id, distance in neighbors
+            ],
+        }
+
+
+class FakeProvider(NewsProvider):
+    """A news provider that answers after one latency draw and fails at `error_rate`."""
+
+    def __init__(
+        self,
+        name: str,
+        latency: Optional[Latency] = None,
+        error_rate: float = 0.0,
+        articles_per_fetch: int = 20,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.articles_per_fetch = articles_per_fetch
+        self._rng = rng or random.Random()
+
+    def fetch_articles(self, query: str) -> List[Article]:
+        _pause(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise ProviderError(f"{self.name} returned HTTP 503")
+        return [
+            Article(
+                title=f"{query} ({self.name} #{i})",
+                url=f"https://{self.name}.example.com/{zlib.crc32(query.encode('utf-8'))}/{i}",
+                content=f"Stand-in article {i} about {query}. " * 20,
+                source=self.name,
+                language="es",
+            )
+            for i in range(self.articles_per_fetch)
+        ]
+
+
+class FakeProviderFactory:
+    """NewsProviderFactory over a fixed set of providers."""
+
+    def __init__(self, providers: Dict[str, NewsProvider]):
+        self.providers = providers
+
+    def get_provider(self, source: str) -> NewsProvider:
+        if source not in self.providers:
+            raise ValueError(f"News source '{source}' is not supported.")
+        return self.providers[source]
+
+
+class FakeIngestionService:
+    """
+    ArticleIngestionService.ingest_articles over stand-ins: the fetch goes through
+    `scheduler` (a real ProviderScheduler over fake providers), then embedding the
+    chunks and writing them to the index cost their latency. Nothing is stored.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        embeddings: FakeEmbeddings,
+        index_latency: Optional[Latency] = None,
+        chunks_per_article: int = 4,
+    ):
+        self.scheduler = scheduler
+        self.embeddings = embeddings
+        self.index_latency = index_latency
+        self.chunks_per_article = chunks_per_article
+
+    def ingest_articles(self, source: str, query: str) -> str:
+        try:
+            articles = self.scheduler.fetch(source, query)
+        except ValueError as e:
+            raise ArticleIngestionError("Ingestion process failed") from e
+        if not articles:
+            return "No articles found from the external source."
+        self.embeddings.embed_documents([
+            f"{article.title} [{i}]" for article in articles for i in range(self.chunks_per_article)
+        ])
+        _pause(self.index_latency)
+        return f"Successfully processed and stored {len(articles)} articles."
@@ -0,0 +1,269 @@
+# Offline load testing of the API: replays a recorded request log, or a synthetic
+# Zipf-distributed query mix, against the in-process FastAPI app with the remote
+# services replaced by stand-ins (see scripts.load_testing.stand_ins), and reports
+# throughput, latency percentiles and error rates per endpoint, checked against SLOs.
+
+import asyncio
+import json
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import httpx
+import numpy as np
+from pydantic import BaseModel
+
+
+class RequestSpec(NamedTuple):
+    """One request to send `at` seconds after the start of the run."""
+    at: float
+    method: str
+    path: str
+    params: Dict = {}
+    body: Optional[str] = None
+
+
+def load_request_log(path: str, qps: Optional[float] = None) -> List[RequestSpec]:
+    """
+    Reads a JSONL request log. Each line has "path" (optionally with a query string)
+    or "url", plus optional "method" (GET), "params" and "body". Send times come from
+    "t" (seconds) or an ISO "timestamp", relative to the earliest request; lines
+    without either, or every line when `qps` is given, are spaced evenly at `qps`
+    (default 10).
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {e}") from e
+
+    times = [None if qps else _entry_time(entry) for entry in entries]
+    first = min((t for t in times if t is not None), default=0.0)
+    requests = []
+    for i, (entry, at) in enumerate(zip(entries, times)):
+        target = urlsplit(entry.get("path") or entry.get("url") or "")
+        if not target.path:
+            raise ValueError(f"{path}: entry {i + 1} has no path or url.")
+        params = dict(parse_qsl(target.query))
+        params.update(entry.get("params") or {})
+        at = i / (qps or 10.0) if at is None else at - first
+        requests.append(RequestSpec(at, entry.get("method", "GET").upper(), target.path, params, entry.get("body")))
+    requests.sort(key=lambda r: r.at)
+    return requests
+
+
+def _entry_time(entry: Dict) -> Optional[float]:
+    if "t" in entry:
+        return float(entry["t"])
+    if "timestamp" in entry:
+        return datetime.fromisoformat(str(entry["timestamp"]).replace("Z", "+00:00")).timestamp()
+    return None
+
+
+def zipf_workload(
+    num_requests: int,
+    qps: float,
+    queries: Sequence[str],
+    exponent: float = 1.1,
+    search_share: float = 0.95,
+    sources: Sequence[str] = ("newsapi",),
+    seed: int = 0,
+) -> List[RequestSpec]:
+    """
+    Poisson arrivals at `qps`. The query of each request is drawn from `queries` by
+    Zipf rank (the first is the most popular), as real query logs are. A
+    `search_share` of the requests are searches; the rest ingest from `sources`.
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank ** exponent for rank in range(1, len(queries) + 1)]
+    drawn = rng.choices(list(queries), weights=weights, k=num_requests)
+    requests, at = [], 0.0
+    for query in drawn:
+        at += rng.expovariate(qps)
+        if rng.random() < search_share:
+            requests.append(RequestSpec(at, "GET", "/api/v1/search", {"q": query}))
+        else:
+            requests.append(RequestSpec(at, "GET", f"/api/v1/articles/{rng.choice(list(sources))}", {"q": query}))
+    return requests
+
+
+def synthetic_queries(count: int) -> List[str]:
+    """Distinct stand-in queries, for a Zipf mix without a query file."""
+    topics = ["inteligencia artificial", "elecciones", "cambio climático", "economía", "fútbol", "salud"]
+    return [
+        topics[i % len(topics)] + (f" {i // len(topics)}" if i >= len(topics) else "")
+        for i in range(count)
+    ]
+
+
+class EndpointStats(BaseModel):
+    """Results of one endpoint (method and route template) over a run."""
+    endpoint: str
+    requests: int
+    errors: int
+    error_rate: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    statuses: Dict[str, int]
+
+
+class LoadReport(BaseModel):
+    duration_seconds: float
+    endpoints: List[EndpointStats]
+
+    def format(self) -> str:
+        header = (
+            f"{'endpoint':<36} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7}  statuses"
+        )
+        lines = [f"Duration: {self.duration_seconds:.1f}s", header, "-" * len(header)]
+        for s in self.endpoints:
+            statuses = ", ".join(f"{code}: {n}" for code, n in sorted(s.statuses.items()))
+            lines.append(
+                f"{s.endpoint:<36} {s.requests:>6} {s.throughput:>7.1f} {s.p50_ms:>8.1f} {s.p95_ms:>8.1f} "
+                f"{s.p99_ms:>8.1f} {s.error_rate:>7.1%}  {statuses}"
+            )
+        return "\n".join(lines)
+
+    def check_slos(self, slos: Sequence[str]) -> List[str]:
+        """
+        Checks objectives like "search:p99<=500" or "articles:error_rate<=0.01"
+        (p50, p95, p99 in ms; error_rate; throughput in req/s) against every endpoint
+        whose name contains the given part. Returns the violations.
+        """
+        violations = []
+        for slo in slos:
+            match = re.fullmatch(r"\s*([^:]+):(p50|p95|p99|error_rate|throughput)\s*(<=|>=)\s*([0-9.]+)\s*", slo)
+            if not match:
+                raise ValueError(f"Invalid SLO '{slo}': use ENDPOINT:METRIC<=VALUE or >=VALUE.")
+            part, metric, op, limit = match.groups()
+            endpoints = [s for s in self.endpoints if part in s.endpoint]
+            if not endpoints:
+                violations.append(f"{slo}: no requests to a matching endpoint")
+            for stats in endpoints:
+                value = getattr(stats, metric + "_ms" if metric.startswith("p") else metric)
+                if (op == "<=" and value > float(limit)) or (op == ">=" and value < float(limit)):
+                    violations.append(f"{slo}: {stats.endpoint} has {metric} = {value:.4g}")
+        return violations
+
+
+def summarize(samples: Dict[str, List[Tuple[int, float]]], duration: float) -> LoadReport:
+    """
+    Builds the report from (status, latency seconds) samples per endpoint. Server
+    errors (5xx, including 503 shed and 504 deadline) and failed requests (status
+    0) count as errors; 4xx are reported by status only.
+    """
+    endpoints = []
+    for endpoint, results in sorted(samples.items()):
+        latencies = np.array([latency for _, latency in results]) * 1000
+        statuses: Dict[str, int] = {}
+        for status, _ in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        errors = sum(1 for status, _ in results if status == 0 or status >= 500)
+        endpoints.append(EndpointStats(
+            endpoint=endpoint,
+            requests=len(results),
+            errors=errors,
+            error_rate=errors / len(results),
+            throughput=len(results) / duration if duration else 0.0,
+            p50_ms=float(np.percentile(latencies, 50)),
+            p95_ms=float(np.percentile(latencies, 95)),
+            p99_ms=float(np.percentile(latencies, 99)),
+            statuses=statuses,
+        ))
+    return LoadReport(duration_seconds=duration, endpoints=endpoints)
+
+
+def endpoint_name(app, method: str, path: str) -> str:
+    """The route template a request hits, e.g. "GET /api/v1/articles/{source}"."""
+    for route in app.routes:
+        regex = getattr(route, "path_regex", None)
+        if regex is not None and regex.match(path) and method in (getattr(route, "methods", None) or {method}):
+            return f"{method} {route.path}"
+    return f"{method} {path}"
+
+
+async def run_load(app, requests: Sequence[RequestSpec], speed: float = 1.0, timeout: float = 300) -> LoadReport:
+    """
+    Sends the requests open-loop at their scheduled times (divided by `speed`), so a
+    slow app does not slow the arrivals down. Latency is measured from the scheduled
+    send time, which keeps event-loop lag in the numbers.
+    """
+    samples: Dict[str, List[Tuple[int, float]]] = {}
+    loop = asyncio.get_running_loop()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+        started = loop.time()
+
+        async def send(spec: RequestSpec):
+            scheduled = started + spec.at / speed
+            await asyncio.sleep(max(0.0, scheduled - loop.time()))
+            try:
+                response = await client.request(spec.method, spec.path, params=spec.params, content=spec.body)
+                status = response.status_code
+            except Exception:
+                status = 0
+            endpoint = endpoint_name(app, spec.method, spec.path)
+            samples.setdefault(endpoint, []).append((status, loop.time() - scheduled))
+
+        await asyncio.gather(*(send(spec) for spec in requests))
+        duration = loop.time() - started
+    return summarize(samples, duration)
+
+
+# Endpoints whose services have stand-ins; anything else would reach a real backend.
+STAND_IN_ENDPOINTS = ("GET /api/v1/search", "GET /api/v1/articles/{source}", "GET /api/v1/health/live")
+
+# Every service getter of app.main. Those without a stand-in fail instead.
+SERVICE_GETTERS = (
+    "get_article_service",
+    "get_search_service",
+    "get_related_service",
+    "get_trending_service",
+    "get_suggest_service",
+    "get_push_service",
+)
+
+
+def endpoints_without_stand_ins(app, requests: Sequence[RequestSpec]) -> List[str]:
+    """The endpoints of `requests` that no stand-in covers, sorted."""
+    endpoints = {endpoint_name(app, r.method, r.path) for r in requests}
+    return sorted(endpoints - set(STAND_IN_ENDPOINTS))
+
+
+def _missing_stand_in(getter: str):
+    def fail():
+        raise RuntimeError(f"The load test has no stand-in for {getter}().")
+    return fail
+
+
+@contextmanager
+def stand_ins(api, search_service, article_service) -> Iterator[None]:
+    """
+    Points every service getter of the API module at a stand-in for the block: the
+    given services for search and ingest, and a getter that raises for the others,
+    so no request reaches a real backend. The admission gates are rebuilt on both
+    sides, since they bind to an event loop.
+    """
+    originals = {name: getattr(api, name) for name in SERVICE_GETTERS}
+    for name in SERVICE_GETTERS:
+        setattr(api, name, _missing_stand_in(name))
+    api.get_search_service = lambda: search_service
+    api.get_article_service = lambda: article_service
+    api.get_search_gate.cache_clear()
+    api.get_ingest_gate.cache_clear()
+    try:
+        yield
+    finally:
+        for name, getter in originals.items():
+            setattr(api, name, getter)
+        api.get_search_gate.cache_clear()
+        api.get_ingest_gate.cache_clear()
@@ -0,0 +1,75 @@
+"""
+Builds a new index version (chunking strategy, embedding model and vector index)
+from the stored article content while the active version keeps serving, then
+switches traffic to it.
+
+Usage:
+    python -m scripts.reindex create v2 --backend pgvector --settings '{"table": "chunk_embeddings_v2"}' \
+        --chunking-strategy recursive --embedding-model text-embedding-005
+    python -m scripts.reindex create coarse256 --backend pgvector \
+        --settings '{"table": "chunk_embeddings_c256", "coarse_dimensions": 256, "coarse_candidates": 200}'
+    python -m scripts.reindex run v2              # resumable
+    python -m scripts.reindex run v2 --cutover    # catch up and activate
+    python -m scripts.reindex activate v1         # switch back (run v1 first to catch up)
+    python -m scripts.reindex list
+"""
+
+import argparse
+import json
+import logging
+from dotenv import load_dotenv
+from database.manager import DatabaseManager
+from storage.backends import VECTOR_BACKENDS
+from uses_cases.reindex import ReindexJob
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and activate index versions.")
+    parser.add_argument("command", choices=["create", "run", "activate", "list"])
+    parser.add_argument("name", nargs="?", help="Index version name.")
+    parser.add_argument("--backend", choices=VECTOR_BACKENDS, default="vertex")
+    parser.add_argument(
+        "--settings", default="{}",
+        help=(
+            "Backend settings as JSON: index_id/endpoint_id/deployed_index_id, or table/dimensions. "
+            "coarse_dimensions (and coarse_candidates) make a two-stage index."
+        ),
+    )
+    parser.add_argument("--chunking-strategy", help="Strategy for every article (default: CHUNKING_* settings).")
+    parser.add_argument("--embedding-model", help="Embedding model (default: the configured one).")
+    parser.add_argument("--batch-size", type=int, default=100, help="Articles per batch.")
+    parser.add_argument("--cutover", action="store_true", help="Activate the version once it is built.")
+    args = parser.parse_args(argv)
+    if args.command != "list" and not args.name:
+        parser.error(f"'{args.command}' needs a version name")
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    db = DatabaseManager()
+    if args.command == "create":
+        db.create_index_version(
+            args.name,
+            args.backend,
+            settings=json.dumps(json.loads(args.settings)),
+            chunking_strategy=args.chunking_strategy,
+            embedding_model=args.embedding_model,
+        )
+        print(f"Index version '{args.name}' created")
+    elif args.command == "run":
+        job = ReindexJob(args.name, batch_size=args.batch_size)
+        report = job.cutover() if args.cutover else job.build()
+        print(f"Reindex completed: {report.summary()}")
+    elif args.command == "activate":
+        db.activate_index_version(args.name)
+        print(f"Index version '{args.name}' is active")
+    else:
+        for version in db.list_index_versions():
+            print(
+                f"{version.name}\t{version.status}\t{version.backend}\t"
+                f"{version.chunking_strategy or '-'}\t{version.embedding_model or '-'}\t{version.settings}"
+            )
+
+
+if __name__ == "__main__":
+    main()
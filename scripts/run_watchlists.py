@@ -0,0 +1,43 @@
+"""
+Keeps a list of (provider, query) topics fresh without an external cron.
+
+The watchlist is a JSON file:
+    [
+      {"source": "newsapi", "query": "artificial intelligence", "interval_seconds": 3600},
+      {"source": "core", "query": "large language models", "interval_seconds": 21600}
+    ]
+
+Usage:
+    python -m scripts.run_watchlists watchlist.json --state watchlist_state.json
+"""
+
+import argparse
+import logging
+from dotenv import load_dotenv
+from uses_cases.watchlist import WatchlistScheduler, load_watchlist
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh watchlist topics on a schedule.")
+    parser.add_argument("watchlist", help="JSON file with the watchlist entries.")
+    parser.add_argument("--state", default=None, help="JSON file remembering each topic's last result set.")
+    parser.add_argument("--workers", type=int, default=4, help="Topics refreshed concurrently.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random spread applied to each interval (fraction).")
+    parser.add_argument("--max-backoff", type=int, default=8, help="Max interval multiplier for unchanged topics.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    scheduler = WatchlistScheduler(
+        load_watchlist(args.watchlist),
+        max_workers=args.workers,
+        jitter=args.jitter,
+        max_backoff=args.max_backoff,
+        state_path=args.state,
+    )
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
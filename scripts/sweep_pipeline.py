@@ -0,0 +1,41 @@
+"""
+Re-drives articles stuck before the 'indexed' stage (failed chunking, embedding or
+upserts) so they become searchable.
+
+Usage:
+    python -m scripts.sweep_pipeline                 # one pass
+    python -m scripts.sweep_pipeline --loop --interval 60
+"""
+
+import argparse
+import logging
+from dotenv import load_dotenv
+from uses_cases.pipeline_sweeper import PipelineSweeper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-drive incomplete articles through the pipeline.")
+    parser.add_argument("--batch-size", type=int, default=50, help="Articles re-driven per batch.")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Give up on an article after this many failures.")
+    parser.add_argument("--idle-seconds", type=int, default=300, help="Skip articles updated more recently than this.")
+    parser.add_argument("--loop", action="store_true", help="Keep sweeping every --interval seconds.")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between sweeps with --loop.")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    sweeper = PipelineSweeper(
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts,
+        idle_seconds=args.idle_seconds,
+    )
+    if args.loop:
+        sweeper.run_forever(interval=args.interval)
+    else:
+        stats = sweeper.run_once()
+        print(f"Sweep completed: {stats}")
+
+
+if __name__ == "__main__":
+    main()
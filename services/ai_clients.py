@@ -1,39 +1,79 @@
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain_google_vertexai import VertexAIEmbeddings
 
 load_dotenv()
 
 
 class AIClientsSingleton:
     """
-    Singleton class that manage the AI clients (embeddings and chunker)
+    Singleton class that manage the AI clients (embeddings and chunker).
+    The langchain SDKs are imported on first instantiation to keep imports cheap.
+    Instantiation is thread-safe, and a forked child builds its own clients: gRPC
+    channels inherited from the parent are not usable after a fork.
     """
 
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._create()
+        return cls._instance
 
-            project_id = os.getenv("GCP_PROJECT_ID")
-            location = os.getenv("GCP_LOCATION")
-
-            if not project_id or not location:
-                raise ValueError(
-                    "GCP_PROJECT_ID and GCP_LOCATION must be set in your .env file"
-                )
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._instance = None
 
-            cls._instance = super(AIClientsSingleton, cls).__new__(cls)
+    @classmethod
+    def _create(cls):
+        project_id = os.getenv("GCP_PROJECT_ID")
+        location = os.getenv("GCP_LOCATION")
 
-            cls._instance.embeddings_client = VertexAIEmbeddings(
-                project=project_id, location=location, model_name="text-embedding-004"
+        if not project_id or not location:
+            raise ValueError(
+                "GCP_PROJECT_ID and GCP_LOCATION must be set in your .env file"
             )
 
-            cls._instance.semantic_chunker = SemanticChunker(
-                cls._instance.embeddings_client,
-                breakpoint_threshold_type="percentile",  # There is "perceWntile" (It should have a big sematic valley to do the chunking. 0.95 by default), "gradient", "standard_deviation"
-                breakpoint_threshold_amount=45,
-            )
+        from langchain_experimental.text_splitter import SemanticChunker
+        from langchain_google_vertexai import VertexAIEmbeddings
 
-        return cls._instance
+        instance = super(AIClientsSingleton, cls).__new__(cls)
+
+        instance.embeddings_client = VertexAIEmbeddings(
+            project=project_id, location=location, model_name="text-embedding-004"
+        )
+
+        instance._embeddings_by_model = {"text-embedding-004": instance.embeddings_client}
+        instance._models_lock = threading.Lock()
+
+        instance.semantic_chunker = SemanticChunker(
+            instance.embeddings_client,
+            breakpoint_threshold_type="percentile",  # There is "perceWntile" (It should have a big sematic valley to do the chunking. 0.95 by default), "gradient", "standard_deviation"
+            breakpoint_threshold_amount=45,
+        )
+
+        return instance
+
+    def embeddings_for(self, model_name: str):
+        """
+        Embeddings client for another Vertex AI model (e.g. for a new index version),
+        built once per model.
+        """
+        with self._models_lock:
+            if model_name not in self._embeddings_by_model:
+                from langchain_google_vertexai import VertexAIEmbeddings
+
+                self._embeddings_by_model[model_name] = VertexAIEmbeddings(
+                    project=os.getenv("GCP_PROJECT_ID"),
+                    location=os.getenv("GCP_LOCATION"),
+                    model_name=model_name,
+                )
+            return self._embeddings_by_model[model_name]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=AIClientsSingleton._after_fork_in_child)
@@ -0,0 +1,104 @@
+# Request deadlines. The API opens a deadline per request; the layers below read it
+# from a context variable (copied into the threadpool with the request context) to
+# bound their own timeouts and waits, and to give up once it has passed instead of
+# finishing work nobody is waiting for. Outside a request there is no deadline.
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, TypeVar
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the request deadline passes before (or while waiting for) a call."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Runs the block under a deadline `seconds` from now. A nested deadline can only
+    shorten the current one. None or 0 leaves it unchanged.
+    """
+    current = _deadline.get()
+    if seconds:
+        ends = time.monotonic() + seconds
+        current = ends if current is None else min(current, ends)
+    token = _deadline.set(current)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (negative once passed), or None without one."""
+    ends = _deadline.get()
+    return None if ends is None else ends - time.monotonic()
+
+
+def check(what: str):
+    """Raises DeadlineExceeded if the deadline has passed, before starting `what`."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded before {what}")
+
+
+def bounded(timeout: Optional[float]) -> Optional[float]:
+    """`timeout` shortened to the time left before the deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(left, 0.001)
+    return left if timeout is None else min(timeout, left)
+
+
+_rpc_executor: Optional[ThreadPoolExecutor] = None
+_rpc_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _rpc_executor
+    with _rpc_lock:
+        if _rpc_executor is None:
+            _rpc_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("DEADLINE_RPC_THREADS", "16")), thread_name_prefix="rpc"
+            )
+        return _rpc_executor
+
+
+def call_bounded(what: str, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+    """
+    Calls `func` with an RPC timeout of `bounded(timeout)`, for clients that take no
+    per-call timeout (the Matching Engine endpoint, the Vertex AI embeddings). The
+    call runs in a worker thread and DeadlineExceeded is raised once the timeout
+    passes; the abandoned call finishes in the background. Without a deadline or
+    `timeout`, `func` is called directly.
+    """
+    check(what)
+    wait = bounded(timeout)
+    if wait is None:
+        return func(*args, **kwargs)
+    future = _executor().submit(func, *args, **kwargs)
+    try:
+        return future.result(timeout=wait)
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded(f"Request deadline exceeded during {what}") from None
+
+
+def _reset_after_fork_in_child():
+    # The parent's worker threads don't exist in the child.
+    global _rpc_executor, _rpc_lock
+    _rpc_executor = None
+    _rpc_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork_in_child)
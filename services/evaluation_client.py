@@ -1,7 +1,6 @@
 import json
 import re  # Importamos el módulo de expresiones regulares
 from typing import List, Dict
-from langchain_google_vertexai import VertexAI
 
 # Asegúrate de que este import sea correcto para tu estructura
 from .prompts import EVALUATION_PROMPT_TEMPLATE
@@ -12,17 +11,26 @@ class ChunkingEvaluator:
     Este servicio utiliza un LLM para evaluar la calidad de una lista de chunks.
     """
 
-    def __init__(self):
-        # Usamos un modelo estable y universalmente disponible
-        self.llm = VertexAI(model_name="gemini-2.5-flash", temperature=0.1)
+    def __init__(self, llm=None, model_name: str = "gemini-2.5-flash"):
+        # Usamos un modelo estable y universalmente disponible.
+        # Se puede inyectar otro `llm` (p. ej. un LLM falso para ejecutar sin red).
+        self.model_name = model_name
+        if llm is None:
+            from langchain_google_vertexai import VertexAI
+
+            llm = VertexAI(model_name=model_name, temperature=0.1)
+        self.llm = llm
+
+    def build_prompt(self, chunks: List[str]) -> str:
+        chunks_as_json_string = json.dumps(chunks, indent=2, ensure_ascii=False)
+        return EVALUATION_PROMPT_TEMPLATE.format(chunks_json=chunks_as_json_string)
 
     def evaluate_chunks(self, chunks: List[str]) -> Dict:
         """
         Envía los chunks a un LLM para su evaluación, limpia la respuesta y
         devuelve el resultado JSON.
         """
-        chunks_as_json_string = json.dumps(chunks, indent=2, ensure_ascii=False)
-        prompt = EVALUATION_PROMPT_TEMPLATE.format(chunks_json=chunks_as_json_string)
+        prompt = self.build_prompt(chunks)
 
         raw_response = ""
         try:
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from chunking.strategies.strategy_i import ChunkingStrategy
+from services.evaluation_client import ChunkingEvaluator
+
+
+# Precio aproximado por millón de tokens (USD) para estimar el coste de evaluación.
+DEFAULT_INPUT_PRICE_PER_M = float(os.getenv("EVAL_INPUT_PRICE_PER_M", "0.30"))
+DEFAULT_OUTPUT_PRICE_PER_M = float(os.getenv("EVAL_OUTPUT_PRICE_PER_M", "2.50"))
+
+
+def estimate_tokens(text: str) -> int:
+    # Heurística habitual: ~4 caracteres por token.
+    return max(1, len(text) // 4)
+
+
+class FakeLLM:
+    """
+    LLM determinista para ejecutar evaluaciones sin red. Puntúa los chunks con una
+    heurística de tamaño: penaliza chunks muy cortos o muy largos.
+    """
+
+    model_name = "fake-llm"
+
+    def __init__(self, ideal_min_chars: int = 200, ideal_max_chars: int = 1500):
+        self.ideal_min_chars = ideal_min_chars
+        self.ideal_max_chars = ideal_max_chars
+
+    def invoke(self, prompt: str) -> str:
+        marker = prompt.rfind("**Aquí está la lista de chunks que debes evaluar:**")
+        chunks = json.loads(prompt[marker:].split("\n", 1)[1]) if marker >= 0 else []
+        if not chunks:
+            score = 1
+        else:
+            in_range = sum(self.ideal_min_chars <= len(c) <= self.ideal_max_chars for c in chunks)
+            score = 1 + round(9 * in_range / len(chunks))
+        return json.dumps({
+            "score": score,
+            "reasoning": f"{len(chunks)} chunks evaluados con la heurística de tamaño.",
+            "suggestion": "",
+        })
+
+
+class VerdictCache:
+    """
+    Caché de veredictos por hash de (modelo, lista de chunks). Opcionalmente se
+    persiste en un fichero JSON para reutilizarla entre ejecuciones.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._verdicts: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._verdicts = json.load(f)
+
+    @staticmethod
+    def key(model_name: str, chunks: List[str]) -> str:
+        payload = json.dumps([model_name, chunks], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._verdicts.get(key)
+
+    def put(self, key: str, verdict: Dict):
+        with self._lock:
+            self._verdicts[key] = verdict
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._verdicts, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class EvaluationStats(BaseModel):
+    llm_calls: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    def cost_usd(
+        self,
+        input_price_per_m: float = DEFAULT_INPUT_PRICE_PER_M,
+        output_price_per_m: float = DEFAULT_OUTPUT_PRICE_PER_M,
+    ) -> float:
+        return (self.input_tokens * input_price_per_m + self.output_tokens * output_price_per_m) / 1_000_000
+
+
+class StrategyResult(BaseModel):
+    """Resultado agregado de una estrategia de chunking sobre el corpus."""
+    strategy: str
+    mean_score: float
+    min_score: int
+    total_chunks: int
+    chunking_seconds: float
+    evaluation: EvaluationStats
+    cost_usd: float
+    scores: Dict[str, int]
+
+
+class BatchEvaluationRunner:
+    """
+    Evalúa muchos documentos en paralelo. Como máximo `max_concurrency` llamadas al
+    LLM están en curso a la vez; los veredictos se cachean por hash de los chunks y
+    del modelo, así que reevaluar chunks idénticos no vuelve a llamar al LLM.
+    """
+
+    def __init__(
+        self,
+        evaluator: ChunkingEvaluator,
+        max_concurrency: int = 8,
+        cache: Optional[VerdictCache] = None,
+    ):
+        self.evaluator = evaluator
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else VerdictCache()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def _evaluate_one(self, chunks: List[str], stats: EvaluationStats, stats_lock: threading.Lock) -> Dict:
+        key = VerdictCache.key(self.evaluator.model_name, chunks)
+        cached = self.cache.get(key)
+        if cached is not None:
+            with stats_lock:
+                stats.cache_hits += 1
+            return cached
+
+        with self._semaphore:
+            verdict = self.evaluator.evaluate_chunks(chunks)
+
+        prompt_tokens = estimate_tokens(self.evaluator.build_prompt(chunks))
+        output_tokens = estimate_tokens(json.dumps(verdict, ensure_ascii=False))
+        with stats_lock:
+            stats.llm_calls += 1
+            stats.input_tokens += prompt_tokens
+            stats.output_tokens += output_tokens
+        # Las respuestas no parseables (score 0) no se cachean para poder reintentarlas.
+        if verdict.get("score", 0):
+            self.cache.put(key, verdict)
+        return verdict
+
+    def evaluate_documents(self, chunked_documents: Dict[str, List[str]]):
+        """
+        Evalúa {nombre_documento: chunks}. Devuelve ({nombre: veredicto}, estadísticas).
+        """
+        stats = EvaluationStats()
+        stats_lock = threading.Lock()
+        started = time.perf_counter()
+        # Más hilos que el límite de concurrencia: los aciertos de caché no esperan.
+        with ThreadPoolExecutor(max_workers=self.max_concurrency * 2) as executor:
+            futures = {
+                name: executor.submit(self._evaluate_one, chunks, stats, stats_lock)
+                for name, chunks in chunked_documents.items()
+            }
+            verdicts = {name: future.result() for name, future in futures.items()}
+        stats.elapsed_seconds = time.perf_counter() - started
+        self.cache.save()
+        return verdicts, stats
+
+    def compare_strategies(
+        self,
+        strategies: Dict[str, ChunkingStrategy],
+        documents: Dict[str, str],
+    ) -> List[StrategyResult]:
+        """
+        Trocea `documents` ({nombre: texto}) con cada estrategia, evalúa los chunks y
+        devuelve un resultado por estrategia ordenado por puntuación media.
+        """
+        results = []
+        for strategy_name, strategy in strategies.items():
+            started = time.perf_counter()
+            chunked = {name: strategy.chunk(text) for name, text in documents.items()}
+            chunking_seconds = time.perf_counter() - started
+
+            verdicts, stats = self.evaluate_documents(chunked)
+            scores = {name: int(v.get("score", 0)) for name, v in verdicts.items()}
+            results.append(
+                StrategyResult(
+                    strategy=strategy_name,
+                    mean_score=statistics.mean(scores.values()) if scores else 0.0,
+                    min_score=min(scores.values()) if scores else 0,
+                    total_chunks=sum(len(c) for c in chunked.values()),
+                    chunking_seconds=chunking_seconds,
+                    evaluation=stats,
+                    cost_usd=stats.cost_usd(),
+                    scores=scores,
+                )
+            )
+        results.sort(key=lambda r: r.mean_score, reverse=True)
+        return results
+
+
+def format_comparison(results: List[StrategyResult]) -> str:
+    """Tabla de texto con la comparación de estrategias."""
+    header = f"{'strategy':<20} {'mean':>6} {'min':>4} {'chunks':>7} {'chunk s':>8} {'calls':>6} {'hits':>5} {'cost $':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.strategy:<20} {r.mean_score:>6.2f} {r.min_score:>4} {r.total_chunks:>7} "
+            f"{r.chunking_seconds:>8.2f} {r.evaluation.llm_calls:>6} {r.evaluation.cache_hits:>5} "
+            f"{r.cost_usd:>9.5f}"
+        )
+    return "\n".join(lines)
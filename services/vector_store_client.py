@@ -1,42 +1,81 @@
 import os
+import threading
 from services.ai_clients import AIClientsSingleton
-from google.cloud import aiplatform
 
 class VectorStoreSingleton:
     """
     Singleton class that manages the connection to Vertex AI Search.
+    google.cloud.aiplatform is imported on first instantiation, not at module import.
+    Like AIClientsSingleton, it is thread-safe and rebuilt in a forked child.
     """
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(VectorStoreSingleton, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._create()
+        return cls._instance
 
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._instance = None
 
-            clients = AIClientsSingleton()
-            cls._instance.embeddings = clients.embeddings_client
+    @classmethod
+    def _create(cls):
+        from google.cloud import aiplatform
 
-            project_id = os.getenv("GCP_PROJECT_ID")
-            location = os.getenv("GCP_LOCATION")
-            index_id = os.getenv("VERTEX_INDEX_ID")       
-            endpoint_id = os.getenv("VERTEX_ENDPOINT_ID") 
+        instance = super(VectorStoreSingleton, cls).__new__(cls)
 
-            if not project_id or not location:
-                raise ValueError("GCP_PROJECT_ID y GCP_LOCATION deben estar configurados en el .env")
 
-            cls._instance.project_id = project_id
-            cls._instance.location = location
-            cls._instance.index_id = index_id
-            cls._instance.endpoint_id = endpoint_id
+        clients = AIClientsSingleton()
+        instance.embeddings = clients.embeddings_client
 
+        project_id = os.getenv("GCP_PROJECT_ID")
+        location = os.getenv("GCP_LOCATION")
+        index_id = os.getenv("VERTEX_INDEX_ID")       
+        endpoint_id = os.getenv("VERTEX_ENDPOINT_ID") 
+        deployed_index_id = os.getenv("DEPLOYED_INDEX_ID")
 
-            aiplatform.init(project=project_id, location=location)
+        if not project_id or not location:
+            raise ValueError("GCP_PROJECT_ID y GCP_LOCATION deben estar configurados en el .env")
 
-            cls._instance.index = aiplatform.MatchingEngineIndex(index_name=index_id)
-            cls._instance.endpoint = aiplatform.MatchingEngineIndexEndpoint(
-                index_endpoint_name=endpoint_id
-            )
+        instance.project_id = project_id
+        instance.location = location
+        instance.index_id = index_id
+        instance.endpoint_id = endpoint_id
+        instance.deployed_index_id = deployed_index_id
 
-        return cls._instance
+
+        aiplatform.init(project=project_id, location=location)
+
+        instance.index = aiplatform.MatchingEngineIndex(index_name=index_id)
+        instance.endpoint = aiplatform.MatchingEngineIndexEndpoint(
+            index_endpoint_name=endpoint_id
+        )
+        instance._resources = {(index_id, endpoint_id): (instance.index, instance.endpoint)}
+        instance._resources_lock = threading.Lock()
+
+        return instance
+
+    def resources(self, index_id: str, endpoint_id: str):
+        """
+        (index, endpoint) handles for other Matching Engine resources, e.g. those of
+        a new index version. Built once per pair.
+        """
+        from google.cloud import aiplatform
+
+        with self._resources_lock:
+            key = (index_id, endpoint_id)
+            if key not in self._resources:
+                self._resources[key] = (
+                    aiplatform.MatchingEngineIndex(index_name=index_id),
+                    aiplatform.MatchingEngineIndexEndpoint(index_endpoint_name=endpoint_id),
+                )
+            return self._resources[key]
 
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=VectorStoreSingleton._after_fork_in_child)
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from typing import Callable
+from storage.vector_store import VectorStore
+
+
+VECTOR_BACKENDS = ("vertex", "pgvector")
+
+
+def build_vector_store(backend: str = None, version=None) -> VectorStore:
+    """
+    Builds the vector store selected by `backend` or VECTOR_BACKEND: "vertex"
+    (Matching Engine, the default) or "pgvector". Both expose the same interface.
+
+    With an index `version` (see IndexVersionModel) the store reads and writes
+    that version; its backend wins over `backend`. With neither, the result is an
+    ActiveVectorStore that follows whichever version is active.
+    """
+    if backend is None and version is None:
+        return ActiveVectorStore()
+    if version is not None:
+        backend = version.backend
+    backend = (backend or os.getenv("VECTOR_BACKEND", "vertex")).lower()
+    if backend == "vertex":
+        return VectorStore(version)
+    if backend == "pgvector":
+        from storage.pgvector_store import PgVectorStore
+        return PgVectorStore(version)
+    raise ValueError(f"Vector backend '{backend}' is not supported.")
+
+
+class ActiveVectorStore:
+    """
+    Delegates to the store of the active index version, so a cut-over made by the
+    reindex job (or from another process) is picked up without a restart. The
+    active version is looked up at most every INDEX_VERSION_REFRESH_SECONDS.
+    Without an active version it is the original, unversioned index.
+    """
+
+    def __init__(
+        self,
+        db_manager=None,
+        refresh_seconds: float = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if db_manager is None:
+            from database.manager import DatabaseManager
+            db_manager = DatabaseManager()
+        self.db_manager = db_manager
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None
+            else float(os.getenv("INDEX_VERSION_REFRESH_SECONDS", "30"))
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._store = None
+        self._checked_at = 0.0
+
+    def current(self):
+        """The store of the active version, rebuilt when the version changes."""
+        store = self._store
+        if store is not None and self._clock() - self._checked_at < self.refresh_seconds:
+            return store
+        with self._lock:
+            if self._store is None or self._clock() - self._checked_at >= self.refresh_seconds:
+                version = self.db_manager.get_active_index_version()
+                name = version.name if version is not None else None
+                if self._store is None or self._store.version_name != name:
+                    self._store = build_vector_store(os.getenv("VECTOR_BACKEND", "vertex"), version)
+                self._checked_at = self._clock()
+            return self._store
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set in __init__.
+        return getattr(self.current(), name)
@@ -0,0 +1,341 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from database.manager import DatabaseManager, apply_deadline
+from services.ai_clients import AIClientsSingleton
+from storage.search_filters import SearchFilters
+from storage.upsert_writer import UpsertWriter
+from storage.vector_store import VectorStore, version_settings
+
+
+# Columns returned for each search result, in the same shape as VectorStore's.
+RESULT_COLUMNS = ("id", "title", "url", "published_at", "content_preview", "source", "language")
+
+DEFAULT_TABLE = "chunk_embeddings"
+
+# pgvector's hnsw.ef_search default and upper bound.
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+# PGVECTOR_ITERATIVE_SCAN values (hnsw.iterative_scan modes).
+ITERATIVE_SCAN_MODES = ("off", "relaxed_order", "strict_order")
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+
+def checked_table(name: str) -> str:
+    # Table names are interpolated into SQL: only plain identifiers are accepted.
+    if not _IDENTIFIER.match(name or ""):
+        raise ValueError(f"Invalid pgvector table name '{name}'.")
+    return name
+
+
+def to_vector_literal(vector: List[float]) -> str:
+    # pgvector's text input format; avoids depending on the pgvector Python package.
+    return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+def parse_vector(literal: Optional[str]) -> Optional[List[float]]:
+    return json.loads(literal) if literal else None
+
+
+def schema_statements(
+    dimensions: int, index_type: str = "hnsw", ivfflat_lists: int = 100, table: str = DEFAULT_TABLE
+) -> List[str]:
+    """
+    DDL for a chunk vector table. Idempotent, so it runs on every start-up.
+    """
+    table = checked_table(table)
+    if index_type == "hnsw":
+        index = (
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_hnsw ON {table} "
+            "USING hnsw (embedding vector_cosine_ops)"
+        )
+    elif index_type == "ivfflat":
+        index = (
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_ivfflat ON {table} "
+            f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(ivfflat_lists)})"
+        )
+    else:
+        raise ValueError(f"pgvector index type '{index_type}' is not supported.")
+    return [
+        "CREATE EXTENSION IF NOT EXISTS vector",
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        " datapoint_id TEXT PRIMARY KEY,"
+        " article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,"
+        f" embedding vector({int(dimensions)}) NOT NULL"
+        ")",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_article_id ON {table} (article_id)",
+        index,
+    ]
+
+
+def build_search_sql(
+    filters: Optional[SearchFilters], with_vectors: bool = False, table: str = DEFAULT_TABLE
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    One statement that finds the nearest chunks (filtered on the joined article),
+    keeps each article's best chunk and returns the articles ordered by distance.
+    Binds :query (a vector literal), :num_chunks and :k.
+    """
+    conditions, params = filters.to_sql("a") if filters else ([], {})
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    vector_column = ", e.embedding::text AS vector" if with_vectors else ""
+    best_vector = ", vector" if with_vectors else ""
+    result_vector = ", best.vector" if with_vectors else ""
+    columns = ", ".join(f"a.{column}" for column in RESULT_COLUMNS)
+    sql = f"""
+        WITH nearest AS (
+            SELECT e.article_id, e.embedding <=> CAST(:query AS vector) AS distance{vector_column}
+            FROM {checked_table(table)} e
+            JOIN articles a ON a.id = e.article_id
+            {where}
+            ORDER BY distance
+            LIMIT :num_chunks
+        ),
+        best AS (
+            SELECT DISTINCT ON (article_id) article_id, distance{best_vector}
+            FROM nearest
+            ORDER BY article_id, distance
+        )
+        SELECT {columns}, best.distance{result_vector}
+        FROM best
+        JOIN articles a ON a.id = best.article_id
+        ORDER BY best.distance
+        LIMIT :k
+    """
+    return sql, params
+
+
+def build_candidate_sql(filters: Optional[SearchFilters], table: str = DEFAULT_TABLE) -> Tuple[str, Dict[str, Any]]:
+    """
+    The candidate pass of a two-stage search: datapoint IDs of the nearest chunks,
+    filtered on the joined article. Binds :query and :num_chunks.
+    """
+    conditions, params = filters.to_sql("a") if filters else ([], {})
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    sql = f"""
+        SELECT e.datapoint_id
+        FROM {checked_table(table)} e
+        JOIN articles a ON a.id = e.article_id
+        {where}
+        ORDER BY e.embedding <=> CAST(:query AS vector)
+        LIMIT :num_chunks
+    """
+    return sql, params
+
+
+def is_transient_db_error(exc: Exception) -> bool:
+    """True for dropped connections and similar errors worth retrying."""
+    if isinstance(exc, OperationalError):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+class PgVectorIndex:
+    """
+    Chunk vectors in a pgvector table next to `articles`. Exposes the two index
+    calls UpsertWriter and VectorStore make on a Matching Engine index.
+    """
+
+    def __init__(self, table: str = DEFAULT_TABLE, dimensions: Optional[int] = None):
+        self.table = checked_table(table)
+        self.dimensions = dimensions or int(os.getenv("PGVECTOR_DIMENSIONS", "768"))
+        self.index_type = os.getenv("PGVECTOR_INDEX", "hnsw").lower()
+        self.ivfflat_lists = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", "100"))
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_schema(self):
+        if self._schema_ready:
+            return
+        with self._lock:
+            if self._schema_ready:
+                return
+            with DatabaseManager().engine.begin() as conn:
+                for statement in schema_statements(self.dimensions, self.index_type, self.ivfflat_lists, self.table):
+                    conn.execute(text(statement))
+            self._schema_ready = True
+
+    def upsert_datapoints(self, datapoints: List[dict]):
+        if not datapoints:
+            return
+        self.ensure_schema()
+        rows = [
+            {
+                "datapoint_id": dp["datapoint_id"],
+                "article_id": UpsertWriter.article_id_of(dp),
+                "embedding": to_vector_literal(dp["feature_vector"]),
+            }
+            for dp in datapoints
+        ]
+        with DatabaseManager().engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.table} (datapoint_id, article_id, embedding) "
+                    "VALUES (:datapoint_id, :article_id, CAST(:embedding AS vector)) "
+                    "ON CONFLICT (datapoint_id) DO UPDATE SET embedding = EXCLUDED.embedding"
+                ),
+                rows,
+            )
+
+    def remove_datapoints(self, datapoint_ids: List[str]):
+        if not datapoint_ids:
+            return
+        self.ensure_schema()
+        with DatabaseManager().engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {self.table} WHERE datapoint_id = ANY(:ids)"),
+                {"ids": list(datapoint_ids)},
+            )
+
+
+class PgVectorStore(VectorStore):
+    """
+    VectorStore backed by pgvector instead of Vertex AI Matching Engine.
+
+    Embeddings still come from Vertex AI, but a search is answered by a single
+    Postgres statement that returns the top articles by best chunk distance with
+    their metadata already joined, so there is no separate hydration round trip.
+    Filters are applied on the joined article row inside the same scan.
+    """
+
+    def __init__(self, version=None):
+        settings = version_settings(version)
+        clients = AIClientsSingleton()
+        self.client = None
+        if version is not None and version.embedding_model:
+            self.embeddings = clients.embeddings_for(version.embedding_model)
+        else:
+            self.embeddings = clients.embeddings_client
+        self.endpoint = None
+        self.index = PgVectorIndex(
+            settings.get("table", DEFAULT_TABLE),
+            settings.get("coarse_dimensions") or settings.get("dimensions"),
+        )
+        self.deployed_index_id = None
+        self._init_version(version)
+        # Chunks fetched per requested article: several chunks of one article can
+        # rank among the nearest, and only the best one counts.
+        self.chunks_per_article = int(os.getenv("PGVECTOR_CHUNKS_PER_ARTICLE", "4"))
+        # Optional HNSW recall/latency trade-off (pgvector's default is 40).
+        self.ef_search = os.getenv("PGVECTOR_EF_SEARCH")
+        # Filtered scans keep walking the graph until the LIMIT is met (pgvector
+        # 0.8+); "off" for older servers, which reject the setting.
+        self.iterative_scan = os.getenv("PGVECTOR_ITERATIVE_SCAN", "relaxed_order").lower()
+        if self.iterative_scan not in ITERATIVE_SCAN_MODES:
+            raise ValueError(f"Unsupported PGVECTOR_ITERATIVE_SCAN '{self.iterative_scan}'.")
+        self._init_search(settings)
+
+    def warm_up(self):
+        DatabaseManager().ping()
+        self.index.ensure_schema()
+
+    def _require_deployed_index(self):
+        pass
+
+    def new_writer(self, **kwargs) -> UpsertWriter:
+        kwargs.setdefault("is_transient", is_transient_db_error)
+        return super().new_writer(**kwargs)
+
+    def read_vectors(self, datapoint_ids: List[str], batch_size: int = 1000) -> Dict[str, List[float]]:
+        if self.coarse_dimensions:
+            return self._read_full_vectors(datapoint_ids)
+        self.index.ensure_schema()
+        vectors = {}
+        with DatabaseManager().engine.connect() as conn:
+            for start in range(0, len(datapoint_ids), batch_size):
+                rows = conn.execute(
+                    text(
+                        f"SELECT datapoint_id, embedding::text FROM {self.index.table} "
+                        "WHERE datapoint_id = ANY(:ids)"
+                    ),
+                    {"ids": datapoint_ids[start:start + batch_size]},
+                )
+                for datapoint_id, literal in rows:
+                    vectors[datapoint_id] = parse_vector(literal)
+        return vectors
+
+    def _configure_scan(self, conn, limit: int, filters: Optional[SearchFilters]):
+        """
+        An HNSW scan yields at most ef_search rows, before the article filters are
+        applied: with a LIMIT above it, or filters discarding rows, a search would
+        silently come back short. Both settings last for the transaction only.
+        """
+        ef_search = min(max(int(self.ef_search or HNSW_DEFAULT_EF_SEARCH), limit), HNSW_MAX_EF_SEARCH)
+        conn.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        if filters and not filters.is_empty() and self.iterative_scan != "off":
+            conn.execute(text(f"SET LOCAL hnsw.iterative_scan = {self.iterative_scan}"))
+
+    def _find_neighbors(
+        self, vectors: List[List[float]], k: int, filters: Optional[SearchFilters]
+    ) -> List[List[Dict]]:
+        # Returns hydrated articles (best distance first) per query vector. The
+        # batch shares one connection and one transaction.
+        if self.coarse_dimensions:
+            return self._two_stage_neighbors(vectors, k, filters)
+        self.index.ensure_schema()
+        with_vectors = bool(self.reranker and self.reranker.mmr_lambda < 1)
+        sql, params = build_search_sql(filters, with_vectors, self.index.table)
+        statement = text(sql)
+        num_chunks = k * self.chunks_per_article
+        results = []
+        with DatabaseManager().engine.begin() as conn:
+            apply_deadline(conn)
+            self._configure_scan(conn, num_chunks, filters)
+            for vector in vectors:
+                rows = conn.execute(
+                    statement,
+                    dict(params, query=to_vector_literal(vector), num_chunks=num_chunks, k=k),
+                ).mappings()
+                results.append([dict(row) for row in rows])
+        return results
+
+    def _coarse_candidates(
+        self, vectors: List[List[float]], n: int, filters: Optional[SearchFilters]
+    ) -> List[List[str]]:
+        self.index.ensure_schema()
+        sql, params = build_candidate_sql(filters, self.index.table)
+        statement = text(sql)
+        with DatabaseManager().engine.begin() as conn:
+            apply_deadline(conn)
+            self._configure_scan(conn, n, filters)
+            return [
+                list(conn.execute(statement, dict(params, query=to_vector_literal(vector), num_chunks=n)).scalars())
+                for vector in vectors
+            ]
+
+    def nearest_articles(self, vectors: List[List[float]], k: int) -> List[List[int]]:
+        if self.coarse_dimensions:
+            return super().nearest_articles(vectors, k)
+        # The search statement already returns one row per article, nearest first.
+        return [[row["id"] for row in rows] for rows in self._find_neighbors(vectors, k, None)]
+
+    def search_similar(
+        self, query: str, k: int = 100, filters: Optional[SearchFilters] = None
+    ) -> Dict[str, Any]:
+        """
+        Searches for 'K' articles similar to the given query, like VectorStore, but
+        the rows come back from Postgres already hydrated. A two-stage store
+        re-scores chunks first, so it hydrates them like VectorStore does.
+        """
+        if self.coarse_dimensions:
+            return super().search_similar(query, k, filters)
+        num_candidates = k * self.candidate_multiplier if self.reranker else k
+        rows = self.query_batcher.search(query, num_candidates, filters)
+        if not rows:
+            return {"query": query, "results": []}
+
+        article_vectors = {row["id"]: parse_vector(row.get("vector")) for row in rows}
+        results = [
+            {**{column: row[column] for column in RESULT_COLUMNS}, "distance": row["distance"]}
+            for row in rows
+        ]
+        results = self._rerank(results, article_vectors, k)
+
+        return {
+            "query": query,
+            "results": results[:k]
+        }
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+from services.deadlines import DeadlineExceeded, bounded, check
+from storage.search_filters import SearchFilters
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingQuery:
+    __slots__ = ("query", "k", "filters", "future")
+
+    def __init__(self, query: str, k: int, filters: Optional[SearchFilters]):
+        self.query = query
+        self.k = k
+        self.filters = filters if filters and not filters.is_empty() else None
+        self.future: Future = Future()
+
+
+class QueryBatcher:
+    """
+    Micro-batches concurrent searches: queries arriving within `window` seconds of
+    each other are embedded in one call and sent to the index as one multi-query
+    `find_neighbors` per distinct filter, then each caller gets its own neighbours.
+
+    There is no background thread: the first caller of a window waits for it to
+    close and runs the batch on behalf of the others, who block on their future. A
+    caller that fills the batch to `max_batch_size` runs it right away instead.
+    A waiting caller stops waiting at its request deadline.
+
+    `embed_queries(texts)` returns one vector per text. `find_neighbors(vectors, k,
+    filters)` returns one neighbour list per vector, nearest first.
+    """
+
+    def __init__(
+        self,
+        embed_queries: Callable[[List[str]], List[List[float]]],
+        find_neighbors: Callable[[List[List[float]], int, Optional[SearchFilters]], List[list]],
+        window: float = 0.005,
+        max_batch_size: int = 32,
+    ):
+        self.embed_queries = embed_queries
+        self.find_neighbors = find_neighbors
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Condition()
+        self._batch: List[_PendingQuery] = []
+
+    def search(self, query: str, k: int, filters: Optional[SearchFilters] = None) -> list:
+        """Returns the `k` nearest neighbours of `query`, batched with concurrent callers."""
+        check("search")
+        item = _PendingQuery(query, k, filters)
+        with self._lock:
+            batch = self._batch
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                self._batch = []
+                self._lock.notify_all()
+            elif len(batch) == 1:
+                deadline = time.monotonic() + self.window
+                while self._batch is batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._batch = []
+                        break
+                    self._lock.wait(timeout=remaining)
+                else:
+                    # Filled up and already run by another caller.
+                    batch = None
+            else:
+                batch = None
+
+        if batch is not None:
+            self._run(batch)
+        try:
+            return item.future.result(timeout=bounded(None))
+        except FutureTimeout:
+            raise DeadlineExceeded("Request deadline exceeded waiting for a batched search") from None
+
+    def _run(self, batch: List[_PendingQuery]):
+        try:
+            texts = list(dict.fromkeys(item.query for item in batch))
+            vectors = dict(zip(texts, self.embed_queries(texts)))
+        except BaseException as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        groups: Dict[Tuple, List[_PendingQuery]] = {}
+        for item in batch:
+            key = item.filters.cache_key() if item.filters else ()
+            groups.setdefault(key, []).append(item)
+
+        for items in groups.values():
+            # Neighbours come back nearest first, so asking for the largest k in the
+            # group and truncating gives every caller exactly its own top k.
+            k = max(item.k for item in items)
+            try:
+                results = self.find_neighbors([vectors[item.query] for item in items], k, items[0].filters)
+            except BaseException as e:
+                for item in items:
+                    item.future.set_exception(e)
+                continue
+            results = list(results)
+            for item, neighbors in zip(items, results):
+                item.future.set_result(list(neighbors)[: item.k])
+            # A short answer must not leave callers waiting on futures nobody sets.
+            for item in items[len(results):]:
+                item.future.set_exception(
+                    RuntimeError(f"find_neighbors returned {len(results)} results for {len(items)} queries")
+                )
+
+        if len(batch) > 1:
+            logger.debug(f"Batched {len(batch)} searches into {len(groups)} index call(s)")
@@ -0,0 +1,126 @@
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from database.manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+def article_embedding(chunk_vectors: List[List[float]]) -> Optional[np.ndarray]:
+    """
+    The article-level embedding: the L2-normalised mean of its chunk vectors, so a
+    dot product between two of them is their cosine similarity.
+    """
+    if not chunk_vectors:
+        return None
+    mean = np.asarray(chunk_vectors, dtype=np.float32).mean(axis=0)
+    norm = np.linalg.norm(mean)
+    return mean / norm if norm else mean
+
+
+def encode_embedding(vector: np.ndarray) -> bytes:
+    # float16 halves the float32 size (1.5 KB for 768 dimensions); unit vectors
+    # lose nothing that matters to a cosine ranking.
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def decode_embedding(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float16).astype(np.float32)
+
+
+class RelatedArticlesIndex:
+    """
+    Keeps a precomputed list of the `num_related` most similar articles per article.
+
+    `update(article_ids)` is incremental: the new (or changed) articles are scored
+    against the stored embeddings. Each gets its full list, and enters an existing
+    article's list only when it beats that list's floor, so the rest of the corpus
+    is not recomputed. A list that loses a changed article is not back-filled;
+    scripts/build_related.py rebuilds from scratch if needed.
+
+    With a `vector_store`, the embeddings scored are only those of the articles the
+    index finds nearest (`candidate_multiplier` times `num_related` per article), so
+    an update costs the same whatever the corpus size. Without one, every stored
+    embedding is scored in one paged pass: exact, for offline rebuilds.
+    """
+
+    def __init__(
+        self,
+        db_manager=None,
+        num_related: Optional[int] = None,
+        min_score: Optional[float] = None,
+        batch_size: int = 2000,
+        vector_store=None,
+        candidate_multiplier: Optional[int] = None,
+    ):
+        self.db_manager = db_manager or DatabaseManager()
+        self.num_related = num_related or int(os.getenv("RELATED_ARTICLES_PER_ARTICLE", "20"))
+        self.min_score = min_score if min_score is not None else float(os.getenv("RELATED_MIN_SCORE", "0.3"))
+        self.batch_size = batch_size
+        self.vector_store = vector_store
+        self.candidate_multiplier = candidate_multiplier or int(os.getenv("RELATED_CANDIDATE_MULTIPLIER", "3"))
+
+    def update(self, article_ids: Iterable[int]) -> int:
+        """
+        Recomputes the related lists touched by `article_ids`, whose embeddings must
+        already be stored. Returns the number of neighbour rows written.
+        """
+        embeddings = self.db_manager.get_article_embeddings(sorted(set(article_ids)))
+        if not embeddings:
+            return 0
+        new_ids = np.array(list(embeddings), dtype=np.int64)
+        queries = np.stack([decode_embedding(e) for e in embeddings.values()])
+        # A changed article may have moved away from its old neighbours.
+        self.db_manager.delete_article_neighbors(new_ids.tolist())
+
+        n = self.num_related
+        best_scores = np.full((len(new_ids), n), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(new_ids), n), dtype=np.int64)
+        reverse: List[Tuple[int, int, float]] = []
+        new_set = set(new_ids.tolist())
+
+        for page in self._pages(queries):
+            if not page:
+                continue
+            page_ids = np.array([aid for aid, _, _ in page], dtype=np.int64)
+            matrix = np.stack([decode_embedding(e) for _, e, _ in page])
+            floors = np.array([-np.inf if f is None else f for _, _, f in page], dtype=np.float32)
+
+            scores = queries @ matrix.T  # (new, page)
+            scores[new_ids[:, None] == page_ids[None, :]] = -np.inf
+            scores[scores < self.min_score] = -np.inf
+
+            # Forward lists: merge this page into each new article's running top-n.
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_ids = np.concatenate([best_ids, np.broadcast_to(page_ids, scores.shape)], axis=1)
+            top = np.argpartition(-merged_scores, n - 1, axis=1)[:, :n]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_ids = np.take_along_axis(merged_ids, top, axis=1)
+
+            # Reverse lists: existing articles whose floor a new article beats.
+            rows, cols = np.nonzero(scores > floors[None, :])
+            for i, j in zip(rows, cols):
+                if int(page_ids[j]) not in new_set:
+                    reverse.append((int(page_ids[j]), int(new_ids[i]), float(scores[i, j])))
+
+        forward = [
+            (int(aid), int(rid), float(score))
+            for aid, ids, row_scores in zip(new_ids, best_ids, best_scores)
+            for rid, score in zip(ids, row_scores)
+            if np.isfinite(score)
+        ]
+        rows = forward + reverse
+        self.db_manager.add_article_neighbors(rows, limit=n)
+        logger.info(
+            f"Related lists updated for {len(new_ids)} articles: "
+            f"{len(forward)} forward and {len(reverse)} reverse neighbours"
+        )
+        return len(rows)
+
+    def _pages(self, queries: np.ndarray) -> Iterable[List[Tuple[int, bytes, Optional[float]]]]:
+        # The (article_id, embedding, neighbor_floor) rows to score the new articles against.
+        if self.vector_store is None:
+            return self.db_manager.iter_article_embeddings(self.batch_size)
+        nearest = self.vector_store.nearest_articles(queries.tolist(), self.num_related * self.candidate_multiplier)
+        return [self.db_manager.get_article_embedding_rows(sorted({aid for ids in nearest for aid in ids}))]
@@ -0,0 +1,127 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class Reranker:
+    """
+    Re-orders aggregated search candidates (one per article) so the top k are
+    relevant, fresh and diverse. All scoring is vectorized over the candidate set:
+
+    - relevance: 1 minus the article's best chunk distance relative to the best
+      candidate (smaller distance is better, as in VectorStore.search_similar). Raw
+      differences are kept rather than min-max scaled, so near-ties stay near-ties;
+    - recency: exponential decay on `published_at` with a half-life in hours, blended
+      into relevance with `recency_weight`;
+    - diversity: Maximal Marginal Relevance over the best chunk vectors, where
+      `mmr_lambda` = 1 ignores redundancy and lower values penalise near-duplicates;
+    - at most `max_per_source` results per provider (0 = no cap).
+
+    The greedy MMR selection stops at `time_budget_ms`; the remaining slots are then
+    filled by score, so a slow request degrades to plain ranking instead of timing out.
+    """
+
+    def __init__(
+        self,
+        mmr_lambda: float = 0.7,
+        recency_weight: float = 0.2,
+        recency_half_life_hours: float = 72.0,
+        max_per_source: int = 0,
+        time_budget_ms: float = 20.0,
+    ):
+        if not 0 <= mmr_lambda <= 1:
+            raise ValueError("mmr_lambda must be between 0 and 1.")
+        if not 0 <= recency_weight <= 1:
+            raise ValueError("recency_weight must be between 0 and 1.")
+        self.mmr_lambda = mmr_lambda
+        self.recency_weight = recency_weight
+        self.recency_half_life_hours = recency_half_life_hours
+        self.max_per_source = max_per_source
+        self.time_budget_ms = time_budget_ms
+
+    @classmethod
+    def from_env(cls) -> "Reranker":
+        return cls(
+            mmr_lambda=float(os.getenv("RERANK_MMR_LAMBDA", "0.7")),
+            recency_weight=float(os.getenv("RERANK_RECENCY_WEIGHT", "0.2")),
+            recency_half_life_hours=float(os.getenv("RERANK_RECENCY_HALF_LIFE_HOURS", "72")),
+            max_per_source=int(os.getenv("RERANK_MAX_PER_SOURCE", "0")),
+            time_budget_ms=float(os.getenv("RERANK_TIME_BUDGET_MS", "20")),
+        )
+
+    def scores(self, candidates: List[Dict], now: Optional[datetime] = None) -> np.ndarray:
+        """Relevance blended with recency, in [0, 1]. Higher is better."""
+        distances = np.array([c["distance"] for c in candidates], dtype=np.float64)
+        relevance = np.clip(1 - (distances - distances.min()), 0, 1)
+        if not self.recency_weight:
+            return relevance
+
+        now = now or datetime.now(timezone.utc)
+        ages = np.array([_age_hours(c.get("published_at"), now) for c in candidates], dtype=np.float64)
+        # Undated articles get no recency boost.
+        recency = np.where(np.isnan(ages), 0.0, 0.5 ** (np.nan_to_num(ages) / self.recency_half_life_hours))
+        return (1 - self.recency_weight) * relevance + self.recency_weight * recency
+
+    def rerank(self, candidates: List[Dict], k: int, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Returns up to `k` candidates in their new order. A candidate may carry its
+        chunk embedding under "vector"; without vectors no diversity penalty applies.
+        """
+        if not candidates:
+            return []
+        started = time.perf_counter()
+        n = len(candidates)
+        scores = self.scores(candidates, now)
+        similarity = self._similarity(candidates)
+
+        sources = np.array([c.get("source") for c in candidates], dtype=object)
+        per_source: Dict[Optional[str], int] = {}
+        available = np.ones(n, dtype=bool)
+        max_similarity = np.zeros(n, dtype=np.float64)
+        selected: List[int] = []
+
+        def take(i: int):
+            selected.append(i)
+            available[i] = False
+            per_source[sources[i]] = per_source.get(sources[i], 0) + 1
+            if self.max_per_source and per_source[sources[i]] >= self.max_per_source:
+                np.logical_and(available, sources != sources[i], out=available)
+
+        use_mmr = similarity is not None and self.mmr_lambda < 1
+        while len(selected) < k and available.any():
+            if use_mmr and (time.perf_counter() - started) * 1000 > self.time_budget_ms:
+                use_mmr = False
+            if use_mmr:
+                mmr = self.mmr_lambda * scores - (1 - self.mmr_lambda) * max_similarity
+                i = int(np.argmax(np.where(available, mmr, -np.inf)))
+                max_similarity = np.maximum(max_similarity, similarity[i])
+            else:
+                i = int(np.argmax(np.where(available, scores, -np.inf)))
+            take(i)
+
+        return [candidates[i] for i in selected]
+
+    @staticmethod
+    def _similarity(candidates: List[Dict]) -> Optional[np.ndarray]:
+        vectors = [c.get("vector") for c in candidates]
+        if any(v is None or len(v) == 0 for v in vectors):
+            return None
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        return (matrix @ matrix.T).astype(np.float64)
+
+
+def _age_hours(published_at, now: datetime) -> float:
+    if published_at is None:
+        return float("nan")
+    if isinstance(published_at, str):
+        try:
+            published_at = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+        except ValueError:
+            return float("nan")
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - published_at).total_seconds() / 3600)
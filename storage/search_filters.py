@@ -0,0 +1,128 @@
+# Search filters that are pushed down to Matching Engine as namespace restricts, so a
+# filtered query is answered by the index itself instead of over-fetching and
+# filtering afterwards.
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from ingestion.models import Article
+
+SOURCE_NAMESPACE = "source"
+LANGUAGE_NAMESPACE = "language"
+PUBLISHED_AT_NAMESPACE = "published_at"
+
+
+def to_epoch_seconds(value: datetime) -> int:
+    # Naive datetimes are stored as UTC throughout the pipeline.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def datapoint_restricts(article: Optional[Article]) -> Dict[str, list]:
+    """
+    Returns the restrict fields to attach to every datapoint of `article`: token
+    restricts for source and language, and a numeric restrict for the publication time.
+    """
+    if article is None:
+        return {}
+    return restricts_for(article.source, article.language, article.published_at)
+
+
+def restricts_for(
+    source: Optional[str], language: Optional[str], published_at: Optional[datetime]
+) -> Dict[str, list]:
+    """The restrict fields for a datapoint with the given metadata; empty values are left out."""
+    restricts = []
+    if source:
+        restricts.append({"namespace": SOURCE_NAMESPACE, "allow_list": [source]})
+    if language:
+        restricts.append({"namespace": LANGUAGE_NAMESPACE, "allow_list": [language]})
+    fields = {}
+    if restricts:
+        fields["restricts"] = restricts
+    if published_at:
+        fields["numeric_restricts"] = [
+            {"namespace": PUBLISHED_AT_NAMESPACE, "value_int": to_epoch_seconds(published_at)}
+        ]
+    return fields
+
+
+class SearchFilters(BaseModel):
+    """Optional restrictions for a semantic search. Empty lists mean no restriction."""
+    sources: List[str] = Field(default_factory=list)
+    languages: List[str] = Field(default_factory=list)
+    published_after: Optional[datetime] = None
+    published_before: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return not (self.sources or self.languages or self.published_after or self.published_before)
+
+    def cache_key(self) -> Tuple:
+        return (
+            tuple(sorted(self.sources)),
+            tuple(sorted(self.languages)),
+            self.published_after,
+            self.published_before,
+        )
+
+    def to_sql(self, alias: str = "a") -> Tuple[List[str], Dict]:
+        """
+        Builds WHERE conditions (and their bind parameters) over the articles table
+        aliased as `alias`, for backends that filter in Postgres.
+        """
+        conditions, params = [], {}
+        if self.sources:
+            conditions.append(f"{alias}.source = ANY(:filter_sources)")
+            params["filter_sources"] = list(self.sources)
+        if self.languages:
+            conditions.append(f"{alias}.language = ANY(:filter_languages)")
+            params["filter_languages"] = list(self.languages)
+        # published_at is stored as naive UTC.
+        if self.published_after:
+            conditions.append(f"{alias}.published_at >= :filter_after")
+            params["filter_after"] = _naive_utc(self.published_after)
+        if self.published_before:
+            conditions.append(f"{alias}.published_at < :filter_before")
+            params["filter_before"] = _naive_utc(self.published_before)
+        return conditions, params
+
+    def to_namespaces(self) -> Tuple[list, list]:
+        """
+        Builds the `filter` and `numeric_filter` arguments for `find_neighbors`.
+        """
+        from google.cloud.aiplatform.matching_engine.matching_engine_index_endpoint import (
+            Namespace,
+            NumericNamespace,
+        )
+
+        token_filters = []
+        if self.sources:
+            token_filters.append(Namespace(name=SOURCE_NAMESPACE, allow_tokens=list(self.sources)))
+        if self.languages:
+            token_filters.append(Namespace(name=LANGUAGE_NAMESPACE, allow_tokens=list(self.languages)))
+
+        numeric_filters = []
+        if self.published_after:
+            numeric_filters.append(
+                NumericNamespace(
+                    name=PUBLISHED_AT_NAMESPACE,
+                    value_int=to_epoch_seconds(self.published_after),
+                    op="GREATER_EQUAL",
+                )
+            )
+        if self.published_before:
+            numeric_filters.append(
+                NumericNamespace(
+                    name=PUBLISHED_AT_NAMESPACE,
+                    value_int=to_epoch_seconds(self.published_before),
+                    op="LESS",
+                )
+            )
+        return token_filters, numeric_filters
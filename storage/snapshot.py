@@ -0,0 +1,213 @@
+# Columnar corpus snapshots: articles (metadata, cleaned content, article embedding and
+# story) and stories in Parquet, and chunk text + vectors in an uncompressed Arrow IPC
+# file, whose fixed-size vector column can be memory-mapped and read without copying.
+# Related-article lists are derived from the article embeddings and rebuilt on import.
+#
+#   <dir>/manifest.json   format version, dimensions and row counts
+#   <dir>/articles.parquet
+#   <dir>/stories.parquet
+#   <dir>/chunks.arrow
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SNAPSHOT_VERSION = 2
+# Version 1 snapshots have no content, embeddings or stories; they still import.
+READABLE_VERSIONS = (1, 2)
+MANIFEST_FILE = "manifest.json"
+ARTICLES_FILE = "articles.parquet"
+STORIES_FILE = "stories.parquet"
+CHUNKS_FILE = "chunks.arrow"
+
+ARTICLE_COLUMNS = (
+    "id", "title", "url", "published_at", "content_preview", "source", "language",
+    "content_hash", "cluster_id", "content", "embedding",
+)
+STORY_COLUMNS = ("id", "label", "centroid", "size", "trend_key", "created_at", "last_article_at")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Corpus snapshots require 'pyarrow' to be installed.") from e
+    return pa, pq
+
+
+class SnapshotWriter:
+    """
+    Streams articles and their chunks into a snapshot directory, batch by batch.
+    The vector dimension is taken from the first chunk written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._pa, self._pq = _pyarrow()
+        self._articles_writer = None
+        self._stories_writer = None
+        self._chunks_writer = None
+        self._chunks_schema = None
+        self.dimensions: Optional[int] = None
+        self.article_count = 0
+        self.story_count = 0
+        self.chunk_count = 0
+
+    def _articles_schema(self):
+        pa = self._pa
+        return pa.schema([
+            ("id", pa.int64()),
+            ("title", pa.string()),
+            ("url", pa.string()),
+            ("published_at", pa.timestamp("us")),
+            ("content_preview", pa.string()),
+            ("source", pa.string()),
+            ("language", pa.string()),
+            ("content_hash", pa.string()),
+            ("cluster_id", pa.int64()),
+            ("content", pa.string()),
+            ("embedding", pa.binary()),
+        ])
+
+    def _stories_schema(self):
+        pa = self._pa
+        return pa.schema([
+            ("id", pa.int64()),
+            ("label", pa.string()),
+            ("centroid", pa.binary()),
+            ("size", pa.int64()),
+            ("trend_key", pa.float64()),
+            ("created_at", pa.timestamp("us")),
+            ("last_article_at", pa.timestamp("us")),
+        ])
+
+    def write_articles(self, articles: List[Dict]):
+        """Each article has the ARTICLE_COLUMNS; missing ones are written as nulls."""
+        if not articles:
+            return
+        if self._articles_writer is None:
+            self._articles_writer = self._pq.ParquetWriter(
+                os.path.join(self.path, ARTICLES_FILE), self._articles_schema(), compression="zstd"
+            )
+        table = self._pa.Table.from_pylist(
+            [{column: a.get(column) for column in ARTICLE_COLUMNS} for a in articles],
+            schema=self._articles_schema(),
+        )
+        self._articles_writer.write_table(table)
+        self.article_count += len(articles)
+
+    def write_stories(self, stories: List[Dict]):
+        if not stories:
+            return
+        if self._stories_writer is None:
+            self._stories_writer = self._pq.ParquetWriter(
+                os.path.join(self.path, STORIES_FILE), self._stories_schema(), compression="zstd"
+            )
+        table = self._pa.Table.from_pylist(
+            [{column: s.get(column) for column in STORY_COLUMNS} for s in stories],
+            schema=self._stories_schema(),
+        )
+        self._stories_writer.write_table(table)
+        self.story_count += len(stories)
+
+    def write_chunks(self, chunks: List[Dict]):
+        """Each chunk has article_id, position, datapoint_id, text and vector."""
+        if not chunks:
+            return
+        pa = self._pa
+        if self._chunks_writer is None:
+            self.dimensions = len(chunks[0]["vector"])
+            self._chunks_schema = pa.schema([
+                ("article_id", pa.int64()),
+                ("position", pa.int32()),
+                ("datapoint_id", pa.string()),
+                ("text", pa.string()),
+                ("vector", pa.list_(pa.float32(), self.dimensions)),
+            ])
+            self._chunks_writer = pa.ipc.new_file(os.path.join(self.path, CHUNKS_FILE), self._chunks_schema)
+
+        for chunk in chunks:
+            if len(chunk["vector"]) != self.dimensions:
+                raise ValueError(
+                    f"Datapoint {chunk['datapoint_id']} has {len(chunk['vector'])} dimensions, "
+                    f"expected {self.dimensions}."
+                )
+        batch = pa.RecordBatch.from_pylist(chunks, schema=self._chunks_schema)
+        self._chunks_writer.write_batch(batch)
+        self.chunk_count += len(chunks)
+
+    def close(self) -> Dict:
+        if self._articles_writer is not None:
+            self._articles_writer.close()
+        if self._stories_writer is not None:
+            self._stories_writer.close()
+        if self._chunks_writer is not None:
+            self._chunks_writer.close()
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "dimensions": self.dimensions,
+            "articles": self.article_count,
+            "stories": self.story_count,
+            "chunks": self.chunk_count,
+        }
+        with open(os.path.join(self.path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SnapshotReader:
+    """Reads a snapshot back; chunk vectors are memory-mapped, not loaded."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pa, self._pq = _pyarrow()
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('version')}")
+
+    def _iter_table(self, name: str, batch_size: int, columns=None) -> Iterator[List[Dict]]:
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            return
+        parquet = self._pq.ParquetFile(path)
+        if columns is not None:
+            columns = [c for c in columns if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pylist()
+
+    def iter_articles(self, batch_size: int = 1000, columns: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Article rows in batches; `columns` limits the columns read (those present)."""
+        return self._iter_table(ARTICLES_FILE, batch_size, columns)
+
+    def iter_stories(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        return self._iter_table(STORIES_FILE, batch_size)
+
+    def iter_chunks(self) -> Iterator[Tuple[List[Dict], "numpy.ndarray"]]:
+        """
+        Yields (metadata, vectors) per record batch: metadata rows without the vector,
+        and a (rows, dimensions) float32 array that is a zero-copy view of the file.
+        """
+        path = os.path.join(self.path, CHUNKS_FILE)
+        if not os.path.exists(path):
+            return
+        dimensions = self.manifest["dimensions"]
+        with self._pa.memory_map(path, "r") as source:
+            reader = self._pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                vectors = (
+                    batch.column("vector").flatten().to_numpy(zero_copy_only=True).reshape(-1, dimensions)
+                )
+                metadata = batch.drop_columns(["vector"]).to_pylist()
+                yield metadata, vectors
@@ -0,0 +1,162 @@
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from database.manager import DatabaseManager
+from storage.related_index import decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+
+def _hours(moment: datetime) -> float:
+    # Naive datetimes are UTC, as stored in Postgres.
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() / 3600
+
+
+def bump_trend_key(trend_key: Optional[float], added: int, now: datetime, half_life_hours: float) -> float:
+    """
+    Adds `added` articles at `now` to a decayed count stored as
+    log2(count) + t / half_life (see StoryClusterModel).
+    """
+    t = _hours(now) / half_life_hours
+    current = 2 ** (trend_key - t) if trend_key is not None else 0.0
+    return math.log2(current + added) + t
+
+
+def trend_velocity(trend_key: float, now: datetime, half_life_hours: float) -> float:
+    """The decayed article count of a story at `now`."""
+    return 2 ** (trend_key - _hours(now) / half_life_hours)
+
+
+class StoryClusterer:
+    """
+    Online story clustering. Each new article joins the most similar active story
+    when the cosine similarity between its article embedding and the story centroid
+    reaches `threshold`, otherwise it starts a new story. Articles of one batch are
+    assigned in order, so copies of a story arriving together end up together.
+
+    Stories stop accepting articles `active_hours` after their last one, which also
+    bounds the centroid matrix scored per batch.
+    """
+
+    def __init__(
+        self,
+        db_manager=None,
+        threshold: Optional[float] = None,
+        active_hours: Optional[float] = None,
+        half_life_hours: Optional[float] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.db_manager = db_manager or DatabaseManager()
+        self.threshold = threshold if threshold is not None else float(os.getenv("STORY_CLUSTER_THRESHOLD", "0.85"))
+        self.active_hours = active_hours or float(os.getenv("STORY_CLUSTER_ACTIVE_HOURS", "72"))
+        self.half_life_hours = half_life_hours or float(os.getenv("STORY_TRENDING_HALF_LIFE_HOURS", "6"))
+        self._clock = clock
+
+    def assign(self, article_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Assigns the given articles (those not in a story yet and with an article
+        embedding) to stories. Returns article ID -> story ID.
+        """
+        titles = self.db_manager.get_unclustered_titles(sorted(set(article_ids)))
+        embeddings = self.db_manager.get_article_embeddings(list(titles))
+        if not embeddings:
+            return {}
+
+        with self.db_manager.story_cluster_lock():
+            now = self._clock()
+            naive_now = now.astimezone(timezone.utc).replace(tzinfo=None)
+            active = self.db_manager.get_active_story_clusters(naive_now - timedelta(hours=self.active_hours))
+
+            # Story IDs: stored ones as they are, new ones as -(i + 1).
+            ids: List[int] = [c.id for c in active]
+            centroids = [decode_embedding(c.centroid) for c in active]
+            sums = [centroid * c.size for centroid, c in zip(centroids, active)]
+            sizes = [c.size for c in active]
+            trend_keys = {c.id: c.trend_key for c in active}
+            matrix = np.stack(centroids) if centroids else None
+
+            created: List[dict] = []
+            added: Dict[int, int] = {}
+            assignments: Dict[int, int] = {}
+            for aid, data in embeddings.items():
+                vector = decode_embedding(data)
+                best = -1
+                if matrix is not None:
+                    scores = matrix @ vector
+                    best = int(np.argmax(scores))
+                    if scores[best] < self.threshold:
+                        best = -1
+
+                if best < 0:
+                    ids.append(-(len(created) + 1))
+                    created.append({"label": titles[aid]})
+                    sums.append(vector.copy())
+                    sizes.append(1)
+                    matrix = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+                    best = len(ids) - 1
+                else:
+                    sums[best] += vector
+                    sizes[best] += 1
+                    matrix[best] = sums[best] / (np.linalg.norm(sums[best]) or 1.0)
+
+                assignments[aid] = ids[best]
+                added[ids[best]] = added.get(ids[best], 0) + 1
+
+            index_of = {sid: i for i, sid in enumerate(ids)}
+            for i, row in enumerate(created):
+                sid = -(i + 1)
+                row.update(self._cluster_values(index_of[sid], matrix, sizes, None, added[sid], naive_now, now))
+            updated = [
+                {"id": sid, **self._cluster_values(index_of[sid], matrix, sizes, trend_keys[sid], count, naive_now, now)}
+                for sid, count in added.items()
+                if sid > 0
+            ]
+            new_ids = self.db_manager.save_story_clusters(created, updated, assignments)
+
+        logger.info(
+            f"Assigned {len(assignments)} articles to stories: "
+            f"{len(new_ids)} new, {len(updated)} existing"
+        )
+        return {aid: new_ids[-sid - 1] if sid < 0 else sid for aid, sid in assignments.items()}
+
+    def recompute_centroids(self) -> int:
+        """
+        Rebuilds the centroid of every active story from the current embeddings of
+        its articles, after the embedding model changed: old centroids can't be
+        compared with new article embeddings. A story none of whose articles has an
+        embedding is retired (it stops accepting articles). Returns the number of
+        stories rebuilt.
+        """
+        with self.db_manager.story_cluster_lock():
+            naive_now = self._clock().astimezone(timezone.utc).replace(tzinfo=None)
+            cutoff = naive_now - timedelta(hours=self.active_hours)
+            active = self.db_manager.get_active_story_clusters(cutoff)
+            members = self.db_manager.get_story_article_ids([c.id for c in active])
+            embeddings = self.db_manager.get_article_embeddings([aid for ids in members.values() for aid in ids])
+            updated = []
+            for cluster in active:
+                vectors = [decode_embedding(embeddings[aid]) for aid in members.get(cluster.id, []) if aid in embeddings]
+                if not vectors:
+                    updated.append({"id": cluster.id, "last_article_at": cutoff - timedelta(seconds=1)})
+                    continue
+                total = np.sum(vectors, axis=0)
+                centroid = total / (np.linalg.norm(total) or 1.0)
+                updated.append({"id": cluster.id, "centroid": encode_embedding(centroid)})
+            self.db_manager.save_story_clusters([], updated, {})
+
+        rebuilt = sum(1 for row in updated if "centroid" in row)
+        logger.info(f"Story centroids rebuilt for {rebuilt} active stories, {len(updated) - rebuilt} retired")
+        return rebuilt
+
+    def _cluster_values(self, index, matrix, sizes, trend_key, count, naive_now, now) -> dict:
+        return {
+            "centroid": encode_embedding(matrix[index]),
+            "size": sizes[index],
+            "trend_key": bump_trend_key(trend_key, count, now, self.half_life_hours),
+            "last_article_at": naive_now,
+        }
@@ -0,0 +1,146 @@
+import bisect
+import re
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_title(text: str) -> str:
+    """
+    Lower-cases, strips accents and collapses punctuation to single spaces, so
+    "Economía: el BCE..." and "economia el bce" share a prefix.
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", stripped.casefold()).strip()
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TitleIndex:
+    """
+    In-memory prefix index over article titles, for type-ahead.
+
+    Every title is stored under the normalised text starting at each of its first
+    `max_words` words, in one sorted list, so a prefix (of the title or of a word
+    inside it) is a binary-search range. Matches are ranked by publication time
+    with a vectorised top-k over that range.
+
+    Writers build a new sorted list and swap it in, so lookups never wait for an
+    insert: they read whichever snapshot was current when they started.
+    """
+
+    def __init__(self, max_words: int = 8):
+        self.max_words = max_words
+        self._write_lock = threading.Lock()
+        # Append-only, so positions in an older snapshot stay valid.
+        self._ids: List[int] = []
+        self._titles: List[str] = []
+        self._published: List[Optional[datetime]] = []
+        self._timestamps: List[float] = []
+        self._positions: Dict[int, int] = {}
+        # (sorted keys, article position per key, recency per key)
+        self._snapshot: Tuple[List[str], np.ndarray, np.ndarray] = (
+            [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        )
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._positions
+
+    def _tails(self, title: str) -> List[str]:
+        words = normalize_title(title).split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), self.max_words)) if words[i]]
+
+    def add(self, articles: Iterable[Tuple[int, str, Optional[datetime]]]) -> int:
+        """
+        Adds (id, title, published_at) tuples; IDs already indexed are skipped.
+        Returns the number of titles added.
+        """
+        with self._write_lock:
+            new_keys: List[Tuple[str, int]] = []
+            for article_id, title, published_at in articles:
+                if article_id in self._positions or not title:
+                    continue
+                position = len(self._ids)
+                self._ids.append(article_id)
+                self._titles.append(title)
+                self._published.append(published_at)
+                self._timestamps.append(_timestamp(published_at))
+                self._positions[article_id] = position
+                new_keys.extend((key, position) for key in self._tails(title))
+            if not new_keys:
+                return 0
+
+            keys, entries, _ = self._snapshot
+            if len(new_keys) * 20 < len(keys):
+                # A few titles: insert into a copy of the sorted list.
+                keys, entries = list(keys), entries.tolist()
+                for key, position in sorted(new_keys):
+                    at = bisect.bisect_right(keys, key)
+                    keys.insert(at, key)
+                    entries.insert(at, position)
+            else:
+                merged = sorted(zip(keys + [k for k, _ in new_keys], entries.tolist() + [p for _, p in new_keys]))
+                keys = [key for key, _ in merged]
+                entries = [position for _, position in merged]
+
+            entries = np.asarray(entries, dtype=np.int64)
+            recency = np.asarray(self._timestamps, dtype=np.float64)[entries]
+            self._snapshot = (keys, entries, recency)
+            return len({position for _, position in new_keys})
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """
+        Titles containing a word sequence that starts with `prefix`, newest first.
+        """
+        query = normalize_title(prefix)
+        if not query:
+            return []
+        keys, entries, recency = self._snapshot
+        lo = bisect.bisect_left(keys, query)
+        hi = bisect.bisect_left(keys, query + "\U0010ffff", lo)
+        if lo == hi:
+            return []
+        candidates, scores = entries[lo:hi], recency[lo:hi]
+
+        # A title can match through several of its words: over-fetch, then
+        # dedupe, widening only in the rare case that wasn't enough.
+        wanted = limit * 4
+        while True:
+            if wanted < len(candidates):
+                top = np.argpartition(-scores, wanted - 1)[:wanted]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            suggestions = self._distinct(candidates[top], limit)
+            if len(suggestions) == limit or len(top) == len(candidates):
+                return suggestions
+            wanted *= 4
+
+    def _distinct(self, positions: np.ndarray, limit: int) -> List[Dict]:
+        suggestions, seen = [], set()
+        for position in positions.tolist():
+            if position in seen:
+                continue
+            seen.add(position)
+            suggestions.append({
+                "id": self._ids[position],
+                "title": self._titles[position],
+                "published_at": self._published[position],
+            })
+            if len(suggestions) == limit:
+                break
+        return suggestions
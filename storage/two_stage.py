@@ -0,0 +1,48 @@
+# Two-stage retrieval: the vector index holds truncated, re-normalised embeddings
+# (text-embedding-004 is trained so that its leading dimensions carry most of the
+# signal) for a cheaper candidate pass, and the full vectors kept in Postgres re-score
+# the few hundred candidates exactly.
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+
+
+class Neighbor(NamedTuple):
+    """A re-scored chunk, shaped like the Matching Engine neighbours search reads."""
+    id: str
+    distance: float
+    feature_vector: Optional[List[float]] = None
+
+
+def truncate_vectors(vectors: Sequence[Sequence[float]], dimensions: Optional[int]) -> np.ndarray:
+    """The first `dimensions` components of each vector (all with None), L2-normalised."""
+    matrix = np.asarray(vectors, dtype=np.float32)[:, :dimensions]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def encode_full_vector(vector: Sequence[float]) -> bytes:
+    # float32, unlike the float16 article embeddings: these decide the final order.
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_full_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def rescore(
+    query: Sequence[float], candidate_ids: List[str], full_vectors: Dict[str, bytes], n: int
+) -> List[Neighbor]:
+    """
+    Orders the candidates by exact cosine distance to the full query vector and
+    keeps the best `n`. Candidates without a stored full vector are dropped.
+    """
+    ids = [datapoint_id for datapoint_id in candidate_ids if datapoint_id in full_vectors]
+    if not ids:
+        return []
+    matrix = np.stack([decode_full_vector(full_vectors[datapoint_id]) for datapoint_id in ids])
+    query = np.asarray(query, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1)
+    distances = 1 - (matrix @ query) / np.where(norms == 0, 1, norms)
+    order = np.argsort(distances, kind="stable")[:n]
+    return [Neighbor(ids[i], float(distances[i]), matrix[i].tolist()) for i in order]
@@ -0,0 +1,249 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """True for errors worth retrying: throttling, timeouts and 5xx from Vertex AI."""
+    from google.api_core import exceptions as gexc
+
+    transient = (
+        gexc.TooManyRequests,
+        gexc.ResourceExhausted,
+        gexc.ServiceUnavailable,
+        gexc.DeadlineExceeded,
+        gexc.InternalServerError,
+        gexc.Aborted,
+        ConnectionError,
+        TimeoutError,
+    )
+    return isinstance(exc, transient)
+
+
+class UpsertReport:
+    """Outcome of the datapoints written since the previous report, grouped by article."""
+
+    def __init__(self):
+        self.indexed_articles: Set[int] = set()
+        self.failed_articles: Dict[int, str] = {}
+        self.failed_datapoints: Dict[str, str] = {}
+        self.datapoints_written = 0
+
+    def __repr__(self):
+        return (
+            f"<UpsertReport(written={self.datapoints_written}, "
+            f"indexed={len(self.indexed_articles)}, failed={len(self.failed_articles)})>"
+        )
+
+
+class UpsertWriter:
+    """
+    Buffers Matching Engine datapoints across articles and upserts them in batches.
+
+    A batch is sent when `batch_size` datapoints are buffered or when the oldest
+    buffered datapoint is `flush_interval` seconds old. At most `max_workers` batches
+    are in flight. Transient errors are retried with jittered exponential backoff; a
+    batch that still fails is split in halves to isolate the datapoints that are
+    actually rejected, so one bad vector doesn't fail its neighbours.
+
+    An article counts as indexed once all of its datapoints landed. `on_indexed` and
+    `on_failed` are called with the affected article IDs as outcomes become known, and
+    `on_rejected` with the IDs of the datapoints that could not be upserted.
+    """
+
+    def __init__(
+        self,
+        index,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_workers: int = 4,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        on_indexed: Optional[Callable[[List[int]], None]] = None,
+        on_failed: Optional[Callable[[Dict[int, str]], None]] = None,
+        on_rejected: Optional[Callable[[List[str]], None]] = None,
+        is_transient: Callable[[Exception], bool] = is_transient_error,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.on_indexed = on_indexed
+        self.on_failed = on_failed
+        self.on_rejected = on_rejected
+        self._is_transient = is_transient
+        self._sleep = sleep
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upsert")
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Condition()
+        self._buffer: List[dict] = []
+        self._buffer_since: Optional[float] = None
+        self._pending_by_article: Dict[int, int] = {}
+        self._article_errors: Dict[int, str] = {}
+        self._outstanding = 0
+        self._report = UpsertReport()
+        self._closed = False
+
+        self._timer = threading.Thread(target=self._flush_on_interval, daemon=True)
+        self._timer.start()
+
+    @staticmethod
+    def article_id_of(datapoint: dict) -> int:
+        # Datapoint IDs follow "<article_id>/<uuid>".
+        return int(datapoint["datapoint_id"].split("/", 1)[0])
+
+    def add(self, datapoints: List[dict]):
+        """Buffers datapoints; sends full batches immediately."""
+        if not datapoints:
+            return
+        batches = []
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("UpsertWriter is closed.")
+            for dp in datapoints:
+                aid = self.article_id_of(dp)
+                self._pending_by_article[aid] = self._pending_by_article.get(aid, 0) + 1
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+                self._lock.notify_all()
+            self._buffer.extend(datapoints)
+            while len(self._buffer) >= self.batch_size:
+                batches.append(self._buffer[: self.batch_size])
+                self._buffer = self._buffer[self.batch_size:]
+                self._outstanding += 1
+            if not self._buffer:
+                self._buffer_since = None
+        for batch in batches:
+            self._submit(batch)
+
+    def flush(self) -> UpsertReport:
+        """Sends whatever is buffered, waits for every in-flight batch and returns the report."""
+        with self._lock:
+            batch = self._take_buffer()
+        if batch:
+            self._submit(batch)
+
+        with self._lock:
+            while self._outstanding:
+                self._lock.wait()
+            report, self._report = self._report, UpsertReport()
+        return report
+
+    def close(self) -> UpsertReport:
+        report = self.flush()
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        self._executor.shutdown(wait=True)
+        return report
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush_on_interval(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                if self._buffer_since is None:
+                    self._lock.wait(timeout=self.flush_interval)
+                    continue
+                age = time.monotonic() - self._buffer_since
+                if age < self.flush_interval:
+                    self._lock.wait(timeout=self.flush_interval - age)
+                    continue
+                batch = self._take_buffer()
+            self._submit(batch)
+
+    def _take_buffer(self) -> List[dict]:
+        # Caller holds the lock. Counting the batch as outstanding here, before it is
+        # submitted, is what lets flush() wait for batches taken by the timer thread.
+        batch, self._buffer, self._buffer_since = self._buffer, [], None
+        if batch:
+            self._outstanding += 1
+        return batch
+
+    def _submit(self, batch: List[dict]):
+        # Blocks the producer when max_workers batches are already in flight.
+        self._slots.acquire()
+        self._executor.submit(self._write_batch, batch)
+
+    def _upsert_with_retry(self, batch: List[dict]):
+        for attempt in range(self.max_attempts):
+            try:
+                self.index.upsert_datapoints(datapoints=batch)
+                return
+            except Exception as e:
+                if not self._is_transient(e) or attempt + 1 == self.max_attempts:
+                    raise
+                delay = random.uniform(0, self.base_delay * (2 ** attempt))
+                logger.warning(f"Transient upsert error for {len(batch)} datapoints, retrying in {delay:.2f}s: {e}")
+                self._sleep(delay)
+
+    def _write_batch(self, batch: List[dict]):
+        try:
+            failed: Dict[str, str] = {}
+            self._write_isolating_failures(batch, failed)
+            self._record(batch, failed)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._outstanding -= 1
+                self._lock.notify_all()
+
+    def _write_isolating_failures(self, batch: List[dict], failed: Dict[str, str]):
+        try:
+            self._upsert_with_retry(batch)
+        except Exception as e:
+            # Retries are exhausted on a transient error: splitting won't help.
+            if len(batch) == 1 or self._is_transient(e):
+                for dp in batch:
+                    failed[dp["datapoint_id"]] = str(e)
+                logger.error(f"{len(batch)} datapoints could not be upserted: {e}")
+                return
+            middle = len(batch) // 2
+            self._write_isolating_failures(batch[:middle], failed)
+            self._write_isolating_failures(batch[middle:], failed)
+
+    def _record(self, batch: List[dict], failed: Dict[str, str]):
+        indexed, newly_failed = [], {}
+        with self._lock:
+            report = self._report
+            report.datapoints_written += len(batch) - len(failed)
+            report.failed_datapoints.update(failed)
+            for dp in batch:
+                aid = self.article_id_of(dp)
+                error = failed.get(dp["datapoint_id"])
+                if error and aid not in self._article_errors:
+                    self._article_errors[aid] = error
+                    report.failed_articles[aid] = error
+                    newly_failed[aid] = error
+                remaining = self._pending_by_article.get(aid, 1) - 1
+                if remaining > 0:
+                    self._pending_by_article[aid] = remaining
+                    continue
+                self._pending_by_article.pop(aid, None)
+                if self._article_errors.pop(aid, None) is None:
+                    report.indexed_articles.add(aid)
+                    indexed.append(aid)
+
+        try:
+            if failed and self.on_rejected:
+                self.on_rejected(list(failed))
+            if indexed and self.on_indexed:
+                self.on_indexed(indexed)
+            if newly_failed and self.on_failed:
+                self.on_failed(newly_failed)
+        except Exception as e:
+            logger.error(f"Upsert outcome callback failed: {e}", exc_info=True)
@@ -1,70 +1,428 @@
+import json
+import os
+import threading
 import uuid 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from services.ai_clients import AIClientsSingleton
 from services.vector_store_client import VectorStoreSingleton
 from dotenv import load_dotenv
-import os
 from database.manager import DatabaseManager
+from ingestion.models import Article
+from storage.query_batcher import QueryBatcher
+from storage.related_index import article_embedding, encode_embedding
+from storage.reranker import Reranker
+from storage.search_filters import SearchFilters, datapoint_restricts
+from storage.two_stage import decode_full_vector, encode_full_vector, rescore, truncate_vectors
+from storage.upsert_writer import UpsertWriter
+from services.deadlines import call_bounded, check
 
 load_dotenv()
 
+# Chunks asked of the index per article wanted by nearest_articles: an article's
+# chunks tend to be near one another, so fewer would return fewer articles.
+NEAREST_CHUNKS_PER_ARTICLE = 4
+
 class VectorStore:
     """
     Manage vectorization and storage in Vertex AI Search.
     """
 
-    def __init__(self):
+    def __init__(self, version=None):
         self.client = VectorStoreSingleton()
-        self.embeddings = self.client.embeddings
-        self.endpoint = self.client.endpoint
-        self.index = self.client.index
+        settings = version_settings(version)
+        if version is not None and version.embedding_model:
+            self.embeddings = AIClientsSingleton().embeddings_for(version.embedding_model)
+        else:
+            self.embeddings = self.client.embeddings
+        if settings.get("index_id") or settings.get("endpoint_id"):
+            self.index, self.endpoint = self.client.resources(
+                settings.get("index_id", self.client.index_id),
+                settings.get("endpoint_id", self.client.endpoint_id),
+            )
+        else:
+            self.endpoint = self.client.endpoint
+            self.index = self.client.index
+        self.deployed_index_id = settings.get("deployed_index_id", self.client.deployed_index_id)
+        self._init_version(version)
+        self._init_search(settings)
 
-    def vectorize_and_store(self, article_id: int, chunks: List[str]) -> List[Dict]:
+    def _init_version(self, version):
+        # Chunk rows are tagged with the index version they were written to; None
+        # is the original index configured through the environment.
+        self.version_name = version.name if version is not None else None
+        self.chunking_strategy = version.chunking_strategy if version is not None else None
+        # Article embeddings feed related articles and stories, so only the store
+        # serving traffic writes them (see ReindexJob).
+        self.record_article_embeddings = True
+        # Embeddings of articles still being upserted, saved once they are indexed.
+        self._pending_embeddings: Dict[int, List[List[float]]] = {}
+        self._pending_lock = threading.Lock()
+
+    def _init_search(self, settings: Optional[Dict[str, Any]] = None):
+        # A version with `coarse_dimensions` is two-stage (see storage.two_stage): its
+        # index holds vectors truncated to that size, and the best `coarse_candidates`
+        # chunks of the index are re-scored with their full vectors.
+        settings = settings or {}
+        self.coarse_dimensions = int(settings.get("coarse_dimensions") or 0)
+        self.coarse_candidates = int(
+            settings.get("coarse_candidates") or os.getenv("SEARCH_COARSE_CANDIDATES", "200")
+        )
+        # Concurrent searches within SEARCH_BATCH_WINDOW_MS share one embedding call
+        # and one find_neighbors call per filter. 0 disables the wait.
+        self.query_batcher = QueryBatcher(
+            self._embed_queries,
+            self._find_neighbors,
+            window=float(os.getenv("SEARCH_BATCH_WINDOW_MS", "5")) / 1000,
+            max_batch_size=int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32")),
+        )
+        # Re-ranking is opt-in (RERANK_ENABLED=true); by default results keep the
+        # plain best-distance order. It needs a deeper candidate pool than the k
+        # results it returns.
+        self.reranker = Reranker.from_env() if os.getenv("RERANK_ENABLED", "false").lower() == "true" else None
+        self.candidate_multiplier = int(os.getenv("RERANK_CANDIDATE_MULTIPLIER", "5"))
+
+    def warm_up(self):
         """
-        Generates embeddings for the given chunks and stores them in Vertex AI Search.
+        Checks the backends the search path depends on. The Vertex AI clients were
+        already built when this store was constructed.
         """
-        vectors = self.embeddings.embed_documents(chunks)
-        datapoints = []
-        
-        generated_ids = []
+        DatabaseManager().ping()
 
-        for vector in vectors:
-            datapoint_id = str(article_id) + "/" + str(uuid.uuid4())
-            generated_ids.append(datapoint_id)
-            datapoints.append({
-                "datapoint_id": datapoint_id,
+    def _require_deployed_index(self):
+        if not self.deployed_index_id:
+            raise ValueError("DEPLOYED_INDEX_ID must be implemented in .env")
+
+    def new_writer(self, **kwargs) -> UpsertWriter:
+        """
+        Creates a buffered, batched writer over this store's index. Articles whose
+        vectors land (or don't) are marked in Postgres so failures can be retried, and
+        the chunk rows of rejected datapoints are deleted.
+        """
+        db = DatabaseManager()
+        on_indexed = kwargs.pop("on_indexed", db.mark_articles_indexed)
+        on_failed = kwargs.pop("on_failed", db.mark_articles_index_failed)
+        kwargs.setdefault("on_rejected", db.delete_chunks)
+
+        # Article embeddings are saved only for articles that made it into the index.
+        def indexed(article_ids: List[int]):
+            if on_indexed:
+                on_indexed(article_ids)
+            self._record_article_embeddings(self._take_pending_embeddings(article_ids))
+
+        def failed(errors: Dict[int, str]):
+            if on_failed:
+                on_failed(errors)
+            self._take_pending_embeddings(list(errors))
+
+        return UpsertWriter(self.index, on_indexed=indexed, on_failed=failed, **kwargs)
+
+    @staticmethod
+    def build_datapoints(
+        article_id: int, vectors: List[List[float]], article: Optional[Article] = None
+    ) -> List[Dict]:
+        """
+        Builds one datapoint per vector. When `article` is given, its source, language
+        and publication time are attached as restricts so searches can filter on them.
+        """
+        restricts = datapoint_restricts(article)
+        return [
+            {
+                "datapoint_id": str(article_id) + "/" + str(uuid.uuid4()),
                 "feature_vector": vector,
-            })
+                **restricts,
+            }
+            for vector in vectors
+        ]
+
+    def vectorize_and_store(
+        self,
+        article_id: int,
+        chunks: List[str],
+        writer: Optional[UpsertWriter] = None,
+        article: Optional[Article] = None,
+        positions: Optional[List[int]] = None,
+    ) -> List[Dict]:
+        """
+        Generates embeddings for the given chunks and stores them in Vertex AI Search.
+        With a `writer`, datapoints are buffered and upserted with other articles' in
+        batches; otherwise they are written (with retries) before returning.
+        `positions` places the chunks within the article when only some of its chunks
+        are (re-)embedded; by default they are the article's chunks in order.
+        """
+        self._require_deployed_index()
+        vectors = call_bounded("document embedding", self.embeddings.embed_documents, chunks)
+        datapoints = self.build_datapoints(article_id, self.index_vectors(vectors), article)
+        self._record_chunks(article_id, chunks, datapoints, positions, vectors)
+        if positions is None:
+            self._defer_article_embeddings({article_id: vectors})
+
+        if writer is not None:
+            writer.add(datapoints)
+        else:
+            with self.new_writer() as own_writer:
+                own_writer.add(datapoints)
+                report = own_writer.flush()
+            if report.failed_articles:
+                raise RuntimeError(
+                    f"Failed to upsert vectors for article {article_id}: "
+                    f"{report.failed_articles[article_id]}"
+                )
 
-        deployed_index_id = os.getenv("DEPLOYED_INDEX_ID")
-        if not deployed_index_id:
-            raise ValueError("DEPLOYED_INDEX_ID must be implemented in .env")
-        
-        self.index.upsert_datapoints(datapoints=datapoints)
-        
         return [
-            {"chunk": chunk, "vector": vector, "vector_id": vector_id}
-            for chunk, vector, vector_id in zip(chunks, vectors, generated_ids)
+            {"chunk": chunk, "vector": vector, "vector_id": dp["datapoint_id"]}
+            for chunk, vector, dp in zip(chunks, vectors, datapoints)
         ]
-        
-    def search_similar(self, query: str, k: int = 100) -> Dict[str, Any]:
+
+    def vectorize_and_store_many(
+        self,
+        chunks_by_article: Dict[int, List[str]],
+        writer: UpsertWriter,
+        articles: Optional[Dict[int, Article]] = None,
+    ) -> int:
         """
-        Searches for 'K' articles similar to the given query.
+        Embeds the chunks of several articles in one call and hands the datapoints to
+        `writer`. Returns the number of datapoints queued.
         """
-        query_embedding = self.embeddings.embed_query(query)
+        article_ids = []
+        texts = []
+        for article_id, chunks in chunks_by_article.items():
+            article_ids.extend([article_id] * len(chunks))
+            texts.extend(chunks)
+
+        if not texts:
+            return 0
+
+        self._require_deployed_index()
+        vectors = call_bounded("document embedding", self.embeddings.embed_documents, texts)
+
+        datapoints = []
+        for article_id, vector in zip(article_ids, self.index_vectors(vectors)):
+            article = articles.get(article_id) if articles else None
+            datapoints.extend(self.build_datapoints(article_id, [vector], article))
+        DatabaseManager().add_chunks([
+            {
+                "article_id": aid,
+                "position": position,
+                "datapoint_id": dp["datapoint_id"],
+                "text": text,
+                "index_version": self.version_name,
+                **self.full_vector_column(vector),
+            }
+            for aid, position, text, dp, vector in zip(
+                article_ids, _positions(article_ids), texts, datapoints, vectors
+            )
+        ])
+        vectors_by_article: Dict[int, List[List[float]]] = {}
+        for article_id, vector in zip(article_ids, vectors):
+            vectors_by_article.setdefault(article_id, []).append(vector)
+        self._defer_article_embeddings(vectors_by_article)
+        writer.add(datapoints)
+        return len(datapoints)
+
+    def _record_chunks(
+        self,
+        article_id: int,
+        chunks: List[str],
+        datapoints: List[Dict],
+        positions: Optional[List[int]] = None,
+        vectors: Optional[List[List[float]]] = None,
+    ):
+        # Keeps the chunk text next to its datapoint ID so the corpus can be exported
+        # and an updated article only re-embeds the chunks that changed.
+        positions = positions if positions is not None else range(len(chunks))
+        vectors = vectors if vectors is not None else [None] * len(chunks)
+        DatabaseManager().add_chunks([
+            {
+                "article_id": article_id,
+                "position": position,
+                "datapoint_id": dp["datapoint_id"],
+                "text": chunk,
+                "index_version": self.version_name,
+                **self.full_vector_column(vector),
+            }
+            for position, chunk, dp, vector in zip(positions, chunks, datapoints, vectors)
+        ])
+
+    def index_vectors(self, vectors: List[List[float]]) -> List[List[float]]:
+        """The vectors as written to the index: truncated when the index is two-stage."""
+        if not self.coarse_dimensions or not vectors:
+            return vectors
+        return truncate_vectors(vectors, self.coarse_dimensions).tolist()
+
+    def full_vector_column(self, vector: Optional[List[float]]) -> Dict[str, bytes]:
+        # The chunk row's full vector, kept only when the index is two-stage.
+        if not self.coarse_dimensions or vector is None:
+            return {}
+        return {"vector": encode_full_vector(vector)}
 
-        deployed_index_id = os.getenv("DEPLOYED_INDEX_ID")
-        response = self.endpoint.find_neighbors(
-            deployed_index_id=deployed_index_id,
-            queries=[query_embedding],
-            num_neighbors=k
+    def _record_article_embeddings(self, vectors_by_article: Dict[int, List[List[float]]]):
+        # One compact vector per article, used to precompute related articles.
+        if not self.record_article_embeddings:
+            return
+        DatabaseManager().save_article_embeddings({
+            article_id: encode_embedding(article_embedding(vectors))
+            for article_id, vectors in vectors_by_article.items()
+            if vectors
+        })
+
+    def _defer_article_embeddings(self, vectors_by_article: Dict[int, List[List[float]]]):
+        # Held until the writer reports the article indexed (see new_writer).
+        if not self.record_article_embeddings:
+            return
+        with self._pending_lock:
+            self._pending_embeddings.update(vectors_by_article)
+
+    def _take_pending_embeddings(self, article_ids: List[int]) -> Dict[int, List[List[float]]]:
+        with self._pending_lock:
+            return {
+                aid: self._pending_embeddings.pop(aid)
+                for aid in article_ids
+                if aid in self._pending_embeddings
+            }
+
+    def refresh_article_embeddings(self, article_ids: List[int]):
+        """
+        Recomputes article embeddings from the vectors stored in the index, for
+        articles that were only partially re-embedded or predate article embeddings.
+        """
+        chunks = DatabaseManager().get_chunks_for_articles(list(article_ids), self.version_name)
+        vectors = self.read_vectors([c.datapoint_id for c in chunks])
+        vectors_by_article: Dict[int, List[List[float]]] = {}
+        for chunk in chunks:
+            if chunk.datapoint_id in vectors:
+                vectors_by_article.setdefault(chunk.article_id, []).append(vectors[chunk.datapoint_id])
+        self._record_article_embeddings(vectors_by_article)
+
+    def remove_datapoints(self, datapoint_ids: List[str]):
+        """
+        Deletes datapoints (e.g. the outdated chunks of an updated article) from the
+        index and forgets their chunk rows.
+        """
+        if not datapoint_ids:
+            return
+        self.index.remove_datapoints(datapoint_ids=datapoint_ids)
+        DatabaseManager().delete_chunks(datapoint_ids)
+
+    def read_vectors(self, datapoint_ids: List[str], batch_size: int = 100) -> Dict[str, List[float]]:
+        """
+        Reads stored vectors back from the deployed index, `batch_size` IDs per call.
+        IDs the index doesn't know are omitted. A two-stage store returns the full
+        vectors kept in Postgres instead of the truncated ones in its index.
+        """
+        if self.coarse_dimensions:
+            return self._read_full_vectors(datapoint_ids)
+        self._require_deployed_index()
+        vectors = {}
+        for start in range(0, len(datapoint_ids), batch_size):
+            response = self.endpoint.read_index_datapoints(
+                deployed_index_id=self.deployed_index_id,
+                ids=datapoint_ids[start:start + batch_size],
+            )
+            for datapoint in response:
+                vectors[datapoint.datapoint_id] = list(datapoint.feature_vector)
+        return vectors
+
+    @staticmethod
+    def _read_full_vectors(datapoint_ids: List[str]) -> Dict[str, List[float]]:
+        return {
+            datapoint_id: decode_full_vector(data).tolist()
+            for datapoint_id, data in DatabaseManager().get_chunk_vectors(list(datapoint_ids)).items()
+        }
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        # Same task type embed_query uses, for several queries in one request.
+        return call_bounded(
+            "query embedding", self.embeddings.embed_documents, queries, embeddings_task_type="RETRIEVAL_QUERY"
         )
-        if not response or not response[0]:
-            return {"query": query, "results": []}
 
-        neighbors = response[0]
+    def _find_neighbors(
+        self, vectors: List[List[float]], k: int, filters: Optional[SearchFilters]
+    ) -> List[list]:
+        if self.coarse_dimensions:
+            return self._two_stage_neighbors(vectors, k, filters)
+        token_filters, numeric_filters = filters.to_namespaces() if filters else (None, None)
+        response = call_bounded(
+            "find_neighbors",
+            self.endpoint.find_neighbors,
+            deployed_index_id=self.deployed_index_id,
+            queries=vectors,
+            num_neighbors=k,
+            filter=token_filters,
+            numeric_filter=numeric_filters,
+            # The stored chunk vectors are only needed for the MMR diversity term.
+            return_full_datapoint=bool(self.reranker and self.reranker.mmr_lambda < 1),
+        )
+        return response or [[] for _ in vectors]
+
+    def _coarse_candidates(
+        self, vectors: List[List[float]], n: int, filters: Optional[SearchFilters]
+    ) -> List[List[str]]:
+        # Datapoint IDs of the `n` nearest truncated vectors, per (truncated) query.
+        token_filters, numeric_filters = filters.to_namespaces() if filters else (None, None)
+        response = call_bounded(
+            "find_neighbors",
+            self.endpoint.find_neighbors,
+            deployed_index_id=self.deployed_index_id,
+            queries=vectors,
+            num_neighbors=n,
+            filter=token_filters,
+            numeric_filter=numeric_filters,
+        )
+        if not response:
+            return [[] for _ in vectors]
+        return [[neighbor.id for neighbor in neighbors] for neighbors in response]
+
+    def _two_stage_neighbors(
+        self, vectors: List[List[float]], k: int, filters: Optional[SearchFilters]
+    ) -> List[list]:
+        # Candidate pass over the truncated index, then exact re-scoring of the
+        # candidates with the full query and chunk vectors.
+        candidates = self._coarse_candidates(
+            self.index_vectors(vectors), max(k, self.coarse_candidates), filters
+        )
+        check("re-scoring")
+        full_vectors = DatabaseManager().get_chunk_vectors(
+            list({datapoint_id for ids in candidates for datapoint_id in ids})
+        )
+        return [rescore(vector, ids, full_vectors, k) for vector, ids in zip(vectors, candidates)]
+
+    def nearest_articles(self, vectors: List[List[float]], k: int) -> List[List[int]]:
+        """
+        IDs of up to `k` articles per vector, ranked by their nearest chunk, best first.
+        Related articles use it to find candidates without scanning every embedding.
+        """
+        # Datapoint IDs follow "<article_id>/<uuid>"; neighbors come nearest first.
+        return [
+            list(dict.fromkeys(int(neighbor.id.split("/", 1)[0]) for neighbor in neighbors))[:k]
+            for neighbors in self._find_neighbors(vectors, k * NEAREST_CHUNKS_PER_ARTICLE, None)
+        ]
+
+    def _rerank(self, results: List[Dict], vectors: Dict[int, Any], k: int) -> List[Dict]:
+        # `results` are sorted by distance; `vectors` holds each article's best chunk vector.
+        if not self.reranker or not results:
+            return results
+        candidates = [dict(r, vector=vectors.get(r["id"])) for r in results]
+        return [
+            {key: value for key, value in r.items() if key != "vector"}
+            for r in self.reranker.rerank(candidates, k)
+        ]
 
-        # storage the best distance per article
+    def search_similar(
+        self, query: str, k: int = 100, filters: Optional[SearchFilters] = None
+    ) -> Dict[str, Any]:
+        """
+        Searches for 'K' articles similar to the given query. `filters` are applied by
+        the index (namespace restricts), so filtered queries cost the same. Concurrent
+        calls are micro-batched (see QueryBatcher).
+        """
+        num_candidates = k * self.candidate_multiplier if self.reranker else k
+        neighbors = self.query_batcher.search(query, num_candidates, filters)
+        if not neighbors:
+            return {"query": query, "results": []}
+
+        # storage the best distance (and that chunk's vector) per article
         article_distances = {}  
+        article_vectors = {}
         for neighbor in neighbors:
             raw_id = neighbor.id  #Based on the defined id structure: ex."32/843b26d7-0dd2-4157-96fa-22f076524a85" where 32 is the article id
             if raw_id and "/" in raw_id:
@@ -73,16 +431,14 @@ class VectorStore:
                     aid = int(article_id)
                     if aid not in article_distances or neighbor.distance < article_distances[aid]:
                         article_distances[aid] = neighbor.distance
+                        article_vectors[aid] = getattr(neighbor, "feature_vector", None)
 
         print(f"Quantity of unique articles found: {len(article_distances)}")
         print(f"Article IDs: {list(article_distances.keys())}")
 
         # --- Fetch articles from the database ---
         db = DatabaseManager()
-        articles = {
-            a.id: a for a in (db.get_article_by_id(aid) for aid in article_distances.keys())
-            if a is not None
-        }
+        articles = db.get_articles_by_ids(list(article_distances.keys()))
 
         
         results = []
@@ -93,12 +449,32 @@ class VectorStore:
                 "url": article.url,
                 "published_at": article.published_at,
                 "content_preview": article.content_preview,
+                "source": article.source,
+                "language": article.language,
                 "distance": article_distances.get(aid)  
             })
 
         results.sort(key=lambda x: x["distance"])
+        results = self._rerank(results, article_vectors, k)
 
         return {
             "query": query,
             "results": results[:k]  
         }
+
+
+def version_settings(version) -> Dict[str, Any]:
+    """The backend settings (JSON) of an index version; empty for the original index."""
+    if version is None or not version.settings:
+        return {}
+    return json.loads(version.settings)
+
+
+def _positions(article_ids: List[int]) -> List[int]:
+    # Position of each chunk within its article, for a flat list grouped by article.
+    positions, counts = [], {}
+    for article_id in article_ids:
+        positions.append(counts.get(article_id, 0))
+        counts[article_id] = positions[-1] + 1
+    return positions
+
@@ -1,4 +1,7 @@
 # conftest.py
+import pytest
+
+
 def pytest_configure(config):
     config.addinivalue_line(
         "markers", "unit: Unit tests that do not require external services"
@@ -11,3 +14,21 @@ def pytest_configure(config):
         "markers",
         "llm_eval: LLM judge for chunking quality",
     )
+    config.addinivalue_line(
+        "markers",
+        "benchmark: Performance checks (import time, throughput); run with --benchmarks",
+    )
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmarks", action="store_true", help="Also run the timing-sensitive benchmark tests.")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timings are noisy on shared machines: benchmarks only run when asked for.
+    if config.getoption("--benchmarks") or "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --benchmarks or -m benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.admission import AdmissionGate, Overloaded
+from services.deadlines import DeadlineExceeded, bounded, call_bounded, check, deadline, remaining
+from storage.query_batcher import QueryBatcher
+
+
+@pytest.mark.unit
+def test_nested_deadline_can_only_shorten_the_outer_one():
+    assert remaining() is None and bounded(30) == 30
+    with deadline(10):
+        with deadline(60):
+            assert remaining() <= 10
+        with deadline(0.001):
+            time.sleep(0.01)
+            with pytest.raises(DeadlineExceeded):
+                check("la consulta")
+        assert 0 < remaining() <= 10 and bounded(30) <= 10
+    assert remaining() is None
+
+
+@pytest.mark.unit
+def test_full_gate_sheds_once_its_queue_is_full():
+    gate = AdmissionGate("search", max_concurrent=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(gate.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(gate.run(lambda: "en cola"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded) as shed:
+            await gate.run(lambda: "rechazada")
+        release.set()
+        return shed.value, await first, await queued
+
+    shed, first, queued = asyncio.run(scenario())
+    assert shed.retry_after == 1.0 and first is True and queued == "en cola"
+
+
+@pytest.mark.unit
+def test_ingest_is_shed_while_searches_wait():
+    search = AdmissionGate("search", max_concurrent=1, max_queue=4)
+    ingest = AdmissionGate("ingest", max_concurrent=4, max_queue=4, retry_after=5, defers_to=[search])
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(search.run(release.wait))
+        await asyncio.sleep(0.05)
+        ok = await ingest.run(lambda: "sin búsquedas en espera")
+        waiting = asyncio.create_task(search.run(lambda: "búsqueda"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded) as shed:
+            await ingest.run(lambda: "ingesta")
+        release.set()
+        return ok, shed.value, await running, await waiting
+
+    ok, shed, _, waited = asyncio.run(scenario())
+    assert ok == "sin búsquedas en espera" and shed.retry_after == 5 and waited == "búsqueda"
+
+
+@pytest.mark.unit
+def test_ingest_is_not_shed_by_a_search_that_gets_a_slot_at_once():
+    search = AdmissionGate("search", max_concurrent=4, max_queue=4)
+    ingest = AdmissionGate("ingest", max_concurrent=4, max_queue=4, defers_to=[search])
+    release = threading.Event()
+
+    async def scenario():
+        # Ambas llegan a la vez: la búsqueda entra sin esperar, así que no cuenta como en cola.
+        searching = asyncio.create_task(search.run(release.wait))
+        ingesting = asyncio.create_task(ingest.run(lambda: "ingesta"))
+        ingested = await ingesting
+        release.set()
+        return ingested, await searching
+
+    assert asyncio.run(scenario()) == ("ingesta", True)
+
+
+@pytest.mark.unit
+def test_queued_request_gives_up_at_its_deadline_and_workers_see_it():
+    gate = AdmissionGate("search", max_concurrent=1, max_queue=4)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(gate.run(release.wait))
+        await asyncio.sleep(0.05)
+        with deadline(0.1):
+            with pytest.raises(Overloaded):
+                await gate.run(lambda: "nunca")
+        release.set()
+        await running
+        # El hilo de trabajo hereda la deadline del contexto de la petición.
+        with deadline(5):
+            return await gate.run(remaining)
+
+    assert 0 < asyncio.run(scenario()) <= 5
+
+
+@pytest.mark.unit
+def test_batched_caller_stops_waiting_at_its_deadline():
+    release = threading.Event()
+
+    def slow_neighbors(vectors, k, filters):
+        release.wait()
+        return [[] for _ in vectors]
+
+    # La primera llamada abre la ventana; la segunda se une y espera su resultado.
+    batcher = QueryBatcher(lambda texts: [[0.0] for _ in texts], slow_neighbors, window=0.5)
+    leader = threading.Thread(target=batcher.search, args=("líder", 5))
+    leader.start()
+    time.sleep(0.05)
+    try:
+        with deadline(0.1):
+            started = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                batcher.search("seguidora", 5)
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+        leader.join()
+
+
+@pytest.mark.unit
+def test_slow_rpc_is_abandoned_at_the_deadline():
+    release = threading.Event()
+
+    def slow_find_neighbors(queries, num_neighbors=10):
+        release.wait(timeout=5)
+        return [[] for _ in queries]
+
+    try:
+        # Sin deadline la llamada se hace en el propio hilo.
+        assert call_bounded("find_neighbors", lambda queries: [[]], [[0.0]]) == [[]]
+        with deadline(0.1):
+            started = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                call_bounded("find_neighbors", slow_find_neighbors, [[0.0]], num_neighbors=5)
+        # El 504 llega a tiempo aunque la llamada siga en curso.
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
@@ -0,0 +1,261 @@
+import gzip
+import json
+import pytest
+import uses_cases.backfill as backfill_module
+from ingestion.dump_reader import expand_paths, iter_articles
+from storage.upsert_writer import UpsertReport
+from uses_cases.backfill import BackfillError, BackfillService, Checkpoint
+
+
+def record(i):
+    return {"title": f"Titular {i}", "content": f"Contenido del artículo {i}.", "url": f"https://example.com/{i}"}
+
+
+def write_jsonl(path, records):
+    lines = "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records)
+    if str(path).endswith(".gz"):
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(lines)
+    else:
+        path.write_text(lines, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", ["volcado.jsonl", "volcado.jsonl.gz", "volcado.ndjson"])
+def test_jsonl_dumps_are_read_by_extension_skipping_blank_lines(tmp_path, name):
+    path = write_jsonl(tmp_path / name, [record(1), "", record(2), record(3)])
+
+    assert [a.title for a in iter_articles(path)] == ["Titular 1", "Titular 2", "Titular 3"]
+    # `skip` cuenta registros, no líneas: la línea en blanco no cuenta.
+    assert [a.title for a in iter_articles(path, skip=2)] == ["Titular 3"]
+
+
+@pytest.mark.unit
+def test_parquet_dumps_resume_inside_a_batch(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "volcado.parquet")
+    pq.write_table(pa.Table.from_pylist([record(i) for i in range(1, 6)]), path)
+
+    assert [a.title for a in iter_articles(path, skip=3, parquet_batch_size=2)] == ["Titular 4", "Titular 5"]
+
+
+@pytest.mark.unit
+def test_unknown_formats_and_malformed_lines_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_articles(str(tmp_path / "volcado.csv")))
+
+    path = write_jsonl(tmp_path / "volcado.jsonl", [record(1), "{roto", {"title": "sin contenido"}])
+    articles = iter_articles(path)
+    assert next(articles).title == "Titular 1"
+    with pytest.raises(ValueError, match=r"volcado\.jsonl:2"):
+        next(articles)
+
+
+@pytest.mark.unit
+def test_directories_expand_to_their_dump_files_in_order(tmp_path):
+    for name in ("b.jsonl", "a.parquet", "notas.txt"):
+        (tmp_path / name).write_text("")
+
+    assert expand_paths([str(tmp_path), "otro.jsonl"]) == [
+        str(tmp_path / "a.parquet"), str(tmp_path / "b.jsonl"), "otro.jsonl",
+    ]
+
+
+@pytest.mark.unit
+def test_checkpoint_survives_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path)
+    checkpoint.advance("volcado.jsonl", 200)
+    checkpoint.advance("volcado.jsonl", 50)
+
+    assert Checkpoint(path).get("volcado.jsonl") == 250
+    assert Checkpoint(path).get("otro.jsonl") == 0
+    assert Checkpoint(None).get("volcado.jsonl") == 0
+
+
+class InlinePool:
+    """multiprocessing.Pool falso: limpia en el propio proceso."""
+
+    def __init__(self, processes=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def map(self, func, items, chunksize=1):
+        return [func(item) for item in items]
+
+
+class FakeDB:
+    """Inserta por titular (los repetidos son duplicados) y puede fallar en una llamada."""
+
+    def __init__(self, fail_on_call=None):
+        self.titles = {}
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+        self.stages = {}
+        self.failed = {}
+
+    def add_articles(self, articles):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("conexión perdida")
+        ids = []
+        for a in articles:
+            if a.title in self.titles:
+                ids.append(None)
+            else:
+                self.titles[a.title] = len(self.titles) + 1
+                ids.append(self.titles[a.title])
+        return ids
+
+    def mark_stage(self, ids, stage):
+        for aid in ids:
+            self.stages[aid] = stage
+
+    def mark_failed(self, errors):
+        self.failed.update(errors)
+
+
+class FakeChunker:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def chunk(self, article):
+        if article.title in self.failing:
+            raise RuntimeError("sin embeddings")
+        return [article.content]
+
+
+class FakeWriter:
+    def __init__(self, rejected=()):
+        self.pending = {}
+        self.rejected = set(rejected)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def flush(self):
+        report = UpsertReport()
+        for aid, chunks in self.pending.items():
+            if aid in self.rejected:
+                report.failed_articles[aid] = "upsert: rechazado"
+            else:
+                report.indexed_articles.add(aid)
+                report.datapoints_written += len(chunks)
+        self.pending = {}
+        return report
+
+
+class FakeVectorStore:
+    chunking_strategy = None
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def new_writer(self):
+        return self.writer
+
+    def vectorize_and_store_many(self, chunks_by_article, writer, articles):
+        writer.pending.update(chunks_by_article)
+
+
+class FakeRelatedIndex:
+    def __init__(self):
+        self.updated = []
+
+    def update(self, ids):
+        self.updated.extend(sorted(ids))
+
+
+def make_service(monkeypatch, checkpoint_path, db, chunker=None, writer=None, fail_on_invalid=False):
+    monkeypatch.setattr(backfill_module, "Pool", InlinePool)
+    service = BackfillService.__new__(BackfillService)
+    service.batch_size = 2
+    service.fail_on_invalid = fail_on_invalid
+    service.processes = 1
+    service.chunk_threads = 1
+    service.checkpoint = Checkpoint(checkpoint_path)
+    service.db_manager = db
+    service.chunker = chunker or FakeChunker()
+    service.vector_store = FakeVectorStore(writer or FakeWriter())
+    service.related_index = FakeRelatedIndex()
+    return service
+
+
+@pytest.mark.unit
+def test_interrupted_backfill_resumes_after_the_last_committed_batch(tmp_path, monkeypatch):
+    dump = write_jsonl(tmp_path / "volcado.jsonl", [record(i) for i in range(1, 6)])
+    checkpoint = str(tmp_path / "checkpoint.json")
+    db = FakeDB(fail_on_call=2)
+
+    with pytest.raises(RuntimeError):
+        make_service(monkeypatch, checkpoint, db).run([dump])
+    # Solo el primer lote llegó a completarse.
+    assert Checkpoint(checkpoint).get(dump) == 2
+
+    report = make_service(monkeypatch, checkpoint, db).run([dump])
+
+    assert report.records_read == 3 and report.articles_stored == 3
+    assert sorted(db.titles) == [f"Titular {i}" for i in range(1, 6)]
+    assert Checkpoint(checkpoint).get(dump) == 5
+
+
+@pytest.mark.unit
+def test_backfill_counts_duplicates_and_failures_per_stage(tmp_path, monkeypatch):
+    dump = write_jsonl(tmp_path / "volcado.jsonl", [record(1), record(2), record(1), record(3), record(4)])
+    db = FakeDB()
+    service = make_service(
+        monkeypatch, None, db, chunker=FakeChunker(failing={"Titular 2"}), writer=FakeWriter(rejected={3})
+    )
+
+    report = service.run([dump])
+
+    assert (report.records_read, report.articles_stored, report.duplicates_skipped) == (5, 4, 1)
+    # Titular 2 falla al trocear y Titular 3 (ID 3) al escribir en el índice.
+    assert report.failed == 2 and report.chunks_indexed == 2
+    assert db.failed == {2: "chunking: sin embeddings"}
+    assert db.stages == {1: "embedded", 3: "embedded", 4: "embedded"}
+    assert service.related_index.updated == [1, 4]
+
+
+@pytest.mark.unit
+def test_invalid_records_are_skipped_counted_and_checkpointed(tmp_path, monkeypatch):
+    dump = write_jsonl(
+        tmp_path / "volcado.jsonl", [record(1), "{roto", record(2), {"title": "sin contenido"}, record(3)]
+    )
+    checkpoint = str(tmp_path / "checkpoint.json")
+    db = FakeDB()
+
+    report = make_service(monkeypatch, checkpoint, db).run([dump])
+
+    assert (report.records_read, report.invalid_records, report.articles_stored) == (3, 2, 3)
+    assert "2 invalid" in report.summary()
+    # Los registros inválidos cuentan como consumidos al reanudar.
+    assert Checkpoint(checkpoint).get(dump) == 5
+
+
+@pytest.mark.unit
+def test_invalid_records_and_unreadable_dumps_raise_backfill_error(tmp_path, monkeypatch):
+    dump = write_jsonl(tmp_path / "volcado.jsonl", [record(1), record(2), "{roto", record(3)])
+    checkpoint = str(tmp_path / "checkpoint.json")
+    db = FakeDB()
+
+    with pytest.raises(BackfillError, match=r"volcado\.jsonl:3"):
+        make_service(monkeypatch, checkpoint, db, fail_on_invalid=True).run([dump])
+    # El lote anterior al registro roto sí quedó confirmado.
+    assert Checkpoint(checkpoint).get(dump) == 2
+
+    corrupt = tmp_path / "roto.jsonl.gz"
+    corrupt.write_bytes(b"no es gzip")
+    with pytest.raises(BackfillError, match="Cannot read"):
+        make_service(monkeypatch, None, FakeDB()).run([str(corrupt)])
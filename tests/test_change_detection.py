@@ -0,0 +1,240 @@
+from types import SimpleNamespace
+import pytest
+from cleaning.cleaner import content_hash
+from ingestion.models import Article
+from storage.upsert_writer import UpsertReport
+from uses_cases.article_ingestion import ArticleIngestionService
+
+
+class IdentityCleaner:
+    def clean(self, text, source=None):
+        return text
+
+
+class SentenceChunker:
+    def chunk(self, article):
+        return [s.strip() + "." for s in article.content.split(".") if s.strip()]
+
+
+class FakeDB:
+    """Base de datos en memoria con lo mínimo que usa la ingesta."""
+
+    def __init__(self):
+        self.articles = {}  # id -> dict(title, status, content_hash)
+        self.chunks = []
+        self.next_id = 1
+        self.moved = {}
+        # Artículos sin indexar que otra ejecución está procesando.
+        self.busy = set()
+
+    def get_statuses_by_title(self, titles):
+        return {
+            a["title"]: (aid, a["status"], a["content_hash"])
+            for aid, a in self.articles.items()
+            if a["title"] in titles
+        }
+
+    def claim_idle_articles(self, ids, idle_seconds=300):
+        return {aid for aid in ids if self.articles[aid]["status"] != "indexed" and aid not in self.busy}
+
+    def get_existing_hashes(self, hashes):
+        return {a["content_hash"] for a in self.articles.values()} & set(hashes)
+
+    def set_content_hashes(self, hashes):
+        for aid, digest in hashes.items():
+            self.articles[aid]["content_hash"] = digest
+
+    def add_articles(self, articles):
+        ids = []
+        for a in articles:
+            self.articles[self.next_id] = {"title": a.title, "status": "cleaned", "content_hash": content_hash(a.content)}
+            ids.append(self.next_id)
+            self.next_id += 1
+        return ids
+
+    def update_articles(self, articles):
+        for aid, a in articles.items():
+            self.articles[aid].update(status="cleaned", content_hash=content_hash(a.content))
+
+    def mark_stage(self, ids, stage):
+        for aid in ids:
+            self.articles[aid]["status"] = stage
+
+    def mark_failed(self, errors):
+        pass
+
+    def get_chunks_for_articles(self, ids, index_version=None):
+        return [c for c in self.chunks if c.article_id in ids]
+
+    def update_chunk_positions(self, positions):
+        self.moved.update(positions)
+
+
+class FakeWriter:
+    def __init__(self, db):
+        self.db = db
+        self.articles = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def flush(self):
+        report = UpsertReport()
+        report.indexed_articles.update(self.articles)
+        self.db.mark_stage(self.articles, "indexed")
+        return report
+
+
+class FakeVectorStore:
+    version_name = None
+    chunking_strategy = None
+
+    def __init__(self, db):
+        self.db = db
+        self.embedded = {}
+        self.removed = []
+        self.refreshed = []
+        self._writer = None
+
+    def new_writer(self):
+        self._writer = FakeWriter(self.db)
+        return self._writer
+
+    def vectorize_and_store(self, aid, chunks, writer, article, positions):
+        self.embedded[aid] = list(zip(positions, chunks))
+        for position, text in zip(positions, chunks):
+            self.db.chunks.append(SimpleNamespace(
+                id=len(self.db.chunks) + 1,
+                article_id=aid,
+                position=position,
+                datapoint_id=f"{aid}/{len(self.db.chunks)}",
+                content_hash=content_hash(text),
+            ))
+        writer.articles.add(aid)
+
+    def remove_datapoints(self, ids):
+        self.removed.extend(ids)
+        self.db.chunks = [c for c in self.db.chunks if c.datapoint_id not in ids]
+
+    def refresh_article_embeddings(self, ids):
+        self.refreshed.extend(ids)
+
+
+class FakeRelatedIndex:
+    def __init__(self):
+        self.updated = []
+
+    def update(self, ids):
+        self.updated.extend(ids)
+
+
+class FakeStoryClusterer:
+    def __init__(self):
+        self.assigned = []
+
+    def assign(self, ids):
+        self.assigned.extend(ids)
+
+
+def make_service():
+    service = ArticleIngestionService.__new__(ArticleIngestionService)
+    service.db_manager = FakeDB()
+    service.cleaner = IdentityCleaner()
+    service.chunker = SentenceChunker()
+    service.vector_store = FakeVectorStore(service.db_manager)
+    service.related_index = FakeRelatedIndex()
+    service.story_clusterer = FakeStoryClusterer()
+    service.indexed_listeners = []
+    service.chunk_workers = 2
+    service.redrive_idle_seconds = 300
+    return service
+
+
+def article(title, content):
+    return Article(title=title, url="https://example.com", content=content, source="newsapi")
+
+
+@pytest.mark.unit
+def test_unchanged_and_retitled_articles_are_skipped():
+    service = make_service()
+    service.ingest_fetched("newsapi", [article("A", "One. Two.")])
+    service.vector_store.embedded.clear()
+
+    result = service.ingest_fetched("newsapi", [article("A", "One. Two."), article("A (copy)", "One. Two.")])
+
+    assert result.new == 0 and result.updated == 0
+    assert [o.status for o in result.outcomes] == ["duplicate", "duplicate"]
+    assert service.vector_store.embedded == {}
+
+
+@pytest.mark.unit
+def test_corrected_article_only_reembeds_changed_chunks():
+    service = make_service()
+    service.ingest_fetched("newsapi", [article("A", "One. Two. Three.")])
+    old_datapoints = {c.position: c.datapoint_id for c in service.db_manager.chunks}
+    service.vector_store.embedded.clear()
+
+    result = service.ingest_fetched("newsapi", [article("A", "Zero. One. Two corrected. Three.")])
+
+    assert result.updated == 1
+    assert [(o.status, o.id) for o in result.outcomes] == [("updated", 1)]
+    # Solo se embeben las frases nuevas o modificadas, en su nueva posición.
+    assert service.vector_store.embedded == {1: [(0, "Zero."), (2, "Two corrected.")]}
+    # La frase sustituida se elimina del índice; las que no cambian se desplazan.
+    assert service.vector_store.removed == [old_datapoints[1]]
+    assert sorted(service.db_manager.moved.values()) == [1, 3]
+    assert service.db_manager.articles[1]["status"] == "indexed"
+
+
+@pytest.mark.unit
+def test_related_lists_follow_reembedded_articles():
+    service = make_service()
+    service.ingest_fetched("newsapi", [article("A", "One. Two."), article("B", "Three.")])
+    assert sorted(service.related_index.updated) == [1, 2]
+    # Los artículos nuevos ya tienen su embedding completo: no hay que releerlo.
+    assert service.vector_store.refreshed == []
+
+    service.related_index.updated.clear()
+    service.ingest_fetched("newsapi", [article("A", "One. Two changed."), article("B", "Three.")])
+
+    assert service.related_index.updated == [1]
+    assert service.vector_store.refreshed == [1]
+    # Una corrección no cambia la historia a la que pertenece el artículo.
+    assert sorted(service.story_clusterer.assigned) == [1, 2]
+
+
+@pytest.mark.unit
+def test_failed_reembedding_keeps_the_old_datapoints():
+    service = make_service()
+    service.ingest_fetched("newsapi", [article("A", "One. Two.")])
+    old_datapoints = [c.datapoint_id for c in service.db_manager.chunks]
+
+    def failing_vectorize(aid, chunks, writer, article, positions):
+        raise RuntimeError("Vertex AI no responde")
+
+    service.vector_store.vectorize_and_store = failing_vectorize
+    service.ingest_fetched("newsapi", [article("A", "One. Two changed.")])
+
+    # Sin vectores nuevos, los antiguos siguen siendo la única copia buscable.
+    assert service.vector_store.removed == []
+    assert [c.datapoint_id for c in service.db_manager.chunks] == old_datapoints
+
+
+@pytest.mark.unit
+def test_unindexed_articles_are_only_redriven_once_idle():
+    service = make_service()
+    service.ingest_fetched("newsapi", [article("A", "One."), article("B", "Two.")])
+    for aid in (1, 2):
+        service.db_manager.articles[aid]["status"] = "chunked"
+    # El artículo 1 sigue en proceso en otra ejecución; el 2 quedó abandonado.
+    service.db_manager.busy.add(1)
+    service.vector_store.embedded.clear()
+
+    result = service.ingest_fetched("newsapi", [article("A", "One."), article("B", "Two.")])
+
+    assert result.redriven == 1
+    assert [(o.status, o.id) for o in result.outcomes] == [("duplicate", None), ("indexed", 2)]
+    assert list(service.vector_store.embedded) == [2]
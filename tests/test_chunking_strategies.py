@@ -0,0 +1,85 @@
+import pytest
+from chunking.chunker import DocumentChunker
+from chunking.strategies.heading_aware import HeadingAwareChunkingStrategy
+from chunking.strategies.recursive import RecursiveChunkingStrategy
+from chunking.strategies.sentence_window import SentenceWindowChunkingStrategy
+from chunking.strategies.strategy_i import ChunkingStrategy
+from chunking.strategies.text_utils import count_tokens, split_sentences
+from ingestion.models import Article
+
+
+class NamedStrategy(ChunkingStrategy):
+    """Estrategia falsa que devuelve su nombre, para comprobar cuál se eligió."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def chunk(self, text):
+        return [self.name]
+
+
+@pytest.mark.unit
+def test_split_sentences_keeps_abbreviations():
+    text = "Dr. Smith met the U.S. envoy on Monday. They discussed trade. Was it useful?"
+    assert split_sentences(text) == [
+        "Dr. Smith met the U.S. envoy on Monday.",
+        "They discussed trade.",
+        "Was it useful?",
+    ]
+
+
+@pytest.mark.unit
+def test_sentence_window_overlaps_neighbouring_chunks():
+    text = " ".join(f"Sentence number {i}." for i in range(1, 8))
+    chunks = SentenceWindowChunkingStrategy(sentences_per_chunk=3, overlap=1).chunk(text)
+
+    assert chunks[0] == "Sentence number 1. Sentence number 2. Sentence number 3."
+    assert chunks[1].startswith("Sentence number 3.")
+    # La última ventana llega hasta el final del texto sin repetir ventanas.
+    assert chunks[-1].endswith("Sentence number 7.")
+    assert len(chunks) == 3
+
+
+@pytest.mark.unit
+def test_recursive_respects_max_tokens():
+    paragraph = " ".join(f"Word{i} appears in this sentence." for i in range(60))
+    text = "\n\n".join([paragraph, paragraph])
+    strategy = RecursiveChunkingStrategy(max_tokens=50, overlap_tokens=5)
+    chunks = strategy.chunk(text)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 50 + 5 for c in chunks)
+    # El solapamiento repite las últimas palabras del chunk anterior.
+    assert chunks[1].split()[:5] == chunks[0].split()[-5:]
+
+
+@pytest.mark.unit
+def test_heading_aware_does_not_mix_sections():
+    text = (
+        "Abstract\nWe study chunking of papers.\n"
+        "1. Introduction\nChunks should not span sections.\n"
+        "2. Results\nSection-aligned chunks retrieve better."
+    )
+    chunks = HeadingAwareChunkingStrategy(max_tokens=50).chunk(text)
+
+    assert chunks == [
+        "Abstract\nWe study chunking of papers.",
+        "1. Introduction\nChunks should not span sections.",
+        "2. Results\nSection-aligned chunks retrieve better.",
+    ]
+
+
+@pytest.mark.unit
+def test_document_chunker_selects_strategy_by_source_and_length():
+    chunker = DocumentChunker(
+        NamedStrategy("default"),
+        source_strategies={"core": NamedStrategy("papers")},
+        length_strategies=[(100, NamedStrategy("short"))],
+    )
+
+    def article(source, content):
+        return Article(title="t", url="https://example.com", content=content, source=source)
+
+    assert chunker.chunk(article("core", "short text")) == ["papers"]
+    assert chunker.chunk(article("newsapi", "short text")) == ["short"]
+    assert chunker.chunk(article("newsapi", "x" * 500)) == ["default"]
@@ -0,0 +1,77 @@
+import os
+import re
+import time
+import pytest
+from cleaning.cleaner import Cleaner
+from cleaning.profiles import (
+    LEGACY_PROFILE,
+    NEWS_PROFILE,
+    PAPER_PROFILE,
+    CompiledTable,
+    build_translate_table,
+    normalize,
+)
+
+SPANISH = "La economía española creció un 2,5 % según el Banco de España — informó José Pérez."
+
+
+@pytest.mark.unit
+def test_unicode_text_is_preserved():
+    assert Cleaner(NEWS_PROFILE).clean(SPANISH) == (
+        "La economía española creció un 2,5 % según el Banco de España - informó José Pérez."
+    )
+
+
+@pytest.mark.unit
+def test_equivalent_texts_clean_to_the_same_string():
+    typographic = "“Fin­al” ﬁgures — 100 €​"
+    plain = '"Final" figures - 100 €'
+    cleaner = Cleaner(NEWS_PROFILE)
+
+    assert cleaner.clean(typographic) == cleaner.clean(plain) == plain
+
+
+@pytest.mark.unit
+def test_control_characters_are_removed_but_newlines_survive_normalization():
+    table = build_translate_table(NEWS_PROFILE)
+    text = "a\x00b\x1bc\nd\te “x”"
+    assert normalize(text, NEWS_PROFILE, CompiledTable(table)) == "abc\nd\te \"x\""
+    # La tabla compilada equivale a str.translate.
+    assert CompiledTable(table).translate(text) == text.translate(table)
+
+
+@pytest.mark.unit
+def test_profiles_are_selected_per_source():
+    text = "Resultados previos [12] confirman la hipótesis."
+    cleaner = Cleaner()
+
+    # Los artículos de CORE usan el perfil de papers, que elimina citas.
+    assert cleaner.clean(text, source="core") == "Resultados previos confirman la hipótesis."
+    assert cleaner.clean(text, source="newsapi") == text
+
+
+@pytest.mark.unit
+def test_legacy_profile_keeps_ascii_only_behaviour():
+    assert Cleaner(LEGACY_PROFILE).clean("Café con leche") == "Caf con leche"
+
+
+@pytest.mark.benchmark
+def test_unicode_pass_is_not_slower_than_the_legacy_regex():
+    # Texto real en español (con tildes y algún signo tipográfico), repetido.
+    path = os.path.join(os.path.dirname(__file__), "data", "articles", "1-long_article.txt")
+    with open(path, "r", encoding="utf-8") as f:
+        text = (f.read() + " \u201cquoted\u201d - ") * 200
+    table = CompiledTable(build_translate_table(PAPER_PROFILE))
+    non_ascii = re.compile(r"[^\x00-\x7F]+")
+
+    def best_of(fn, repeats=5):
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    legacy = best_of(lambda: non_ascii.sub(" ", text))
+    unicode_pass = best_of(lambda: normalize(text, PAPER_PROFILE, table))
+    assert unicode_pass <= legacy, f"unicode {unicode_pass:.4f}s vs legacy {legacy:.4f}s"
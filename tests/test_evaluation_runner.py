@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from chunking.strategies.strategy_i import ChunkingStrategy
+from services.evaluation_client import ChunkingEvaluator
+from services.evaluation_runner import BatchEvaluationRunner, FakeLLM, VerdictCache
+
+
+class CountingLLM(FakeLLM):
+    """LLM falso que cuenta llamadas y la concurrencia máxima observada."""
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return super().invoke(prompt)
+
+
+class SentenceStrategy(ChunkingStrategy):
+    def chunk(self, text):
+        return [s.strip() + "." for s in text.split(".") if s.strip()]
+
+
+class WholeDocumentStrategy(ChunkingStrategy):
+    def chunk(self, text):
+        return [text]
+
+
+@pytest.mark.unit
+def test_fake_llm_is_deterministic():
+    evaluator = ChunkingEvaluator(llm=FakeLLM(), model_name="fake-llm")
+    chunks = ["a" * 300, "b" * 50]
+    assert evaluator.evaluate_chunks(chunks) == evaluator.evaluate_chunks(chunks)
+    assert evaluator.evaluate_chunks(chunks)["score"] == 5
+
+
+@pytest.mark.unit
+def test_runner_bounds_concurrency_and_caches_verdicts():
+    llm = CountingLLM(delay=0.02)
+    runner = BatchEvaluationRunner(ChunkingEvaluator(llm=llm, model_name="fake-llm"), max_concurrency=3)
+    documents = {f"doc-{i}": [f"chunk {i}"] for i in range(12)}
+
+    verdicts, stats = runner.evaluate_documents(documents)
+    assert len(verdicts) == 12
+    assert stats.llm_calls == 12
+    assert llm.max_active <= 3
+
+    _, stats = runner.evaluate_documents(documents)
+    assert stats.llm_calls == 0
+    assert stats.cache_hits == 12
+    assert llm.calls == 12
+
+
+@pytest.mark.unit
+def test_cache_key_depends_on_model():
+    assert VerdictCache.key("a", ["x"]) != VerdictCache.key("b", ["x"])
+    assert VerdictCache.key("a", ["x", "y"]) != VerdictCache.key("a", ["xy"])
+
+
+@pytest.mark.unit
+def test_compare_strategies_ranks_by_mean_score():
+    runner = BatchEvaluationRunner(ChunkingEvaluator(llm=FakeLLM(ideal_min_chars=20, ideal_max_chars=40), model_name="fake-llm"))
+    documents = {"doc": "Primera frase bastante larga. Segunda frase también larga."}
+
+    results = runner.compare_strategies(
+        {"sentences": SentenceStrategy(), "whole": WholeDocumentStrategy()}, documents
+    )
+    assert [r.strategy for r in results] == ["sentences", "whole"]
+    assert results[0].mean_score == 10 and results[1].mean_score == 1
+    assert all(r.evaluation.llm_calls == 1 for r in results)
+    assert all(r.cost_usd > 0 for r in results)
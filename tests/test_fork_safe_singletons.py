@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+import pytest
+from database.manager import DatabaseManager
+from services.ai_clients import AIClientsSingleton
+
+
+def _run_concurrently(target, threads=8):
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(target())
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return results
+
+
+@pytest.fixture
+def fresh_singletons(monkeypatch):
+    monkeypatch.setattr(AIClientsSingleton, "_instance", None)
+    monkeypatch.setattr(DatabaseManager, "_instance", None)
+
+
+@pytest.mark.unit
+def test_ai_clients_singleton_is_built_once_under_concurrency(fresh_singletons, monkeypatch):
+    calls = []
+
+    def slow_create(cls):
+        calls.append(1)
+        time.sleep(0.05)
+        return object.__new__(cls)
+
+    monkeypatch.setattr(AIClientsSingleton, "_create", classmethod(slow_create))
+    instances = _run_concurrently(AIClientsSingleton)
+
+    assert len(calls) == 1
+    assert all(i is instances[0] for i in instances)
+
+
+@pytest.mark.unit
+def test_database_engine_is_initialized_once_under_concurrency(fresh_singletons, monkeypatch):
+    calls = []
+
+    def slow_initialize(self):
+        calls.append(1)
+        time.sleep(0.05)
+        self._session_factory = object()
+        self._engine = object()
+
+    monkeypatch.setattr(DatabaseManager, "_initialize", slow_initialize)
+    engines = _run_concurrently(lambda: DatabaseManager().engine)
+
+    assert len(calls) == 1
+    assert all(e is engines[0] for e in engines)
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_rebuilds_clients_and_drops_pooled_connections(fresh_singletons, monkeypatch):
+    class FakeEngine:
+        disposed_with = None
+
+        def dispose(self, close=True):
+            FakeEngine.disposed_with = close
+
+    monkeypatch.setattr(AIClientsSingleton, "_create", classmethod(lambda cls: object.__new__(cls)))
+    AIClientsSingleton()
+    db = DatabaseManager()
+    db._engine = FakeEngine()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Proceso hijo: comprueba el estado tras el fork y sale sin pasar por pytest.
+        ok = AIClientsSingleton._instance is None and FakeEngine.disposed_with is False
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+
+    assert result == b"1"
+    # El padre conserva sus clientes y conexiones.
+    assert AIClientsSingleton._instance is not None
+    assert FakeEngine.disposed_with is None
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import pytest
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for `import app.main`, in milliseconds. Override with IMPORT_TIME_BUDGET_MS.
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# SDKs that must only be imported when a request (or the readiness probe) needs them.
+LAZY_MODULES = [
+    "langchain_experimental",
+    "langchain_google_vertexai",
+    "google.cloud.aiplatform",
+    "eventregistry",
+    "perigon",
+]
+
+
+def _profile_import(module: str):
+    """Imports `module` in a fresh interpreter with -X importtime and parses the report."""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if parts[2] == module:
+            cumulative_us = int(parts[1])
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, loaded
+
+
+@pytest.mark.unit
+def test_app_import_does_not_load_heavy_sdks():
+    """
+    Importar app.main no debe cargar los SDKs de proveedores ni de Vertex AI.
+    """
+    _, loaded = _profile_import("app.main")
+    assert loaded == [], f"Eagerly imported at startup: {loaded}"
+
+
+@pytest.mark.unit
+@pytest.mark.benchmark
+def test_app_import_time_within_budget():
+    """
+    Verifica que el tiempo de importación de app.main se mantiene dentro del presupuesto.
+    """
+    # Warm the filesystem cache so the measurement reflects import work, not disk I/O.
+    _profile_import("app.main")
+    elapsed_ms, _ = _profile_import("app.main")
+    print(f"\n⏱️ import app.main: {elapsed_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS} ms)")
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import random
+import pytest
+from ingestion.scheduler import ProviderScheduler
+from scripts.load_testing.stand_ins import (
+    FakeEmbeddings,
+    FakeIngestionService,
+    FakeProvider,
+    FakeProviderFactory,
+    FakeVectorStore,
+    parse_latency,
+)
+from scripts.load_testing.workload import (
+    RequestSpec,
+    endpoints_without_stand_ins,
+    load_request_log,
+    run_load,
+    stand_ins,
+    summarize,
+    zipf_workload,
+)
+from uses_cases.search_service import SearchService
+
+
+@pytest.mark.unit
+def test_latency_specs_are_in_milliseconds():
+    rng = random.Random(1)
+    assert parse_latency("0") is None and parse_latency(None) is None
+    assert parse_latency("fixed:250")() == 0.25
+    assert 0.01 <= parse_latency("uniform:10,20", rng)() <= 0.02
+    draws = sorted(parse_latency("lognormal:40,0.5", rng)() for _ in range(2001))
+    assert draws[1000] == pytest.approx(0.04, rel=0.1)
+    with pytest.raises(ValueError):
+        parse_latency("gamma:3")
+
+
+@pytest.mark.unit
+def test_zipf_mix_favours_the_first_queries():
+    queries = [f"q{i}" for i in range(100)]
+    requests = zipf_workload(2000, qps=100, queries=queries, search_share=0.9, sources=["core"], seed=3)
+
+    counts = {}
+    for r in requests:
+        counts[r.params["q"]] = counts.get(r.params["q"], 0) + 1
+    assert counts["q0"] > 5 * counts.get("q50", 1)
+    assert 0.85 < sum(r.path == "/api/v1/search" for r in requests) / len(requests) < 0.95
+    assert all(r.path in ("/api/v1/search", "/api/v1/articles/core") for r in requests)
+    # Llegadas de Poisson a ~100 req/s.
+    assert requests[-1].at == pytest.approx(20, rel=0.15)
+
+
+@pytest.mark.unit
+def test_request_log_times_are_relative_to_the_first_entry(tmp_path):
+    log = tmp_path / "traffic.jsonl"
+    log.write_text("\n".join(json.dumps(e) for e in [
+        {"timestamp": "2026-10-01T10:00:02Z", "path": "/api/v1/articles/core?q=clima"},
+        {"timestamp": "2026-10-01T10:00:00Z", "path": "/api/v1/search", "params": {"q": "elecciones"}},
+        {"timestamp": "2026-10-01T10:00:05Z", "method": "post", "url": "/api/v1/articles:batch", "body": "{}"},
+    ]) + "\n\n", encoding="utf-8")
+
+    requests = load_request_log(str(log))
+
+    assert [(r.at, r.method, r.path) for r in requests] == [
+        (0.0, "GET", "/api/v1/search"), (2.0, "GET", "/api/v1/articles/core"), (5.0, "POST", "/api/v1/articles:batch"),
+    ]
+    assert requests[1].params == {"q": "clima"} and requests[2].body == "{}"
+    assert [r.at for r in load_request_log(str(log), qps=2)] == [0.0, 0.5, 1.0]
+
+
+@pytest.mark.unit
+def test_report_percentiles_errors_and_slos():
+    samples = {"GET /api/v1/search": [(200, i / 1000) for i in range(1, 100)] + [(503, 0.001)]}
+    report = summarize(samples, duration=2.0)
+    [search] = report.endpoints
+
+    assert search.requests == 100 and search.errors == 1 and search.throughput == 50
+    assert search.p50_ms == pytest.approx(49.5) and search.p99_ms > 97
+    assert report.check_slos(["search:p50<=100", "search:error_rate<=0.01"]) == []
+    assert len(report.check_slos(["search:p95<=10", "trending:p99<=10"])) == 2
+    with pytest.raises(ValueError):
+        report.check_slos(["search:p42<10"])
+
+
+@pytest.mark.unit
+def test_load_run_against_the_app_with_stand_ins():
+    from app import main as api
+
+    embeddings = FakeEmbeddings(dimensions=16)
+    search = SearchService(FakeVectorStore(embeddings, corpus_size=50))
+    scheduler = ProviderScheduler(
+        FakeProviderFactory({"core": FakeProvider("core", articles_per_fetch=3)}),
+        rate_limits={"core": (1000, 1, 1000)},
+    )
+    requests = [RequestSpec(i * 0.002, "GET", "/api/v1/search", {"q": f"consulta {i % 3}"}) for i in range(30)]
+    requests += [
+        # Después de las búsquedas: con búsquedas en cola la ingesta se rechaza (503).
+        RequestSpec(0.3, "GET", "/api/v1/articles/core", {"q": "clima"}),
+        RequestSpec(0.35, "GET", "/api/v1/articles/desconocida", {"q": "clima"}),
+        # Sin sustituto: falla en vez de llegar a la base de datos real.
+        RequestSpec(0.4, "GET", "/api/v1/trending"),
+    ]
+    assert endpoints_without_stand_ins(api.app, requests) == ["GET /api/v1/trending"]
+
+    with stand_ins(api, search, FakeIngestionService(scheduler, embeddings)):
+        report = asyncio.run(run_load(api.app, requests))
+
+    stats = {s.endpoint: s for s in report.endpoints}
+    assert stats["GET /api/v1/search"].statuses == {"200": 30}
+    # Una fuente desconocida es un 400: aparece por estado pero no como error.
+    assert stats["GET /api/v1/articles/{source}"].statuses == {"200": 1, "400": 1}
+    assert stats["GET /api/v1/articles/{source}"].errors == 0
+    assert stats["GET /api/v1/trending"].statuses == {"500": 1}
+    # Al salir se restauran los getters reales.
+    assert all(hasattr(getattr(api, name), "cache_clear") for name in (
+        "get_search_service", "get_article_service", "get_trending_service", "get_push_service",
+    ))
@@ -0,0 +1,149 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+import storage.pgvector_store as pgvector_store_module
+from storage.backends import build_vector_store
+from storage.pgvector_store import (
+    PgVectorStore,
+    build_candidate_sql,
+    build_search_sql,
+    parse_vector,
+    schema_statements,
+    to_vector_literal,
+)
+from storage.query_batcher import QueryBatcher
+from storage.search_filters import SearchFilters
+
+
+@pytest.mark.unit
+def test_vector_literal_round_trip():
+    literal = to_vector_literal([0.5, -1, 2.25])
+    assert literal == "[0.5,-1.0,2.25]"
+    assert parse_vector(literal) == [0.5, -1.0, 2.25]
+    assert parse_vector(None) is None
+
+
+@pytest.mark.unit
+def test_search_sql_filters_inside_the_scan():
+    filters = SearchFilters(
+        sources=["core"],
+        languages=["es"],
+        published_after=datetime(2026, 1, 1, 3, tzinfo=timezone.utc),
+    )
+    sql, params = build_search_sql(filters)
+
+    # Los filtros van en el CTE que recorre el índice, antes del LIMIT.
+    nearest = sql.split("best AS")[0]
+    assert "a.source = ANY(:filter_sources)" in nearest
+    assert "a.language = ANY(:filter_languages)" in nearest
+    assert "a.published_at >= :filter_after" in nearest
+    assert "DISTINCT ON (article_id)" in sql
+    assert "best.vector" not in sql
+    assert params == {
+        "filter_sources": ["core"],
+        "filter_languages": ["es"],
+        # published_at se guarda como UTC sin zona horaria.
+        "filter_after": datetime(2026, 1, 1, 3),
+    }
+
+
+@pytest.mark.unit
+def test_search_sql_without_filters_and_with_vectors():
+    sql, params = build_search_sql(None, with_vectors=True)
+    assert "WHERE" not in sql
+    assert params == {}
+    assert "e.embedding::text AS vector" in sql
+    assert "best.vector" in sql
+
+
+@pytest.mark.unit
+def test_candidate_sql_returns_filtered_chunk_ids():
+    sql, params = build_candidate_sql(SearchFilters(languages=["es"]), table="chunk_embeddings_c256")
+    assert "SELECT e.datapoint_id" in sql and "FROM chunk_embeddings_c256 e" in sql
+    assert "a.language = ANY(:filter_languages)" in sql
+    assert params == {"filter_languages": ["es"]}
+    with pytest.raises(ValueError):
+        build_candidate_sql(None, table="chunks; DROP TABLE articles")
+
+
+@pytest.mark.unit
+def test_schema_statements_choose_the_index_type():
+    assert "USING hnsw" in schema_statements(768)[-1]
+    assert "lists = 50" in schema_statements(768, "ivfflat", 50)[-1]
+    assert "vector(768)" in schema_statements(768)[1]
+    with pytest.raises(ValueError):
+        schema_statements(768, "flat")
+
+
+@pytest.mark.unit
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        build_vector_store("faiss")
+
+
+@pytest.mark.unit
+def test_search_returns_hydrated_rows_in_distance_order(monkeypatch):
+    monkeypatch.setenv("RERANK_ENABLED", "false")
+    monkeypatch.setenv("SEARCH_BATCH_WINDOW_MS", "0")
+    # Sin clientes de Vertex: solo se prueba el camino de búsqueda.
+    store = PgVectorStore.__new__(PgVectorStore)
+    store._init_search()
+
+    def row(aid, distance):
+        return {
+            "id": aid, "title": f"t{aid}", "url": None, "published_at": None,
+            "content_preview": "", "source": "core", "language": "es", "distance": distance,
+        }
+
+    calls = []
+
+    def find_neighbors(vectors, k, filters):
+        calls.append(k)
+        return [[row(7, 0.1), row(3, 0.2), row(9, 0.4)] for _ in vectors]
+
+    store.query_batcher = QueryBatcher(lambda queries: [[0.0] for _ in queries], find_neighbors, window=0)
+    response = store.search_similar("consulta", k=2)
+
+    assert calls == [2]
+    assert [r["id"] for r in response["results"]] == [7, 3]
+    assert response["results"][0]["distance"] == 0.1
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return SimpleNamespace(mappings=lambda: [], scalars=lambda: [])
+
+
+@pytest.mark.unit
+def test_scan_settings_cover_the_limit_and_filtered_queries(monkeypatch):
+    conn = RecordingConnection()
+    monkeypatch.setattr(
+        pgvector_store_module, "DatabaseManager", lambda: SimpleNamespace(engine=SimpleNamespace(begin=lambda: conn))
+    )
+    store = PgVectorStore.__new__(PgVectorStore)
+    store.index = SimpleNamespace(table="chunk_embeddings", ensure_schema=lambda: None)
+    store.coarse_dimensions = 0
+    store.reranker = None
+    store.chunks_per_article = 4
+    store.ef_search = "64"
+    store.iterative_scan = "relaxed_order"
+
+    # 30 artículos x 4 fragmentos superan el ef_search configurado: se amplía al LIMIT.
+    store._find_neighbors([[0.1, 0.2]], 30, None)
+    assert [s for s in conn.statements if s.startswith("SET")] == ["SET LOCAL hnsw.ef_search = 120"]
+
+    conn.statements.clear()
+    store._coarse_candidates([[0.1, 0.2]], 5, SearchFilters(sources=["core"]))
+    assert [s for s in conn.statements if s.startswith("SET")] == [
+        "SET LOCAL hnsw.ef_search = 64", "SET LOCAL hnsw.iterative_scan = relaxed_order",
+    ]
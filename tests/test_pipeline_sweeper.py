@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.manager import DatabaseManager
+from database.models import ArticleModel, Base
+from storage.upsert_writer import UpsertReport
+from uses_cases.pipeline_sweeper import PipelineSweeper
+
+
+class FakeDB:
+    """Artículos incompletos en memoria, con las mismas reglas que la consulta real."""
+
+    def __init__(self, rows):
+        self.rows = {row.id: row for row in rows}
+        self.busy = set()
+
+    def get_incomplete_articles(self, limit, after_id=0, max_attempts=5, idle_seconds=300):
+        return [
+            row for aid, row in sorted(self.rows.items())
+            if aid > after_id and row.status != "indexed" and row.content is not None
+            and row.attempts < max_attempts
+        ][:limit]
+
+    def claim_idle_articles(self, ids, idle_seconds=300):
+        return {aid for aid in ids if aid not in self.busy}
+
+    def mark_failed(self, errors):
+        for aid, error in errors.items():
+            self.rows[aid].attempts += 1
+            self.rows[aid].last_error = error
+
+    def get_contents(self, ids):
+        return {aid: self.rows[aid].content for aid in ids if self.rows[aid].content is not None}
+
+
+class FlakyIngestion:
+    """Falla la indexación de los IDs de `failing`; el resto queda indexado."""
+
+    def __init__(self, db, failing=()):
+        self.db = db
+        self.failing = set(failing)
+        self.batches = []
+
+    def index_articles(self, id_to_article):
+        self.batches.append({aid: a.content for aid, a in id_to_article.items()})
+        report = UpsertReport()
+        for aid in id_to_article:
+            if aid in self.failing:
+                report.failed_articles[aid] = "embedding: error"
+            else:
+                report.indexed_articles.add(aid)
+                self.db.rows[aid].status = "indexed"
+        self.db.mark_failed(dict(report.failed_articles))
+        return report
+
+
+def row(aid, status="chunked", content="texto"):
+    return SimpleNamespace(
+        id=aid, status=status, attempts=0, last_error=None, content=content, title=f"t{aid}",
+        url=None, published_at=None, content_preview="", source="core", language="es",
+    )
+
+
+def make_sweeper(db, ingestion, **kwargs):
+    sweeper = PipelineSweeper(ingestion, **kwargs)
+    sweeper.db_manager = db
+    return sweeper
+
+
+@pytest.mark.unit
+def test_sweeper_redrives_stored_content_and_pages_through_the_backlog():
+    db = FakeDB([row(1, status="cleaned", content="uno"), row(2), row(3), row(4, content=None)])
+    ingestion = FlakyIngestion(db)
+
+    stats = make_sweeper(db, ingestion, batch_size=2).run_once()
+
+    assert stats == {"redriven": 3, "indexed": 3, "failed": 0}
+    assert ingestion.batches == [{1: "uno", 2: "texto"}, {3: "texto"}]
+    # Sin contenido guardado no hay nada que reanudar.
+    assert [r.id for r in db.rows.values() if r.status != "indexed"] == [4]
+
+
+@pytest.mark.unit
+def test_sweeper_gives_up_after_max_attempts_and_skips_claimed_articles():
+    db = FakeDB([row(1), row(2), row(3)])
+    db.busy.add(3)
+    ingestion = FlakyIngestion(db, failing={1})
+    sweeper = make_sweeper(db, ingestion, max_attempts=2)
+
+    first = sweeper.run_once()
+    second = sweeper.run_once()
+    third = sweeper.run_once()
+
+    assert first == {"redriven": 2, "indexed": 1, "failed": 1}
+    assert second == {"redriven": 1, "indexed": 0, "failed": 1}
+    # Tras dos fallos el artículo 1 se abandona; el 3 lo está procesando otra ejecución.
+    assert third == {"redriven": 0, "indexed": 0, "failed": 0}
+    assert db.rows[1].attempts == 2 and db.rows[1].last_error == "embedding: error"
+    assert db.rows[3].status == "chunked"
+
+
+@pytest.mark.unit
+def test_mark_stage_only_moves_articles_forward():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    manager = object.__new__(DatabaseManager)
+    manager._engine = engine
+    manager._session_factory = sessionmaker(bind=engine)
+
+    with manager.SessionLocal() as db:
+        db.add_all([
+            ArticleModel(id=1, title="a", status="chunked", last_error="fallo"),
+            ArticleModel(id=2, title="b", status="indexed"),
+        ])
+        db.commit()
+
+    manager.mark_stage([1, 2], "embedded")
+    with manager.SessionLocal() as db:
+        statuses = {a.id: (a.status, a.last_error) for a in db.query(ArticleModel).order_by(ArticleModel.id)}
+    # El artículo ya indexado no vuelve a 'embedded'.
+    assert statuses == {1: ("embedded", None), 2: ("indexed", None)}
+
+    manager.mark_stage([1], "indexed")
+    with manager.SessionLocal() as db:
+        indexed = db.get(ArticleModel, 1)
+        assert indexed.status == "indexed" and indexed.indexed_at is not None
+    with pytest.raises(ValueError):
+        manager.mark_stage([1], "publicado")
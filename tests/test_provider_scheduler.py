@@ -0,0 +1,244 @@
+import threading
+import time
+import pytest
+from ingestion.providers.provider_i import NewsProvider, ProviderError, ProviderRateLimitError
+from ingestion.scheduler import (
+    CircuitBreaker,
+    ProviderScheduler,
+    ProviderUnavailableError,
+    TokenBucket,
+    parse_rate_limits,
+    share_rate_limits,
+)
+
+
+class FakeClock:
+    """Reloj manual: `sleep` avanza el tiempo en lugar de bloquear."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedProvider(NewsProvider):
+    """Proveedor falso que devuelve (o lanza) las respuestas en orden."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def fetch_articles(self, query):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeFactory:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def get_provider(self, source):
+        return self.provider
+
+
+def make_scheduler(provider, clock, **kwargs):
+    return ProviderScheduler(
+        factory=FakeFactory(provider),
+        rate_limits={"fake": (1, 1, 1)},
+        sleep=clock.sleep,
+        clock=clock,
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    assert bucket.acquire() is True
+    assert clock.now == pytest.approx(0.5)
+
+
+@pytest.mark.unit
+def test_token_bucket_pause_blocks_until_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+    bucket.pause(30)
+
+    assert bucket.acquire(timeout=10) is False
+    assert bucket.acquire() is True
+    assert clock.now >= 30
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()  # trial call
+    assert not breaker.allow()  # only one trial while half-open
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.unit
+def test_scheduler_honours_retry_after():
+    clock = FakeClock()
+    provider = ScriptedProvider([ProviderRateLimitError("429", retry_after=7), ["ok"]])
+    scheduler = make_scheduler(provider, clock)
+
+    assert scheduler.fetch("fake", "q") == ["ok"]
+    assert provider.calls == 2
+    assert clock.now >= 7
+
+
+class CachingProvider(ScriptedProvider):
+    """Guarda cada respuesta como haría la caché de respuestas de los adaptadores."""
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.cache = {}
+
+    def peek_articles(self, query):
+        return self.cache.get(query)
+
+    def fetch_articles(self, query):
+        self.cache[query] = super().fetch_articles(query)
+        return self.cache[query]
+
+
+@pytest.mark.unit
+def test_cache_hits_do_not_take_a_token():
+    clock = FakeClock()
+    provider = CachingProvider([["ok"], ["otra"]])
+    scheduler = make_scheduler(provider, clock, acquire_timeout=0)
+
+    assert scheduler.fetch("fake", "q") == ["ok"]
+    # El cubo (1 petición/s, ráfaga 1) está vacío, pero la respuesta en caché no lo necesita.
+    assert scheduler.fetch("fake", "q") == ["ok"]
+    assert scheduler.bucket("fake").wait_time() > 0
+    with pytest.raises(ProviderRateLimitError):
+        scheduler.fetch("fake", "otra")
+    assert provider.calls == 1
+
+
+@pytest.mark.unit
+def test_scheduler_does_not_retry_permanent_errors():
+    clock = FakeClock()
+    provider = ScriptedProvider([ProviderError("bad key", retryable=False)])
+    scheduler = make_scheduler(provider, clock)
+
+    with pytest.raises(ProviderError):
+        scheduler.fetch("fake", "q")
+    assert provider.calls == 1
+
+
+@pytest.mark.unit
+def test_scheduler_opens_circuit_after_repeated_failures():
+    clock = FakeClock()
+    provider = ScriptedProvider([ProviderError("503")] * 10)
+    scheduler = make_scheduler(provider, clock, max_attempts=3, failure_threshold=3)
+
+    with pytest.raises(ProviderError):
+        scheduler.fetch("fake", "q")
+    with pytest.raises(ProviderUnavailableError):
+        scheduler.fetch("fake", "q")
+    assert provider.calls == 3
+
+
+@pytest.mark.unit
+def test_trial_call_failing_with_another_error_reopens_the_circuit():
+    clock = FakeClock()
+    provider = ScriptedProvider([ProviderError("503")] * 3 + [ValueError("JSON inválido"), ["ok"]])
+    scheduler = make_scheduler(provider, clock, max_attempts=3, failure_threshold=3, reset_timeout=60)
+
+    with pytest.raises(ProviderError):
+        scheduler.fetch("fake", "q")
+    clock.now += 61
+    with pytest.raises(ValueError):
+        scheduler.fetch("fake", "q")
+
+    # La llamada de prueba fallida vuelve a abrir el circuito en vez de dejarlo semiabierto.
+    breaker = scheduler.breaker("fake")
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 61
+    assert scheduler.fetch("fake", "q") == ["ok"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.unit
+def test_scheduler_coalesces_identical_concurrent_fetches():
+    release = threading.Event()
+    started = threading.Event()
+
+    class SlowProvider(NewsProvider):
+        calls = 0
+
+        def fetch_articles(self, query):
+            SlowProvider.calls += 1
+            started.set()
+            release.wait(timeout=5)
+            return ["shared"]
+
+    scheduler = ProviderScheduler(factory=FakeFactory(SlowProvider()), rate_limits={"fake": (100, 1, 100)})
+    results = []
+
+    def fetch():
+        results.append(scheduler.fetch("fake", "q"))
+
+    leader = threading.Thread(target=fetch)
+    leader.start()
+    started.wait(timeout=5)
+    followers = [threading.Thread(target=fetch) for _ in range(3)]
+    for t in followers:
+        t.start()
+    time.sleep(0.2)  # deja que los seguidores se unan al fetch en curso
+    release.set()
+    for t in [leader, *followers]:
+        t.join(timeout=5)
+
+    assert SlowProvider.calls == 1
+    assert results == [["shared"]] * 4
+
+
+@pytest.mark.unit
+def test_parse_rate_limits_overrides_defaults():
+    limits = parse_rate_limits("core=20/60:4, newsapi=500/86400")
+    assert limits["core"] == (20, 60.0, 4)
+    assert limits["newsapi"] == (500, 86400.0, 1)
+    assert "perigon" in limits
+
+
+@pytest.mark.unit
+def test_rate_limits_are_shared_between_worker_processes(monkeypatch):
+    limits = {"core": (10, 60.0, 2), "newsapi": (100, 86400.0, 5)}
+
+    shared = share_rate_limits(limits, 4)
+
+    # Cada proceso recibe una cuarta parte del ritmo, sin redondear a cero.
+    assert shared == {"core": (10, 240.0, 1), "newsapi": (100, 345600.0, 1)}
+    assert share_rate_limits(limits, 1) == limits
+
+    monkeypatch.setenv("PROVIDER_RATE_LIMITS", "core=10/60:2")
+    monkeypatch.setenv("PROVIDER_RATE_LIMIT_SHARES", "4")
+    assert ProviderScheduler(factory=object()).rate_limits["core"] == (10, 240.0, 1)
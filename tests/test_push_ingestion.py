@@ -0,0 +1,147 @@
+import asyncio
+import gzip
+import json
+import pytest
+from ingestion.ndjson_stream import NDJSONArticleDecoder, RecordError, StreamError
+from uses_cases.article_ingestion import IngestionResult, RecordOutcome
+from uses_cases.push_ingestion import PushIngestionService
+
+
+def record(i):
+    return {"title": f"Titular {i}", "content": f"Contenido del artículo {i}.", "url": f"https://example.com/{i}"}
+
+
+def ndjson(records):
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records).encode("utf-8")
+
+
+def pieces(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def decode(chunks, **kwargs):
+    decoder = NDJSONArticleDecoder(**kwargs)
+    records = []
+    for chunk in chunks:
+        records.extend(decoder.feed(chunk))
+    return records + decoder.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compress", [False, True])
+def test_records_split_across_chunks_are_decoded_in_order(compress):
+    data = ndjson([record(1), "", "no es json", record(2), {"title": "sin contenido"}])
+    if compress:
+        data = gzip.compress(data)
+
+    records = decode(pieces(data, 7))
+
+    assert [line for line, _ in records] == [1, 3, 4, 5]
+    assert records[0][1].title == "Titular 1" and records[2][1].title == "Titular 2"
+    assert isinstance(records[1][1], RecordError) and isinstance(records[3][1], RecordError)
+
+
+@pytest.mark.unit
+def test_concatenated_gzip_members_are_one_stream():
+    data = gzip.compress(ndjson([record(1), record(2)])) + gzip.compress(ndjson([record(3)]))
+
+    for size in (5, len(data)):
+        records = decode(pieces(data, size))
+        assert [(line, r.title) for line, r in records] == [(1, "Titular 1"), (2, "Titular 2"), (3, "Titular 3")]
+    # Un segundo miembro cortado también es un flujo truncado.
+    with pytest.raises(StreamError):
+        decode([data[:-10]])
+
+
+@pytest.mark.unit
+def test_oversized_and_truncated_streams_are_rejected():
+    with pytest.raises(StreamError):
+        decode([b'{"title": "' + b"x" * 100], max_line_bytes=50)
+    with pytest.raises(StreamError):
+        decode([gzip.compress(ndjson([record(1)]))[:-10]])
+
+
+class FakeIngestion:
+    """Marca como duplicado todo titular ya visto; el resto se indexa."""
+
+    def __init__(self):
+        self.batches = []
+        self.seen = set()
+
+    def ingest_fetched(self, source, articles):
+        self.batches.append([a.title for a in articles])
+        outcomes = []
+        for a in articles:
+            if a.title in self.seen:
+                outcomes.append(RecordOutcome(status="duplicate"))
+            else:
+                self.seen.add(a.title)
+                outcomes.append(RecordOutcome(status="indexed", id=len(self.seen)))
+        return IngestionResult(message="", outcomes=outcomes)
+
+
+async def body(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.unit
+def test_pushed_stream_is_ingested_in_batches_with_per_line_results():
+    ingestion = FakeIngestion()
+    service = PushIngestionService(ingestion, batch_size=2)
+    data = gzip.compress(ndjson([record(1), record(2), "{roto", record(3), record(1)]))
+
+    report = asyncio.run(service.ingest_stream(body(pieces(data, 16)), "crawler"))
+
+    assert ingestion.batches == [["Titular 1", "Titular 2"], ["Titular 3", "Titular 1"]]
+    assert (report.received, report.indexed, report.duplicate, report.failed) == (5, 3, 1, 1)
+    assert [(r.line, r.status) for r in report.results] == [
+        (1, "indexed"), (2, "indexed"), (3, "failed"), (4, "indexed"), (5, "duplicate"),
+    ]
+    assert report.error is None
+
+
+@pytest.mark.unit
+def test_records_before_a_malformed_point_are_still_ingested():
+    ingestion = FakeIngestion()
+    service = PushIngestionService(ingestion, batch_size=10, max_line_bytes=200)
+    data = ndjson([record(1)]) + b"x" * 500
+
+    report = asyncio.run(service.ingest_stream(body(pieces(data, 64)), "crawler"))
+
+    assert ingestion.batches == [["Titular 1"]]
+    assert report.indexed == 1 and "longer than" in report.error
+
+
+@pytest.mark.unit
+def test_pushed_batches_run_on_the_ingest_gate_threads_with_a_deadline(monkeypatch):
+    import httpx
+    from app import main as api
+    from services.deadlines import remaining
+
+    seen = []
+
+    class RecordingIngestion(FakeIngestion):
+        def ingest_fetched(self, source, articles):
+            seen.append((api.get_ingest_gate()._threads.borrowed_tokens, remaining()))
+            return super().ingest_fetched(source, articles)
+
+    monkeypatch.setattr(api, "get_push_service", lambda: PushIngestionService(RecordingIngestion(), batch_size=1))
+    api.get_search_gate.cache_clear()
+    api.get_ingest_gate.cache_clear()
+
+    async def push():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/articles:batch", content=ndjson([record(1), record(2)]))
+
+    try:
+        response = asyncio.run(push())
+    finally:
+        api.get_search_gate.cache_clear()
+        api.get_ingest_gate.cache_clear()
+
+    assert response.status_code == 200 and response.json()["indexed"] == 2
+    # Cada lote ocupa un hilo de la puerta de ingesta y tiene su propia deadline.
+    assert [tokens for tokens, _ in seen] == [1, 1]
+    assert all(0 < left <= api.INGEST_DEADLINE_SECONDS for _, left in seen)
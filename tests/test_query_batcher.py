@@ -0,0 +1,96 @@
+import threading
+import pytest
+from storage.query_batcher import QueryBatcher
+from storage.search_filters import SearchFilters
+
+
+class FakeBackend:
+    """Embeddings e índice falsos: el vecino i de una consulta es '<consulta>-i'."""
+
+    def __init__(self, fail_filters=False):
+        self.embed_calls = []
+        self.search_calls = []
+        self.fail_filters = fail_filters
+        self._lock = threading.Lock()
+
+    def embed_queries(self, texts):
+        with self._lock:
+            self.embed_calls.append(list(texts))
+        return [[text] for text in texts]
+
+    def find_neighbors(self, vectors, k, filters):
+        with self._lock:
+            self.search_calls.append((len(vectors), k, filters))
+        if filters and self.fail_filters:
+            raise RuntimeError("index error")
+        return [[f"{vector[0]}-{i}" for i in range(k)] for vector in vectors]
+
+
+def search_concurrently(batcher, requests):
+    barrier = threading.Barrier(len(requests))
+    results = [None] * len(requests)
+
+    def worker(i, query, k, filters):
+        barrier.wait()
+        try:
+            results[i] = batcher.search(query, k, filters)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i, *r)) for i, r in enumerate(requests)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+@pytest.mark.unit
+def test_concurrent_queries_share_one_embedding_and_index_call():
+    backend = FakeBackend()
+    batcher = QueryBatcher(backend.embed_queries, backend.find_neighbors, window=0.2)
+    results = search_concurrently(batcher, [(f"q{i}", 2 + i % 2, None) for i in range(6)])
+
+    assert len(backend.embed_calls) == 1
+    assert sorted(backend.embed_calls[0]) == [f"q{i}" for i in range(6)]
+    assert backend.search_calls == [(6, 3, None)]
+    # Cada llamador recibe sus propios vecinos, truncados a su k.
+    for i, neighbors in enumerate(results):
+        assert neighbors == [f"q{i}-{j}" for j in range(2 + i % 2)]
+
+
+@pytest.mark.unit
+def test_queries_are_grouped_by_filter_and_errors_stay_in_their_group():
+    backend = FakeBackend(fail_filters=True)
+    batcher = QueryBatcher(backend.embed_queries, backend.find_neighbors, window=0.2)
+    filters = SearchFilters(sources=["core"])
+    results = search_concurrently(batcher, [("a", 1, None), ("b", 1, filters), ("c", 1, None)])
+
+    assert len(backend.embed_calls) == 1
+    assert sorted(n for n, _, _ in backend.search_calls) == [1, 2]
+    assert results[0] == ["a-0"] and results[2] == ["c-0"]
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.unit
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    backend = FakeBackend()
+    batcher = QueryBatcher(backend.embed_queries, backend.find_neighbors, window=30, max_batch_size=4)
+    results = search_concurrently(batcher, [(f"q{i}", 1, None) for i in range(4)])
+
+    assert results == [[f"q{i}-0"] for i in range(4)]
+    assert backend.search_calls == [(4, 1, None)]
+
+
+@pytest.mark.unit
+def test_queries_missing_from_a_short_index_answer_fail_instead_of_hanging():
+    backend = FakeBackend()
+
+    def first_only(vectors, k, filters):
+        return backend.find_neighbors(vectors, k, filters)[:1]
+
+    batcher = QueryBatcher(backend.embed_queries, first_only, window=30, max_batch_size=3)
+    results = search_concurrently(batcher, [(f"q{i}", 1, None) for i in range(3)])
+
+    assert sum(isinstance(r, RuntimeError) for r in results) == 2
+    assert [r for r in results if isinstance(r, list)] in ([["q0-0"]], [["q1-0"]], [["q2-0"]])
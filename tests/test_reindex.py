@@ -0,0 +1,220 @@
+from types import SimpleNamespace
+import pytest
+from database.compression import ZLIB, ZSTD, compress_text, decompress_text
+from storage.backends import ActiveVectorStore
+from storage.upsert_writer import UpsertReport
+from uses_cases.reindex import ReindexJob
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("codec", [ZSTD, ZLIB])
+def test_content_round_trips_through_both_codecs(codec):
+    text = "El Banco Central Europeo sube los tipos de interés. " * 200
+    stored_codec, data = compress_text(text, codec)
+
+    assert stored_codec == codec
+    assert len(data) < len(text.encode("utf-8")) / 10
+    assert decompress_text(stored_codec, data) == text
+
+
+class FakeDB:
+    """Artículos indexados, contenido comprimido, chunks por versión y versiones."""
+
+    def __init__(self):
+        self.articles = {}
+        self.contents = {}
+        self.chunks = []
+        self.versions = {
+            "v1": SimpleNamespace(name="v1", status="active", embedding_model=None, chunking_strategy=None),
+            "v2": SimpleNamespace(name="v2", status="building", embedding_model="nuevo", chunking_strategy=None),
+        }
+
+    def add_article(self, aid, content=None, chunks=()):
+        self.articles[aid] = SimpleNamespace(
+            id=aid, title=f"title {aid}", url=None, published_at=None,
+            content_preview=None, source="newsapi", language="es",
+        )
+        if content is not None:
+            self.contents[aid] = content
+        for position, text in enumerate(chunks):
+            self.add_chunk(aid, position, text, "v1")
+
+    def add_chunk(self, aid, position, text, version):
+        self.chunks.append(SimpleNamespace(
+            article_id=aid, position=position, text=text,
+            datapoint_id=f"{aid}/{version}/{position}", index_version=version,
+        ))
+
+    def get_index_version(self, name):
+        return self.versions.get(name)
+
+    def get_active_index_version(self):
+        return next((v for v in self.versions.values() if v.status == "active"), None)
+
+    def activate_index_version(self, name):
+        for version in self.versions.values():
+            version.status = "retired" if version.status == "active" else version.status
+        self.versions[name].status = "active"
+
+    def get_indexed_missing_version(self, version, limit=500, after_id=0):
+        done = {c.article_id for c in self.chunks if c.index_version == version}
+        ids = sorted(aid for aid in self.articles if aid > after_id and aid not in done)
+        return [self.articles[aid] for aid in ids[:limit]]
+
+    def get_indexed_articles(self, limit=500, after_id=0):
+        return [self.articles[aid] for aid in sorted(self.articles) if aid > after_id][:limit]
+
+    def get_contents(self, ids):
+        return {aid: self.contents[aid] for aid in ids if aid in self.contents}
+
+    def get_chunks_for_articles(self, ids, version=None):
+        chunks = [c for c in self.chunks if c.article_id in ids and c.index_version == version]
+        return sorted(chunks, key=lambda c: (c.article_id, c.position))
+
+    def delete_chunks(self, datapoint_ids):
+        self.chunks = [c for c in self.chunks if c.datapoint_id not in datapoint_ids]
+
+
+class FakeWriter:
+    def __init__(self, store):
+        self.store = store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def flush(self):
+        report = UpsertReport()
+        report.failed_articles.update({aid: "rejected" for aid in self.store.rejected})
+        self.store.rejected.clear()
+        return report
+
+
+class FakeVersionStore:
+    """Índice de la versión nueva: guarda los chunks como haría vectorize_and_store_many."""
+
+    def __init__(self, db, reject=()):
+        self.db = db
+        self.reject = set(reject)
+        self.rejected = set()
+        self.version_name = "v2"
+        self.record_article_embeddings = True
+        self.refreshed = []
+
+    def new_writer(self, on_indexed, on_failed):
+        assert on_indexed is None and on_failed is None
+        return FakeWriter(self)
+
+    def vectorize_and_store_many(self, chunks_by_article, writer, articles):
+        assert not self.record_article_embeddings
+        for aid, chunks in chunks_by_article.items():
+            for position, text in enumerate(chunks):
+                self.db.add_chunk(aid, position, text, "v2")
+            if aid in self.reject:
+                self.rejected.add(aid)
+        return sum(len(chunks) for chunks in chunks_by_article.values())
+
+    def refresh_article_embeddings(self, ids):
+        assert self.record_article_embeddings
+        self.refreshed.extend(ids)
+
+
+class ParagraphChunker:
+    def chunk(self, article):
+        return [p for p in article.content.split("\n\n") if p]
+
+
+class FakeRelatedIndex:
+    def __init__(self):
+        self.updated = []
+
+    def update(self, ids):
+        self.updated.extend(ids)
+
+
+class FakeStoryClusterer:
+    def __init__(self):
+        self.recomputed = 0
+
+    def recompute_centroids(self):
+        self.recomputed += 1
+        return 0
+
+
+def make_job(db, store):
+    return ReindexJob("v2", batch_size=2, db_manager=db, vector_store=store, related_index=FakeRelatedIndex(),
+                      story_clusterer=FakeStoryClusterer(), chunker=ParagraphChunker(), sleep=lambda s: None)
+
+
+@pytest.mark.unit
+def test_build_uses_stored_content_and_falls_back_to_old_chunks():
+    db = FakeDB()
+    db.add_article(1, content="Primer párrafo.\n\nSegundo párrafo.")
+    db.add_article(2, chunks=["Texto antiguo.", "Más texto."])  # sin contenido guardado
+    db.add_article(3)
+    store = FakeVersionStore(db)
+
+    report = make_job(db, store).build()
+
+    assert (report.articles, report.chunks, report.from_chunks, report.skipped) == (2, 4, 1, 1)
+    assert [c.text for c in db.get_chunks_for_articles([2], "v2")] == ["Texto antiguo.", "Más texto."]
+    # Nada cambia para la versión activa.
+    assert db.get_active_index_version().name == "v1"
+
+
+@pytest.mark.unit
+def test_rejected_articles_are_retried_on_the_next_run():
+    db = FakeDB()
+    db.add_article(1, content="Uno.")
+    db.add_article(2, content="Dos.")
+    store = FakeVersionStore(db, reject=[2])
+    job = make_job(db, store)
+
+    assert job.build().failed == 1
+    assert db.get_chunks_for_articles([2], "v2") == []
+
+    store.reject.clear()
+    assert job.build().articles == 1
+    assert len(db.get_chunks_for_articles([1, 2], "v2")) == 2
+
+
+@pytest.mark.unit
+def test_cutover_catches_up_and_rebuilds_embeddings_for_a_new_model():
+    db = FakeDB()
+    db.add_article(1, content="Uno.")
+    store = FakeVersionStore(db)
+    job = make_job(db, store)
+    job.build()
+
+    # Llega un artículo mientras tanto.
+    db.add_article(2, content="Dos.")
+    report = job.cutover()
+
+    assert report.articles == 1
+    assert db.get_active_index_version().name == "v2"
+    assert store.refreshed == [1, 2] and job.related_index.updated == [1, 2]
+    assert job.story_clusterer.recomputed == 1
+
+
+@pytest.mark.unit
+def test_active_store_follows_the_version_switch(monkeypatch):
+    db = FakeDB()
+    built = []
+
+    def fake_build(backend=None, version=None):
+        built.append(version.name if version else None)
+        return SimpleNamespace(version_name=version.name if version else None)
+
+    monkeypatch.setattr("storage.backends.build_vector_store", fake_build)
+    now = [0.0]
+    store = ActiveVectorStore(db, refresh_seconds=30, clock=lambda: now[0])
+
+    assert store.version_name == "v1"
+    db.activate_index_version("v2")
+    now[0] = 10
+    assert store.version_name == "v1"
+    now[0] = 31
+    assert store.version_name == "v2"
+    assert built == ["v1", "v2"]
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+from storage.related_index import (
+    RelatedArticlesIndex,
+    article_embedding,
+    decode_embedding,
+    encode_embedding,
+)
+
+
+class FakeDB:
+    """Tablas article_embeddings y article_neighbors en memoria."""
+
+    def __init__(self):
+        self.embeddings = {}  # id -> bytes
+        self.floors = {}
+        self.neighbors = {}  # id -> {related_id: score}
+
+    def save(self, vectors):
+        for aid, vector in vectors.items():
+            self.embeddings[aid] = encode_embedding(article_embedding([vector]))
+
+    def get_article_embeddings(self, ids):
+        return {aid: self.embeddings[aid] for aid in ids if aid in self.embeddings}
+
+    def iter_article_embeddings(self, batch_size):
+        ids = sorted(self.embeddings)
+        for start in range(0, len(ids), batch_size):
+            yield [(aid, self.embeddings[aid], self.floors.get(aid)) for aid in ids[start:start + batch_size]]
+
+    def delete_article_neighbors(self, ids):
+        for aid in ids:
+            self.neighbors.pop(aid, None)
+            self.floors[aid] = None
+        for aid, related in self.neighbors.items():
+            if any(rid in related for rid in ids):
+                for rid in ids:
+                    related.pop(rid, None)
+                self.floors[aid] = None
+
+    def add_article_neighbors(self, rows, limit):
+        for aid, rid, score in rows:
+            self.neighbors.setdefault(aid, {})[rid] = score
+        for aid in {aid for aid, _, _ in rows}:
+            best = sorted(self.neighbors[aid].items(), key=lambda item: -item[1])[:limit]
+            self.neighbors[aid] = dict(best)
+            self.floors[aid] = best[-1][1] if len(best) >= limit else None
+
+    def lists(self):
+        return {aid: sorted(related, key=lambda rid: -related[rid]) for aid, related in self.neighbors.items() if related}
+
+
+def random_vectors(count, seed):
+    rng = np.random.default_rng(seed)
+    return {aid: rng.normal(size=16).tolist() for aid in range(1, count + 1)}
+
+
+@pytest.mark.unit
+def test_embedding_is_a_compact_unit_vector():
+    vector = article_embedding([[3.0, 0.0], [1.0, 0.0], [0.0, 0.0]])
+    data = encode_embedding(vector)
+    assert len(data) == 2 * 2  # float16
+    assert np.allclose(decode_embedding(data), [1.0, 0.0])
+    assert article_embedding([]) is None
+
+
+@pytest.mark.unit
+def test_incremental_updates_match_a_full_rebuild():
+    vectors = random_vectors(40, seed=7)
+
+    incremental = FakeDB()
+    index = RelatedArticlesIndex(incremental, num_related=5, min_score=-1.0, batch_size=7)
+    # Los artículos llegan en lotes, como en la ingesta.
+    for start in range(1, 41, 10):
+        batch = {aid: vectors[aid] for aid in range(start, start + 10)}
+        incremental.save(batch)
+        index.update(batch)
+
+    full = FakeDB()
+    full.save(vectors)
+    RelatedArticlesIndex(full, num_related=5, min_score=-1.0, batch_size=7).update(vectors)
+
+    assert incremental.lists() == full.lists()
+    assert all(len(related) == 5 for related in full.lists().values())
+
+
+@pytest.mark.unit
+def test_changed_article_leaves_its_old_neighbours():
+    db = FakeDB()
+    index = RelatedArticlesIndex(db, num_related=1, min_score=0.5)
+    db.save({1: [1.0, 0.0], 2: [0.9, 0.1], 3: [0.0, 1.0]})
+    index.update([1, 2, 3])
+    assert db.lists() == {1: [2], 2: [1]}
+
+    # El artículo 2 se corrige y ahora se parece al 3.
+    db.save({2: [0.1, 0.9]})
+    index.update([2])
+
+    assert db.lists() == {2: [3], 3: [2]}
+
+
+class ExactNearestStore:
+    """Almacén falso: devuelve los artículos más cercanos según los embeddings de la base de datos."""
+
+    def __init__(self, db):
+        self.db = db
+        self.calls = []
+
+    def nearest_articles(self, vectors, k):
+        self.calls.append(k)
+        ids = sorted(self.db.embeddings)
+        matrix = np.stack([decode_embedding(self.db.embeddings[aid]) for aid in ids])
+        return [[ids[i] for i in np.argsort(-(matrix @ np.asarray(v)))[:k]] for v in vectors]
+
+
+class IndexedFakeDB(FakeDB):
+    def iter_article_embeddings(self, batch_size):
+        raise AssertionError("con un índice vectorial no se recorre toda la tabla")
+
+    def get_article_embedding_rows(self, ids):
+        return [(aid, self.embeddings[aid], self.floors.get(aid)) for aid in sorted(ids) if aid in self.embeddings]
+
+
+@pytest.mark.unit
+def test_index_candidates_give_the_same_lists_without_a_scan():
+    vectors = random_vectors(40, seed=11)
+
+    db = IndexedFakeDB()
+    store = ExactNearestStore(db)
+    index = RelatedArticlesIndex(db, num_related=5, min_score=-1.0, vector_store=store, candidate_multiplier=3)
+    for start in range(1, 41, 10):
+        batch = {aid: vectors[aid] for aid in range(start, start + 10)}
+        db.save(batch)
+        index.update(batch)
+
+    full = FakeDB()
+    full.save(vectors)
+    RelatedArticlesIndex(full, num_related=5, min_score=-1.0).update(vectors)
+
+    # Con candidatos suficientes, las listas de los artículos nuevos son las exactas.
+    assert {aid: db.lists()[aid] for aid in range(31, 41)} == {aid: full.lists()[aid] for aid in range(31, 41)}
+    assert store.calls == [15] * 4
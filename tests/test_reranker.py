@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from storage.reranker import Reranker
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def candidate(aid, distance, vector=None, hours_old=1, source="newsapi"):
+    return {
+        "id": aid,
+        "distance": distance,
+        "vector": vector,
+        "published_at": NOW - timedelta(hours=hours_old),
+        "source": source,
+    }
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+@pytest.mark.unit
+def test_mmr_demotes_near_duplicates():
+    candidates = [
+        candidate(1, 0.10, [1.0, 0.0]),
+        candidate(2, 0.11, [1.0, 0.01]),  # casi idéntico al 1
+        candidate(3, 0.20, [0.0, 1.0]),
+    ]
+    plain = Reranker(mmr_lambda=1.0, recency_weight=0).rerank(candidates, k=2, now=NOW)
+    diverse = Reranker(mmr_lambda=0.5, recency_weight=0).rerank(candidates, k=2, now=NOW)
+
+    assert ids(plain) == [1, 2]
+    assert ids(diverse) == [1, 3]
+
+
+@pytest.mark.unit
+def test_recency_boost_promotes_fresh_articles():
+    candidates = [candidate(1, 0.10, hours_old=24 * 30), candidate(2, 0.12, hours_old=1)]
+    reranker = Reranker(mmr_lambda=1.0, recency_weight=0.5, recency_half_life_hours=24)
+
+    assert ids(reranker.rerank(candidates, k=2, now=NOW)) == [2, 1]
+    assert ids(Reranker(mmr_lambda=1.0, recency_weight=0).rerank(candidates, k=2, now=NOW)) == [1, 2]
+
+
+@pytest.mark.unit
+def test_source_cap_and_missing_vectors():
+    candidates = [
+        candidate(1, 0.1, source="core"),
+        candidate(2, 0.2, source="core"),
+        candidate(3, 0.3, source="core"),
+        candidate(4, 0.4, source="perigon"),
+    ]
+    # Sin vectores no hay término de diversidad, pero el tope por fuente se aplica.
+    results = Reranker(mmr_lambda=0.5, recency_weight=0, max_per_source=2).rerank(candidates, k=4, now=NOW)
+
+    assert ids(results) == [1, 2, 4]
+
+
+@pytest.mark.unit
+def test_exhausted_time_budget_falls_back_to_score_order():
+    candidates = [
+        candidate(1, 0.10, [1.0, 0.0]),
+        candidate(2, 0.11, [1.0, 0.01]),
+        candidate(3, 0.20, [0.0, 1.0]),
+    ]
+    reranker = Reranker(mmr_lambda=0.5, recency_weight=0, time_budget_ms=-1)
+
+    assert ids(reranker.rerank(candidates, k=3, now=NOW)) == [1, 2, 3]
@@ -0,0 +1,135 @@
+import json
+import os
+import pytest
+from ingestion.models import Article
+from ingestion.providers.provider_i import ProviderError, ProviderRateLimitError
+from ingestion.providers.response_cache import ResponseCache, cached_articles, fetch_json
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(payload) if payload is not None else ""
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeGet:
+    """requests.get falso: devuelve las respuestas en orden y guarda las cabeceras enviadas."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, url, params=None, headers=None, timeout=None):
+        self.calls.append({"params": params, "headers": headers})
+        return self.responses.pop(0)
+
+
+def make_cache(tmp_path, clock, **kwargs):
+    return ResponseCache(str(tmp_path / "cache"), ttl=kwargs.pop("ttl", 60), clock=clock, **kwargs)
+
+
+@pytest.mark.unit
+def test_fresh_hits_skip_the_provider_and_keys_ignore_credentials(tmp_path):
+    clock = FakeClock()
+    cache = make_cache(tmp_path, clock)
+    get = FakeGet([FakeResponse(200, {"articles": [1, 2]})])
+
+    for key in ("secreto-1", "secreto-2"):
+        data = fetch_json(cache, "NewsAPI", "https://x", {"q": "bce", "apiKey": key},
+                          cache_params={"q": "bce"}, get=get)
+        assert data == {"articles": [1, 2]}
+    assert len(get.calls) == 1
+
+
+@pytest.mark.unit
+def test_stale_entries_are_revalidated_with_their_validators(tmp_path):
+    clock = FakeClock()
+    cache = make_cache(tmp_path, clock)
+    get = FakeGet([
+        FakeResponse(200, {"v": 1}, {"ETag": '"abc"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"}),
+        FakeResponse(304),
+        FakeResponse(200, {"v": 2}, {"ETag": '"def"'}),
+    ])
+
+    assert fetch_json(cache, "CORE API", "https://x", {"q": "ia"}, get=get) == {"v": 1}
+    clock.now += 61
+    assert fetch_json(cache, "CORE API", "https://x", {"q": "ia"}, get=get) == {"v": 1}
+    assert get.calls[1]["headers"] == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT",
+    }
+    # El 304 renueva la entrada: sigue fresca sin volver a llamar.
+    clock.now += 30
+    assert fetch_json(cache, "CORE API", "https://x", {"q": "ia"}, get=get) == {"v": 1}
+    assert len(get.calls) == 2
+
+    clock.now += 61
+    assert fetch_json(cache, "CORE API", "https://x", {"q": "ia"}, get=get) == {"v": 2}
+
+
+@pytest.mark.unit
+def test_errors_are_not_cached(tmp_path):
+    cache = make_cache(tmp_path, FakeClock())
+    get = FakeGet([FakeResponse(429, headers={"Retry-After": "5"}), FakeResponse(200, {"ok": True})])
+
+    with pytest.raises(ProviderRateLimitError):
+        fetch_json(cache, "NewsAPI", "https://x", {"q": "a"}, get=get)
+    assert fetch_json(cache, "NewsAPI", "https://x", {"q": "a"}, get=get) == {"ok": True}
+
+
+@pytest.mark.unit
+def test_invalid_json_is_a_provider_error_and_is_not_cached(tmp_path):
+    cache = make_cache(tmp_path, FakeClock())
+    broken = FakeResponse(200)
+    broken.text = '{"articles": [1,'
+    get = FakeGet([broken, FakeResponse(200, {"ok": True})])
+
+    with pytest.raises(ProviderError):
+        fetch_json(cache, "NewsAPI", "https://x", {"q": "a"}, get=get)
+    assert fetch_json(cache, "NewsAPI", "https://x", {"q": "a"}, get=get) == {"ok": True}
+
+
+@pytest.mark.unit
+def test_least_recently_used_entries_are_evicted_past_the_cap(tmp_path):
+    clock = FakeClock()
+    cache = make_cache(tmp_path, clock)
+    body = os.urandom(2000).hex()
+
+    cache.put("a", body)
+    # Caben dos entradas, no tres.
+    cache.max_bytes = int(os.path.getsize(cache._path("a")) * 2.5)
+    cache.put("b", body)
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    cache.get("a")  # "a" pasa a ser la más reciente
+    cache.put("c", body)
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == body and cache.get("c").body == body
+
+
+@pytest.mark.unit
+def test_sdk_results_are_cached_as_articles(tmp_path):
+    cache = make_cache(tmp_path, FakeClock())
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [Article(title="Titular", content="Texto", source="perigon")]
+
+    first = cached_articles(cache, "PerigonAPI", {"q": "bce"}, load)
+    second = cached_articles(cache, "PerigonAPI", {"q": "bce"}, load)
+
+    assert second == first and len(calls) == 1
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import httpx
+import pytest
+from ingestion.models import Article
+from storage.search_filters import SearchFilters, datapoint_restricts, to_epoch_seconds
+from uses_cases.search_service import SearchError, SearchService
+
+
+@pytest.mark.unit
+def test_datapoint_restricts_follow_the_article_metadata():
+    article = Article(
+        title="t", url="u", content="c", source="core", language="es",
+        published_at=datetime(2026, 10, 1, 12, 0),
+    )
+
+    assert datapoint_restricts(article) == {
+        "restricts": [
+            {"namespace": "source", "allow_list": ["core"]},
+            {"namespace": "language", "allow_list": ["es"]},
+        ],
+        # Las fechas sin zona horaria se interpretan como UTC.
+        "numeric_restricts": [{"namespace": "published_at", "value_int": 1790856000}],
+    }
+    assert datapoint_restricts(Article(title="t", url="u", content="c", source=None)) == {}
+    assert datapoint_restricts(None) == {}
+
+
+@pytest.mark.unit
+def test_filters_become_index_namespaces():
+    after = datetime(2026, 10, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    filters = SearchFilters(sources=["core", "newsapi"], languages=["es"], published_after=after)
+
+    tokens, numeric = filters.to_namespaces()
+
+    assert [(n.name, n.allow_tokens) for n in tokens] == [("source", ["core", "newsapi"]), ("language", ["es"])]
+    assert [(n.name, n.value_int, n.op) for n in numeric] == [("published_at", 1790856000, "GREATER_EQUAL")]
+    assert SearchFilters().to_namespaces() == ([], [])
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.filters = []
+
+    def search_similar(self, query, k=10, filters=None):
+        self.filters.append(filters)
+        return {"query": query, "results": []}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("before", [
+    datetime(2026, 10, 1, 12, 0),
+    datetime(2026, 10, 1, 11, 0),
+    # La misma hora expresada en otra zona horaria sigue siendo un rango vacío.
+    datetime(2026, 10, 1, 14, 0, tzinfo=timezone(timedelta(hours=2))),
+])
+def test_empty_and_inverted_date_ranges_are_rejected(before):
+    store = RecordingVectorStore()
+    filters = SearchFilters(published_after=datetime(2026, 10, 1, 12, 0), published_before=before)
+
+    with pytest.raises(SearchError):
+        SearchService(store).search_articles("elecciones", filters=filters)
+    assert store.filters == []
+
+
+@pytest.mark.unit
+def test_valid_date_range_reaches_the_index():
+    store = RecordingVectorStore()
+    filters = SearchFilters(
+        published_after=datetime(2026, 10, 1, 12, 0), published_before=datetime(2026, 10, 1, 12, 1)
+    )
+
+    SearchService(store).search_articles("elecciones", filters=filters)
+
+    assert store.filters == [filters]
+
+
+@pytest.mark.unit
+def test_since_hours_becomes_published_after(monkeypatch):
+    from app import main as api
+
+    store = RecordingVectorStore()
+    monkeypatch.setattr(api, "get_search_service", lambda: SearchService(store))
+    api.get_search_gate.cache_clear()
+
+    async def search(params):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/search", params=params)
+
+    try:
+        now = datetime.now(timezone.utc)
+        assert asyncio.run(search({"q": "clima", "since_hours": 6})).status_code == 200
+        explicit = asyncio.run(search({"q": "clima", "since_hours": 6, "published_after": "2026-10-01T00:00:00Z"}))
+        rejected = asyncio.run(search({"q": "clima", "since_hours": 0}))
+    finally:
+        api.get_search_gate.cache_clear()
+
+    since, given = store.filters
+    assert abs(to_epoch_seconds(since.published_after) - to_epoch_seconds(now - timedelta(hours=6))) < 60
+    # Una fecha explícita tiene prioridad sobre el atajo.
+    assert explicit.status_code == 200 and given.published_after == datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert rejected.status_code == 422
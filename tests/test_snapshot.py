@@ -0,0 +1,208 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from storage.snapshot import SnapshotReader, SnapshotWriter
+from storage.upsert_writer import UpsertReport
+from uses_cases.corpus_snapshot import CorpusSnapshotService
+
+
+def article(aid):
+    return {
+        "id": aid,
+        "title": f"Article {aid}",
+        "url": f"https://example.com/{aid}",
+        "published_at": datetime(2026, 1, aid),
+        "content_preview": None,
+        "source": "core",
+        "language": "en",
+    }
+
+
+def chunk(aid, position, dims=4):
+    return {
+        "article_id": aid,
+        "position": position,
+        "datapoint_id": f"{aid}/{position}",
+        "text": f"chunk {position} of {aid}",
+        "vector": [float(aid + position)] * dims,
+    }
+
+
+@pytest.mark.unit
+def test_snapshot_round_trip_streams_batches(tmp_path):
+    with SnapshotWriter(str(tmp_path)) as writer:
+        for aid in (1, 2):
+            writer.write_articles([article(aid)])
+            writer.write_chunks([chunk(aid, 0), chunk(aid, 1)])
+
+    reader = SnapshotReader(str(tmp_path))
+    assert reader.manifest["articles"] == 2
+    assert reader.manifest["chunks"] == 4
+    assert reader.manifest["dimensions"] == 4
+
+    articles = [a for batch in reader.iter_articles() for a in batch]
+    assert [a["id"] for a in articles] == [1, 2]
+    assert articles[0]["published_at"] == datetime(2026, 1, 1)
+
+    batches = list((metadata, vectors.copy()) for metadata, vectors in reader.iter_chunks())
+    # Un lote de registros por llamada a write_chunks.
+    assert len(batches) == 2
+    metadata, vectors = batches[1]
+    assert [m["datapoint_id"] for m in metadata] == ["2/0", "2/1"]
+    assert vectors.shape == (2, 4)
+    assert vectors[1].tolist() == [3.0] * 4
+
+
+@pytest.mark.unit
+def test_snapshot_rejects_mixed_dimensions(tmp_path):
+    writer = SnapshotWriter(str(tmp_path))
+    writer.write_chunks([chunk(1, 0, dims=4)])
+    with pytest.raises(ValueError, match="dimensions"):
+        writer.write_chunks([chunk(1, 1, dims=3)])
+    writer.close()
+
+
+class SourceDB:
+    """Base de datos de origen y de destino en memoria, con lo que usa el servicio de snapshots."""
+
+    def __init__(self, articles=(), chunks=(), contents=None, embeddings=None, stories=()):
+        self.articles = {a.id: a for a in articles}
+        self.chunks = list(chunks)
+        self.contents = dict(contents or {})
+        self.embeddings = dict(embeddings or {})
+        self.stories = {s.id: s for s in stories}
+        self.restored_articles = []
+
+    def get_indexed_articles(self, limit, after_id=0):
+        return [a for aid, a in sorted(self.articles.items()) if aid > after_id][:limit]
+
+    def get_chunks_for_articles(self, ids, index_version=None):
+        return [c for c in self.chunks if c.article_id in ids]
+
+    def get_contents(self, ids):
+        return {aid: self.contents[aid] for aid in ids if aid in self.contents}
+
+    def get_article_embeddings(self, ids):
+        return {aid: self.embeddings[aid] for aid in ids if aid in self.embeddings}
+
+    def iter_story_clusters(self, batch_size=1000):
+        if self.stories:
+            yield list(self.stories.values())
+
+    def restore_story_clusters(self, rows):
+        inserted = [r["id"] for r in rows if r["id"] not in self.stories]
+        self.stories.update({r["id"]: SimpleNamespace(**r) for r in rows if r["id"] in inserted})
+        return inserted
+
+    def restore_articles(self, rows):
+        self.restored_articles.extend(rows)
+        for r in rows:
+            if r.get("content"):
+                self.contents[r["id"]] = r["content"]
+        return [r["id"] for r in rows]
+
+    def reset_id_sequences(self):
+        pass
+
+    def add_chunks(self, rows):
+        self.chunks.extend(SimpleNamespace(**r) for r in rows)
+
+    def save_article_embeddings(self, embeddings):
+        self.embeddings.update(embeddings)
+
+
+class InMemoryWriter:
+    def __init__(self):
+        self.datapoints = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def add(self, datapoints):
+        self.datapoints.extend(datapoints)
+
+    def flush(self):
+        return UpsertReport()
+
+
+class SnapshotVectorStore:
+    version_name = None
+
+    def __init__(self, vectors=None):
+        self.vectors = vectors or {}
+        self.writer = InMemoryWriter()
+        self.refreshed = []
+
+    def read_vectors(self, ids):
+        return {i: self.vectors[i] for i in ids if i in self.vectors}
+
+    def index_vectors(self, vectors):
+        return vectors
+
+    def full_vector_column(self, vector):
+        return {}
+
+    def new_writer(self):
+        return self.writer
+
+    def refresh_article_embeddings(self, ids):
+        self.refreshed.extend(ids)
+
+
+class RecordingRelatedIndex:
+    def __init__(self):
+        self.updated = []
+
+    def update(self, ids):
+        self.updated.extend(ids)
+
+
+def snapshot_service(db, vector_store):
+    service = CorpusSnapshotService.__new__(CorpusSnapshotService)
+    service.db_manager = db
+    service.vector_store = vector_store
+    service.batch_size = 10
+    service.related_index = RecordingRelatedIndex()
+    return service
+
+
+@pytest.mark.unit
+def test_import_restores_content_embeddings_and_stories(tmp_path):
+    def source_article(aid, cluster_id):
+        return SimpleNamespace(
+            content_hash=f"hash-{aid}", cluster_id=cluster_id, **article(aid)
+        )
+
+    story = SimpleNamespace(
+        id=7, label="Elecciones", centroid=b"\x01\x02", size=1, trend_key=1.5,
+        created_at=datetime(2026, 1, 1), last_article_at=datetime(2026, 1, 1),
+    )
+    source = SourceDB(
+        articles=[source_article(1, 7), source_article(2, None)],
+        chunks=[SimpleNamespace(**{k: v for k, v in chunk(aid, 0).items() if k != "vector"}) for aid in (1, 2)],
+        contents={1: "Texto 1", 2: "Texto 2"},
+        # El artículo 2 no tiene embedding de artículo: se recalcula desde el índice.
+        embeddings={1: b"emb-1"},
+        stories=[story],
+    )
+    source_store = SnapshotVectorStore({f"{aid}/0": chunk(aid, 0)["vector"] for aid in (1, 2)})
+    export = snapshot_service(source, source_store).export_to(str(tmp_path))
+    assert (export.articles, export.stories, export.chunks) == (2, 1, 2)
+
+    target, target_store = SourceDB(), SnapshotVectorStore()
+    service = snapshot_service(target, target_store)
+    report = service.import_from(str(tmp_path))
+
+    assert (report.articles, report.stories, report.chunks) == (2, 1, 2)
+    assert target.contents == {1: "Texto 1", 2: "Texto 2"}
+    assert [(r["content_hash"], r["cluster_id"]) for r in target.restored_articles] == [("hash-1", 7), ("hash-2", None)]
+    assert target.stories[7].label == "Elecciones" and target.stories[7].centroid == b"\x01\x02"
+    assert target.embeddings == {1: b"emb-1"} and target_store.refreshed == [2]
+    assert service.related_index.updated == [1, 2]
+    assert len(target_store.writer.datapoints) == 2
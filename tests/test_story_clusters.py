@@ -0,0 +1,138 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from storage.related_index import article_embedding, decode_embedding, encode_embedding
+from storage.story_clusters import StoryClusterer, bump_trend_key, trend_velocity
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+class FakeDB:
+    """Historias y embeddings de artículos en memoria."""
+
+    def __init__(self):
+        self.embeddings = {}
+        self.titles = {}
+        self.cluster_of = {}
+        self.clusters = {}
+        self.next_id = 1
+
+    def add_article(self, aid, vector):
+        self.embeddings[aid] = encode_embedding(article_embedding([vector]))
+        self.titles[aid] = f"title {aid}"
+
+    @contextmanager
+    def story_cluster_lock(self):
+        yield
+
+    def get_unclustered_titles(self, ids):
+        return {aid: self.titles[aid] for aid in ids if aid not in self.cluster_of}
+
+    def get_article_embeddings(self, ids):
+        return {aid: self.embeddings[aid] for aid in ids if aid in self.embeddings}
+
+    def get_story_article_ids(self, cluster_ids):
+        members = {}
+        for aid, cid in sorted(self.cluster_of.items()):
+            if cid in cluster_ids:
+                members.setdefault(cid, []).append(aid)
+        return members
+
+    def get_active_story_clusters(self, since):
+        return [SimpleNamespace(id=cid, **c) for cid, c in sorted(self.clusters.items()) if c["last_article_at"] >= since]
+
+    def save_story_clusters(self, created, updated, assignments):
+        new_ids = []
+        for row in created:
+            self.clusters[self.next_id] = dict(row)
+            new_ids.append(self.next_id)
+            self.next_id += 1
+        for row in updated:
+            self.clusters[row["id"]].update({k: v for k, v in row.items() if k != "id"})
+        for aid, cid in assignments.items():
+            self.cluster_of[aid] = new_ids[-cid - 1] if cid < 0 else cid
+        return new_ids
+
+
+def clusterer(db, clock=lambda: NOW):
+    return StoryClusterer(db, threshold=0.9, active_hours=24, half_life_hours=6, clock=clock)
+
+
+@pytest.mark.unit
+def test_syndicated_copies_join_one_story():
+    db = FakeDB()
+    db.add_article(1, [1.0, 0.0, 0.0])
+    db.add_article(2, [0.98, 0.05, 0.0])  # misma noticia, otra agencia
+    db.add_article(3, [0.0, 1.0, 0.0])
+
+    assignments = clusterer(db).assign([1, 2, 3])
+
+    assert assignments[1] == assignments[2] != assignments[3]
+    story = db.clusters[assignments[1]]
+    assert story["size"] == 2 and story["label"] == "title 1"
+
+
+@pytest.mark.unit
+def test_later_articles_join_existing_stories_and_skip_clustered_ones():
+    db = FakeDB()
+    db.add_article(1, [1.0, 0.0])
+    clusterer(db).assign([1])
+
+    db.add_article(2, [0.99, 0.02])
+    assignments = clusterer(db, clock=lambda: NOW + timedelta(hours=1)).assign([1, 2])
+
+    assert assignments == {2: db.cluster_of[1]}
+    assert db.clusters[db.cluster_of[1]]["size"] == 2
+
+
+@pytest.mark.unit
+def test_inactive_stories_are_not_extended():
+    db = FakeDB()
+    db.add_article(1, [1.0, 0.0])
+    clusterer(db).assign([1])
+
+    db.add_article(2, [1.0, 0.0])
+    clusterer(db, clock=lambda: NOW + timedelta(hours=30)).assign([2])
+
+    assert db.cluster_of[1] != db.cluster_of[2]
+
+
+@pytest.mark.unit
+def test_centroids_follow_a_new_embedding_model():
+    db = FakeDB()
+    db.add_article(1, [1.0, 0.0])
+    db.add_article(2, [0.99, 0.02])
+    db.add_article(3, [0.0, 1.0])
+    first = clusterer(db).assign([1, 2, 3])
+
+    # El nuevo modelo tiene otra dimensión; el artículo 3 aún no tiene embedding.
+    db.add_article(1, [0.0, 0.0, 1.0])
+    db.add_article(2, [0.0, 0.1, 1.0])
+    del db.embeddings[3]
+    later = lambda: NOW + timedelta(hours=1)
+    assert clusterer(db, clock=later).recompute_centroids() == 1
+
+    story = db.clusters[first[1]]
+    assert decode_embedding(story["centroid"]) == pytest.approx([0.0, 0.05, 0.9987], abs=1e-3)
+    # Sin embeddings, la historia del artículo 3 deja de aceptar artículos.
+    assert db.clusters[first[3]]["last_article_at"] < NOW.replace(tzinfo=None) - timedelta(hours=23)
+
+    db.add_article(4, [0.0, 0.05, 1.0])
+    assert clusterer(db, clock=later).assign([4]) == {4: first[1]}
+
+
+@pytest.mark.unit
+def test_trend_key_decays_without_rewrites():
+    key = bump_trend_key(None, 4, NOW, half_life_hours=6)
+    assert trend_velocity(key, NOW, 6) == pytest.approx(4)
+    assert trend_velocity(key, NOW + timedelta(hours=6), 6) == pytest.approx(2)
+
+    # Dos artículos nuevos seis horas después: 4 / 2 + 2.
+    key = bump_trend_key(key, 2, NOW + timedelta(hours=6), half_life_hours=6)
+    assert trend_velocity(key, NOW + timedelta(hours=6), 6) == pytest.approx(4)
+
+    # Una historia más reciente con menos artículos puede ir por delante.
+    fresh = bump_trend_key(None, 3, NOW + timedelta(hours=6), half_life_hours=6)
+    assert fresh < key
+    assert bump_trend_key(None, 3, NOW + timedelta(hours=12), half_life_hours=6) > key
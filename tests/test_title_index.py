@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import pytest
+from storage.title_index import TitleIndex, normalize_title
+from uses_cases.suggest import SuggestService
+
+DAY = datetime(2026, 4, 1)
+
+
+def ids(suggestions):
+    return [s["id"] for s in suggestions]
+
+
+@pytest.mark.unit
+def test_normalization_ignores_case_accents_and_punctuation():
+    assert normalize_title("Economía: el BCE sube   los tipos!") == "economia el bce sube los tipos"
+
+
+@pytest.mark.unit
+def test_prefixes_match_inside_titles_newest_first():
+    index = TitleIndex()
+    index.add([
+        (1, "El BCE sube los tipos", DAY),
+        (2, "Bolsa: el BCE mantiene los tipos", DAY + timedelta(days=1)),
+        (3, "Inteligencia artificial en Europa", DAY - timedelta(days=1)),
+    ])
+
+    assert ids(index.suggest("bce")) == [2, 1]
+    assert ids(index.suggest("el bce sub")) == [1]
+    assert ids(index.suggest("INTELIGENCIA ART")) == [3]
+    assert index.suggest("zzz") == [] and index.suggest("  ") == []
+
+
+@pytest.mark.unit
+def test_titles_matching_through_several_words_are_returned_once():
+    index = TitleIndex()
+    # "tipos" aparece varias veces en el mismo titular.
+    index.add([(1, "Tipos y más tipos: los tipos suben", DAY)])
+    index.add([(i, f"Noticia {i} sobre tipos", DAY - timedelta(days=i)) for i in range(2, 12)])
+
+    assert ids(index.suggest("tipos", limit=4)) == [1, 2, 3, 4]
+
+
+@pytest.mark.unit
+def test_incremental_adds_match_a_bulk_load():
+    titles = [(i, f"Titular número {i} de la jornada", DAY + timedelta(hours=i)) for i in range(1, 200)]
+    bulk = TitleIndex()
+    bulk.add(titles)
+
+    incremental = TitleIndex()
+    incremental.add(titles[:150])
+    for title in titles[150:]:
+        incremental.add([title])
+    assert incremental.add(titles[:5]) == 0
+
+    assert len(incremental) == len(bulk) == 199
+    for prefix in ("titular", "jornada", "numero 1", "de la"):
+        assert incremental.suggest(prefix, limit=10) == bulk.suggest(prefix, limit=10)
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.since = []
+
+    def iter_indexed_titles(self, batch_size=5000):
+        yield list(self.rows)
+
+    def get_titles_indexed_since(self, since):
+        self.since.append(since)
+        return [row for row in self.rows if row[3] >= since]
+
+
+@pytest.mark.unit
+def test_refresh_pulls_articles_indexed_elsewhere():
+    db = FakeDB([(1, "Primer titular", DAY, DAY)])
+    service = SuggestService()
+    service.db_manager = db
+    service.refresh_overlap = timedelta(minutes=10)
+    service.load()
+
+    db.rows.append((2, "Segundo titular", DAY, DAY + timedelta(minutes=1)))
+    service.refresh()
+
+    assert db.since == [DAY - timedelta(minutes=10)]
+    assert ids(service.index.suggest("titular")) == [1, 2]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from scripts.benchmark_two_stage import exact_top_k, recall, two_stage_top_k
+import storage.vector_store as vector_store_module
+from storage.query_batcher import QueryBatcher
+from storage.two_stage import encode_full_vector, rescore, truncate_vectors
+from storage.vector_store import VectorStore
+
+
+@pytest.mark.unit
+def test_truncated_vectors_are_normalised_again():
+    truncated = truncate_vectors([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]], 2)
+    assert truncated.shape == (2, 2)
+    np.testing.assert_allclose(truncated[0], [0.6, 0.8])
+    # Un vector que se anula al truncarlo se queda a cero en vez de dar NaN.
+    np.testing.assert_allclose(truncated[1], [0.0, 0.0])
+
+
+@pytest.mark.unit
+def test_rescore_orders_candidates_by_full_distance():
+    full = {
+        "1/a": encode_full_vector([1.0, 0.0, 0.0]),
+        "2/b": encode_full_vector([0.0, 1.0, 0.0]),
+        "3/c": encode_full_vector([0.6, 0.8, 0.0]),
+    }
+    neighbors = rescore([0.0, 1.0, 0.0], ["1/a", "3/c", "9/sin-vector", "2/b"], full, n=2)
+
+    assert [n.id for n in neighbors] == ["2/b", "3/c"]
+    assert neighbors[0].distance == pytest.approx(0.0)
+    assert neighbors[1].distance == pytest.approx(0.2)
+    assert neighbors[0].feature_vector == [0.0, 1.0, 0.0]
+
+
+class FakeDB:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.requested = []
+
+    def get_chunk_vectors(self, datapoint_ids):
+        self.requested.append(sorted(datapoint_ids))
+        return {i: self.vectors[i] for i in datapoint_ids if i in self.vectors}
+
+    def get_articles_by_ids(self, article_ids):
+        class Row:
+            def __init__(self, aid):
+                self.id = aid
+                self.title = f"t{aid}"
+                self.url = self.published_at = None
+                self.content_preview = ""
+                self.source = "core"
+                self.language = "es"
+
+        return {aid: Row(aid) for aid in article_ids}
+
+
+@pytest.mark.unit
+def test_two_stage_search_rescores_the_coarse_candidates(monkeypatch):
+    monkeypatch.setenv("RERANK_ENABLED", "false")
+    # Sin clientes de Vertex: solo se prueba el camino de búsqueda.
+    store = VectorStore.__new__(VectorStore)
+    store._init_search({"coarse_dimensions": 2, "coarse_candidates": 3})
+
+    # En las dos primeras dimensiones el artículo 1 parece el más cercano; con el
+    # vector completo lo es el 2.
+    db = FakeDB({
+        "1/a": encode_full_vector([1.0, 0.0, -1.0]),
+        "2/b": encode_full_vector([0.9, 0.1, 1.0]),
+        "3/c": encode_full_vector([0.5, 0.5, 0.7]),
+    })
+    monkeypatch.setattr(vector_store_module, "DatabaseManager", lambda: db)
+    coarse_calls = []
+
+    def coarse_candidates(vectors, n, filters):
+        coarse_calls.append((vectors, n))
+        return [["1/a", "2/b", "3/c"] for _ in vectors]
+
+    store._coarse_candidates = coarse_candidates
+    store.query_batcher = QueryBatcher(
+        lambda queries: [[1.0, 0.0, 1.0] for _ in queries], store._find_neighbors, window=0
+    )
+
+    response = store.search_similar("consulta", k=2)
+
+    [(vectors, n)] = coarse_calls
+    assert n == 3 and len(vectors[0]) == 2
+    assert np.linalg.norm(vectors[0]) == pytest.approx(1.0)
+    assert db.requested == [["1/a", "2/b", "3/c"]]
+    assert [r["id"] for r in response["results"]] == [2, 3]
+
+
+@pytest.mark.unit
+def test_enough_candidates_recover_the_exact_top_k():
+    rng = np.random.default_rng(7)
+    corpus = truncate_vectors(rng.normal(size=(300, 32)), None)
+    queries = truncate_vectors(rng.normal(size=(20, 32)), None)
+    truth = exact_top_k(corpus, queries, 10)
+
+    assert recall(two_stage_top_k(corpus, queries, 10, 8, 300), truth) == 1.0
+    assert recall(two_stage_top_k(corpus, queries, 10, 8, 10), truth) < 1.0
@@ -0,0 +1,160 @@
+import threading
+import pytest
+from storage.upsert_writer import UpsertWriter
+
+
+class TransientError(Exception):
+    pass
+
+
+class FakeIndex:
+    """Índice falso que registra cada upsert y rechaza los IDs indicados."""
+
+    def __init__(self, rejected=(), transient_failures=0):
+        self.rejected = set(rejected)
+        self.transient_failures = transient_failures
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def upsert_datapoints(self, datapoints):
+        with self._lock:
+            self.calls.append([dp["datapoint_id"] for dp in datapoints])
+            if self.transient_failures:
+                self.transient_failures -= 1
+                raise TransientError("503")
+        if any(dp["datapoint_id"] in self.rejected for dp in datapoints):
+            raise ValueError("invalid datapoint")
+
+
+def datapoints(article_id, n):
+    return [{"datapoint_id": f"{article_id}/{i}", "feature_vector": [0.0]} for i in range(n)]
+
+
+def make_writer(index, **kwargs):
+    kwargs.setdefault("flush_interval", 60)
+    return UpsertWriter(
+        index,
+        is_transient=lambda e: isinstance(e, TransientError),
+        sleep=lambda _: None,
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+def test_writer_batches_across_articles():
+    index = FakeIndex()
+    indexed = []
+    with make_writer(index, batch_size=4, on_indexed=indexed.extend) as writer:
+        writer.add(datapoints(1, 3))
+        writer.add(datapoints(2, 3))
+        report = writer.flush()
+
+    assert sorted(len(c) for c in index.calls) == [2, 4]
+    assert report.indexed_articles == {1, 2}
+    assert report.datapoints_written == 6
+    assert sorted(indexed) == [1, 2]
+
+
+@pytest.mark.unit
+def test_writer_retries_transient_errors():
+    index = FakeIndex(transient_failures=2)
+    with make_writer(index, batch_size=10) as writer:
+        writer.add(datapoints(1, 2))
+        report = writer.flush()
+
+    assert len(index.calls) == 3
+    assert report.indexed_articles == {1}
+
+
+@pytest.mark.unit
+def test_writer_isolates_rejected_datapoints():
+    index = FakeIndex(rejected={"2/1"})
+    failed, rejected = {}, []
+    with make_writer(index, batch_size=10, on_failed=failed.update, on_rejected=rejected.extend) as writer:
+        writer.add(datapoints(1, 3) + datapoints(2, 3))
+        report = writer.flush()
+
+    assert report.indexed_articles == {1}
+    assert set(report.failed_articles) == {2}
+    assert set(report.failed_datapoints) == {"2/1"}
+    assert report.datapoints_written == 5
+    assert set(failed) == {2}
+    # Solo el datapoint rechazado pierde su fila de chunk; los del artículo 2 que sí llegaron se conservan.
+    assert rejected == ["2/1"]
+
+
+@pytest.mark.unit
+def test_writer_flushes_on_interval():
+    index = FakeIndex()
+    writer = make_writer(index, batch_size=100, flush_interval=0.05)
+    writer.add(datapoints(1, 1))
+    for _ in range(100):
+        if index.calls:
+            break
+        threading.Event().wait(0.01)
+    writer.close()
+
+    assert index.calls == [["1/0"]]
+
+
+class ArticleRejectingIndex:
+    """Índice falso que rechaza todos los datapoints de los artículos indicados."""
+
+    def __init__(self, rejected_articles):
+        self.rejected_articles = set(rejected_articles)
+
+    def upsert_datapoints(self, datapoints):
+        if any(UpsertWriter.article_id_of(dp) in self.rejected_articles for dp in datapoints):
+            raise ValueError("invalid datapoint")
+
+
+class RecordingDB:
+    def __init__(self):
+        self.chunks = {}
+        self.embeddings = {}
+        self.indexed, self.failed = [], {}
+
+    def add_chunks(self, chunks):
+        self.chunks.update({c["datapoint_id"]: c["article_id"] for c in chunks})
+
+    def delete_chunks(self, datapoint_ids):
+        for datapoint_id in datapoint_ids:
+            del self.chunks[datapoint_id]
+
+    def save_article_embeddings(self, embeddings):
+        self.embeddings.update(embeddings)
+
+    def mark_articles_indexed(self, article_ids):
+        self.indexed.extend(article_ids)
+
+    def mark_articles_index_failed(self, errors):
+        self.failed.update(errors)
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0, float(i)] for i in range(len(texts))]
+
+
+@pytest.mark.unit
+def test_store_writer_only_keeps_what_reached_the_index(monkeypatch):
+    import storage.vector_store as vector_store_module
+    from storage.vector_store import VectorStore
+
+    db = RecordingDB()
+    monkeypatch.setattr(vector_store_module, "DatabaseManager", lambda: db)
+    store = VectorStore.__new__(VectorStore)
+    store.index = ArticleRejectingIndex({2})
+    store.deployed_index_id = "desplegado"
+    store.embeddings = FakeEmbeddings()
+    store.coarse_dimensions = 0
+    store._init_version(None)
+
+    with store.new_writer(batch_size=1, base_delay=0) as writer:
+        store.vectorize_and_store_many({1: ["a", "b"], 2: ["c"]}, writer)
+        report = writer.flush()
+
+    assert db.indexed == [1] and set(db.failed) == {2}
+    # El artículo rechazado no deja filas de chunk ni embedding de artículo.
+    assert sorted(db.chunks.values()) == [1, 1] and set(db.embeddings) == {1}
+    assert set(report.failed_articles) == {2} and store._pending_embeddings == {}
@@ -0,0 +1,108 @@
+import pytest
+from ingestion.models import Article
+from ingestion.providers.provider_i import ProviderRateLimitError
+from uses_cases.article_ingestion import IngestionResult
+from uses_cases.watchlist import WatchlistEntry, WatchlistScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProviderScheduler:
+    """Devuelve los artículos configurados por (fuente, consulta) y cuenta los fetch."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def fetch(self, source, query):
+        self.calls.append((source, query))
+        result = self.results[(source, query)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class FakeIngestionService:
+    def __init__(self, results):
+        self.provider_scheduler = FakeProviderScheduler(results)
+        self.ingested = []
+
+    def ingest_fetched(self, source, articles):
+        self.ingested.append((source, [a.title for a in articles]))
+        return IngestionResult(message="ok", fetched=len(articles), new=len(articles), indexed=len(articles))
+
+
+def articles(*titles, content="text"):
+    return [Article(title=t, url=f"https://example.com/{t}", content=content) for t in titles]
+
+
+def make_scheduler(service, clock, entries, **kwargs):
+    return WatchlistScheduler(entries, ingestion_service=service, jitter=0, clock=clock, **kwargs)
+
+
+@pytest.mark.unit
+def test_unchanged_topics_are_skipped_and_backed_off():
+    clock = FakeClock()
+    service = FakeIngestionService({("newsapi", "ai"): articles("a", "b")})
+    scheduler = make_scheduler(service, clock, [WatchlistEntry(source="newsapi", query="ai", interval_seconds=100)])
+
+    clock.now = 100
+    first = scheduler.run_due()
+    clock.now += scheduler.next_due_in()
+    second = scheduler.run_due()
+
+    assert first.articles_new == 2 and first.topics_unchanged == 0
+    assert second.topics_unchanged == 1
+    # Solo la primera ejecución llegó a la ingesta.
+    assert len(service.ingested) == 1
+    # Tema sin cambios: el intervalo se duplica.
+    assert scheduler.next_due_in() == pytest.approx(200)
+
+
+@pytest.mark.unit
+def test_changed_results_are_ingested_and_reset_the_interval(tmp_path):
+    clock = FakeClock()
+    results = {("core", "llm"): articles("a")}
+    service = FakeIngestionService(results)
+    state = tmp_path / "state.json"
+    entry = WatchlistEntry(source="core", query="llm", interval_seconds=100)
+    scheduler = make_scheduler(service, clock, [entry], state_path=str(state))
+
+    clock.now = 100
+    scheduler.run_due()
+    clock.now += scheduler.next_due_in()
+    scheduler.run_due()
+    results[("core", "llm")] = articles("a", "b")
+    clock.now += scheduler.next_due_in()
+    scheduler.run_due()
+    # Mismos titulares y URLs, pero el cuerpo de los artículos se ha corregido.
+    results[("core", "llm")] = articles("a", "b", content="text corrected")
+    clock.now += scheduler.next_due_in()
+    scheduler.run_due()
+
+    assert [titles for _, titles in service.ingested] == [["a"], ["a", "b"], ["a", "b"]]
+    assert scheduler.next_due_in() == pytest.approx(100)
+
+    # Tras reiniciar, el estado persistido evita reprocesar el tema.
+    restarted = make_scheduler(service, clock, [entry], state_path=str(state))
+    clock.now += 100
+    assert restarted.run_due().topics_unchanged == 1
+
+
+@pytest.mark.unit
+def test_rate_limited_topic_is_rescheduled_after_retry_after():
+    clock = FakeClock()
+    service = FakeIngestionService({("perigon", "x"): ProviderRateLimitError("429", retry_after=500)})
+    scheduler = make_scheduler(service, clock, [WatchlistEntry(source="perigon", query="x", interval_seconds=60)])
+
+    clock.now = 60
+    report = scheduler.run_due()
+
+    assert report.topics_failed == 1
+    assert scheduler.next_due_in() == pytest.approx(500)
@@ -1,101 +1,393 @@
 # services/article_service.py
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel
 from ingestion.factory import NewsProviderFactory
+from ingestion.providers.provider_i import ProviderError
+from ingestion.scheduler import ProviderScheduler
 from ingestion.models import Article
-from cleaning.cleaner import Cleaner
+from cleaning.cleaner import Cleaner, content_hash
 from database.manager import DatabaseManager
-from chunking.chunker import DocumentChunker
-from chunking.strategies.semantic import SemanticChunkingStrategy
-from storage.vector_store import VectorStore
+from services.deadlines import DeadlineExceeded
+from chunking.chunker import DocumentChunker, build_document_chunker, build_version_chunker
+from storage.upsert_writer import UpsertReport
+from storage.backends import build_vector_store
+from storage.related_index import RelatedArticlesIndex
+from storage.story_clusters import StoryClusterer
 
 logger = logging.getLogger(__name__)
 
 class ArticleIngestionError(Exception):
     """Base exception for ingestion errors."""
 
+class RecordOutcome(BaseModel):
+    """
+    What happened to one input article: "indexed", "updated" (re-indexed after a
+    content change), "duplicate" (already stored with this content) or "failed".
+    """
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class IngestionResult(BaseModel):
+    """Outcome of one ingest call: the message returned by the API plus counters."""
+    message: str
+    fetched: int = 0
+    new: int = 0
+    redriven: int = 0
+    updated: int = 0
+    indexed: int = 0
+    failed: int = 0
+    # One per input article, in input order.
+    outcomes: List[RecordOutcome] = []
+
+
 class ArticleIngestionService:
-    def __init__(self):
+    def __init__(self, chunk_workers: int = None):
         self.db_manager = DatabaseManager()
         self.news_factory = NewsProviderFactory()
+        self.provider_scheduler = ProviderScheduler(self.news_factory)
         self.cleaner = Cleaner()
-        self.chunker = DocumentChunker(strategy=SemanticChunkingStrategy())
-        self.vector_store = VectorStore()
+        self.chunker = build_document_chunker()
+        self.vector_store = build_vector_store()
+        self.related_index = RelatedArticlesIndex(self.db_manager, vector_store=self.vector_store)
+        self.story_clusterer = StoryClusterer(self.db_manager)
+        # Called with {id: Article} for the articles each indexing run made searchable.
+        self.indexed_listeners: List[Callable[[Dict[int, Article]], None]] = []
+        self.chunk_workers = chunk_workers or int(os.getenv("INGEST_CHUNK_WORKERS", "8"))
+        # A stored but unindexed article is only re-driven once it has been idle this
+        # long: until then another ingest run (or the sweeper) may still be on it.
+        self.redrive_idle_seconds = int(os.getenv("REDRIVE_IDLE_SECONDS", "300"))
 
     def ingest_articles(self, source: str, query: str) -> str:
         try:
-            # 1. Fetch articles from external source
-            provider = self.news_factory.get_provider(source)
-            articles = provider.fetch_articles(query=query)
+            # 1. Fetch articles from external source (rate limited, retried, coalesced)
+            articles = self.provider_scheduler.fetch(source, query)
+        except (ProviderError, DeadlineExceeded):
+            raise
+        except Exception as e:
+            logger.critical(f"Unexpected ingestion error: {e}", exc_info=True)
+            raise ArticleIngestionError("Ingestion process failed") from e
+        return self.ingest_fetched(source, articles).message
+
+    def ingest_fetched(self, source: str, articles: List[Article]) -> IngestionResult:
+        """
+        Runs clean -> dedup -> store -> index for articles already fetched from `source`.
+        """
+        try:
+            articles = [a if a.source else a.model_copy(update={"source": source}) for a in articles]
 
             if not articles:
                 msg = "No articles found from the external source."
                 logger.warning(msg)
-                return msg
-
-            # 2. Avoid duplicates
-            new_articles = [
-                article for article in articles
-                if not self.db_manager.article_exists_by_title(article.title)
-            ]
-            if not new_articles:
-                msg = "No new articles to process. All fetched articles already exist."
-                logger.info(msg)
-                return msg
-
-            # 3. Clean articles
-            clean_articles = []
-            for a in new_articles:
-                try:
-                    clean_content = self.cleaner.clean(a.content)
-                    clean_articles.append(
-                        Article(
-                            title=a.title,
-                            url=a.url,
-                            content=clean_content,
-                            published_at=a.published_at,
-                            content_preview=a.content_preview,
-                        )
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to clean article '{a.title}': {e}", exc_info=True)
+                return IngestionResult(message=msg)
 
+            # 2. Clean articles. Change detection compares hashes of the cleaned text.
+            cleaned = self._clean_all(articles)
+            clean_articles = [a for a in cleaned if a is not None]
+            result = IngestionResult(message="", fetched=len(articles), failed=len(articles) - len(clean_articles))
+            # Article (by identity) -> stored ID, or an error for those not stored.
+            stored: Dict[int, Tuple[Optional[int], Optional[str]]] = {}
+            report = UpsertReport()
             if not clean_articles:
-                msg = "All new articles failed during cleaning."
-                logger.error(msg)
-                return msg
+                result.message = "All new articles failed during cleaning."
+                logger.error(result.message)
+                result.outcomes = self._outcomes(cleaned, stored, set(), report)
+                return result
 
-            # 4. Store metadata in DB
-            article_ids = []
+            # 3. Classify against what is stored. Known titles that never reached the
+            # index are re-driven; indexed ones are re-processed only if their content
+            # changed. Unknown titles whose content is already stored are retitled copies.
+            new_articles, retry_articles, updated_articles = self._classify(clean_articles)
+            result.new = len(new_articles)
+            result.redriven = len(retry_articles)
+            result.updated = len(updated_articles)
+            if not new_articles and not retry_articles and not updated_articles:
+                result.message = "No new articles to process. All fetched articles already exist."
+                logger.info(result.message)
+                result.outcomes = self._outcomes(cleaned, stored, set(), report)
+                return result
+
+            # 4. Store metadata (and the content, until indexed) in DB
             id_to_article = {}
-            for a in clean_articles:
+            try:
+                ids = self.db_manager.add_articles(new_articles)
+                id_to_article = {aid: a for aid, a in zip(ids, new_articles) if aid is not None}
+                stored.update({id(a): (aid, None) for aid, a in zip(ids, new_articles)})
+            except Exception as e:
+                logger.error(f"Failed to store {len(new_articles)} articles in DB: {e}", exc_info=True)
+                stored.update({id(a): (None, f"storing: {e}") for a in new_articles})
+                result.failed += len(new_articles)
+            if retry_articles or updated_articles:
+                self.db_manager.update_articles({**retry_articles, **updated_articles})
+                id_to_article.update(retry_articles)
+                id_to_article.update(updated_articles)
+                stored.update({id(a): (aid, None) for aid, a in {**retry_articles, **updated_articles}.items()})
+
+            if not id_to_article:
+                result.message = "Failed to store any articles in the database."
+                logger.error(result.message)
+                result.outcomes = self._outcomes(cleaned, stored, set(), report)
+                return result
+
+            # 5. Chunking + Vectorization, then batched upserts across all articles
+            report = self.index_articles(id_to_article, incremental=set(updated_articles))
+            if report.failed_articles:
+                logger.error(
+                    f"Vectors for {len(report.failed_articles)} articles could not be indexed "
+                    f"and were marked for retry: {sorted(report.failed_articles)}"
+                )
+
+            result.indexed = len(report.indexed_articles)
+            result.failed += len(report.failed_articles)
+            result.message = f"Successfully processed and stored {len(id_to_article)} articles."
+            result.outcomes = self._outcomes(cleaned, stored, set(updated_articles), report)
+            return result
+
+        except Exception as e:
+            logger.critical(f"Unexpected ingestion error: {e}", exc_info=True)
+            raise ArticleIngestionError("Ingestion process failed") from e
+
+    @staticmethod
+    def _outcomes(
+        cleaned: List[Optional[Article]],
+        stored: Dict[int, Tuple[Optional[int], Optional[str]]],
+        updated: Set[int],
+        report: UpsertReport,
+    ) -> List[RecordOutcome]:
+        outcomes = []
+        for article in cleaned:
+            if article is None:
+                outcomes.append(RecordOutcome(status="failed", error="cleaning failed"))
+                continue
+            aid, error = stored.get(id(article), (None, None))
+            if error:
+                outcomes.append(RecordOutcome(status="failed", error=error))
+            elif aid is None:
+                outcomes.append(RecordOutcome(status="duplicate"))
+            elif aid in report.failed_articles:
+                outcomes.append(RecordOutcome(status="failed", id=aid, error=report.failed_articles[aid]))
+            elif aid in report.indexed_articles:
+                outcomes.append(RecordOutcome(status="updated" if aid in updated else "indexed", id=aid))
+            else:
+                outcomes.append(RecordOutcome(status="failed", id=aid, error="not indexed"))
+        return outcomes
+
+    def _classify(
+        self, articles: List[Article]
+    ) -> Tuple[List[Article], Dict[int, Article], Dict[int, Article]]:
+        """
+        Splits cleaned articles into (new, re-driven by ID, updated by ID). Unchanged
+        and retitled articles are dropped, and so are unindexed ones another run is
+        still processing.
+        """
+        known = self.db_manager.get_statuses_by_title([a.title for a in articles])
+        digests = [content_hash(a.content) for a in articles]
+        known_hashes = self.db_manager.get_existing_hashes(
+            [d for a, d in zip(articles, digests) if a.title not in known]
+        )
+
+        claimed = self.db_manager.claim_idle_articles(
+            [aid for aid, status, _ in known.values() if status != "indexed"], self.redrive_idle_seconds
+        )
+
+        new_articles, retry_articles, updated_articles, legacy_hashes = [], {}, {}, {}
+        for a, digest in zip(articles, digests):
+            if a.title not in known:
+                if digest not in known_hashes:
+                    new_articles.append(a)
+                continue
+            aid, status, stored_hash = known[a.title]
+            if status != "indexed":
+                if aid in claimed:
+                    retry_articles[aid] = a
+            elif stored_hash is None:
+                # Indexed before hashes were recorded: assume unchanged, remember the hash.
+                legacy_hashes[aid] = digest
+            elif stored_hash != digest:
+                updated_articles[aid] = a
+        self.db_manager.set_content_hashes(legacy_hashes)
+        return new_articles, retry_articles, updated_articles
+
+    def _clean_all(self, articles: List[Article]) -> List[Optional[Article]]:
+        """Cleans each article's content; failed articles come back as None."""
+        cleaned = []
+        for a in articles:
+            try:
+                cleaned.append(a.model_copy(update={"content": self.cleaner.clean(a.content, source=a.source)}))
+            except Exception as e:
+                logger.error(f"Failed to clean article '{a.title}': {e}", exc_info=True)
+                cleaned.append(None)
+        return cleaned
+
+    def index_articles(
+        self, id_to_article: Dict[int, Article], incremental: Optional[Set[int]] = None
+    ) -> UpsertReport:
+        """
+        Runs the chunk -> embed -> upsert stages for articles already stored in the
+        database, recording each stage (or the failure) on the article. Chunking runs
+        concurrently; upserts are batched across articles.
+
+        Articles in `incremental` are new versions of indexed articles: only chunks
+        whose text changed are embedded, unchanged ones keep their vectors. For the
+        others, anything an earlier attempt stored is replaced. Outdated datapoints
+        are removed from the index once the new ones are written.
+        """
+        incremental = incremental or set()
+        errors: Dict[int, str] = {}
+        chunks_by_article: Dict[int, List[str]] = {}
+        chunker = self._chunker()
+
+        with ThreadPoolExecutor(max_workers=self.chunk_workers) as executor:
+            futures = {aid: executor.submit(chunker.chunk, a) for aid, a in id_to_article.items()}
+            for aid, future in futures.items():
                 try:
-                    aid = self.db_manager.add_article(a)
-                    article_ids.append(aid)
-                    id_to_article[aid] = a
+                    chunks = future.result()
                 except Exception as e:
-                    logger.error(f"Failed to store article '{a.title}' in DB: {e}", exc_info=True)
+                    logger.error(f"Failed to chunk article ID {aid}: {e}", exc_info=True)
+                    errors[aid] = f"chunking: {e}"
+                    continue
+                if not chunks:
+                    logger.warning(f"No chunks generated for article '{id_to_article[aid].title}' (ID {aid})")
+                    errors[aid] = "chunking: no chunks generated"
+                    continue
+                chunks_by_article[aid] = chunks
+        self.db_manager.mark_stage(list(chunks_by_article), "chunked")
 
-            if not article_ids:
-                msg = "Failed to store any articles in the database."
-                logger.error(msg)
-                return msg
+        pending, stale = self._diff_chunks(chunks_by_article, incremental)
 
-            # 5. Chunking + Vectorization + Storage
-            for aid, article in id_to_article.items():
+        embedded = []
+        with self.vector_store.new_writer() as writer:
+            for aid, chunks in pending.items():
+                if not chunks:
+                    continue
                 try:
-                    chunks = self.chunker.chunk(article)
-                    if not chunks:
-                        logger.warning(f"No chunks generated for article '{article.title}' (ID {aid})")
-                        continue
-                    self.vector_store.vectorize_and_store(aid, chunks)
+                    self.vector_store.vectorize_and_store(
+                        aid,
+                        [text for _, text in chunks],
+                        writer=writer,
+                        article=id_to_article[aid],
+                        positions=[position for position, _ in chunks],
+                    )
+                    embedded.append(aid)
                 except Exception as e:
                     logger.error(
-                        f"Failed to process chunks for article '{article.title}' (ID {aid}): {e}",
+                        f"Failed to process chunks for article '{id_to_article[aid].title}' (ID {aid}): {e}",
                         exc_info=True
                     )
+                    errors[aid] = f"embedding: {e}"
+            self.db_manager.mark_stage(embedded, "embedded")
+            report = writer.flush()
 
-            return f"Successfully processed and stored {len(article_ids)} articles."
+        # Updated articles whose chunks were all unchanged never reach the writer.
+        unchanged = [aid for aid, chunks in pending.items() if not chunks]
+        self.db_manager.mark_stage(unchanged, "indexed")
+        report.indexed_articles.update(unchanged)
 
+        # Drop outdated datapoints, except for articles whose new vectors didn't land.
+        outdated = [
+            dp for aid, ids in stale.items()
+            if aid not in report.failed_articles and aid not in errors
+            for dp in ids
+        ]
+        try:
+            self.vector_store.remove_datapoints(outdated)
         except Exception as e:
-            logger.critical(f"Unexpected ingestion error: {e}", exc_info=True)
-            raise ArticleIngestionError("Ingestion process failed") from e
+            logger.error(f"Failed to remove {len(outdated)} outdated datapoints: {e}", exc_info=True)
+
+        indexed_now = [aid for aid in embedded if aid in report.indexed_articles]
+        self._update_related(indexed_now, incremental)
+        self._assign_stories([aid for aid in indexed_now if aid not in incremental])
+        self._notify_indexed({aid: id_to_article[aid] for aid in report.indexed_articles if aid in id_to_article})
+
+        self.db_manager.mark_failed(errors)
+        for aid, error in errors.items():
+            report.failed_articles.setdefault(aid, error)
+        return report
+
+    def _chunker(self) -> DocumentChunker:
+        # The active index version may have been built with another strategy; new
+        # articles must be chunked the same way.
+        strategy = self.vector_store.chunking_strategy
+        return build_version_chunker(strategy) if strategy else self.chunker
+
+    def _update_related(self, article_ids: List[int], incremental: Set[int]):
+        """
+        Refreshes the related-article lists touched by newly indexed vectors. A
+        failure here is logged: the articles are searchable either way.
+        """
+        if not article_ids:
+            return
+        try:
+            # Partially re-embedded articles have no complete set of fresh vectors.
+            self.vector_store.refresh_article_embeddings([aid for aid in article_ids if aid in incremental])
+            self.related_index.update(article_ids)
+        except Exception as e:
+            logger.error(f"Failed to update related articles for {len(article_ids)} articles: {e}", exc_info=True)
+
+    def _notify_indexed(self, articles: Dict[int, Article]):
+        if not articles:
+            return
+        for listener in self.indexed_listeners:
+            try:
+                listener(articles)
+            except Exception as e:
+                logger.error(f"Indexed-articles listener failed: {e}", exc_info=True)
+
+    def _assign_stories(self, article_ids: List[int]):
+        """
+        Adds newly indexed articles to story clusters (an updated article keeps its
+        story). Like related articles, a failure doesn't fail the ingestion.
+        """
+        if not article_ids:
+            return
+        try:
+            self.story_clusterer.assign(article_ids)
+        except Exception as e:
+            logger.error(f"Failed to assign {len(article_ids)} articles to stories: {e}", exc_info=True)
+
+    def _diff_chunks(
+        self, chunks_by_article: Dict[int, List[str]], incremental: Set[int]
+    ) -> Tuple[Dict[int, List[Tuple[int, str]]], Dict[int, List[str]]]:
+        """
+        Compares new chunks with the stored ones. Returns the (position, text) pairs
+        to embed per article and the outdated datapoint IDs per article.
+        """
+        stored: Dict[int, list] = {}
+        chunks = self.db_manager.get_chunks_for_articles(list(chunks_by_article), self.vector_store.version_name)
+        for chunk in chunks:
+            stored.setdefault(chunk.article_id, []).append(chunk)
+
+        pending: Dict[int, List[Tuple[int, str]]] = {}
+        stale: Dict[int, List[str]] = {}
+        moved: Dict[int, int] = {}
+        for aid, chunks in chunks_by_article.items():
+            previous = stored.get(aid, [])
+            if aid not in incremental:
+                pending[aid] = list(enumerate(chunks))
+                stale[aid] = [c.datapoint_id for c in previous]
+                continue
+
+            by_hash: Dict[str, list] = {}
+            for c in previous:
+                by_hash.setdefault(c.content_hash, []).append(c)
+            pending[aid] = []
+            for position, text in enumerate(chunks):
+                kept = by_hash.get(content_hash(text))
+                if kept:
+                    c = kept.pop()
+                    if c.position != position:
+                        moved[c.id] = position
+                else:
+                    pending[aid].append((position, text))
+            stale[aid] = [c.datapoint_id for cs in by_hash.values() for c in cs]
+            logger.info(
+                f"Article {aid} changed: {len(pending[aid])} of {len(chunks)} chunks to embed, "
+                f"{len(stale[aid])} outdated"
+            )
+
+        self.db_manager.update_chunk_positions(moved)
+        return pending, stale
@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional
+from pydantic import BaseModel
+from ingestion.dump_reader import InvalidRecordError, iter_articles, expand_paths
+from ingestion.models import Article
+from cleaning.cleaner import Cleaner
+from database.manager import DatabaseManager
+from chunking.chunker import build_document_chunker, build_version_chunker
+from storage.upsert_writer import UpsertWriter
+from storage.backends import build_vector_store
+from storage.related_index import RelatedArticlesIndex
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillError(Exception):
+    """Raised when a backfill run cannot continue."""
+
+
+class BackfillReport(BaseModel):
+    """Counters for a backfill run, updated after every batch."""
+    records_read: int = 0
+    articles_stored: int = 0
+    duplicates_skipped: int = 0
+    failed: int = 0
+    chunks_indexed: int = 0
+    invalid_records: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records_read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.records_read} records read, {self.articles_stored} stored, "
+            f"{self.duplicates_skipped} duplicates, {self.failed} failed, "
+            f"{self.invalid_records} invalid, "
+            f"{self.chunks_indexed} chunks indexed in {self.elapsed_seconds:.1f}s "
+            f"({self.records_per_second:.1f} records/s)"
+        )
+
+
+class Checkpoint:
+    """
+    Persists how many records of each dump file have been fully processed, so an
+    interrupted backfill resumes after the last committed batch.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.positions: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.positions = json.load(f)
+
+    def get(self, dump_path: str) -> int:
+        return self.positions.get(os.path.abspath(dump_path), 0)
+
+    def advance(self, dump_path: str, records: int):
+        key = os.path.abspath(dump_path)
+        self.positions[key] = self.positions.get(key, 0) + records
+        if not self.path:
+            return
+        # Write-then-rename so a crash never leaves a truncated checkpoint behind.
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.positions, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _clean_article(article: Article) -> Optional[Article]:
+    # Runs in a worker process; Cleaner is stateless so a fresh instance is cheap.
+    try:
+        return article.model_copy(update={"content": Cleaner().clean(article.content, source=article.source)})
+    except Exception as e:
+        logger.error(f"Failed to clean article '{article.title}': {e}")
+        return None
+
+
+class BackfillService:
+    """
+    Streams article dumps through clean -> bulk insert -> chunk -> batched embed ->
+    batched upsert. Cleaning runs in a process pool; chunking runs in a thread pool
+    because the semantic strategy is bound by remote embedding calls.
+
+    Invalid records are logged, counted and skipped unless `fail_on_invalid` is set,
+    in which case the first one stops the run with BackfillError.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        processes: Optional[int] = None,
+        chunk_threads: int = 8,
+        checkpoint_path: Optional[str] = None,
+        fail_on_invalid: bool = False,
+    ):
+        self.batch_size = batch_size
+        self.fail_on_invalid = fail_on_invalid
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_threads = chunk_threads
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.db_manager = DatabaseManager()
+        self.chunker = build_document_chunker()
+        self.vector_store = build_vector_store()
+        self.related_index = RelatedArticlesIndex(self.db_manager, vector_store=self.vector_store)
+
+    def run(self, paths: List[str]) -> BackfillReport:
+        files = expand_paths(paths)
+        if not files:
+            raise BackfillError("No dump files found to backfill.")
+
+        report = BackfillReport()
+        started = time.monotonic()
+
+        with Pool(processes=self.processes) as pool, ThreadPoolExecutor(
+            max_workers=self.chunk_threads
+        ) as chunk_executor, self.vector_store.new_writer() as writer:
+            for dump_path in files:
+                skip = self.checkpoint.get(dump_path)
+                if skip:
+                    logger.info(f"Resuming '{dump_path}' after {skip} records.")
+
+                batch: List[Article] = []
+                # Invalid records read since the last checkpoint; they count as consumed.
+                invalid: List[InvalidRecordError] = []
+                for article in self._read(dump_path, skip, invalid):
+                    batch.append(article)
+                    if len(batch) >= self.batch_size:
+                        self._process_batch(batch, pool, chunk_executor, writer, report)
+                        self._advance(dump_path, batch, invalid, report)
+                        report.elapsed_seconds = time.monotonic() - started
+                        logger.info(f"Backfill progress: {report.summary()}")
+                        batch = []
+
+                if batch:
+                    self._process_batch(batch, pool, chunk_executor, writer, report)
+                self._advance(dump_path, batch, invalid, report)
+
+                report.elapsed_seconds = time.monotonic() - started
+                logger.info(f"Finished '{dump_path}': {report.summary()}")
+
+        return report
+
+    def _read(self, dump_path: str, skip: int, invalid: List[InvalidRecordError]) -> Iterator[Article]:
+        def on_invalid(error: InvalidRecordError):
+            logger.warning(f"Skipping {error}")
+            invalid.append(error)
+
+        try:
+            yield from iter_articles(
+                dump_path, skip=skip, on_invalid=None if self.fail_on_invalid else on_invalid
+            )
+        except InvalidRecordError as e:
+            raise BackfillError(str(e)) from e
+        except (ValueError, ImportError, OSError) as e:
+            # Unsupported format, missing pyarrow, unreadable or corrupt file.
+            raise BackfillError(f"Cannot read '{dump_path}': {e}") from e
+
+    def _advance(
+        self,
+        dump_path: str,
+        batch: List[Article],
+        invalid: List[InvalidRecordError],
+        report: BackfillReport,
+    ):
+        records = len(batch) + len(invalid)
+        if not records:
+            return
+        report.invalid_records += len(invalid)
+        self.checkpoint.advance(dump_path, records)
+        invalid.clear()
+
+    def _process_batch(
+        self,
+        batch: List[Article],
+        pool: Pool,
+        chunk_executor: ThreadPoolExecutor,
+        writer: UpsertWriter,
+        report: BackfillReport,
+    ):
+        report.records_read += len(batch)
+
+        # 1. Clean (CPU bound, multiprocess)
+        chunksize = max(1, len(batch) // (self.processes * 4))
+        cleaned = [a for a in pool.map(_clean_article, batch, chunksize=chunksize) if a]
+        report.failed += len(batch) - len(cleaned)
+        if not cleaned:
+            return
+
+        # 2. Bulk insert, dedup by title in the same query
+        ids = self.db_manager.add_articles(cleaned)
+        stored = {aid: a for aid, a in zip(ids, cleaned) if aid is not None}
+        report.duplicates_skipped += len(cleaned) - len(stored)
+        report.articles_stored += len(stored)
+        if not stored:
+            return
+
+        # 3. Chunk (remote-bound, threaded), the way the active index version does
+        errors: Dict[int, str] = {}
+        chunks_by_article: Dict[int, List[str]] = {}
+        strategy = self.vector_store.chunking_strategy
+        chunker = build_version_chunker(strategy) if strategy else self.chunker
+        futures = {aid: chunk_executor.submit(chunker.chunk, a) for aid, a in stored.items()}
+        for aid, future in futures.items():
+            try:
+                chunks = future.result()
+            except Exception as e:
+                logger.error(f"Failed to chunk article ID {aid}: {e}", exc_info=True)
+                errors[aid] = f"chunking: {e}"
+                continue
+            if chunks:
+                chunks_by_article[aid] = chunks
+            else:
+                errors[aid] = "chunking: no chunks generated"
+        self.db_manager.mark_stage(list(chunks_by_article), "chunked")
+
+        # 4. Batched embedding
+        try:
+            self.vector_store.vectorize_and_store_many(chunks_by_article, writer, stored)
+            self.db_manager.mark_stage(list(chunks_by_article), "embedded")
+        except Exception as e:
+            logger.error(f"Failed to vectorize batch of {len(chunks_by_article)} articles: {e}", exc_info=True)
+            errors.update({aid: f"embedding: {e}" for aid in chunks_by_article})
+            chunks_by_article = {}
+
+        # Failed articles keep their content and are picked up by the pipeline sweeper.
+        self.db_manager.mark_failed(errors)
+        report.failed += len(errors)
+        if not chunks_by_article:
+            return
+
+        # 5. Batched upserts. Flushing before the checkpoint advances guarantees that
+        # a resumed run never skips records whose vectors were still buffered.
+        upserts = writer.flush()
+        report.chunks_indexed += upserts.datapoints_written
+        report.failed += len(upserts.failed_articles)
+
+        # 6. Related articles, one pass over the stored embeddings per batch.
+        try:
+            self.related_index.update(upserts.indexed_articles)
+        except Exception as e:
+            logger.error(f"Failed to update related articles: {e}", exc_info=True)
@@ -0,0 +1,206 @@
+import logging
+import time
+from typing import Dict, Optional
+from pydantic import BaseModel
+from database.manager import DatabaseManager
+from storage.related_index import RelatedArticlesIndex
+from storage.search_filters import restricts_for
+from storage.snapshot import ARTICLE_COLUMNS, SnapshotReader, SnapshotWriter
+from storage.backends import build_vector_store
+from storage.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotReport(BaseModel):
+    """Counters for an export or import run."""
+    articles: int = 0
+    stories: int = 0
+    chunks: int = 0
+    skipped_articles: int = 0
+    missing_vectors: int = 0
+    failed_articles: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.articles} articles, {self.stories} stories, {self.chunks} chunks, "
+            f"{self.skipped_articles} skipped, "
+            f"{self.missing_vectors} missing vectors, {self.failed_articles} failed "
+            f"in {self.elapsed_seconds:.1f}s"
+        )
+
+
+class CorpusSnapshotService:
+    """
+    Moves the indexed corpus between environments without re-embedding: articles
+    (with their cleaned content, article embedding and story) and stories come from
+    Postgres, chunk text from `article_chunks` and vectors are read back from the
+    deployed index. Import restores the rows with their original IDs, streams the
+    vectors through the batched upsert writer and then stores the article embeddings
+    of the articles that were indexed and rebuilds their related lists.
+
+    Articles indexed before chunk text was recorded have no chunk rows and are
+    skipped on export (reported as `skipped_articles`); re-ingest them instead.
+    """
+
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        batch_size: int = 500,
+        related_index: Optional[RelatedArticlesIndex] = None,
+    ):
+        self.db_manager = DatabaseManager()
+        self.vector_store = vector_store or build_vector_store()
+        self.batch_size = batch_size
+        self.related_index = related_index or RelatedArticlesIndex(self.db_manager)
+
+    def export_to(self, path: str) -> SnapshotReport:
+        report = SnapshotReport()
+        started = time.perf_counter()
+        after_id = 0
+        with SnapshotWriter(path) as writer:
+            while True:
+                rows = self.db_manager.get_indexed_articles(limit=self.batch_size, after_id=after_id)
+                if not rows:
+                    break
+                after_id = rows[-1].id
+
+                chunks = self.db_manager.get_chunks_for_articles(
+                    [r.id for r in rows], self.vector_store.version_name
+                )
+                vectors = self.vector_store.read_vectors([c.datapoint_id for c in chunks])
+                with_chunks = {c.article_id for c in chunks}
+
+                chunk_rows = []
+                for chunk in chunks:
+                    vector = vectors.get(chunk.datapoint_id)
+                    if vector is None:
+                        report.missing_vectors += 1
+                        continue
+                    chunk_rows.append({
+                        "article_id": chunk.article_id,
+                        "position": chunk.position,
+                        "datapoint_id": chunk.datapoint_id,
+                        "text": chunk.text,
+                        "vector": vector,
+                    })
+                exported = [r for r in rows if r.id in with_chunks]
+                contents = self.db_manager.get_contents([r.id for r in exported])
+                embeddings = self.db_manager.get_article_embeddings([r.id for r in exported])
+                writer.write_articles([
+                    {
+                        "id": r.id,
+                        "title": r.title,
+                        "url": r.url,
+                        "published_at": r.published_at,
+                        "content_preview": r.content_preview,
+                        "source": r.source,
+                        "language": r.language,
+                        "content_hash": r.content_hash,
+                        "cluster_id": r.cluster_id,
+                        "content": contents.get(r.id),
+                        "embedding": embeddings.get(r.id),
+                    }
+                    for r in exported
+                ])
+                writer.write_chunks(chunk_rows)
+
+                report.articles += len(exported)
+                report.chunks += len(chunk_rows)
+                report.skipped_articles += len(rows) - len(exported)
+                logger.info(f"Exported articles up to ID {after_id}: {report.summary()}")
+
+            for stories in self.db_manager.iter_story_clusters(self.batch_size):
+                writer.write_stories([
+                    {
+                        "id": c.id,
+                        "label": c.label,
+                        "centroid": bytes(c.centroid),
+                        "size": c.size,
+                        "trend_key": c.trend_key,
+                        "created_at": c.created_at,
+                        "last_article_at": c.last_article_at,
+                    }
+                    for c in stories
+                ])
+                report.stories += len(stories)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info(f"Export to {path} finished: {report.summary()}")
+        return report
+
+    def import_from(self, path: str) -> SnapshotReport:
+        report = SnapshotReport()
+        started = time.perf_counter()
+        reader = SnapshotReader(path)
+
+        # 1. Stories and articles keep their IDs, since datapoint IDs embed the
+        # article's. Existing rows win; an article whose story wasn't restored has none.
+        stories = set()
+        for batch in reader.iter_stories(batch_size=self.batch_size):
+            stories.update(self.db_manager.restore_story_clusters(batch))
+        report.stories = len(stories)
+
+        # Each restored article's restricts are attached to all of its datapoints.
+        restored: Dict[int, Dict[str, list]] = {}
+        columns = [c for c in ARTICLE_COLUMNS if c != "embedding"]
+        for batch in reader.iter_articles(batch_size=self.batch_size, columns=columns):
+            for row in batch:
+                if row.get("cluster_id") not in stories:
+                    row["cluster_id"] = None
+            inserted = set(self.db_manager.restore_articles(batch))
+            restored.update({
+                row["id"]: restricts_for(row.get("source"), row.get("language"), row.get("published_at"))
+                for row in batch
+                if row["id"] in inserted
+            })
+            report.skipped_articles += len(batch) - len(inserted)
+        self.db_manager.reset_id_sequences()
+        report.articles = len(restored)
+
+        # 2. Chunks are streamed from the memory-mapped file straight into the writer;
+        # the writer marks each article indexed once all its vectors have landed.
+        with self.vector_store.new_writer() as writer:
+            for metadata, vectors in reader.iter_chunks():
+                chunk_rows, datapoints = [], []
+                # A two-stage store indexes truncated vectors and keeps the full ones.
+                index_vectors = self.vector_store.index_vectors(vectors.tolist())
+                for row, vector, index_vector in zip(metadata, vectors, index_vectors):
+                    restricts = restored.get(row["article_id"])
+                    if restricts is None:
+                        continue
+                    chunk_rows.append(dict(
+                        row,
+                        index_version=self.vector_store.version_name,
+                        **self.vector_store.full_vector_column(vector),
+                    ))
+                    datapoints.append({
+                        "datapoint_id": row["datapoint_id"],
+                        "feature_vector": index_vector,
+                        **restricts,
+                    })
+                self.db_manager.add_chunks(chunk_rows)
+                writer.add(datapoints)
+                report.chunks += len(datapoints)
+            upserts = writer.flush()
+        report.failed_articles = len(upserts.failed_articles)
+
+        # 3. Article embeddings of the articles that made it into the index, then
+        # their related lists. Snapshots without embeddings read them from the index.
+        for batch in reader.iter_articles(batch_size=self.batch_size, columns=["id", "embedding"]):
+            rows = [
+                row for row in batch
+                if row["id"] in restored and row["id"] not in upserts.failed_articles
+            ]
+            ids = [row["id"] for row in rows]
+            embeddings = {row["id"]: row["embedding"] for row in rows if row.get("embedding")}
+            self.db_manager.save_article_embeddings(embeddings)
+            missing = [aid for aid in ids if aid not in embeddings]
+            if missing:
+                self.vector_store.refresh_article_embeddings(missing)
+            self.related_index.update(ids)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info(f"Import from {path} finished: {report.summary()}")
+        return report
@@ -0,0 +1,85 @@
+import logging
+import time
+from typing import Optional
+from ingestion.models import Article
+from database.manager import DatabaseManager
+from uses_cases.article_ingestion import ArticleIngestionService
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineSweeper:
+    """
+    Re-drives articles that were stored but never reached the 'indexed' stage
+    (a chunking, embedding or upsert failure, or a crash mid-ingest). Articles are
+    resumed from their stored cleaned content in ID order, `batch_size` at a time,
+    and given up on after `max_attempts` recorded failures.
+    """
+
+    def __init__(
+        self,
+        ingestion_service: Optional[ArticleIngestionService] = None,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        idle_seconds: int = 300,
+    ):
+        self.db_manager = DatabaseManager()
+        self.ingestion_service = ingestion_service or ArticleIngestionService()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.idle_seconds = idle_seconds
+
+    def run_once(self) -> dict:
+        """
+        Sweeps every incomplete article once. Returns counts of re-driven, indexed
+        and still-failing articles.
+        """
+        stats = {"redriven": 0, "indexed": 0, "failed": 0}
+        after_id = 0
+        while True:
+            rows = self.db_manager.get_incomplete_articles(
+                limit=self.batch_size,
+                after_id=after_id,
+                max_attempts=self.max_attempts,
+                idle_seconds=self.idle_seconds,
+            )
+            if not rows:
+                break
+            after_id = rows[-1].id
+            # An ingest run may have picked some of them up since the query.
+            claimed = self.db_manager.claim_idle_articles([row.id for row in rows], self.idle_seconds)
+            rows = [row for row in rows if row.id in claimed]
+
+            contents = self.db_manager.get_contents([row.id for row in rows])
+            id_to_article = {
+                row.id: Article(
+                    title=row.title,
+                    url=row.url,
+                    content=contents[row.id],
+                    published_at=row.published_at,
+                    content_preview=row.content_preview,
+                    source=row.source,
+                    language=row.language,
+                )
+                for row in rows
+                if row.id in contents
+            }
+            if not id_to_article:
+                continue
+
+            logger.info(f"Re-driving {len(id_to_article)} incomplete articles (IDs {rows[0].id}..{after_id})")
+            report = self.ingestion_service.index_articles(id_to_article)
+            stats["redriven"] += len(id_to_article)
+            stats["indexed"] += len(report.indexed_articles)
+            stats["failed"] += len(report.failed_articles)
+
+        logger.info(f"Pipeline sweep finished: {stats}")
+        return stats
+
+    def run_forever(self, interval: float = 60.0):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Pipeline sweep failed: {e}", exc_info=True)
+            time.sleep(interval)
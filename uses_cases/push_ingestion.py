@@ -0,0 +1,101 @@
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from ingestion.models import Article
+from ingestion.ndjson_stream import NDJSONArticleDecoder, RecordError, StreamError
+
+logger = logging.getLogger(__name__)
+
+
+class PushRecordResult(BaseModel):
+    """Outcome of one pushed record, identified by its line in the stream."""
+    line: int
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class PushReport(BaseModel):
+    """Counters and per-record results of one pushed stream, results in line order."""
+    received: int = 0
+    indexed: int = 0
+    updated: int = 0
+    duplicate: int = 0
+    failed: int = 0
+    # Set when the stream was malformed; records after that point were not read.
+    error: Optional[str] = None
+    results: List[PushRecordResult] = []
+
+
+class PushIngestionService:
+    """
+    Ingests articles pushed by external producers (crawlers that already have the
+    text) as an NDJSON stream. Records are parsed as the body arrives and go through
+    the same clean -> dedup -> store -> index pipeline as fetched articles, in batches
+    of `batch_size`, so memory stays bounded by one batch whatever the stream size.
+    """
+
+    def __init__(self, ingestion_service, batch_size: int = None, max_line_bytes: int = None):
+        self.ingestion_service = ingestion_service
+        self.batch_size = batch_size or int(os.getenv("PUSH_BATCH_SIZE", "200"))
+        self.max_line_bytes = max_line_bytes or int(os.getenv("PUSH_MAX_LINE_BYTES", str(8 * 1024 * 1024)))
+
+    async def ingest_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        source: str,
+        run_sync: Callable[..., Awaitable] = run_in_threadpool,
+    ) -> PushReport:
+        """
+        Consumes the body chunks. Invalid lines are reported and skipped; a malformed
+        stream stops the parsing, and the records read until then are still ingested.
+        Each batch runs through `run_sync`, which keeps the blocking pipeline off the
+        event loop (the API passes the ingest gate's worker threads).
+        """
+        decoder = NDJSONArticleDecoder(self.max_line_bytes)
+        report = PushReport()
+        batch: List[Tuple[int, Article]] = []
+        try:
+            async for chunk in chunks:
+                for line, record in decoder.feed(chunk):
+                    batch = await self._add(record, line, batch, source, report, run_sync)
+            for line, record in decoder.close():
+                batch = await self._add(record, line, batch, source, report, run_sync)
+        except StreamError as e:
+            logger.warning(f"Pushed stream stopped after {report.received} records: {e}")
+            report.error = str(e)
+        if batch:
+            await run_sync(self._ingest_batch, batch, source, report)
+        report.results.sort(key=lambda r: r.line)
+        return report
+
+    async def _add(self, record, line: int, batch, source: str, report: PushReport, run_sync):
+        report.received += 1
+        if isinstance(record, RecordError):
+            self._record(report, PushRecordResult(line=line, status="failed", error=f"invalid record: {record}"))
+            return batch
+        batch.append((line, record))
+        if len(batch) >= self.batch_size:
+            await run_sync(self._ingest_batch, batch, source, report)
+            return []
+        return batch
+
+    def _ingest_batch(self, batch: List[Tuple[int, Article]], source: str, report: PushReport):
+        lines = [line for line, _ in batch]
+        try:
+            result = self.ingestion_service.ingest_fetched(source, [article for _, article in batch])
+        except Exception as e:
+            logger.error(f"Failed to ingest pushed batch of {len(batch)} records: {e}", exc_info=True)
+            for line in lines:
+                self._record(report, PushRecordResult(line=line, status="failed", error="ingestion failed"))
+            return
+        for line, outcome in zip(lines, result.outcomes):
+            self._record(report, PushRecordResult(line=line, **outcome.model_dump()))
+
+    @staticmethod
+    def _record(report: PushReport, result: PushRecordResult):
+        report.results.append(result)
+        field = result.status if result.status in ("indexed", "updated", "duplicate") else "failed"
+        setattr(report, field, getattr(report, field) + 1)
@@ -0,0 +1,203 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+from ingestion.models import Article
+from database.manager import DatabaseManager
+from chunking.chunker import build_document_chunker, build_version_chunker
+from storage.upsert_writer import UpsertWriter
+from storage.backends import build_vector_store
+from storage.related_index import RelatedArticlesIndex
+from storage.story_clusters import StoryClusterer
+
+logger = logging.getLogger(__name__)
+
+
+class ReindexError(Exception):
+    """Raised when an index version cannot be built or activated."""
+
+
+class ReindexReport(BaseModel):
+    """Counters for one build or cut-over of an index version."""
+    articles: int = 0
+    chunks: int = 0
+    from_chunks: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.articles} articles re-indexed ({self.chunks} chunks), "
+            f"{self.from_chunks} rebuilt from old chunks, {self.skipped} without content, "
+            f"{self.failed} failed in {self.elapsed_seconds:.1f}s"
+        )
+
+
+class ReindexJob:
+    """
+    Builds an index version offline: the stored cleaned content of every indexed
+    article is re-chunked with the version's strategy, embedded with its model and
+    written to its index while the active version keeps serving. Chunk rows are
+    tagged with the version, so a run can stop at any time and resume where it was.
+
+    Articles stored before compressed content was kept fall back to the text of
+    their chunks in the active version, joined in order (exact for non-overlapping
+    strategies, slightly repetitive for overlapping ones).
+
+    `cutover` catches up on articles indexed during the build, activates the
+    version and catches up once more after the other processes have switched.
+    Article embeddings (related articles, stories) are only written by the store
+    serving traffic; when the embedding model changes they are recomputed from the
+    new version after activation.
+    """
+
+    def __init__(
+        self,
+        version_name: str,
+        batch_size: int = 100,
+        db_manager=None,
+        vector_store=None,
+        related_index: Optional[RelatedArticlesIndex] = None,
+        story_clusterer: Optional[StoryClusterer] = None,
+        chunker=None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.db_manager = db_manager or DatabaseManager()
+        self.version = self.db_manager.get_index_version(version_name)
+        if self.version is None:
+            raise ReindexError(f"Index version '{version_name}' does not exist.")
+        # Version whose chunks stand in for content that was never stored.
+        active = self.db_manager.get_active_index_version()
+        self.source_name = active.name if active is not None and active.name != version_name else None
+        self.batch_size = batch_size
+        self.vector_store = vector_store or build_vector_store(version=self.version)
+        self.vector_store.record_article_embeddings = False
+        strategy = self.version.chunking_strategy
+        self.chunker = chunker or (build_version_chunker(strategy) if strategy else build_document_chunker())
+        self.related_index = related_index or RelatedArticlesIndex(self.db_manager)
+        self.story_clusterer = story_clusterer or StoryClusterer(self.db_manager)
+        # How long other processes may keep writing to the old version (see ActiveVectorStore).
+        self.settle_seconds = float(os.getenv("INDEX_VERSION_REFRESH_SECONDS", "30"))
+        self._sleep = sleep
+
+    def build(self) -> ReindexReport:
+        """
+        Indexes every indexed article that has no chunks in this version yet.
+        """
+        report = ReindexReport()
+        started = time.monotonic()
+        after_id = 0
+        with self.vector_store.new_writer(on_indexed=None, on_failed=None) as writer:
+            while True:
+                rows = self.db_manager.get_indexed_missing_version(
+                    self.version.name, limit=self.batch_size, after_id=after_id
+                )
+                if not rows:
+                    break
+                after_id = rows[-1].id
+                self._process_batch(rows, writer, report)
+                report.elapsed_seconds = time.monotonic() - started
+                logger.info(f"Reindex '{self.version.name}' progress: {report.summary()}")
+
+        report.elapsed_seconds = time.monotonic() - started
+        return report
+
+    def _process_batch(self, rows, writer: UpsertWriter, report: ReindexReport):
+        contents = self.db_manager.get_contents([r.id for r in rows])
+        missing = [r.id for r in rows if r.id not in contents]
+        if missing:
+            recovered: Dict[int, List[str]] = {}
+            for chunk in self.db_manager.get_chunks_for_articles(missing, self.source_name):
+                recovered.setdefault(chunk.article_id, []).append(chunk.text)
+            contents.update({aid: "\n\n".join(texts) for aid, texts in recovered.items()})
+            report.from_chunks += len(recovered)
+
+        articles: Dict[int, Article] = {}
+        for row in rows:
+            if not contents.get(row.id):
+                report.skipped += 1
+                continue
+            articles[row.id] = Article(
+                title=row.title,
+                url=row.url,
+                content=contents[row.id],
+                published_at=row.published_at,
+                content_preview=row.content_preview,
+                source=row.source,
+                language=row.language,
+            )
+
+        chunks_by_article: Dict[int, List[str]] = {}
+        for aid, article in articles.items():
+            try:
+                chunks = self.chunker.chunk(article)
+            except Exception as e:
+                logger.error(f"Failed to chunk article ID {aid}: {e}", exc_info=True)
+                chunks = []
+            if chunks:
+                chunks_by_article[aid] = chunks
+            else:
+                report.failed += 1
+
+        try:
+            report.chunks += self.vector_store.vectorize_and_store_many(chunks_by_article, writer, articles)
+        except Exception as e:
+            # Nothing was recorded for the batch: the next run picks it up again.
+            logger.error(f"Failed to re-embed batch of {len(chunks_by_article)} articles: {e}", exc_info=True)
+            report.failed += len(chunks_by_article)
+            return
+
+        # Forget the chunk rows of articles whose vectors didn't land, so a rerun retries them.
+        upserts = writer.flush()
+        if upserts.failed_articles:
+            chunks = self.db_manager.get_chunks_for_articles(list(upserts.failed_articles), self.version.name)
+            self.db_manager.delete_chunks([c.datapoint_id for c in chunks])
+        report.failed += len(upserts.failed_articles)
+        report.articles += len(chunks_by_article) - len(upserts.failed_articles)
+
+    def cutover(self) -> ReindexReport:
+        """
+        Catches up, activates this version and catches up on whatever the other
+        processes indexed into the previous version before they switched.
+        """
+        report = self.build()
+        previous = self.db_manager.get_index_version(self.source_name) if self.source_name else None
+        self.db_manager.activate_index_version(self.version.name)
+        self.vector_store.record_article_embeddings = True
+        logger.info(f"Index version '{self.version.name}' is active")
+
+        self._sleep(self.settle_seconds)
+        late = self.build()
+        report.articles += late.articles
+        report.chunks += late.chunks
+        report.from_chunks += late.from_chunks
+        report.skipped += late.skipped
+        report.failed += late.failed
+        report.elapsed_seconds += late.elapsed_seconds
+
+        previous_model = previous.embedding_model if previous is not None else None
+        if previous_model != self.version.embedding_model:
+            self.refresh_article_embeddings()
+        return report
+
+    def refresh_article_embeddings(self):
+        """
+        Recomputes article embeddings from this version's vectors, then every
+        related list and the active story centroids, since similarities across
+        embedding models are meaningless.
+        """
+        after_id, article_ids = 0, []
+        while True:
+            rows = self.db_manager.get_indexed_articles(limit=self.batch_size, after_id=after_id)
+            if not rows:
+                break
+            after_id = rows[-1].id
+            ids = [r.id for r in rows]
+            self.vector_store.refresh_article_embeddings(ids)
+            article_ids.extend(ids)
+        for start in range(0, len(article_ids), self.batch_size):
+            self.related_index.update(article_ids[start:start + self.batch_size])
+        self.story_clusterer.recompute_centroids()
+        logger.info(f"Article embeddings and related lists rebuilt for {len(article_ids)} articles")
@@ -0,0 +1,41 @@
+import logging
+from typing import Any, Dict
+from database.manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleNotFoundError(Exception):
+    """Raised when the requested article does not exist."""
+
+
+class RelatedArticlesService:
+    """
+    Serves "more like this article" from the precomputed neighbour lists (see
+    RelatedArticlesIndex): no embedding or vector search happens at request time.
+    """
+
+    def __init__(self):
+        self.db_manager = DatabaseManager()
+
+    def get_related(self, article_id: int, k: int = 10) -> Dict[str, Any]:
+        related = self.db_manager.get_related_articles(article_id, limit=k)
+        # Only an empty answer needs a second query, to tell "unknown" from "no neighbours yet".
+        if not related and self.db_manager.get_article_by_id(article_id) is None:
+            raise ArticleNotFoundError(f"Article {article_id} not found.")
+        return {
+            "article_id": article_id,
+            "results": [
+                {
+                    "id": article.id,
+                    "title": article.title,
+                    "url": article.url,
+                    "published_at": article.published_at,
+                    "content_preview": article.content_preview,
+                    "source": article.source,
+                    "language": article.language,
+                    "score": score,
+                }
+                for article, score in related
+            ],
+        }
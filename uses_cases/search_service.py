@@ -1,5 +1,8 @@
 import logging
-from storage.vector_store import VectorStore
+from typing import Optional
+from storage.search_filters import SearchFilters, to_epoch_seconds
+from storage.backends import build_vector_store
+from services.deadlines import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -9,21 +12,33 @@ class SearchError(Exception):
 
 
 class SearchService:
-    def __init__(self):
-        self.vector_store = VectorStore()
+    def __init__(self, vector_store=None):
+        self.vector_store = vector_store or build_vector_store()
 
-    def search_articles(self, query: str, k: int = 10):
+    def search_articles(self, query: str, k: int = 10, filters: Optional[SearchFilters] = None):
         if not query or not query.strip():
             msg = "Search query cannot be empty."
             logger.warning(msg)
             raise SearchError(msg)
 
+        if (
+            filters
+            and filters.published_after
+            and filters.published_before
+            and to_epoch_seconds(filters.published_after) >= to_epoch_seconds(filters.published_before)
+        ):
+            msg = "published_after must be earlier than published_before."
+            logger.warning(msg)
+            raise SearchError(msg)
+
         try:
-            results = self.vector_store.search_similar(query, k=k)
+            results = self.vector_store.search_similar(query, k=k, filters=filters)
             if not results:
                 logger.info(f"No results found for query: '{query}'")
                 return []
             return results
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Search failed for query '{query}': {e}", exc_info=True)
             raise SearchError("Semantic search failed") from e
@@ -0,0 +1,85 @@
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict
+from database.manager import DatabaseManager
+from ingestion.models import Article
+from storage.title_index import TitleIndex
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestService:
+    """
+    Title type-ahead served from an in-memory TitleIndex: a lookup makes no remote
+    call. The index is loaded from Postgres once (at warm-up or on first use), gets
+    articles indexed by this process pushed to it, and every
+    SUGGEST_REFRESH_SECONDS pulls in, in the background, articles indexed elsewhere
+    (other workers, the watchlist scheduler, backfills).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.db_manager = DatabaseManager()
+        self.index = TitleIndex()
+        self.refresh_interval = float(os.getenv("SUGGEST_REFRESH_SECONDS", "30"))
+        # indexed_at is the transaction start time, so rows can commit with an
+        # older timestamp than the last one seen: each refresh re-reads a margin.
+        self.refresh_overlap = timedelta(seconds=float(os.getenv("SUGGEST_REFRESH_OVERLAP_SECONDS", "600")))
+        self._clock = clock
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._refreshing = threading.Lock()
+        self._last_refresh = 0.0
+        self._watermark = None
+
+    def _add_rows(self, rows):
+        self.index.add((aid, title, published_at) for aid, title, published_at, _ in rows)
+        stamps = [indexed_at for _, _, _, indexed_at in rows if indexed_at]
+        if stamps and (self._watermark is None or max(stamps) > self._watermark):
+            self._watermark = max(stamps)
+
+    def load(self):
+        """Loads every indexed title. Later calls return immediately."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            started = time.perf_counter()
+            for rows in self.db_manager.iter_indexed_titles():
+                self._add_rows(rows)
+            self._last_refresh = self._clock()
+            self._loaded = True
+            logger.info(f"Loaded {len(self.index)} titles for suggestions in {time.perf_counter() - started:.1f}s")
+
+    def refresh(self):
+        """Adds the articles indexed since the last load or refresh."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            self._last_refresh = self._clock()
+            if self._watermark is None:
+                rows = [row for rows in self.db_manager.iter_indexed_titles() for row in rows]
+            else:
+                rows = self.db_manager.get_titles_indexed_since(self._watermark - self.refresh_overlap)
+            self._add_rows(rows)
+        except Exception as e:
+            logger.error(f"Failed to refresh suggestions: {e}", exc_info=True)
+        finally:
+            self._refreshing.release()
+
+    def _refresh_if_stale(self):
+        if self._clock() - self._last_refresh >= self.refresh_interval and not self._refreshing.locked():
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def add_articles(self, articles: Dict[int, Article]):
+        """Pushes articles this process just indexed (see ArticleIngestionService)."""
+        if self._loaded:
+            self.index.add((aid, a.title, a.published_at) for aid, a in articles.items())
+
+    def suggest(self, prefix: str, limit: int = 8) -> Dict[str, Any]:
+        self.load()
+        self._refresh_if_stale()
+        return {"q": prefix, "suggestions": self.index.suggest(prefix, limit=limit)}
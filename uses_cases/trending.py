@@ -0,0 +1,51 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+from database.manager import DatabaseManager
+from storage.story_clusters import trend_velocity
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingService:
+    """
+    Ranks stories by velocity: their article count decayed with a half-life of
+    STORY_TRENDING_HALF_LIFE_HOURS. Counts are maintained as articles are clustered,
+    so a request is an indexed read, not a re-clustering.
+    """
+
+    def __init__(self):
+        self.db_manager = DatabaseManager()
+        self.half_life_hours = float(os.getenv("STORY_TRENDING_HALF_LIFE_HOURS", "6"))
+
+    def get_trending(
+        self, hours: int = 48, limit: int = 10, min_size: int = 2, per_story: int = 3
+    ) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        since = (now - timedelta(hours=hours)).replace(tzinfo=None)
+        stories = self.db_manager.get_trending_stories(since, limit=limit, min_size=min_size)
+        articles = self.db_manager.get_story_articles([s.id for s in stories], per_story=per_story)
+        return {
+            "generated_at": now,
+            "stories": [
+                {
+                    "id": story.id,
+                    "label": story.label,
+                    "size": story.size,
+                    "velocity": round(trend_velocity(story.trend_key, now, self.half_life_hours), 3),
+                    "last_article_at": story.last_article_at,
+                    "articles": [
+                        {
+                            "id": a.id,
+                            "title": a.title,
+                            "url": a.url,
+                            "published_at": a.published_at,
+                            "source": a.source,
+                        }
+                        for a in articles.get(story.id, [])
+                    ],
+                }
+                for story in stories
+            ],
+        }
@@ -0,0 +1,205 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+from cleaning.cleaner import content_hash
+from ingestion.models import Article
+from ingestion.providers.provider_i import ProviderError
+from uses_cases.article_ingestion import ArticleIngestionService
+
+logger = logging.getLogger(__name__)
+
+
+class WatchlistEntry(BaseModel):
+    """A (provider, query) topic refreshed every `interval_seconds`."""
+    source: str
+    query: str
+    interval_seconds: float = 3600.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.source}:{self.query}"
+
+
+class WatchlistRunReport(BaseModel):
+    """Counters for one scheduler tick (every entry that was due)."""
+    topics_run: int = 0
+    topics_unchanged: int = 0
+    topics_failed: int = 0
+    articles_fetched: int = 0
+    articles_new: int = 0
+    articles_indexed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def articles_per_second(self) -> float:
+        return self.articles_fetched / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.topics_run} topics run ({self.topics_unchanged} unchanged, "
+            f"{self.topics_failed} failed): {self.articles_fetched} articles fetched, "
+            f"{self.articles_new} new, {self.articles_indexed} indexed in "
+            f"{self.elapsed_seconds:.1f}s ({self.articles_per_second:.1f} articles/s)"
+        )
+
+
+def load_watchlist(path: str) -> List[WatchlistEntry]:
+    """Reads a JSON list of {"source", "query", "interval_seconds"} objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [WatchlistEntry(**entry) for entry in json.load(f)]
+
+
+def fingerprint(articles: List[Article]) -> str:
+    """
+    Order-independent digest of a result set, used to detect unchanged topics. The
+    content is part of it, so a corrected article body counts as a change.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(f"{a.url}\n{a.title}\n{content_hash(a.content)}" for a in articles):
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class WatchlistScheduler:
+    """
+    Keeps many (provider, query) topics fresh from one process.
+
+    Each entry runs every `interval_seconds`, with +/- `jitter` (a fraction of the
+    interval) so topics sharing a provider don't fire together; first runs are
+    spread over one interval. Fetches go through the ingestion service's
+    ProviderScheduler, so provider quotas, backoff and circuit breakers are shared by
+    every topic, and a provider asking us to wait (Retry-After) pushes the entry back.
+
+    A topic whose result set is identical to the previous run is skipped before any
+    dedup/clean/index work, and its interval is doubled (up to `max_backoff` times
+    the configured one) until the results change again. Fingerprints are kept in
+    `state_path`, when given, so a restart doesn't reprocess every topic.
+    """
+
+    def __init__(
+        self,
+        entries: List[WatchlistEntry],
+        ingestion_service: Optional[ArticleIngestionService] = None,
+        max_workers: int = 4,
+        jitter: float = 0.1,
+        max_backoff: int = 8,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.entries = {entry.key: entry for entry in entries}
+        self.ingestion_service = ingestion_service or ArticleIngestionService()
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.state_path = state_path
+        self._clock = clock
+        self._sleep = sleep
+
+        self._state: Dict[str, dict] = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+
+        now = clock()
+        self._queue = [
+            (now + random.uniform(0, entry.interval_seconds), key)
+            for key, entry in self.entries.items()
+        ]
+        heapq.heapify(self._queue)
+
+    def next_due_in(self) -> float:
+        if not self._queue:
+            return float("inf")
+        return max(0.0, self._queue[0][0] - self._clock())
+
+    def _next_interval(self, entry: WatchlistEntry) -> float:
+        backoff = self._state.get(entry.key, {}).get("backoff", 1)
+        interval = entry.interval_seconds * backoff
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run_entry(self, entry: WatchlistEntry) -> dict:
+        state = self._state.setdefault(entry.key, {"fingerprint": None, "backoff": 1})
+        try:
+            articles = self.ingestion_service.provider_scheduler.fetch(entry.source, entry.query)
+        except ProviderError as e:
+            logger.warning(f"Watchlist '{entry.key}' fetch failed: {e}")
+            return {"failed": True, "retry_after": e.retry_after}
+        except Exception as e:
+            logger.error(f"Watchlist '{entry.key}' fetch failed: {e}", exc_info=True)
+            return {"failed": True}
+
+        digest = fingerprint(articles)
+        if digest == state["fingerprint"]:
+            state["backoff"] = min(self.max_backoff, state["backoff"] * 2)
+            return {"unchanged": True, "fetched": len(articles)}
+
+        try:
+            result = self.ingestion_service.ingest_fetched(entry.source, articles)
+        except Exception as e:
+            logger.error(f"Watchlist '{entry.key}' ingestion failed: {e}", exc_info=True)
+            return {"failed": True, "fetched": len(articles)}
+        # Only remember the result set once it was processed, so failures are retried.
+        state["fingerprint"] = digest
+        state["backoff"] = 1
+        return {"fetched": result.fetched, "new": result.new, "indexed": result.indexed}
+
+    def run_due(self) -> WatchlistRunReport:
+        """Runs every entry that is due, concurrently, and reschedules them."""
+        now = self._clock()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[1])
+
+        report = WatchlistRunReport()
+        if not due:
+            return report
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            outcomes = dict(zip(due, executor.map(lambda key: self._run_entry(self.entries[key]), due)))
+
+        now = self._clock()
+        for key, outcome in outcomes.items():
+            entry = self.entries[key]
+            report.topics_run += 1
+            report.topics_failed += bool(outcome.get("failed"))
+            report.topics_unchanged += bool(outcome.get("unchanged"))
+            report.articles_fetched += outcome.get("fetched", 0)
+            report.articles_new += outcome.get("new", 0)
+            report.articles_indexed += outcome.get("indexed", 0)
+
+            delay = self._next_interval(entry)
+            if outcome.get("retry_after"):
+                delay = max(delay, outcome["retry_after"])
+            heapq.heappush(self._queue, (now + delay, key))
+
+        report.elapsed_seconds = time.perf_counter() - started
+        self._save_state()
+        logger.info(f"Watchlist run: {report.summary()}")
+        return report
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        # Write-then-rename so a crash never leaves a truncated state file behind.
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run_forever(self, max_idle: float = 60.0):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Watchlist run failed: {e}", exc_info=True)
+            self._sleep(min(max_idle, self.next_due_in()))